@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark indicator computation: legacy Python loops vs the NumPy kernels in
+src/utils/indicators.py.
+
+- per-symbol: one series of --bars closes, MA5/10/20 + RSI14 + MACD(12,26,9),
+  legacy loops vs 1-D kernel calls
+- whole-market: --symbols × --bars, legacy loops / 1-D kernel per symbol vs a
+  single 2-D kernel call
+
+The legacy functions below are the loop implementations the kernels replaced
+(perception TechnicalDetector helpers), kept here only as the baseline.
+
+Usage:
+    python scripts/benchmark_indicators.py [--symbols 5000] [--bars 260] [--repeat 3]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src.utils import indicators
+
+
+# ── Legacy loop implementations (baseline) ───────────────────────────
+
+
+def legacy_sma(values, period):
+    return [
+        sum(values[i - period + 1:i + 1]) / period if i >= period - 1 else None
+        for i in range(len(values))
+    ]
+
+
+def legacy_ema(values, period):
+    if len(values) < period:
+        return None
+    k = 2.0 / (period + 1)
+    ema_val = sum(values[:period]) / period
+    for v in values[period:]:
+        ema_val = v * k + ema_val * (1 - k)
+    return ema_val
+
+
+def legacy_rsi(closes, period=14):
+    deltas = [closes[i] - closes[i - 1] for i in range(1, len(closes))]
+    gains = [d if d > 0 else 0.0 for d in deltas]
+    losses = [-d if d < 0 else 0.0 for d in deltas]
+    avg_gain = sum(gains[:period]) / period
+    avg_loss = sum(losses[:period]) / period
+    for i in range(period, len(gains)):
+        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+    return 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+def legacy_macd(closes, fast=12, slow=26, signal=9):
+    macd_series = []
+    for end in range(slow, len(closes) + 1):
+        macd_series.append(legacy_ema(closes[:end], fast) - legacy_ema(closes[:end], slow))
+    sig = legacy_ema(macd_series, signal)
+    return macd_series[-1], sig
+
+
+def legacy_all(closes):
+    for p in (5, 10, 20):
+        legacy_sma(closes, p)
+    legacy_rsi(closes)
+    legacy_macd(closes)
+
+
+def kernel_all(closes):
+    for p in (5, 10, 20):
+        indicators.sma(closes, p)
+    indicators.rsi(closes)
+    indicators.macd(closes, seed="sma")
+
+
+# ── Harness ──────────────────────────────────────────────────────────
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indicator kernels")
+    parser.add_argument("--symbols", type=int, default=5000, help="Symbols in the market matrix")
+    parser.add_argument("--bars", type=int, default=260, help="Bars per symbol")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    parser.add_argument(
+        "--legacy-sample", type=int, default=200,
+        help="Symbols to time for the legacy whole-market loop (extrapolated)",
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    matrix = 10 + rng.standard_normal((args.symbols, args.bars)).cumsum(axis=1) * 0.1
+    series = matrix[0]
+    series_list = series.tolist()
+
+    print(f"Bars: {args.bars}, symbols: {args.symbols:,}")
+    print(f"{'case':<34}{'seconds':>12}{'speedup':>10}")
+
+    legacy_one = best_of(lambda: legacy_all(series_list), args.repeat)
+    kernel_one = best_of(lambda: kernel_all(series), args.repeat)
+    print(f"{'per-symbol legacy loops':<34}{legacy_one:>12.6f}")
+    print(f"{'per-symbol kernel (1-D)':<34}{kernel_one:>12.6f}{legacy_one / kernel_one:>9.1f}x")
+
+    sample = min(args.legacy_sample, args.symbols)
+    rows = matrix[:sample].tolist()
+    legacy_sample = best_of(lambda: [legacy_all(r) for r in rows], 1)
+    legacy_market = legacy_sample * args.symbols / sample
+    loop_market = best_of(lambda: [kernel_all(r) for r in matrix], 1)
+    kernel_market = best_of(lambda: kernel_all(matrix), args.repeat)
+    print(f"{'market legacy loops (extrapolated)':<34}{legacy_market:>12.3f}")
+    print(f"{'market kernel 1-D per symbol':<34}{loop_market:>12.3f}{legacy_market / loop_market:>9.1f}x")
+    print(f"{'market kernel 2-D single call':<34}{kernel_market:>12.3f}{legacy_market / kernel_market:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark K-line ingest: ORM path (KlineService.save_klines) vs columnar path
+(KlineRepository.upsert_columns).
+
+Both paths write the same synthetic daily bars into a fresh SQLite database
+(in-memory by default) and report rows/sec for an insert pass and an update
+(upsert-over-existing) pass.
+
+Usage:
+    python scripts/benchmark_kline_upsert.py [--symbols 200] [--bars 1000] [--db-file PATH]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base
+from src.models import KlineTimeframe, SymbolType
+from src.repositories.kline_repository import KlineRepository
+from src.services.kline_service import KlineService
+
+
+def make_frame(symbols: int, bars: int, seed: int = 7) -> pd.DataFrame:
+    """Synthetic daily bars for `symbols` tickers × `bars` days."""
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range("2015-01-01", periods=bars).strftime("%Y%m%d")
+    n = symbols * bars
+    close = 10 + rng.standard_normal(n).cumsum() * 0.01
+    return pd.DataFrame({
+        "symbol_code": np.repeat([f"{600000 + i:06d}" for i in range(symbols)], bars),
+        "trade_time": np.tile(days, symbols),
+        "open": close * 0.99,
+        "high": close * 1.01,
+        "low": close * 0.98,
+        "close": close,
+        "volume": rng.integers(1_000, 100_000, n).astype(float),
+        "amount": rng.integers(10_000, 1_000_000, n).astype(float),
+    })
+
+
+def make_session(db_file: str | None):
+    url = f"sqlite:///{db_file}" if db_file else "sqlite:///:memory:"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def run_orm(session, frame: pd.DataFrame) -> float:
+    """Current path: list[dict] per symbol -> save_klines -> ORM objects -> upsert_batch."""
+    service = KlineService.create_with_session(session)
+    start = time.perf_counter()
+    for code, group in frame.groupby("symbol_code", sort=False):
+        klines = [
+            {
+                "datetime": row.trade_time,
+                "open": row.open,
+                "high": row.high,
+                "low": row.low,
+                "close": row.close,
+                "volume": row.volume,
+                "amount": row.amount,
+            }
+            for row in group.itertuples(index=False)
+        ]
+        service.save_klines(
+            symbol_type=SymbolType.STOCK,
+            symbol_code=code,
+            symbol_name=None,
+            timeframe=KlineTimeframe.DAY,
+            klines=klines,
+            calculate_indicators=False,
+        )
+    session.commit()
+    return time.perf_counter() - start
+
+
+def run_columnar(session, frame: pd.DataFrame) -> float:
+    """Columnar path: whole frame -> upsert_columns."""
+    repo = KlineRepository(session)
+    start = time.perf_counter()
+    repo.upsert_columns(frame, SymbolType.STOCK, KlineTimeframe.DAY)
+    session.commit()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark kline upsert paths")
+    parser.add_argument("--symbols", type=int, default=200, help="Number of symbols")
+    parser.add_argument("--bars", type=int, default=1000, help="Bars per symbol")
+    parser.add_argument(
+        "--db-file", default=None,
+        help="Scratch SQLite file, tables are dropped (default: in-memory)",
+    )
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    frame = make_frame(args.symbols, args.bars)
+    rows = len(frame)
+    print(f"Rows: {rows:,} ({args.symbols} symbols × {args.bars} bars)")
+    print(f"{'path':<12}{'pass':<10}{'seconds':>10}{'rows/sec':>14}")
+
+    results = {}
+    for name, runner in (("orm", run_orm), ("columnar", run_columnar)):
+        session = make_session(args.db_file)
+        for phase in ("insert", "update"):
+            elapsed = runner(session, frame)
+            results[(name, phase)] = elapsed
+            print(f"{name:<12}{phase:<10}{elapsed:>10.2f}{rows / elapsed:>14,.0f}")
+        session.close()
+
+    for phase in ("insert", "update"):
+        speedup = results[("orm", phase)] / results[("columnar", phase)]
+        print(f"speedup ({phase}): {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,7 @@ import tushare as ts
 from src.config import get_settings
 from src.database import SessionLocal
 from src.models import Watchlist
+from src.repositories.technical_indicator_repository import TechnicalIndicatorRepository
 from sqlalchemy import text, select
 
 
@@ -137,6 +138,9 @@ def calculate_and_save(pro, ticker: str, session) -> bool:
             'boll_lower': None if pd.isna(row['boll_lower']) else float(row['boll_lower']),
         })
     
+    # 同步选股快照（最新两个交易日）
+    TechnicalIndicatorRepository(session).refresh_snapshot([ticker])
+    
     return True
 
 
@@ -151,6 +155,12 @@ def main():
     session = SessionLocal()
     
     try:
+        # 快照为空（首次运行或旧库）时先全量重建，之后逐只增量刷新
+        indicator_repo = TechnicalIndicatorRepository(session)
+        if indicator_repo.needs_bootstrap():
+            indicator_repo.rebuild()
+            session.commit()
+
         watchlist = session.execute(select(Watchlist.ticker)).fetchall()
         tickers = [w[0] for w in watchlist]
         
@@ -56,7 +56,7 @@ class ETFKlineDownloader:
             DataFrame with columns: date, open, high, low, close, volume, amount
         """
         try:
-            time.sleep(0.3)  # 限流
+            self.client.rate_limiter.acquire()  # 共享 tushare 额度
 
             end_date = datetime.now().strftime('%Y%m%d')
             start_date = (datetime.now() - timedelta(days=days + 30)).strftime('%Y%m%d')
@@ -6,7 +6,6 @@
 """
 
 import sys
-import time
 from pathlib import Path
 from typing import Dict, List, Set
 from collections import defaultdict
@@ -19,6 +18,7 @@ sys.path.insert(0, str(project_root))
 from src.services.tushare_client import TushareClient
 from src.database import SessionLocal
 from src.models import SymbolMetadata
+from src.repositories.board_membership_repository import BoardMembershipRepository
 from src.config import get_settings
 from sqlalchemy import select
 
@@ -71,9 +71,6 @@ def fetch_all_concept_members(client: TushareClient, concept_df: pd.DataFrame) -
                 concept_members[concept_name] = set()
                 print(f"[{idx + 1}/{total}] ⚠️  {concept_name}: 无成分股")
 
-            # API 限流保护：每次调用后休息0.3秒
-            time.sleep(0.3)
-
         except Exception as e:
             print(f"[{idx + 1}/{total}] ❌ {concept_name}: 获取失败 - {e}")
             concept_members[concept_name] = set()
@@ -112,8 +109,12 @@ def build_ticker_concept_mapping(concept_members: Dict[str, Set[str]]) -> Dict[s
     return dict(ticker_concepts)
 
 
-def update_database(ticker_concepts: Dict[str, List[str]]) -> None:
-    """更新数据库中的 concepts 字段"""
+def update_database(
+    ticker_concepts: Dict[str, List[str]],
+    concept_members: Dict[str, Set[str]],
+    concept_codes: Dict[str, str],
+) -> None:
+    """更新数据库中的 concepts 字段，并整体替换 board_membership 中的概念成分股"""
     session = SessionLocal()
 
     try:
@@ -139,12 +140,22 @@ def update_database(ticker_concepts: Dict[str, List[str]]) -> None:
                 symbol.concepts = []
                 no_concept_count += 1
 
+        # 概念 → 成分股关系（一次批量写入）
+        membership_count = BoardMembershipRepository(session).replace_boards(
+            "concept",
+            (
+                (name, concept_codes.get(name), sorted(tickers))
+                for name, tickers in concept_members.items()
+            ),
+        )
+
         # 提交更改
         session.commit()
 
         print(f"✅ 数据库更新完成!")
         print(f"   - 有概念的股票: {updated_count} 只")
         print(f"   - 无概念的股票: {no_concept_count} 只")
+        print(f"   - 概念成分股关系: {membership_count} 条")
         print("=" * 80)
 
     except Exception as e:
@@ -200,7 +211,8 @@ def main():
     ticker_concepts = build_ticker_concept_mapping(concept_members)
 
     # 4. 更新数据库
-    update_database(ticker_concepts)
+    concept_codes = dict(zip(concept_df['指数名称'], concept_df['指数代码']))
+    update_database(ticker_concepts, concept_members, concept_codes)
 
     # 5. 显示样例结果
     session = SessionLocal()
@@ -11,7 +11,6 @@
 
 import os
 import sys
-import time
 import logging
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -54,7 +53,7 @@ class ETFDailyFlowUpdater:
             (最新份额, 前一日份额, 最新日期)
         """
         try:
-            time.sleep(0.3)
+            self.client.rate_limiter.acquire()  # 共享 tushare 额度
             df = self.pro.fund_share(ts_code=ts_code)
             if df is None or len(df) < 1:
                 return None, None, None
@@ -72,7 +71,7 @@ class ETFDailyFlowUpdater:
     def get_fund_daily(self, ts_code: str) -> Optional[Dict[str, Any]]:
         """获取基金最新日线数据"""
         try:
-            time.sleep(0.3)
+            self.client.rate_limiter.acquire()  # 共享 tushare 额度
             end_date = datetime.now().strftime('%Y%m%d')
             start_date = (datetime.now() - timedelta(days=10)).strftime('%Y%m%d')
             df = self.pro.fund_daily(ts_code=ts_code, start_date=start_date, end_date=end_date)
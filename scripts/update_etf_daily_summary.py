@@ -90,7 +90,7 @@ class ETFDataUpdater:
             (最新份额, 前一日份额, 最新日期)
         """
         try:
-            time.sleep(0.3)  # 限流
+            self.client.rate_limiter.acquire()  # 共享 tushare 额度
             df = self.pro.fund_share(ts_code=ts_code)
             if df is None or len(df) < 1:
                 return None, None, None
@@ -109,7 +109,7 @@ class ETFDataUpdater:
     def get_fund_daily_close(self, ts_code: str, trade_date: str = None) -> Optional[float]:
         """获取基金收盘价"""
         try:
-            time.sleep(0.3)
+            self.client.rate_limiter.acquire()  # 共享 tushare 额度
             if trade_date:
                 df = self.pro.fund_daily(ts_code=ts_code, trade_date=trade_date)
             else:
@@ -136,7 +136,7 @@ class ETFDataUpdater:
             (TOP3持仓名称, TOP3占比, 持仓数量)
         """
         try:
-            time.sleep(0.3)
+            self.client.rate_limiter.acquire()  # 共享 tushare 额度
             df = self.pro.fund_portfolio(ts_code=ts_code)
             if df is None or len(df) < 1:
                 return None, None, None
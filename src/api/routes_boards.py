@@ -18,7 +18,9 @@ from src.api.dependencies import get_data_service, get_db
 from src.services.board_service import BoardService as BoardMappingService
 from src.services.data_pipeline import MarketDataService
 from src.models import IndustryDaily, SymbolMetadata, BoardMapping, SuperCategoryDaily
+from src.repositories.board_membership_repository import get_membership_index
 from src.schemas import SymbolMeta
+from src.utils.ticker_utils import TickerNormalizer
 
 logger = get_logger(__name__)
 
@@ -129,14 +131,14 @@ def verify_board_changes(
 @router.get("/concepts/{ticker}", response_model=StockConceptsResponse)
 def get_stock_concepts(
     ticker: str,
+    db: Session = Depends(get_db),
 ) -> StockConceptsResponse:
     """
-    获取某只股票所属的概念板块列表
+    获取某只股票所属的概念板块列表（板块成分股索引查询）
     """
-    service = BoardMappingService()
-
     try:
-        concepts = service.get_stock_concepts(ticker)
+        normalized = TickerNormalizer.normalize(ticker)
+        concepts = get_membership_index(db).boards_of(normalized, "concept")
         return StockConceptsResponse(
             ticker=ticker,
             concepts=concepts
@@ -2,10 +2,12 @@
 股票K线API
 带懒加载功能：数据库无数据或过期时自动从API获取并保存
 """
+import threading
+import weakref
 from datetime import datetime, time, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Query, Path
 from sqlalchemy.orm import Session
-from typing import Annotated, Optional
+from typing import Annotated, Optional, Tuple
 
 from src.api.dependencies import get_db
 from src.models import KlineTimeframe, SymbolType, Timeframe, TradeCalendar
@@ -32,17 +34,45 @@ RESPONSE_TIMEFRAME_MAP = {
 }
 
 
+# 最近交易日缓存有效期（交易日历很少变化，避免每次请求都查 trade_calendar）
+_TRADE_DATE_CACHE_TTL = timedelta(minutes=5)
+# Engine -> (今天, 缓存时间, 最近交易日)
+_trade_date_cache: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_trade_date_cache_lock = threading.Lock()
+
+
 # ==================== 懒加载辅助函数 ====================
 
 def _get_latest_trade_date(db: Session) -> Optional[str]:
     """
     获取最近一个交易日的日期 (YYYY-MM-DD)
-    从 trade_calendar 表查询
+    从 trade_calendar 表查询（按数据库缓存5分钟）
 
     Args:
         db: 数据库会话
     """
-    today = datetime.now().strftime("%Y-%m-%d")
+    now = datetime.now()
+    today = now.strftime("%Y-%m-%d")
+    try:
+        engine = db.get_bind()
+    except Exception:
+        engine = None
+
+    if engine is not None:
+        with _trade_date_cache_lock:
+            cached: Optional[Tuple[str, datetime, Optional[str]]] = _trade_date_cache.get(engine)
+        if cached and cached[0] == today and now - cached[1] < _TRADE_DATE_CACHE_TTL:
+            return cached[2]
+
+    latest = _query_latest_trade_date(db, today)
+    if engine is not None:
+        with _trade_date_cache_lock:
+            _trade_date_cache[engine] = (today, now, latest)
+    return latest
+
+
+def _query_latest_trade_date(db: Session, today: str) -> Optional[str]:
+    """查询 today 或之前最近的交易日"""
     # 查找今天或之前最近的交易日
     cal = db.query(TradeCalendar).filter(
         TradeCalendar.date <= today,
@@ -107,13 +137,10 @@ def _is_data_stale(
             return True
 
         # 如果是今天且已收盘(15:30后)，检查是否需要更新
+        # (最近交易日就是今天 <=> 今天是交易日)
         today = now.strftime("%Y-%m-%d")
         if data_date < today and now.time() > time(15, 30):
-            # 检查今天是否是交易日
-            cal = db.query(TradeCalendar).filter(
-                TradeCalendar.date == today
-            ).first()
-            if cal and cal.is_trading_day:
+            if latest_trade_date == today:
                 return True
 
         return False
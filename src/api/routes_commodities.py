@@ -48,6 +48,72 @@ class CommoditiesResponse(BaseModel):
     commodities: List[CommodityItem]
 
 
+def fetch_commodities_realtime() -> CommoditiesResponse:
+    """
+    同步获取大宗商品实时价格（阻塞的 yfinance 调用）
+
+    供接口与后台任务共用；在事件循环中请通过 asyncio.to_thread 调用。
+    """
+    symbols = list(COMMODITY_SYMBOLS.keys())
+    tickers = yf.Tickers(" ".join(symbols))
+
+    commodities: List[CommodityItem] = []
+
+    for symbol in symbols:
+        meta = COMMODITY_SYMBOLS[symbol]
+        try:
+            ticker = tickers.tickers[symbol]
+            info = ticker.fast_info
+
+            price = float(info.last_price) if hasattr(info, 'last_price') and info.last_price else 0
+            prev_close = float(info.previous_close) if hasattr(info, 'previous_close') and info.previous_close else 0
+            open_price = float(info.open) if hasattr(info, 'open') and info.open else 0
+            day_high = float(info.day_high) if hasattr(info, 'day_high') and info.day_high else 0
+            day_low = float(info.day_low) if hasattr(info, 'day_low') and info.day_low else 0
+
+            change = price - prev_close if prev_close > 0 else 0
+            change_pct = (change / prev_close * 100) if prev_close > 0 else 0
+
+            commodities.append(CommodityItem(
+                symbol=symbol,
+                name=meta["name"],
+                name_cn=meta["name_cn"],
+                unit=meta["unit"],
+                price=round(price, 4),
+                change=round(change, 4),
+                change_pct=round(change_pct, 2),
+                high_24h=round(day_high, 4),
+                low_24h=round(day_low, 4),
+                open_price=round(open_price, 4),
+                prev_close=round(prev_close, 4),
+                last_update=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
+            ))
+        except Exception as e:
+            logger.warning(f"Failed to fetch {symbol}: {e}")
+            # Return a placeholder with zeros so the frontend still renders
+            commodities.append(CommodityItem(
+                symbol=symbol,
+                name=meta["name"],
+                name_cn=meta["name_cn"],
+                unit=meta["unit"],
+                price=0,
+                change=0,
+                change_pct=0,
+                high_24h=0,
+                low_24h=0,
+                open_price=0,
+                prev_close=0,
+                last_update=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
+            ))
+
+    return CommoditiesResponse(
+        count=len(commodities),
+        source="yahoo_finance",
+        last_update=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
+        commodities=commodities,
+    )
+
+
 @router.get("/realtime", response_model=CommoditiesResponse)
 async def get_commodities_realtime():
     """
@@ -56,68 +122,8 @@ async def get_commodities_realtime():
     Returns:
         黄金、白银、铜、原油的实时行情数据
     """
-    import yfinance as yf
-
     try:
-        symbols = list(COMMODITY_SYMBOLS.keys())
-        tickers = yf.Tickers(" ".join(symbols))
-
-        commodities: List[CommodityItem] = []
-
-        for symbol in symbols:
-            meta = COMMODITY_SYMBOLS[symbol]
-            try:
-                ticker = tickers.tickers[symbol]
-                info = ticker.fast_info
-
-                price = float(info.last_price) if hasattr(info, 'last_price') and info.last_price else 0
-                prev_close = float(info.previous_close) if hasattr(info, 'previous_close') and info.previous_close else 0
-                open_price = float(info.open) if hasattr(info, 'open') and info.open else 0
-                day_high = float(info.day_high) if hasattr(info, 'day_high') and info.day_high else 0
-                day_low = float(info.day_low) if hasattr(info, 'day_low') and info.day_low else 0
-
-                change = price - prev_close if prev_close > 0 else 0
-                change_pct = (change / prev_close * 100) if prev_close > 0 else 0
-
-                commodities.append(CommodityItem(
-                    symbol=symbol,
-                    name=meta["name"],
-                    name_cn=meta["name_cn"],
-                    unit=meta["unit"],
-                    price=round(price, 4),
-                    change=round(change, 4),
-                    change_pct=round(change_pct, 2),
-                    high_24h=round(day_high, 4),
-                    low_24h=round(day_low, 4),
-                    open_price=round(open_price, 4),
-                    prev_close=round(prev_close, 4),
-                    last_update=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
-                ))
-            except Exception as e:
-                logger.warning(f"Failed to fetch {symbol}: {e}")
-                # Return a placeholder with zeros so the frontend still renders
-                commodities.append(CommodityItem(
-                    symbol=symbol,
-                    name=meta["name"],
-                    name_cn=meta["name_cn"],
-                    unit=meta["unit"],
-                    price=0,
-                    change=0,
-                    change_pct=0,
-                    high_24h=0,
-                    low_24h=0,
-                    open_price=0,
-                    prev_close=0,
-                    last_update=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
-                ))
-
-        return CommoditiesResponse(
-            count=len(commodities),
-            source="yahoo_finance",
-            last_update=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
-            commodities=commodities,
-        )
-
+        return fetch_commodities_realtime()
     except Exception as e:
         logger.exception("Failed to fetch commodities data")
         raise DatabaseError(operation="get_commodities_realtime", reason=str(e) if get_settings().debug else "Internal server error")
@@ -15,7 +15,9 @@ from src.api.dependencies import get_db
 from src.config import get_settings
 from src.exceptions import DatabaseError, ServiceUnavailableError
 from src.models import KlineTimeframe, SymbolType
+from src.repositories.board_membership_repository import get_membership_index
 from src.schemas.normalized import NormalizedTicker
+from src.services.http_clients import get_http_clients
 from src.services.kline_service import KlineService
 from src.utils.logging import get_logger
 
@@ -200,59 +202,58 @@ async def get_concept_realtime(code: str):
     try:
         # 获取分时数据
         url = f"{BASE_URL}/time/bk_{code}/last.js"
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=HEADERS, timeout=10.0)
-            resp.raise_for_status()
-
-            # 解析JSONP响应
-            text = resp.text
-            match = re.search(r'\((\{.*\})\)', text, re.DOTALL)
-            if not match:
-                raise HTTPException(status_code=404, detail="无法解析数据")
-
-            outer_data = json.loads(match.group(1))
-
-            # 获取内层数据 (结构: {"bk_886047": {...}})
-            inner_key = f"bk_{code}"
-            if inner_key not in outer_data:
-                raise HTTPException(status_code=404, detail=f"板块 {code} 数据不存在")
-
-            data = outer_data[inner_key]
-
-            # 获取关键数据
-            name = data.get('name', '')
-            pre_close = float(data.get('pre', 0))  # 昨收
-
-            # 从分时数据获取最新价格
-            time_data = data.get('data', '')
-            if time_data:
-                # 格式: "时间,价格,成交额,涨跌幅,成交量;..."
-                items = [item for item in time_data.split(';') if item.strip()]
-                if items:
-                    last_item = items[-1].split(',')
-                    if len(last_item) >= 2 and last_item[1]:
-                        current_price = float(last_item[1])
-                    else:
-                        current_price = pre_close
+        resp = await get_http_clients().get(url, headers=HEADERS, timeout=10.0)
+        resp.raise_for_status()
+
+        # 解析JSONP响应
+        text = resp.text
+        match = re.search(r'\((\{.*\})\)', text, re.DOTALL)
+        if not match:
+            raise HTTPException(status_code=404, detail="无法解析数据")
+
+        outer_data = json.loads(match.group(1))
+
+        # 获取内层数据 (结构: {"bk_886047": {...}})
+        inner_key = f"bk_{code}"
+        if inner_key not in outer_data:
+            raise HTTPException(status_code=404, detail=f"板块 {code} 数据不存在")
+
+        data = outer_data[inner_key]
+
+        # 获取关键数据
+        name = data.get('name', '')
+        pre_close = float(data.get('pre', 0))  # 昨收
+
+        # 从分时数据获取最新价格
+        time_data = data.get('data', '')
+        if time_data:
+            # 格式: "时间,价格,成交额,涨跌幅,成交量;..."
+            items = [item for item in time_data.split(';') if item.strip()]
+            if items:
+                last_item = items[-1].split(',')
+                if len(last_item) >= 2 and last_item[1]:
+                    current_price = float(last_item[1])
                 else:
                     current_price = pre_close
             else:
                 current_price = pre_close
+        else:
+            current_price = pre_close
 
-            # 计算涨跌幅
-            if pre_close > 0:
-                change_pct = ((current_price - pre_close) / pre_close) * 100
-            else:
-                change_pct = 0
-
-            return {
-                'code': code,
-                'name': name,
-                'price': current_price,
-                'pre_close': pre_close,
-                'change_pct': round(change_pct, 2),
-                'last_update': data.get('update', '')
-            }
+        # 计算涨跌幅
+        if pre_close > 0:
+            change_pct = ((current_price - pre_close) / pre_close) * 100
+        else:
+            change_pct = 0
+
+        return {
+            'code': code,
+            'name': name,
+            'price': current_price,
+            'pre_close': pre_close,
+            'change_pct': round(change_pct, 2),
+            'last_update': data.get('update', '')
+        }
     except httpx.RequestError as e:
         logger.exception("概念板块实时数据请求失败")
         raise ServiceUnavailableError(service="concept_realtime", reason=str(e) if get_settings().debug else "Service unavailable")
@@ -393,13 +394,17 @@ def get_concept_stocks(concept_name: str, db: Session = Depends(get_db)):
     from sqlalchemy import select
     from ..models import SymbolMetadata
 
-    mapping = load_concept_mapping()
-
-    if concept_name not in mapping:
-        raise HTTPException(status_code=404, detail=f"概念 {concept_name} 不存在")
-
-    info = mapping[concept_name]
-    stock_codes = info['stocks']
+    # 优先查板块成分股索引，索引中没有的概念回退到CSV映射
+    index = get_membership_index(db)
+    if index.has_board(concept_name, "concept"):
+        stock_codes = index.constituents(concept_name, "concept")
+        board_code = (index.board_code(concept_name, "concept") or "").replace('.TI', '')
+    else:
+        mapping = load_concept_mapping()
+        if concept_name not in mapping:
+            raise HTTPException(status_code=404, detail=f"概念 {concept_name} 不存在")
+        stock_codes = mapping[concept_name]['stocks']
+        board_code = mapping[concept_name]['code']
 
     # 使用标准化模型转换为带后缀的ticker格式
     def code_to_ticker(code: str) -> str:
@@ -454,7 +459,7 @@ def get_concept_stocks(concept_name: str, db: Session = Depends(get_db)):
 
     return {
         'concept': concept_name,
-        'code': info['code'],
+        'code': board_code,
         'stocks': result,
         'total': len(result)
     }
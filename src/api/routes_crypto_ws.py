@@ -1,13 +1,18 @@
 """
 Crypto WebSocket 实时数据 API 路由
-提供低延迟的实时价格查询和WebSocket状态管理
+提供低延迟的实时价格查询和WebSocket状态管理，
+以及 /ws/stream 推送（订阅后先收 snapshot，再收 ticker/kline/bar 增量）
 """
+import asyncio
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, HTTPException, Path
+from fastapi import APIRouter, Depends, Query, HTTPException, Path, WebSocket, WebSocketDisconnect
 from src.api.auth import verify_api_key
 from pydantic import BaseModel
 
-from src.services.crypto_ws import get_crypto_ws_manager
+from src.services.crypto_ws import BAR_HISTORY_SIZE, get_crypto_ws_manager
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
 
 router = APIRouter()
 
@@ -62,6 +67,16 @@ class WebSocketStatusResponse(BaseModel):
     uptime_seconds: float
     last_message: Optional[str]
     reconnect_delay: float
+    bar_buffers: int = 0
+    subscribers: int = 0
+    frames_dropped: int = 0
+
+
+class RealtimeBarsResponse(BaseModel):
+    symbol: str
+    interval: str
+    count: int
+    bars: List[RealtimeKlineItem]
 
 
 # ── 实时价格 (from WebSocket cache) ──
@@ -128,6 +143,83 @@ async def get_realtime_kline(
     return kline.to_dict()
 
 
+@router.get("/realtime/bars/{symbol}", response_model=RealtimeBarsResponse)
+async def get_realtime_bars(
+    symbol: str = Path(..., description="加密货币代码"),
+    interval: str = Query("1m", description="K线间隔 (需在WS订阅中)"),
+    limit: int = Query(200, ge=1, le=BAR_HISTORY_SIZE, description="返回条数"),
+    include_live: bool = Query(False, description="是否附带当前未收盘K线"),
+):
+    """获取最近的已收盘K线 (内存环形缓冲)"""
+    manager = get_crypto_ws_manager()
+
+    if interval not in manager.kline_intervals:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Interval {interval} not streamed. Available intervals: {manager.kline_intervals}",
+        )
+
+    bars = manager.get_bars(symbol, interval, limit=limit, include_live=include_live)
+    return RealtimeBarsResponse(
+        symbol=symbol.upper(),
+        interval=interval,
+        count=len(bars),
+        bars=[bar.to_dict() for bar in bars],
+    )
+
+
+# ── 实时推送 ──
+
+def _split_param(value: Optional[str]) -> Optional[List[str]]:
+    if not value:
+        return None
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    return items or None
+
+
+@router.websocket("/ws/stream")
+async def stream_realtime(
+    websocket: WebSocket,
+    symbols: Optional[str] = Query(None, description="逗号分隔，如 BTC,ETH；为空订阅全部"),
+    intervals: Optional[str] = Query(None, description="逗号分隔的K线间隔；为空订阅全部"),
+):
+    """
+    实时推送：连接后先发送一帧 snapshot，之后推送 ticker / kline (未收盘) / bar (已收盘) 增量
+    所有客户端共用同一个上游 Binance 连接；客户端处理不过来时同一 key 只推最新一帧
+    """
+    manager = get_crypto_ws_manager()
+    await websocket.accept()
+
+    try:
+        subscriber = manager.subscribe(_split_param(symbols), _split_param(intervals))
+    except RuntimeError as e:
+        await websocket.close(code=1013, reason=str(e))
+        return
+
+    async def push():
+        await websocket.send_text(manager.snapshot_frame(subscriber))
+        while True:
+            for frame in await subscriber.get():
+                await websocket.send_text(frame)
+
+    async def watch_disconnect():
+        # 客户端不发消息；读到断开即结束，避免空闲时残留订阅
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = [asyncio.create_task(push()), asyncio.create_task(watch_disconnect())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                logger.warning(f"Crypto stream client dropped: {error}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        manager.unsubscribe(subscriber)
+
+
 # ── WebSocket 状态 ──
 
 @router.get("/ws/status", response_model=WebSocketStatusResponse)
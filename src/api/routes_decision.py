@@ -22,12 +22,9 @@ router = APIRouter()
 
 
 def _get_service() -> DecisionLoopService:
-    """Create service with current settings."""
+    """Create service with current settings (inputs read in-process)."""
     settings = get_settings()
-    return DecisionLoopService(
-        base_url="http://127.0.0.1:8000",
-        api_key=settings.api_key,
-    )
+    return DecisionLoopService(api_key=settings.api_key)
 
 
 @router.post("/run")
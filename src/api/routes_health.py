@@ -7,13 +7,15 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict, Any
 
 import httpx
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from src.api.dependencies import get_db
 from src.config import get_settings
+from src.services.http_clients import get_http_clients
 from src.services.kline_service import KlineService
+from src.services.rate_limiter import rate_limiter_stats
 from src.models import SymbolType, KlineTimeframe
 from src.utils.logging import get_logger
 
@@ -266,8 +268,9 @@ async def unified_health_check(db: Session = Depends(get_db)) -> Dict[str, Any]:
     qualitative: Dict[str, Any] = {}
     park_intel_url = get_settings().park_intel_url.rstrip("/")
     try:
-        async with httpx.AsyncClient(timeout=_EXTERNAL_TIMEOUT) as client:
-            resp = await client.get(f"{park_intel_url}/api/articles/sources")
+        resp = await get_http_clients().get(
+            f"{park_intel_url}/api/articles/sources", timeout=_EXTERNAL_TIMEOUT
+        )
         if resp.status_code == 200:
             for src in resp.json():
                 qualitative[src["source"]] = {
@@ -310,13 +313,19 @@ async def unified_health_check(db: Session = Depends(get_db)) -> Dict[str, Any]:
 
 
 @router.get("/gaps")
-def get_health_gaps(db: Session = Depends(get_db)) -> Dict[str, Any]:
+def get_health_gaps(
+    refresh: bool = Query(False, description="Rebuild the kline coverage summary from klines first"),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
     """
     Gap detection endpoint: cross-references trade_calendar with klines to find missing trading days.
     
     Only counts gaps AFTER a stock's listing date (from stock_basic) or after the backfill start date
     (2021-01-04), whichever is later. This prevents false gaps for stocks that IPO'd after the 
     backfill start date.
+
+    Answered from the incrementally maintained kline_coverage bitmaps (see GapService);
+    pass refresh=true after writing klines outside the repositories (e.g. raw SQL scripts).
     
     Returns:
         - total_gaps: Total count of missing trading days across all symbols
@@ -326,149 +335,9 @@ def get_health_gaps(db: Session = Depends(get_db)) -> Dict[str, Any]:
         - total_tracked_stocks: Total number of tracked stocks (for frontend summary)
         - stocks_with_zero_gaps: Number of stocks with no gaps (healthy)
     """
-    from src.models import TradeCalendar, Kline, SymbolType, KlineTimeframe
-    from sqlalchemy import func, select, text
-    
-    BACKFILL_START_DATE = "2021-01-04"
-    
-    # 1. Get calendar coverage
-    cal_min = db.execute(select(func.min(TradeCalendar.date)).filter(TradeCalendar.is_trading_day == 1)).scalar()
-    cal_max = db.execute(select(func.max(TradeCalendar.date)).filter(TradeCalendar.is_trading_day == 1)).scalar()
-    trading_day_count = db.execute(select(func.count()).select_from(TradeCalendar).filter(TradeCalendar.is_trading_day == 1)).scalar()
-    
-    calendar_coverage = {
-        "min_date": cal_min or "unknown",
-        "max_date": cal_max or "unknown",
-        "trading_days": trading_day_count or 0
-    }
-    
-    # 2. Get all trading days from calendar (2021-01-04 onwards)
-    trading_days_result = db.execute(
-        select(TradeCalendar.date)
-        .filter(TradeCalendar.is_trading_day == 1, TradeCalendar.date >= BACKFILL_START_DATE)
-        .order_by(TradeCalendar.date)
-    ).fetchall()
-    all_trading_days = {row[0] for row in trading_days_result}
-    
-    # 3. Get all tracked symbols (both STOCK and INDEX) with their names
-    # Use GROUP BY to get one row per (symbol_code, symbol_type) with the first non-null name
-    symbols_query = text("""
-        SELECT symbol_code, 
-               COALESCE(MAX(symbol_name), symbol_code) as symbol_name,
-               symbol_type
-        FROM klines 
-        WHERE timeframe = 'DAY' 
-          AND symbol_type IN ('STOCK', 'INDEX')
-        GROUP BY symbol_code, symbol_type
-    """)
-    symbols_result = db.execute(symbols_query).fetchall()
-    
-    # 4. Get stock listing dates from stock_basic (for filtering gaps)
-    # Map symbol_code (e.g., "000001") to list_date
-    # stock_basic uses ts_code format like "000001.SZ", so we need to match the plain symbol part
-    stock_list_dates = {}
-    try:
-        list_dates_result = db.execute(text(
-            "SELECT ts_code, list_date FROM stock_basic WHERE list_date IS NOT NULL"
-        )).fetchall()
-        
-        for ts_code, list_date in list_dates_result:
-            if not list_date:
-                continue
-            # Extract plain symbol from ts_code (e.g., "000001.SZ" -> "000001")
-            plain_symbol = ts_code.split('.')[0] if '.' in ts_code else ts_code
-            # Convert list_date from YYYYMMDD to YYYY-MM-DD format
-            if len(list_date) == 8 and list_date.isdigit():
-                formatted_date = f"{list_date[:4]}-{list_date[4:6]}-{list_date[6:8]}"
-                stock_list_dates[plain_symbol] = formatted_date
-    except Exception as e:
-        logger.warning(f"Failed to load stock listing dates: {e}")
-        # Continue without listing dates (will use backfill start date for all stocks)
-    
-    # 5. For each symbol, find gaps (considering listing dates for stocks)
-    gap_details = []
-    by_type = {
-        "STOCK": {"symbols_with_gaps": 0, "total_missing_days": 0},
-        "INDEX": {"symbols_with_gaps": 0, "total_missing_days": 0}
-    }
-    
-    total_tracked_stocks = 0
-    stocks_with_zero_gaps = 0
-    
-    for symbol_code, symbol_name, symbol_type_str in symbols_result:
-        # symbol_type_str is a string when using raw SQL
-        # Count tracked stocks
-        if symbol_type_str == 'STOCK':
-            total_tracked_stocks += 1
-        
-        # Get all kline dates for this symbol
-        # Convert symbol_type_str back to enum for query
-        symbol_type_enum = SymbolType.STOCK if symbol_type_str == 'STOCK' else SymbolType.INDEX
-        kline_dates_result = db.execute(
-            select(Kline.trade_time)
-            .filter(
-                Kline.symbol_code == symbol_code,
-                Kline.symbol_type == symbol_type_enum,
-                Kline.timeframe == KlineTimeframe.DAY
-            )
-        ).fetchall()
-        
-        # Extract date part (first 10 chars: YYYY-MM-DD)
-        kline_dates = {row[0][:10] for row in kline_dates_result if row[0]}
-        
-        # Determine expected start date for this symbol
-        # For stocks: MAX(list_date, BACKFILL_START_DATE)
-        # For indices: BACKFILL_START_DATE
-        if symbol_type_str == 'STOCK':
-            list_date = stock_list_dates.get(symbol_code)
-            if list_date and list_date > BACKFILL_START_DATE:
-                expected_start_date = list_date
-            else:
-                expected_start_date = BACKFILL_START_DATE
-        else:
-            # Indices should have data from backfill start
-            expected_start_date = BACKFILL_START_DATE
-        
-        # Filter trading days to only those >= expected_start_date
-        expected_trading_days = {d for d in all_trading_days if d >= expected_start_date}
-        
-        # Find missing dates
-        missing = expected_trading_days - kline_dates
-        
-        if missing:
-            missing_sorted = sorted(list(missing))
-            # symbol_type_str is already uppercase from SQL query
-            gap_details.append({
-                "symbol_code": symbol_code,
-                "symbol_name": symbol_name or symbol_code,
-                "symbol_type": symbol_type_str,
-                "gap_count": len(missing),
-                "missing_dates": missing_sorted
-            })
-            
-            # Update by_type stats
-            by_type[symbol_type_str]["symbols_with_gaps"] += 1
-            by_type[symbol_type_str]["total_missing_days"] += len(missing)
-        else:
-            # No gaps for this symbol
-            if symbol_type_str == 'STOCK':
-                stocks_with_zero_gaps += 1
-    
-    # 6. Sort by gap_count descending, limit to top 50 for performance
-    gap_details.sort(key=lambda x: x["gap_count"], reverse=True)
-    top_50_details = gap_details[:50]
-    
-    # 7. Calculate total_gaps
-    total_gaps = sum(detail["gap_count"] for detail in gap_details)
-    
-    return {
-        "total_gaps": total_gaps,
-        "by_type": by_type,
-        "details": top_50_details,
-        "calendar_coverage": calendar_coverage,
-        "total_tracked_stocks": total_tracked_stocks,
-        "stocks_with_zero_gaps": stocks_with_zero_gaps
-    }
+    from src.services.gap_service import GapService
+
+    return GapService(db).gap_report(detail_limit=50, refresh=refresh)
 
 
 @router.get("/consistency")
@@ -527,3 +396,70 @@ def get_health_failures(db: Session = Depends(get_db)) -> Dict[str, Any]:
         "failures": failures,
         "count": len(failures)
     }
+
+
+@router.get("/kline-cache")
+def get_kline_cache_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """
+    K-line LRU cache stats for this process: size, hits/misses, hit rate, evictions.
+    """
+    from src.repositories.kline_cache import get_kline_cache
+
+    cache = get_kline_cache(db)
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/http-clients")
+def get_http_client_stats() -> Dict[str, Any]:
+    """
+    Shared outbound HTTP client pool: per-host requests, errors, in-flight/peak
+    concurrency, queueing and latency.
+    """
+    return get_http_clients().stats()
+
+
+@router.get("/rate-limits")
+def get_rate_limit_stats() -> Dict[str, Any]:
+    """
+    Shared per-provider token buckets: configured rate, tokens available,
+    and how many calls had to wait (and for how long).
+    """
+    return rate_limiter_stats()
+
+
+@router.get("/nightly")
+def get_nightly_run(db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """
+    Latest outcome and timing of each node in the post-close job graph,
+    from the ``nightly.<node>`` DataUpdateLog rows.
+    """
+    from src.models import DataUpdateLog
+    from sqlalchemy import desc, select
+
+    logs = db.execute(
+        select(DataUpdateLog)
+        .filter(DataUpdateLog.update_type.like("nightly.%"))
+        .order_by(desc(DataUpdateLog.id))
+        .limit(200)
+    ).scalars().all()
+
+    nodes: Dict[str, Dict[str, Any]] = {}
+    for log in logs:
+        name = log.update_type.split(".", 1)[1]
+        if name in nodes:
+            continue
+        duration = None
+        if log.started_at and log.completed_at:
+            duration = round((log.completed_at - log.started_at).total_seconds(), 1)
+        nodes[name] = {
+            "status": log.status.value.upper(),
+            "records_updated": log.records_updated,
+            "error_message": log.error_message,
+            "started_at": log.started_at.isoformat() if log.started_at else None,
+            "completed_at": log.completed_at.isoformat() if log.completed_at else None,
+            "duration_seconds": duration,
+        }
+
+    return {"nodes": nodes, "count": len(nodes)}
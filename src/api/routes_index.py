@@ -15,6 +15,7 @@ from src.api.dependencies import get_db
 from src.config import get_settings
 from src.exceptions import DatabaseError, ServiceUnavailableError
 from src.models import KlineTimeframe, SymbolType
+from src.services.http_clients import get_http_clients
 from src.services.kline_service import KlineService
 from src.services.tushare_client import TushareClient
 from src.utils.indicators import calculate_macd
@@ -320,40 +321,39 @@ async def get_index_realtime(ts_code: str = "000001.SH"):
     url = f"http://hq.sinajs.cn/list=s_{sina_code}"
 
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers={
-                "Referer": "http://finance.sina.com.cn/",
-                "User-Agent": "Mozilla/5.0"
-            }, timeout=10.0)
-            resp.raise_for_status()
-
-            # 解析响应: var hq_str_s_sh000001="上证指数,3259.22,46.14,1.44,2660394,28862016";
-            text = resp.text
-            match = re.search(r'"([^"]+)"', text)
-            if not match:
-                raise HTTPException(status_code=404, detail="无法解析指数数据")
-
-            parts = match.group(1).split(",")
-            if len(parts) < 6:
-                raise HTTPException(status_code=404, detail="指数数据格式错误")
-
-            name = parts[0]
-            price = float(parts[1]) if parts[1] else 0
-            change = float(parts[2]) if parts[2] else 0
-            change_pct = float(parts[3]) if parts[3] else 0
-            volume = int(parts[4]) if parts[4] else 0
-            amount = float(parts[5]) if parts[5] else 0
-
-            return {
-                "ts_code": ts_code,
-                "name": name,
-                "price": price,
-                "change": change,
-                "change_pct": change_pct,
-                "volume": volume,
-                "amount": amount,
-                "last_update": datetime.now().strftime("%H:%M:%S")
-            }
+        resp = await get_http_clients().get(url, headers={
+            "Referer": "http://finance.sina.com.cn/",
+            "User-Agent": "Mozilla/5.0"
+        }, timeout=10.0)
+        resp.raise_for_status()
+
+        # 解析响应: var hq_str_s_sh000001="上证指数,3259.22,46.14,1.44,2660394,28862016";
+        text = resp.text
+        match = re.search(r'"([^"]+)"', text)
+        if not match:
+            raise HTTPException(status_code=404, detail="无法解析指数数据")
+
+        parts = match.group(1).split(",")
+        if len(parts) < 6:
+            raise HTTPException(status_code=404, detail="指数数据格式错误")
+
+        name = parts[0]
+        price = float(parts[1]) if parts[1] else 0
+        change = float(parts[2]) if parts[2] else 0
+        change_pct = float(parts[3]) if parts[3] else 0
+        volume = int(parts[4]) if parts[4] else 0
+        amount = float(parts[5]) if parts[5] else 0
+
+        return {
+            "ts_code": ts_code,
+            "name": name,
+            "price": price,
+            "change": change,
+            "change_pct": change_pct,
+            "volume": volume,
+            "amount": amount,
+            "last_update": datetime.now().strftime("%H:%M:%S")
+        }
 
     except httpx.RequestError as e:
         logger.exception(f"指数实时行情请求失败: {ts_code}")
@@ -13,6 +13,7 @@ from fastapi.responses import JSONResponse
 import httpx
 
 from src.config import get_settings
+from src.services.http_clients import get_http_clients
 
 router = APIRouter()
 
@@ -26,9 +27,8 @@ async def _proxy(path: str, params: dict) -> JSONResponse:
     # Strip None values from params
     params = {k: v for k, v in params.items() if v is not None}
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            resp = await client.get(url, params=params)
-            return JSONResponse(content=resp.json(), status_code=resp.status_code)
+        resp = await get_http_clients().get(url, params=params, timeout=TIMEOUT)
+        return JSONResponse(content=resp.json(), status_code=resp.status_code)
     except (httpx.ConnectError, httpx.TimeoutException):
         return JSONResponse(
             content={"error": "park-intel unavailable", "data": []},
@@ -15,6 +15,10 @@ router = APIRouter(prefix="/pattern", tags=["pattern"])
 
 
 class PatternMatch(BaseModel):
+    ticker: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    distance: Optional[float] = None
     start_idx: int
     end_idx: int
     similarity: float
@@ -36,18 +40,20 @@ class PatternAnalysis(BaseModel):
 
 
 @router.get("/analyze/{ticker}", response_model=PatternAnalysis)
-async def analyze_pattern(
+def analyze_pattern(
     ticker: str,
-    pattern_days: int = Query(default=20, ge=5, le=60, description="形态天数")
+    pattern_days: int = Query(default=20, ge=5, le=60, description="形态天数"),
+    market: bool = Query(default=False, description="在全市场历史中匹配 (默认只看自身历史)"),
 ):
     """
     分析股票K线形态
     
-    找出历史上相似的形态，统计后续涨跌概率
+    找出历史上相似的形态，统计后续涨跌概率 (基于本地日线数据)
     
     Args:
         ticker: 股票代码 (如 000661)
         pattern_days: 形态天数 (5-60天)
+        market: 是否在全市场历史中匹配
     
     Returns:
         - similar_count: 相似形态数量
@@ -57,7 +63,7 @@ async def analyze_pattern(
     """
     try:
         from src.services.pattern_matcher import analyze_stock_pattern
-        result = analyze_stock_pattern(ticker, pattern_days)
+        result = analyze_stock_pattern(ticker, pattern_days, market=market)
         return result
     except Exception as e:
         logger.exception("分析股票K线形态失败")
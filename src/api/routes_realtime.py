@@ -7,6 +7,7 @@ from fastapi import APIRouter, HTTPException, Query
 
 from src.config import get_settings
 from src.exceptions import ServiceUnavailableError
+from src.services.http_clients import get_http_clients
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -51,10 +52,9 @@ async def get_realtime_prices(tickers: str = Query(..., description="Comma-separ
             'Referer': 'https://finance.sina.com.cn/'
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, timeout=10.0)
-            response.raise_for_status()
-            return {"data": response.text}
+        response = await get_http_clients().get(url, headers=headers, timeout=10.0)
+        response.raise_for_status()
+        return {"data": response.text}
     except httpx.HTTPStatusError as e:
         logger.exception("Sina API HTTP error")
         detail = str(e) if get_settings().debug else "Internal server error"
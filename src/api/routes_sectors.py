@@ -12,6 +12,7 @@ from typing import Optional
 from src.api.dependencies import get_db
 from src.config import get_settings
 from src.exceptions import DatabaseError
+from src.repositories.market_stats_repository import MarketStatsRepository
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -79,93 +80,41 @@ async def get_sector_turnover(
     今日成交额按比例折算：今日实际成交额 vs 昨日全天成交额 × (已交易时间 / 4小时)
     """
     try:
-        # 1. 获取最近两个有足够成交量数据的交易日
-        # 需要有超过100只股票有成交量数据才算有效
-        trade_dates = db.execute(
-            text("""
-                SELECT trade_time, COUNT(*) as cnt
-                FROM klines
-                WHERE symbol_type = 'STOCK' AND timeframe = 'DAY' AND volume > 0
-                GROUP BY trade_time
-                HAVING cnt > 100
-                ORDER BY trade_time DESC
-                LIMIT 2
-            """)
-        ).fetchall()
+        # 1. 从 market_daily_stats 取最近两个有足够成交量数据的交易日
+        # 需要有超过100只股票有成交量数据才算有效（汇总表过期时现算，不写库）
+        stats_repo = MarketStatsRepository(db)
+        trade_dates = stats_repo.find_recent(limit=2, min_traded_count=100)
 
         if len(trade_dates) < 2:
             return SectorTurnoverResponse(data=[], today_date="", yesterday_date="")
 
-        today_date = trade_dates[0][0]  # 最近有数据的日期（可能是今天）
-        yesterday_date = trade_dates[1][0]  # 前一个有数据的日期（昨天）
+        today_date = trade_dates[0].trade_date  # 最近有数据的日期（可能是今天）
+        yesterday_date = trade_dates[1].trade_date  # 前一个有数据的日期（昨天）
 
         # 计算已交易时间比例
         traded_hours = get_traded_hours()
         time_ratio = traded_hours / 4.0 if traded_hours > 0 else 1.0
 
-        # 2. 获取所有赛道分类
-        sectors_result = db.execute(
-            text("SELECT ticker, sector FROM stock_sectors")
-        ).fetchall()
-
-        # ticker -> sector 映射
-        ticker_to_sector = {}
-        for row in sectors_result:
-            # ticker格式: 000001 (不含后缀)
-            ticker_to_sector[row[0]] = row[1]
-
-        # 3. 查询今日和昨日的成交量和收盘价数据
-        # 成交额 = volume * close * 100 (volume是手数，每手100股)
-        volume_result = db.execute(
-            text("""
-                SELECT symbol_code, trade_time, volume, close
-                FROM klines
-                WHERE symbol_type = 'STOCK'
-                AND timeframe = 'DAY'
-                AND trade_time IN (:today, :yesterday)
-            """),
-            {"today": today_date, "yesterday": yesterday_date}
-        ).fetchall()
-
-        # 4. 按赛道汇总成交额
+        # 2. 读取两天的赛道汇总 (成交额 = 手数 * 收盘价 * 100)
         # sector -> {today: amount, yesterday: amount, count: int}
         sector_data: dict[str, dict] = {}
-
-        for row in volume_result:
-            symbol_code = row[0]  # 6位代码
-            trade_time = row[1]
-            volume = row[2] or 0
-            close = row[3] or 0
-            # 计算成交额: 手数 * 收盘价 * 100
-            amount = volume * close * 100
-
-            sector = ticker_to_sector.get(symbol_code)
-            if not sector:
-                continue
-
-            if sector not in sector_data:
-                sector_data[sector] = {
-                    "today": 0,
-                    "yesterday": 0,
-                    "today_stocks": set(),
-                    "yesterday_stocks": set(),
-                }
-
-            if trade_time == today_date:
-                sector_data[sector]["today"] += amount
-                sector_data[sector]["today_stocks"].add(symbol_code)
-            elif trade_time == yesterday_date:
-                sector_data[sector]["yesterday"] += amount
-                sector_data[sector]["yesterday_stocks"].add(symbol_code)
-
-        # 5. 计算变化比例并构建响应（按比例折算）
+        for row in stats_repo.find_sector_stats([today_date, yesterday_date]):
+            data = sector_data.setdefault(row.sector, {"today": 0, "yesterday": 0, "count": 0})
+            if row.trade_date == today_date:
+                data["today"] = row.turnover
+                # 今日在上一交易日也有数据的股票数
+                data["count"] = row.paired_count
+            else:
+                data["yesterday"] = row.turnover
+
+        # 3. 计算变化比例并构建响应（按比例折算）
         items = []
         for sector, data in sector_data.items():
             today_amount = data["today"]
             yesterday_amount = data["yesterday"]
 
             # 取两天都有数据的股票数量
-            stock_count = len(data["today_stocks"] & data["yesterday_stocks"])
+            stock_count = data["count"]
 
             # 计算变化比例：今日实际成交额 vs 昨日按时间比例折算的成交额
             change_percent = None
@@ -290,7 +239,7 @@ async def update_sector(
 
         # 检查是否已存在
         existing = db.execute(
-            text("SELECT ticker FROM stock_sectors WHERE ticker = :ticker"),
+            text("SELECT ticker, sector FROM stock_sectors WHERE ticker = :ticker"),
             {"ticker": ticker}
         ).fetchone()
 
@@ -307,6 +256,11 @@ async def update_sector(
                 {"ticker": ticker, "sector": request.sector, "now": now}
             )
 
+        # 赛道归属变化，重算新旧赛道的日线汇总
+        old_sector = existing[1] if existing else None
+        if old_sector != request.sector:
+            MarketStatsRepository(db).rebuild_sectors([old_sector, request.sector])
+
         db.commit()
         return SectorResponse(ticker=ticker, sector=request.sector)
     except Exception as e:
@@ -63,16 +63,10 @@ def get_refresh_status(job_id: str) -> dict[str, str | int | None]:
 
 def _run_script(script_name: str) -> None:
     """Run a helper script synchronously (same behavior as scheduler)."""
-    import subprocess
-    from pathlib import Path
-
-    script_path = Path(__file__).parent.parent.parent / "scripts" / script_name
-    result = subprocess.run(
-        ["python", str(script_path)],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0:
+    from src.tasks.task_runner import run_script
+
+    result = run_script(script_name, timeout=3600)
+    if not result.success:
         # log to stderr so uvicorn logs it; avoid raising to keep other tasks going
         print(f"[refresh] {script_name} failed: {result.stderr}", flush=True)
 
@@ -23,8 +23,8 @@ class QuoteItem(BaseModel):
     change: float
     change_pct: float
     volume: int = 0
-    market_cap: int = 0
-    pe_ratio: float = 0
+    market_cap: Optional[int] = None
+    pe_ratio: Optional[float] = None
     last_update: str = ""
 
 
@@ -7,7 +7,8 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class SchedulerConfig(BaseModel):
-    daily_refresh_cron: str = "10 18 * * 1-5"  # 18:10 each trading day (Asia/Shanghai)
+    daily_refresh_cron: str = "35 15 * * 1-5"  # nightly job graph start, right after the close (Asia/Shanghai)
+    nightly_deadline: str = "23:30"  # HH:MM, nodes stop polling for fresh data
     timezone: str = "Asia/Shanghai"
 
 
@@ -52,6 +53,15 @@ class Settings(BaseSettings):
     tushare_delay: float = Field(default=0.3, alias="TUSHARE_DELAY")
     tushare_max_retries: int = Field(default=3, alias="TUSHARE_MAX_RETRIES")
 
+    # Board constituent crawler (BoardService.build_all_mappings)
+    board_crawl_workers: int = Field(default=4, alias="BOARD_CRAWL_WORKERS")
+    board_crawl_calls_per_minute: int = Field(default=0, alias="BOARD_CRAWL_CALLS_PER_MINUTE")  # 0 = Tushare points tier
+    board_crawl_max_calls: int = Field(default=0, alias="BOARD_CRAWL_MAX_CALLS")  # per run, 0 = unlimited
+
+    # Watchlist 30m updater (StockUpdater.update_watchlist_30m)
+    watchlist_30m_workers: int = Field(default=8, alias="WATCHLIST_30M_WORKERS")
+    sina_calls_per_minute: int = Field(default=0, alias="SINA_CALLS_PER_MINUTE")  # 0 = provider default
+
     # Park-intel (qualitative data pipeline)
     park_intel_url: str = Field(default="http://127.0.0.1:8001", alias="PARK_INTEL_URL")
 
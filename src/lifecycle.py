@@ -5,10 +5,17 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from src.config import get_settings
-from src.database import init_db
+from src.database import SessionLocal, init_db
+from src.repositories.board_membership_repository import (
+    BoardMembershipRepository,
+    get_membership_index,
+)
+from src.repositories.technical_indicator_repository import TechnicalIndicatorRepository
 from src.tasks.scheduler import SchedulerManager
+from src.tasks.task_runner import shutdown_job_pools
 from src.services.kline_scheduler import get_scheduler, stop_scheduler
 from src.services.crypto_ws import start_crypto_ws, stop_crypto_ws
+from src.services.http_clients import start_http_clients, stop_http_clients
 from src.utils.logging import LOGGER
 
 
@@ -18,6 +25,30 @@ async def lifespan(app: FastAPI):
     LOGGER.info("Application startup - using Tushare Pro")
     init_db()
 
+    # 预热板块成分股索引（首次启动时先从 board_mapping 重建关系表；失败不影响启动）
+    try:
+        with SessionLocal() as session:
+            membership_repo = BoardMembershipRepository(session)
+            if membership_repo.needs_bootstrap():
+                membership_repo.rebuild()
+                session.commit()
+            index = get_membership_index(session)
+        LOGGER.info(f"Board membership index loaded ({len(index)} memberships)")
+    except Exception as e:
+        LOGGER.warning(f"Failed to load board membership index: {e}")
+
+    # 旧库升级：技术指标快照为空时从历史表重建一次（选股请求只读快照）
+    try:
+        with SessionLocal() as session:
+            indicator_repo = TechnicalIndicatorRepository(session)
+            if indicator_repo.needs_bootstrap():
+                indicator_repo.rebuild()
+                session.commit()
+    except Exception as e:
+        LOGGER.warning(f"Failed to bootstrap technical indicator snapshot: {e}")
+
+    await start_http_clients()
+
     settings = get_settings()
     scheduler_manager = None
     if settings.scheduler:
@@ -41,7 +72,12 @@ async def lifespan(app: FastAPI):
     if scheduler_manager:
         scheduler_manager.shutdown()
     stop_scheduler()
+    shutdown_job_pools()
     try:
         await stop_crypto_ws()
     except Exception as e:
         LOGGER.warning(f"Crypto WS shutdown error: {e}")
+    try:
+        await stop_http_clients()
+    except Exception as e:
+        LOGGER.warning(f"HTTP client pool shutdown error: {e}")
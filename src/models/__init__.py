@@ -22,12 +22,15 @@ from src.models.enums import (
 # Models
 from src.models.board import (
     BoardMapping,
+    BoardMembership,
     ConceptDaily,
     IndustryDaily,
 )
-from src.models.kline import DataUpdateLog, Kline
+from src.models.kline import DataUpdateLog, Kline, KlineCoverage, KlineIndicatorState
+from src.models.market_stats import MarketDailyStats, SectorDailyStats
 from src.models.simulated import SimulatedAccount, SimulatedPosition, SimulatedTrade
 from src.models.symbol import SymbolMetadata
+from src.models.technical_indicator import TechnicalIndicator, TechnicalIndicatorSnapshot
 from src.models.trade_calendar import TradeCalendar
 from src.models.perception_signal import PerceptionScanReport, PerceptionSignal
 from src.models.decision import DecisionRun
@@ -45,13 +48,22 @@ __all__ = [
     "TradeType",
     # K-line models
     "Kline",
+    "KlineIndicatorState",
+    "KlineCoverage",
     "DataUpdateLog",
+    # Market aggregates
+    "MarketDailyStats",
+    "SectorDailyStats",
     # Symbol models
     "SymbolMetadata",
     # Board models
     "BoardMapping",
+    "BoardMembership",
     "IndustryDaily",
     "ConceptDaily",
+    # Technical indicators
+    "TechnicalIndicator",
+    "TechnicalIndicatorSnapshot",
     # Calendar
     "TradeCalendar",
     # User models
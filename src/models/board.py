@@ -28,6 +28,24 @@ class BoardMapping(Base):
     )
 
 
+class BoardMembership(Base):
+    """板块成分股关系表 - board_mapping.constituents 的规范化展开，板块→成分股、成分股→板块双向索引"""
+
+    __tablename__ = "board_membership"
+    __table_args__ = (
+        UniqueConstraint("board_type", "board_name", "ticker"),
+        Index("ix_membership_ticker", "ticker", "board_type"),
+        Index("ix_membership_code", "board_code"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    board_name: Mapped[str] = mapped_column(String(64))  # 板块名称
+    board_type: Mapped[str] = mapped_column(String(16))  # industry / concept
+    board_code: Mapped[str | None] = mapped_column(String(16), nullable=True)  # 板块代码
+    ticker: Mapped[str] = mapped_column(String(16))  # 成分股代码
+    position: Mapped[int] = mapped_column(Integer, default=0)  # 在成分股列表中的顺序
+
+
 class IndustryDaily(Base):
     """同花顺行业板块每日数据表 - 存储90个行业的每日行情和资金流向数据"""
 
@@ -128,4 +146,4 @@ class ConceptDaily(Base):
     )
 
 
-__all__ = ["BoardMapping", "IndustryDaily", "ConceptDaily"]
+__all__ = ["BoardMapping", "BoardMembership", "IndustryDaily", "ConceptDaily"]
@@ -9,6 +9,7 @@ from sqlalchemy import (
     Float,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
@@ -70,6 +71,74 @@ class Kline(Base):
     )
 
 
+class KlineIndicatorState(Base):
+    """
+    K线指标递推状态表
+    每个 (标的, 周期) 一行，保存最后一根(及倒数第二根)K线计算完成后的EMA状态，
+    新增K线时从该状态继续计算MACD，无需重算全部历史
+    """
+
+    __tablename__ = "kline_indicator_state"
+    __table_args__ = (
+        UniqueConstraint("symbol_type", "symbol_code", "timeframe"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    symbol_type: Mapped[SymbolType] = mapped_column(SqlEnum(SymbolType))
+    symbol_code: Mapped[str] = mapped_column(String(16))
+    timeframe: Mapped[KlineTimeframe] = mapped_column(SqlEnum(KlineTimeframe))
+
+    # 最后一根K线计算完成后的状态
+    last_trade_time: Mapped[str] = mapped_column(String(32))
+    ema_fast: Mapped[float] = mapped_column(Float)
+    ema_slow: Mapped[float] = mapped_column(Float)
+    dea: Mapped[float] = mapped_column(Float)
+    bar_count: Mapped[int] = mapped_column(Integer)
+
+    # 倒数第二根K线的状态 (用于最后一根K线被修订时回退一步)
+    prev_trade_time: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    prev_ema_fast: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prev_ema_slow: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prev_dea: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, onupdate=utcnow
+    )
+
+
+class KlineCoverage(Base):
+    """
+    K线覆盖摘要表
+    每个 (标的, 周期) 一行，用位图记录哪些自然日有K线：
+    第 i 位对应 first_date 之后第 i 天。写入K线时增量更新，
+    缺口检测只需与交易日位图做位运算，无需扫描 klines 表
+    """
+
+    __tablename__ = "kline_coverage"
+    __table_args__ = (
+        UniqueConstraint("symbol_type", "symbol_code", "timeframe"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    symbol_type: Mapped[SymbolType] = mapped_column(SqlEnum(SymbolType))
+    symbol_code: Mapped[str] = mapped_column(String(16))
+    symbol_name: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    timeframe: Mapped[KlineTimeframe] = mapped_column(SqlEnum(KlineTimeframe))
+
+    # 覆盖范围 (YYYY-MM-DD) 与有K线的天数
+    first_date: Mapped[str] = mapped_column(String(10))
+    last_date: Mapped[str] = mapped_column(String(10))
+    day_count: Mapped[int] = mapped_column(Integer)
+    # 小端字节序位图
+    bitmap: Mapped[bytes] = mapped_column(LargeBinary)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, onupdate=utcnow
+    )
+
+
 class DataUpdateLog(Base):
     """
     数据更新日志表
@@ -102,4 +171,4 @@ class DataUpdateLog(Base):
     )
 
 
-__all__ = ["Kline", "DataUpdateLog"]
+__all__ = ["Kline", "KlineIndicatorState", "KlineCoverage", "DataUpdateLog"]
@@ -0,0 +1,84 @@
+"""
+Market aggregate models
+"""
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Float, Index, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models.base import Base, utcnow
+
+
+class MarketDailyStats(Base):
+    """
+    全市场个股日线汇总表
+    每个交易日一行：家数、涨跌家数、涨跌停、成交量/成交额。
+    写入个股日线时把涉及的交易日标记为 stale，刷新时只重算这些交易日，
+    看板直接读取汇总行，无需扫描 klines 表
+    """
+
+    __tablename__ = "market_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("trade_date"),
+        Index("ix_market_stats_stale", "stale"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    trade_date: Mapped[str] = mapped_column(String(10))  # YYYY-MM-DD
+    prev_date: Mapped[str | None] = mapped_column(String(10), nullable=True)  # 上一个有数据的交易日
+
+    # 宽度
+    stock_count: Mapped[int] = mapped_column(Integer, default=0)  # 有K线的股票数
+    traded_count: Mapped[int] = mapped_column(Integer, default=0)  # 成交量>0的股票数
+    up_count: Mapped[int] = mapped_column(Integer, default=0)  # 上涨家数
+    down_count: Mapped[int] = mapped_column(Integer, default=0)  # 下跌家数
+    flat_count: Mapped[int] = mapped_column(Integer, default=0)  # 平盘家数
+    limit_up_count: Mapped[int] = mapped_column(Integer, default=0)  # 涨停家数 (近似 ≥9.9%)
+    limit_down_count: Mapped[int] = mapped_column(Integer, default=0)  # 跌停家数 (近似 ≤-9.9%)
+
+    # 成交
+    total_volume: Mapped[float] = mapped_column(Float, default=0)  # 成交量合计 (手)
+    total_amount: Mapped[float] = mapped_column(Float, default=0)  # 成交额合计
+    turnover: Mapped[float] = mapped_column(Float, default=0)  # 估算成交额合计 (手数 × 收盘价 × 100)
+
+    # 待重算标记
+    stale: Mapped[bool] = mapped_column(Boolean, default=True)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, onupdate=utcnow
+    )
+
+
+class SectorDailyStats(Base):
+    """
+    赛道日线汇总表
+    每个 (交易日, 赛道) 一行，赛道归属来自 stock_sectors，
+    随 market_daily_stats 一起重算
+    """
+
+    __tablename__ = "sector_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("trade_date", "sector"),
+        Index("ix_sector_stats_sector", "sector"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    trade_date: Mapped[str] = mapped_column(String(10))  # YYYY-MM-DD
+    sector: Mapped[str] = mapped_column(String(64))  # 赛道名称
+
+    stock_count: Mapped[int] = mapped_column(Integer, default=0)  # 有K线的股票数
+    paired_count: Mapped[int] = mapped_column(Integer, default=0)  # 上一交易日也有K线的股票数
+    traded_count: Mapped[int] = mapped_column(Integer, default=0)  # 成交量>0的股票数
+    up_count: Mapped[int] = mapped_column(Integer, default=0)  # 上涨家数
+    down_count: Mapped[int] = mapped_column(Integer, default=0)  # 下跌家数
+
+    total_volume: Mapped[float] = mapped_column(Float, default=0)  # 成交量合计 (手)
+    total_amount: Mapped[float] = mapped_column(Float, default=0)  # 成交额合计
+    turnover: Mapped[float] = mapped_column(Float, default=0)  # 估算成交额合计 (手数 × 收盘价 × 100)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, onupdate=utcnow
+    )
+
+
+__all__ = ["MarketDailyStats", "SectorDailyStats"]
@@ -0,0 +1,99 @@
+"""
+Technical indicator models (screener input)
+"""
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models.base import Base, utcnow
+
+# 指标列（technical_indicators 与快照表共用）
+INDICATOR_COLUMNS = (
+    "ma5", "ma10", "ma20", "ma60",
+    "macd_dif", "macd_dea", "macd_hist",
+    "rsi6", "rsi12", "rsi24",
+    "boll_upper", "boll_mid", "boll_lower",
+)
+
+
+class TechnicalIndicator(Base):
+    """
+    日线技术指标表
+    由 scripts/calculate_technical_indicators.py 按 (ticker, trade_date) 覆盖写入
+    """
+
+    __tablename__ = "technical_indicators"
+    __table_args__ = (UniqueConstraint("ticker", "trade_date"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    ticker: Mapped[str] = mapped_column(String(16))
+    trade_date: Mapped[str] = mapped_column(String(8))  # YYYYMMDD
+
+    ma5: Mapped[float | None] = mapped_column(Float, nullable=True)
+    ma10: Mapped[float | None] = mapped_column(Float, nullable=True)
+    ma20: Mapped[float | None] = mapped_column(Float, nullable=True)
+    ma60: Mapped[float | None] = mapped_column(Float, nullable=True)
+    macd_dif: Mapped[float | None] = mapped_column(Float, nullable=True)
+    macd_dea: Mapped[float | None] = mapped_column(Float, nullable=True)
+    macd_hist: Mapped[float | None] = mapped_column(Float, nullable=True)
+    rsi6: Mapped[float | None] = mapped_column(Float, nullable=True)
+    rsi12: Mapped[float | None] = mapped_column(Float, nullable=True)
+    rsi24: Mapped[float | None] = mapped_column(Float, nullable=True)
+    boll_upper: Mapped[float | None] = mapped_column(Float, nullable=True)
+    boll_mid: Mapped[float | None] = mapped_column(Float, nullable=True)
+    boll_lower: Mapped[float | None] = mapped_column(Float, nullable=True)
+    volume_ratio: Mapped[float | None] = mapped_column(Float, nullable=True)
+    turnover_rate: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+
+
+class TechnicalIndicatorSnapshot(Base):
+    """
+    技术指标快照表
+    每只股票一行：最新一个交易日的指标 + 上一交易日的指标 (prev_*)。
+    写入 technical_indicators 后按股票增量刷新，选股器只读这张表，
+    耗时与指标历史长度无关
+    """
+
+    __tablename__ = "technical_indicators_latest"
+
+    ticker: Mapped[str] = mapped_column(String(16), primary_key=True)
+    trade_date: Mapped[str] = mapped_column(String(8))  # YYYYMMDD
+    prev_trade_date: Mapped[str | None] = mapped_column(String(8), nullable=True)
+
+    ma5: Mapped[float | None] = mapped_column(Float, nullable=True)
+    ma10: Mapped[float | None] = mapped_column(Float, nullable=True)
+    ma20: Mapped[float | None] = mapped_column(Float, nullable=True)
+    ma60: Mapped[float | None] = mapped_column(Float, nullable=True)
+    macd_dif: Mapped[float | None] = mapped_column(Float, nullable=True)
+    macd_dea: Mapped[float | None] = mapped_column(Float, nullable=True)
+    macd_hist: Mapped[float | None] = mapped_column(Float, nullable=True)
+    rsi6: Mapped[float | None] = mapped_column(Float, nullable=True)
+    rsi12: Mapped[float | None] = mapped_column(Float, nullable=True)
+    rsi24: Mapped[float | None] = mapped_column(Float, nullable=True)
+    boll_upper: Mapped[float | None] = mapped_column(Float, nullable=True)
+    boll_mid: Mapped[float | None] = mapped_column(Float, nullable=True)
+    boll_lower: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    prev_ma5: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prev_ma10: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prev_ma20: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prev_ma60: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prev_macd_dif: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prev_macd_dea: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prev_macd_hist: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prev_rsi6: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prev_rsi12: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prev_rsi24: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prev_boll_upper: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prev_boll_mid: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prev_boll_lower: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, onupdate=utcnow
+    )
+
+
+__all__ = ["INDICATOR_COLUMNS", "TechnicalIndicator", "TechnicalIndicatorSnapshot"]
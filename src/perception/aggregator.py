@@ -7,6 +7,12 @@ The aggregator sits downstream of all detectors and is responsible for:
 4. Producing per-asset composite scores
 5. Providing ranked signal summaries for downstream consumers
 
+Per-asset state is maintained incrementally: a (source, direction) index of
+time-ordered deques makes dedup O(1) amortized, long/short score
+accumulators are updated on ingest and eviction, and summaries are cached
+until the asset changes, so summarize() / top_signals() cost is bounded by
+the number of assets touched rather than the buffer size.
+
 Usage::
 
     aggregator = SignalAggregator()
@@ -23,10 +29,12 @@ Usage::
 
 from __future__ import annotations
 
-from collections import defaultdict
+import heapq
+from bisect import bisect_left
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 from src.perception.signals import (
     Direction,
@@ -168,6 +176,44 @@ class AggregationReport:
         }
 
 
+@dataclass
+class _AssetState:
+    """Incrementally maintained signals and score accumulators for one asset."""
+
+    # Signals and their combined weights, in ingest order
+    signals: List[UnifiedSignal] = field(default_factory=list)
+    weights: List[float] = field(default_factory=list)
+    # (source, direction) → time-ordered timestamps, for dedup
+    index: Dict[Tuple[str, str], Deque[datetime]] = field(default_factory=dict)
+
+    long_score: float = 0.0
+    short_score: float = 0.0
+    long_count: int = 0
+    short_count: int = 0
+    type_counts: Dict[str, int] = field(default_factory=dict)
+    source_counts: Dict[str, int] = field(default_factory=dict)
+    market_counts: Dict[Any, int] = field(default_factory=dict)
+    strongest: Optional[UnifiedSignal] = None
+    strongest_weight: float = 0.0
+    oldest: Optional[datetime] = None
+    newest: Optional[datetime] = None
+
+    # Cached summary; None when the asset changed since it was built
+    summary: Optional[AssetSignalSummary] = None
+
+
+def _type_value(sig: UnifiedSignal) -> str:
+    return sig.signal_type.value if isinstance(sig.signal_type, SignalType) else sig.signal_type
+
+
+def _bump(counts: Dict[Any, int], key: Any, delta: int) -> None:
+    count = counts.get(key, 0) + delta
+    if count:
+        counts[key] = count
+    else:
+        del counts[key]
+
+
 # ── Aggregator ───────────────────────────────────────────────────────
 
 
@@ -180,8 +226,9 @@ class SignalAggregator:
 
     def __init__(self, config: Optional[AggregatorConfig] = None) -> None:
         self._config = config or AggregatorConfig()
-        # asset → list of signals
-        self._buffer: Dict[str, List[UnifiedSignal]] = defaultdict(list)
+        # asset → signals + accumulators
+        self._assets: Dict[str, _AssetState] = {}
+        self._signal_count: int = 0
         self._total_ingested: int = 0
 
     # ── Ingestion ────────────────────────────────────────────────────
@@ -197,7 +244,7 @@ class SignalAggregator:
                 continue
             if self._is_duplicate(signal):
                 continue
-            self._buffer[signal.asset].append(signal)
+            self._add(signal)
             added += 1
         self._total_ingested += added
         return added
@@ -220,25 +267,23 @@ class SignalAggregator:
         self._evict_stale()
 
         all_summaries: List[AssetSignalSummary] = []
-        for asset, signals in self._buffer.items():
-            if not signals:
-                continue
-            summary = self._build_asset_summary(asset, signals)
+        for asset, state in self._assets.items():
+            summary = self._summary_for(asset, state)
             if abs(summary.composite_score) >= self._config.min_composite_score:
                 all_summaries.append(summary)
 
-        # Sort by composite score
-        longs = sorted(
-            [s for s in all_summaries if s.direction == Direction.LONG],
+        # Top-N by composite score
+        longs = heapq.nlargest(
+            limit,
+            (s for s in all_summaries if s.direction == Direction.LONG),
             key=lambda s: s.composite_score,
-            reverse=True,
-        )[:limit]
+        )
 
-        shorts = sorted(
-            [s for s in all_summaries if s.direction == Direction.SHORT],
+        shorts = heapq.nlargest(
+            limit,
+            (s for s in all_summaries if s.direction == Direction.SHORT),
             key=lambda s: s.composite_score,
-            reverse=True,
-        )[:limit]
+        )
 
         # Market bias
         total_long_score = sum(s.composite_score for s in all_summaries if s.direction == Direction.LONG)
@@ -259,11 +304,9 @@ class SignalAggregator:
                 by_market[mkt]["short_count"] += 1
             by_market[mkt]["total_score"] += summary.composite_score
 
-        total_signals = sum(len(sigs) for sigs in self._buffer.values())
-
         return AggregationReport(
             timestamp=datetime.now(timezone.utc),
-            total_signals=total_signals,
+            total_signals=self._signal_count,
             total_assets=len(all_summaries),
             top_longs=longs,
             top_shorts=shorts,
@@ -282,40 +325,46 @@ class SignalAggregator:
         self._evict_stale()
 
         summaries = []
-        for asset, signals in self._buffer.items():
-            if not signals:
-                continue
-            if market:
-                signals = [s for s in signals if s.market == market]
-            if not signals:
-                continue
-            summary = self._build_asset_summary(asset, signals)
+        for asset, state in self._assets.items():
+            if not market:
+                summary = self._summary_for(asset, state)
+            else:
+                matched = state.market_counts.get(market, 0)
+                if not matched:
+                    continue
+                if matched == len(state.signals):
+                    summary = self._summary_for(asset, state)
+                else:
+                    # Mixed-market asset: summarize the matching subset
+                    summary = self._build_asset_summary(
+                        asset, [s for s in state.signals if s.market == market]
+                    )
             if direction and summary.direction != direction:
                 continue
             if abs(summary.composite_score) >= self._config.min_composite_score:
                 summaries.append(summary)
 
-        summaries.sort(key=lambda s: s.composite_score, reverse=True)
-        return summaries[:limit]
+        return heapq.nlargest(limit, summaries, key=lambda s: s.composite_score)
 
     def get_asset_signals(self, asset: str) -> Optional[AssetSignalSummary]:
         """Get the aggregated summary for a specific asset."""
-        signals = self._buffer.get(asset, [])
-        if not signals:
+        state = self._assets.get(asset)
+        if state is None:
             return None
-        return self._build_asset_summary(asset, signals)
+        return self._summary_for(asset, state)
 
     def signal_count(self) -> int:
         """Total signals currently in buffer."""
-        return sum(len(sigs) for sigs in self._buffer.values())
+        return self._signal_count
 
     def asset_count(self) -> int:
         """Number of unique assets with signals."""
-        return len([k for k, v in self._buffer.items() if v])
+        return len(self._assets)
 
     def clear(self) -> None:
         """Clear all signals from the buffer."""
-        self._buffer.clear()
+        self._assets.clear()
+        self._signal_count = 0
         self._total_ingested = 0
 
     @property
@@ -326,58 +375,172 @@ class SignalAggregator:
     # ── Internal ─────────────────────────────────────────────────────
 
     def _is_duplicate(self, signal: UnifiedSignal) -> bool:
-        """Check if a near-identical signal already exists in the buffer."""
-        existing = self._buffer.get(signal.asset, [])
-        window = timedelta(seconds=self._config.dedup_window_seconds)
-
-        for existing_sig in existing:
-            # Same source + same direction + within time window
-            if (
-                existing_sig.source == signal.source
-                and existing_sig.direction == signal.direction
-                and abs((existing_sig.timestamp - signal.timestamp).total_seconds())
-                < window.total_seconds()
-            ):
-                return True
-        return False
+        """Check if a near-identical signal already exists in the buffer.
+
+        Same source + same direction + within the dedup window; only the
+        nearest timestamps on either side need to be compared.
+        """
+        state = self._assets.get(signal.asset)
+        if state is None:
+            return False
+        times = state.index.get((signal.source, signal.direction))
+        if not times:
+            return False
+
+        window = self._config.dedup_window_seconds
+        ts = signal.timestamp
+        if ts >= times[-1]:
+            return (ts - times[-1]).total_seconds() < window
+
+        pos = bisect_left(times, ts)
+        if abs((times[pos] - ts).total_seconds()) < window:
+            return True
+        return pos > 0 and (ts - times[pos - 1]).total_seconds() < window
+
+    def _signal_weight(self, sig: UnifiedSignal) -> Tuple[float, str]:
+        """Combined weight and signal-type value for one signal."""
+        cfg = self._config
+        # Source reliability weight
+        source_w = cfg.source_weights.get(sig.source, cfg.default_source_weight)
+
+        # Signal type weight
+        st_val = _type_value(sig)
+        type_w = cfg.signal_type_weights.get(st_val, 0.5)
+
+        return sig.strength * sig.confidence * source_w * type_w, st_val
+
+    def _add(self, signal: UnifiedSignal) -> None:
+        """Append a signal and update its asset's index and accumulators."""
+        state = self._assets.get(signal.asset)
+        if state is None:
+            state = self._assets[signal.asset] = _AssetState()
+
+        weight, st_val = self._signal_weight(signal)
+        state.signals.append(signal)
+        state.weights.append(weight)
+
+        times = state.index.setdefault((signal.source, signal.direction), deque())
+        ts = signal.timestamp
+        if not times or ts >= times[-1]:
+            times.append(ts)
+        else:
+            times.insert(bisect_left(times, ts), ts)
+
+        if signal.direction == Direction.LONG:
+            state.long_score += weight
+            state.long_count += 1
+        else:
+            state.short_score += weight
+            state.short_count += 1
+        _bump(state.type_counts, st_val, 1)
+        _bump(state.source_counts, signal.source, 1)
+        _bump(state.market_counts, signal.market, 1)
+
+        if weight > state.strongest_weight:
+            state.strongest_weight = weight
+            state.strongest = signal
+        if state.oldest is None or ts < state.oldest:
+            state.oldest = ts
+        if state.newest is None or ts > state.newest:
+            state.newest = ts
+
+        state.summary = None
+        self._signal_count += 1
 
     def _evict_stale(self) -> None:
         """Remove signals older than max_signal_age_seconds."""
         cutoff = datetime.now(timezone.utc) - timedelta(
             seconds=self._config.max_signal_age_seconds
         )
-        for asset in list(self._buffer.keys()):
-            self._buffer[asset] = [
-                s for s in self._buffer[asset] if s.timestamp >= cutoff
-            ]
-            if not self._buffer[asset]:
-                del self._buffer[asset]
+        for asset in list(self._assets.keys()):
+            state = self._assets[asset]
+            if state.oldest >= cutoff:
+                continue
+
+            kept_signals: List[UnifiedSignal] = []
+            kept_weights: List[float] = []
+            # Rebuilt so ties keep first-appearance order among survivors
+            type_counts: Dict[str, int] = {}
+            strongest_evicted = False
+            for sig, weight in zip(state.signals, state.weights):
+                if sig.timestamp >= cutoff:
+                    kept_signals.append(sig)
+                    kept_weights.append(weight)
+                    st_val = _type_value(sig)
+                    type_counts[st_val] = type_counts.get(st_val, 0) + 1
+                    continue
+                if sig.direction == Direction.LONG:
+                    state.long_score -= weight
+                    state.long_count -= 1
+                else:
+                    state.short_score -= weight
+                    state.short_count -= 1
+                _bump(state.source_counts, sig.source, -1)
+                _bump(state.market_counts, sig.market, -1)
+                strongest_evicted = strongest_evicted or sig is state.strongest
+
+            self._signal_count -= len(state.signals) - len(kept_signals)
+            if not kept_signals:
+                del self._assets[asset]
+                continue
+
+            for key in list(state.index.keys()):
+                times = state.index[key]
+                while times and times[0] < cutoff:
+                    times.popleft()
+                if not times:
+                    del state.index[key]
+
+            # Reset drift once a side is empty
+            if not state.long_count:
+                state.long_score = 0.0
+            if not state.short_count:
+                state.short_score = 0.0
+
+            if strongest_evicted:
+                state.strongest, state.strongest_weight = None, 0.0
+                for sig, weight in zip(kept_signals, kept_weights):
+                    if weight > state.strongest_weight:
+                        state.strongest_weight = weight
+                        state.strongest = sig
+
+            state.signals = kept_signals
+            state.weights = kept_weights
+            state.type_counts = type_counts
+            state.oldest = min(s.timestamp for s in kept_signals)
+            state.summary = None
+
+    def _summary_for(self, asset: str, state: _AssetState) -> AssetSignalSummary:
+        """Cached summary for an asset, rebuilt from its accumulators if stale."""
+        if state.summary is None:
+            state.summary = self._make_summary(
+                asset,
+                list(state.signals),
+                state.long_score,
+                state.short_score,
+                state.long_count,
+                state.short_count,
+                state.type_counts,
+                sorted(state.source_counts),
+                state.strongest,
+                state.newest,
+            )
+        return state.summary
 
     def _build_asset_summary(
         self, asset: str, signals: List[UnifiedSignal]
     ) -> AssetSignalSummary:
-        """Build a weighted summary for one asset's signals."""
-        cfg = self._config
-
+        """Build a weighted summary for an arbitrary list of signals."""
         long_score = 0.0
         short_score = 0.0
         long_count = 0
         short_count = 0
-        type_counts: Dict[str, int] = defaultdict(int)
-        sources: List[str] = []
+        type_counts: Dict[str, int] = {}
         strongest: Optional[UnifiedSignal] = None
         strongest_weight = 0.0
 
         for sig in signals:
-            # Source reliability weight
-            source_w = cfg.source_weights.get(sig.source, cfg.default_source_weight)
-
-            # Signal type weight
-            st_val = sig.signal_type.value if isinstance(sig.signal_type, SignalType) else sig.signal_type
-            type_w = cfg.signal_type_weights.get(st_val, 0.5)
-
-            # Combined weight
-            weight = sig.strength * sig.confidence * source_w * type_w
+            weight, st_val = self._signal_weight(sig)
 
             if sig.direction == Direction.LONG:
                 long_score += weight
@@ -387,12 +550,40 @@ class SignalAggregator:
                 short_count += 1
 
             type_counts[st_val] = type_counts.get(st_val, 0) + 1
-            sources.append(sig.source)
 
             if weight > strongest_weight:
                 strongest_weight = weight
                 strongest = sig
 
+        return self._make_summary(
+            asset,
+            signals,
+            long_score,
+            short_score,
+            long_count,
+            short_count,
+            type_counts,
+            sorted({s.source for s in signals}),
+            strongest,
+            max(s.timestamp for s in signals),
+        )
+
+    def _make_summary(
+        self,
+        asset: str,
+        signals: List[UnifiedSignal],
+        long_score: float,
+        short_score: float,
+        long_count: int,
+        short_count: int,
+        type_counts: Dict[str, int],
+        sources: List[str],
+        strongest: Optional[UnifiedSignal],
+        last_updated: datetime,
+    ) -> AssetSignalSummary:
+        """Turn accumulated scores/counts into an AssetSignalSummary."""
+        cfg = self._config
+
         # Conflict penalty: when both LONG and SHORT signals exist
         if long_count > 0 and short_count > 0:
             minority = min(long_score, short_score)
@@ -418,8 +609,6 @@ class SignalAggregator:
             except ValueError:
                 market = Market.A_SHARE
 
-        unique_sources = sorted(set(sources))
-
         return AssetSignalSummary(
             asset=asset,
             market=market,
@@ -430,8 +619,8 @@ class SignalAggregator:
             long_signals=long_count,
             short_signals=short_count,
             dominant_type=dominant_type,
-            sources=unique_sources,
+            sources=sources,
             top_signal=strongest,
             all_signals=signals,
-            last_updated=max(s.timestamp for s in signals),
+            last_updated=last_updated,
         )
@@ -10,6 +10,10 @@ SENTIMENT-typed UnifiedSignals.  Supports:
 * Dynamic rule reconfiguration at runtime (no restart)
 * Merging multiple hits from the same event into a single signal
   (highest priority wins)
+
+Rules and watchlist tickers/names are compiled into one Aho–Corasick
+automaton (rebuilt on rule / watchlist updates), so each event is matched
+in a single pass over its text regardless of how many rules exist.
 """
 
 from __future__ import annotations
@@ -24,6 +28,7 @@ from typing import Any, Dict, List, Optional, Set, Tuple
 from src.perception.detectors.base import Detector
 from src.perception.events import EventType, RawMarketEvent
 from src.perception.signals import Direction, Market, SignalType, UnifiedSignal
+from src.utils.keyword_matcher import KeywordMatcher
 
 
 # ── Priority ─────────────────────────────────────────────────────────
@@ -156,6 +161,16 @@ class KeywordDetector(Detector):
         # pre-compile for faster matching
         self._compile()
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # RLock is not picklable (process-pool detector execution)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
     # ── Dynamic config ───────────────────────────────────────────────
 
     def update_rules(self, rules: List[KeywordRule]) -> None:
@@ -168,11 +183,12 @@ class KeywordDetector(Detector):
         """Replace watchlist at runtime (thread-safe)."""
         with self._lock:
             self._watchlist = list(watchlist)
+            self._compile()
 
     def add_rule(self, rule: KeywordRule) -> None:
         """Append a single rule (thread-safe)."""
         with self._lock:
-            self._rules.append(rule)
+            self._rules = [*self._rules, rule]
             self._compile()
 
     def get_rules(self) -> List[KeywordRule]:
@@ -196,27 +212,19 @@ class KeywordDetector(Detector):
             return []
 
         with self._lock:
-            rules = list(self._rules)
-            watchlist = list(self._watchlist)
+            rules = self._rules
+            watchlist = self._watchlist
+            matcher = self._matcher
 
-        # ── keyword matching ─────────────────────────────────────────
+        # ── keyword + watchlist matching (single pass) ───────────────
         hits: List[Tuple[KeywordRule, str]] = []  # (rule, matched_keyword)
-        text_lower = text.lower()
-
-        for rule in rules:
-            # CJK keywords: exact substring.  ASCII: case-insensitive.
-            if _is_ascii(rule.keyword):
-                if rule.keyword.lower() in text_lower:
-                    hits.append((rule, rule.keyword))
-            else:
-                if rule.keyword in text:
-                    hits.append((rule, rule.keyword))
-
-        # ── watchlist matching ───────────────────────────────────────
         watchlist_matches: List[WatchlistEntry] = []
-        for entry in watchlist:
-            if entry.ticker in text or entry.name in text:
-                watchlist_matches.append(entry)
+        for kind, idx in matcher.search(text):
+            if kind == "rule":
+                rule = rules[idx]
+                hits.append((rule, rule.keyword))
+            else:
+                watchlist_matches.append(watchlist[idx])
 
         if not hits and not watchlist_matches:
             return []
@@ -336,10 +344,20 @@ class KeywordDetector(Detector):
         return Market.A_SHARE  # default for ashare project
 
     def _compile(self) -> None:
-        """Pre-processing hook (reserved for future regex compilation)."""
-        # Currently a no-op; kept so callers don't need changing if we
-        # add compiled regex patterns later.
-        pass
+        """Rebuild the matcher from the current rules and watchlist.
+
+        Called with ``self._lock`` held (or from ``__init__``). Rules and
+        watchlist lists are replaced, never mutated in place, after a
+        compile, so ``detect`` can use the snapshot it read without copying.
+        """
+        matcher = KeywordMatcher()
+        for idx, rule in enumerate(self._rules):
+            # CJK keywords: exact substring.  ASCII: case-insensitive.
+            matcher.add(rule.keyword, ("rule", idx), ignore_case=_is_ascii(rule.keyword))
+        for idx, entry in enumerate(self._watchlist):
+            matcher.add(entry.ticker, ("watchlist", idx))
+            matcher.add(entry.name, ("watchlist", idx))
+        self._matcher = matcher.build()
 
 
 # ── Utility ──────────────────────────────────────────────────────────
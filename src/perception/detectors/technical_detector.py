@@ -10,13 +10,19 @@ Accepts event types: KLINE, PRICE_UPDATE
 
 The detector is *stateless* -- each event must carry enough history
 in ``event.data["bars"]`` (list of OHLCV dicts) for the indicators
-to be computed.  Bars should be ordered oldest-first.
+to be computed.  Bars should be ordered oldest-first.  When the event
+also carries ``event.data["columns"]`` (NumPy arrays, see
+MarketDataSource) those are used directly.
+
+Indicator math comes from the shared kernels in ``src.utils.indicators``.
 """
 
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
+import numpy as np
+
 from src.perception.detectors.base import Detector
 from src.perception.events import EventType, RawMarketEvent
 from src.perception.signals import (
@@ -25,6 +31,7 @@ from src.perception.signals import (
     SignalType,
     UnifiedSignal,
 )
+from src.utils import indicators
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -32,44 +39,47 @@ logger = get_logger(__name__)
 # ── Helpers ──────────────────────────────────────────────────────────
 
 
+def _last(values: np.ndarray) -> Optional[float]:
+    """Last element of an indicator series as float, or None if NaN/empty."""
+    if len(values) == 0 or np.isnan(values[-1]):
+        return None
+    return float(values[-1])
+
+
 def _sma(values: List[float], period: int) -> Optional[float]:
     """Simple moving average of the last *period* values, or None."""
     if len(values) < period:
         return None
-    return sum(values[-period:]) / period
+    return _last(indicators.sma(values, period))
 
 
 def _ema(values: List[float], period: int) -> Optional[float]:
     """Exponential moving average over all *values* with given period.
 
+    Seeded with the SMA of the first *period* values.
     Returns None if fewer values than *period*.
     """
     if len(values) < period:
         return None
-    k = 2.0 / (period + 1)
-    # Seed with SMA of first *period* values
-    ema_val = sum(values[:period]) / period
-    for v in values[period:]:
-        ema_val = v * k + ema_val * (1 - k)
-    return ema_val
+    return _last(indicators.ema(values, period, seed="sma"))
 
 
 def _rsi(closes: List[float], period: int = 14) -> Optional[float]:
     """Wilder-style RSI.  Returns None when not enough data."""
     if len(closes) < period + 1:
         return None
-    deltas = [closes[i] - closes[i - 1] for i in range(1, len(closes))]
-    gains = [d if d > 0 else 0.0 for d in deltas]
-    losses = [-d if d < 0 else 0.0 for d in deltas]
-    avg_gain = sum(gains[:period]) / period
-    avg_loss = sum(losses[:period]) / period
-    for i in range(period, len(gains)):
-        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-    if avg_loss == 0:
-        return 100.0
-    rs = avg_gain / avg_loss
-    return 100.0 - 100.0 / (1.0 + rs)
+    return _last(indicators.rsi(closes, period))
+
+
+def _macd_series(
+    closes,
+    fast: int = 12,
+    slow: int = 26,
+    signal: int = 9,
+) -> tuple[np.ndarray, np.ndarray]:
+    """MACD line and signal line arrays (SMA-seeded EMAs)."""
+    dif, dea, _ = indicators.macd(closes, fast, slow, signal, seed="sma")
+    return dif, dea
 
 
 def _macd(
@@ -81,25 +91,11 @@ def _macd(
     """Return {macd, signal, hist} or None if not enough data."""
     if len(closes) < slow + signal:
         return None
-    fast_ema = _ema(closes, fast)
-    slow_ema = _ema(closes, slow)
-    if fast_ema is None or slow_ema is None:
+    line, sig = _macd_series(closes, fast, slow, signal)
+    m, sg = _last(line), _last(sig)
+    if m is None or sg is None:
         return None
-    # We need a MACD series long enough to compute the signal line.
-    # Build MACD values for the last (slow+signal) bars.
-    macd_series: List[float] = []
-    for end in range(slow, len(closes) + 1):
-        f = _ema(closes[:end], fast)
-        s = _ema(closes[:end], slow)
-        if f is not None and s is not None:
-            macd_series.append(f - s)
-    if len(macd_series) < signal:
-        return None
-    sig = _ema(macd_series, signal)
-    if sig is None:
-        return None
-    m = macd_series[-1]
-    return {"macd": m, "signal": sig, "hist": m - sig}
+    return {"macd": m, "signal": sg, "hist": m - sg}
 
 
 # ── Detector ─────────────────────────────────────────────────────────
@@ -126,12 +122,18 @@ class TechnicalDetector(Detector):
     # ── public API ───────────────────────────────────────────────────
 
     def detect(self, event: RawMarketEvent) -> List[UnifiedSignal]:
-        bars: List[Dict[str, Any]] = (event.data or {}).get("bars", [])
+        data = event.data or {}
+        bars: List[Dict[str, Any]] = data.get("bars", [])
         if not bars:
             return []
 
-        closes = [float(b["close"]) for b in bars if "close" in b]
-        volumes = [float(b["volume"]) for b in bars if "volume" in b]
+        columns = data.get("columns") or {}
+        if "close" in columns and "volume" in columns:
+            closes = np.asarray(columns["close"], dtype=float)
+            volumes = np.asarray(columns["volume"], dtype=float)
+        else:
+            closes = np.array([float(b["close"]) for b in bars if "close" in b])
+            volumes = np.array([float(b["volume"]) for b in bars if "volume" in b])
 
         asset = event.symbol or "UNKNOWN"
         market = self._resolve_market(event)
@@ -165,7 +167,7 @@ class TechnicalDetector(Detector):
 
     def _detect_ma_cross(
         self,
-        closes: List[float],
+        closes: np.ndarray,
         asset: str,
         market: Market,
         ts,
@@ -173,15 +175,16 @@ class TechnicalDetector(Detector):
         """Check for MA5/MA10/MA20 crossovers on the last two bars."""
         signals: List[UnifiedSignal] = []
         pairs = [(5, 10), (5, 20), (10, 20)]
+        # Only the last two bars matter: one SMA pass per period over the tail
+        tail = closes[-21:]
+        mas = {p: indicators.sma(tail, p) for p in (5, 10, 20)}
 
         for short_p, long_p in pairs:
             if len(closes) < long_p + 1:
                 continue
-            cur_short = _sma(closes, short_p)
-            cur_long = _sma(closes, long_p)
-            prev_short = _sma(closes[:-1], short_p)
-            prev_long = _sma(closes[:-1], long_p)
-            if None in (cur_short, cur_long, prev_short, prev_long):
+            prev_short, cur_short = mas[short_p][-2:].tolist()
+            prev_long, cur_long = mas[long_p][-2:].tolist()
+            if np.isnan([cur_short, cur_long, prev_short, prev_long]).any():
                 continue
 
             cross_up = prev_short <= prev_long and cur_short > cur_long
@@ -217,7 +220,7 @@ class TechnicalDetector(Detector):
 
     def _detect_rsi(
         self,
-        closes: List[float],
+        closes: np.ndarray,
         asset: str,
         market: Market,
         ts,
@@ -258,20 +261,23 @@ class TechnicalDetector(Detector):
 
     def _detect_macd(
         self,
-        closes: List[float],
+        closes: np.ndarray,
         asset: str,
         market: Market,
         ts,
     ) -> List[UnifiedSignal]:
         if len(closes) < 36:  # need 26+9+1
             return []
-        cur = _macd(closes)
-        prev = _macd(closes[:-1])
-        if cur is None or prev is None:
+        # One pass gives both the current and the previous bar's values
+        line, sig = _macd_series(closes)
+        hist = line[-2:] - sig[-2:]
+        if np.isnan(hist).any():
             return []
+        prev_hist, cur_hist = hist.tolist()
+        cur = {"macd": float(line[-1]), "signal": float(sig[-1]), "hist": cur_hist}
 
-        cross_up = prev["hist"] <= 0 and cur["hist"] > 0
-        cross_down = prev["hist"] >= 0 and cur["hist"] < 0
+        cross_up = prev_hist <= 0 and cur["hist"] > 0
+        cross_down = prev_hist >= 0 and cur["hist"] < 0
 
         if not cross_up and not cross_down:
             return []
@@ -303,7 +309,7 @@ class TechnicalDetector(Detector):
 
     def _detect_volume_breakout(
         self,
-        volumes: List[float],
+        volumes: np.ndarray,
         asset: str,
         market: Market,
         ts,
@@ -311,10 +317,10 @@ class TechnicalDetector(Detector):
         period = 20
         if len(volumes) < period + 1:
             return []
-        avg = sum(volumes[-period - 1 : -1]) / period
+        avg = float(volumes[-period - 1 : -1].sum()) / period
         if avg <= 0:
             return []
-        ratio = volumes[-1] / avg
+        ratio = float(volumes[-1]) / avg
         if ratio < 2.0:
             return []
 
@@ -333,7 +339,7 @@ class TechnicalDetector(Detector):
                 metadata={
                     "detector": "technical",
                     "sub_type": "volume_breakout",
-                    "current_volume": volumes[-1],
+                    "current_volume": float(volumes[-1]),
                     "avg_volume": round(avg, 2),
                     "ratio": round(ratio, 2),
                 },
@@ -2,7 +2,9 @@
 
 Lifecycle per cycle:
     1. All sources poll() in parallel
-    2. Events are routed to matching detectors
+    2. Events are routed to matching detectors — sharded across a
+       thread/process pool (or run inline) and merged back in
+       (event, detector) order, so results do not depend on the executor
     3. Signals are ingested into the SignalAggregator
     4. An AggregationReport is produced
 
@@ -14,9 +16,11 @@ from __future__ import annotations
 
 import asyncio
 import time
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from uuid import uuid4
 
 from src.perception.aggregator import (
@@ -47,6 +51,8 @@ logger = get_logger(__name__)
 
 # ── Configuration ────────────────────────────────────────────────────
 
+DETECTOR_EXECUTORS = ("inline", "thread", "process")
+
 
 @dataclass
 class PipelineConfig:
@@ -62,6 +68,13 @@ class PipelineConfig:
             from src.config import get_settings
             settings = get_settings()
             self.db_path = str(settings.data_dir / "market.db")
+        if self.detector_executor not in DETECTOR_EXECUTORS:
+            raise ValueError(
+                f"detector_executor must be one of {DETECTOR_EXECUTORS}, "
+                f"got {self.detector_executor!r}"
+            )
+        if self.detector_workers < 1 or self.detector_shard_size < 1:
+            raise ValueError("detector_workers and detector_shard_size must be >= 1")
 
     # Scan interval (seconds) when running in loop mode
     scan_interval_seconds: float = 60.0
@@ -75,6 +88,17 @@ class PipelineConfig:
     # Aggregator config
     aggregator_config: Optional[AggregatorConfig] = None
 
+    # Detector execution stage:
+    #   "inline"  — run on the event loop (blocks it for large scans)
+    #   "thread"  — shard events across a thread pool
+    #   "process" — shard events across a process pool; detectors and
+    #               events are pickled per shard, so detector state changed
+    #               inside detect() is not carried back
+    detector_executor: str = "thread"
+    detector_workers: int = 4
+    # Events per shard submitted to the executor
+    detector_shard_size: int = 100
+
 
 # ── Scan result ──────────────────────────────────────────────────────
 
@@ -91,6 +115,8 @@ class ScanResult:
     report: AggregationReport
     source_health: Dict[str, SourceHealth]
     errors: List[str] = field(default_factory=list)
+    # Detector name → cumulative time spent in detect() this scan (ms)
+    detector_timings_ms: Dict[str, float] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -110,9 +136,57 @@ class ScanResult:
                 for k, v in self.source_health.items()
             },
             "errors": self.errors,
+            "detector_timings_ms": {
+                k: round(v, 2) for k, v in self.detector_timings_ms.items()
+            },
         }
 
 
+# ── Detector execution stage ─────────────────────────────────────────
+
+# (event index, event, positions of the detectors routed to it)
+_ShardItem = Tuple[int, RawMarketEvent, Tuple[int, ...]]
+
+
+@dataclass
+class _ShardOutcome:
+    """Detector output for one shard of events."""
+
+    # (event index, detector position, signals)
+    signals: List[Tuple[int, int, List[UnifiedSignal]]] = field(default_factory=list)
+    # (event index, detector position, message)
+    errors: List[Tuple[int, int, str]] = field(default_factory=list)
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+
+def _detect_shard(
+    detectors: Sequence[Detector], shard: Sequence[_ShardItem]
+) -> _ShardOutcome:
+    """Run the routed detectors over one shard of events.
+
+    Module-level so it can be shipped to a process pool. Events are
+    processed detector by detector so each detector is timed once per shard.
+    """
+    outcome = _ShardOutcome()
+    for pos, detector in enumerate(detectors):
+        items = [(idx, event) for idx, event, routed in shard if pos in routed]
+        if not items:
+            continue
+        start = time.perf_counter()
+        for idx, event in items:
+            try:
+                outcome.signals.append((idx, pos, detector.detect(event)))
+            except Exception as exc:
+                outcome.errors.append(
+                    (idx, pos, f"Detector {detector.name} error: {exc}")
+                )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        outcome.timings_ms[detector.name] = (
+            outcome.timings_ms.get(detector.name, 0.0) + elapsed_ms
+        )
+    return outcome
+
+
 # ── Pipeline ─────────────────────────────────────────────────────────
 
 
@@ -142,6 +216,7 @@ class PerceptionPipeline:
         self._running = False
         self._scan_count = 0
         self._last_result: Optional[ScanResult] = None
+        self._executor: Optional[Executor] = None
 
         # Build default sources if not provided
         if sources is not None:
@@ -176,6 +251,9 @@ class PerceptionPipeline:
                 await source.disconnect()
             except Exception as exc:
                 logger.warning("Failed to disconnect source %s: %s", source.name, exc)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
         self._running = False
 
     @property
@@ -207,19 +285,8 @@ class PerceptionPipeline:
             all_events.extend(events)
 
         # 2. Route events to detectors
-        for event in all_events:
-            etype = event.event_type
-            etype_val = etype.value if hasattr(etype, "value") else str(etype)
-
-            matched_detectors = self._route_map.get(etype_val, [])
-            for detector in matched_detectors:
-                try:
-                    sigs = detector.detect(event)
-                    all_signals.extend(sigs)
-                except Exception as exc:
-                    err = f"Detector {detector.name} error: {exc}"
-                    logger.warning(err)
-                    errors.append(err)
+        signals, detector_timings_ms = await self._run_detectors(all_events, errors)
+        all_signals.extend(signals)
 
         # 3. Ingest signals into aggregator
         ingested = self._aggregator.ingest(all_signals)
@@ -246,6 +313,7 @@ class PerceptionPipeline:
             report=report,
             source_health=source_health,
             errors=errors,
+            detector_timings_ms=detector_timings_ms,
         )
         self._last_result = result
 
@@ -328,6 +396,75 @@ class PerceptionPipeline:
             errors.append(err)
             return []
 
+    async def _run_detectors(
+        self, events: List[RawMarketEvent], errors: List[str]
+    ) -> Tuple[List[UnifiedSignal], Dict[str, float]]:
+        """Run routed detectors over events via the configured executor.
+
+        Returns signals in (event, detector) order — the same order as a
+        serial loop — plus per-detector cumulative detect() time in ms.
+        """
+        positions = {id(d): pos for pos, d in enumerate(self._detectors)}
+        work: List[_ShardItem] = []
+        for idx, event in enumerate(events):
+            etype = event.event_type
+            etype_val = etype.value if hasattr(etype, "value") else str(etype)
+            routed = tuple(
+                positions[id(d)] for d in self._route_map.get(etype_val, [])
+            )
+            if routed:
+                work.append((idx, event, routed))
+
+        size = self._config.detector_shard_size
+        shards = [work[i:i + size] for i in range(0, len(work), size)]
+
+        if self._config.detector_executor == "inline":
+            outcomes = [_detect_shard(self._detectors, shard) for shard in shards]
+        else:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            outcomes = await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, _detect_shard, self._detectors, shard)
+                    for shard in shards
+                ),
+                return_exceptions=True,
+            )
+
+        merged: List[Tuple[int, int, List[UnifiedSignal]]] = []
+        shard_errors: List[Tuple[int, int, str]] = []
+        timings: Dict[str, float] = defaultdict(float)
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                err = f"Detector shard failed: {outcome}"
+                logger.warning(err)
+                errors.append(err)
+                continue
+            merged.extend(outcome.signals)
+            shard_errors.extend(outcome.errors)
+            for name, ms in outcome.timings_ms.items():
+                timings[name] += ms
+
+        for _, _, err in sorted(shard_errors, key=lambda e: (e[0], e[1])):
+            logger.warning(err)
+            errors.append(err)
+
+        merged.sort(key=lambda s: (s[0], s[1]))
+        signals = [sig for _, _, sigs in merged for sig in sigs]
+        return signals, dict(timings)
+
+    def _get_executor(self) -> Executor:
+        """Lazily create the detector executor (shut down in stop())."""
+        if self._executor is None:
+            workers = self._config.detector_workers
+            if self._config.detector_executor == "process":
+                self._executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="perception-detect"
+                )
+        return self._executor
+
     def _build_default_sources(self) -> List[DataSource]:
         """Create the default set of data sources."""
         cfg = self._config
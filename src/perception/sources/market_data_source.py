@@ -6,7 +6,8 @@ Fetches:
 3. Kline history from ``data/market.db`` → ``klines`` table
 
 Feeds data into PriceDetector, VolumeDetector, and TechnicalDetector
-by constructing RawMarketEvents with ``data["bars"]`` payloads.
+by constructing RawMarketEvents with ``data["bars"]`` payloads (plus the
+same history as ``data["columns"]`` NumPy arrays).
 """
 
 from __future__ import annotations
@@ -26,7 +27,9 @@ from src.perception.events import (
     RawMarketEvent,
 )
 from src.perception.health import HealthStatus, SourceHealth
+from src.models import KlineTimeframe, SymbolType
 from src.perception.sources.base import DataSource, SourceType
+from src.repositories.kline_repository import KlineRepository
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -47,6 +50,17 @@ DEFAULT_DB_PATH = None  # Resolved lazily
 # How many recent kline bars to load per symbol for detector analysis
 KLINE_BAR_LIMIT = 260  # ~1 year of daily
 
+# Accepted ``kline_timeframe`` spellings → stored KlineTimeframe
+_TIMEFRAME_ALIASES = {
+    "daily": KlineTimeframe.DAY,
+    "day": KlineTimeframe.DAY,
+    "30m": KlineTimeframe.MINS_30,
+    "5m": KlineTimeframe.MINS_5,
+    "1m": KlineTimeframe.MINS_1,
+}
+
+_BAR_FIELDS = ("open", "high", "low", "close", "volume", "amount")
+
 
 class MarketDataSource(DataSource):
     """Combine index API + local DB into RawMarketEvents.
@@ -60,7 +74,8 @@ class MarketDataSource(DataSource):
     index_codes : list[str] | None
         Indexes to track.
     kline_timeframe : str
-        Timeframe to pull from klines table (e.g. "daily").
+        Timeframe to pull from klines table (e.g. "daily", "30m" or a
+        ``KlineTimeframe`` name such as "DAY").
     timeout : float
         HTTP timeout in seconds.
     """
@@ -76,7 +91,7 @@ class MarketDataSource(DataSource):
         self._base_url = base_url.rstrip("/")
         self._db_path = db_path or _get_default_db_path()
         self._index_codes = index_codes or list(DEFAULT_INDEX_CODES)
-        self._kline_timeframe = kline_timeframe
+        self._kline_timeframe = _resolve_timeframe(kline_timeframe)
         self._timeout = timeout
         self._client: Optional[httpx.AsyncClient] = None
 
@@ -217,67 +232,67 @@ class MarketDataSource(DataSource):
 
     # ── Watchlist + Klines from DB ───────────────────────────────────
 
-    def get_watchlist(self) -> List[Dict[str, Any]]:
-        """Read the watchlist table from SQLite."""
+    def get_watchlist(self, session: Any = None) -> List[Dict[str, Any]]:
+        """Read the watchlist table from SQLite.
+
+        Uses *session* when given, otherwise opens (and closes) its own.
+        """
+        if session is not None:
+            return self._query_watchlist(session)
+
         from src.database import SessionLocal
 
         session = SessionLocal()
         try:
-            rows = session.execute(
-                text("SELECT ticker, category, is_focus FROM watchlist ORDER BY is_focus DESC")
-            ).mappings().fetchall()
-            return [dict(r) for r in rows]
+            return self._query_watchlist(session)
         finally:
             session.close()
 
     def get_klines(self, symbol_code: str, limit: int = KLINE_BAR_LIMIT) -> List[Dict[str, Any]]:
-        """Load recent kline bars for a symbol from SQLite."""
+        """Load the most recent *limit* kline bars for a symbol, oldest first."""
         from src.database import SessionLocal
 
         session = SessionLocal()
         try:
-            rows = session.execute(
-                text("""
-                SELECT trade_time, open, high, low, close, volume, amount
-                FROM klines
-                WHERE symbol_code = :symbol_code AND timeframe = :timeframe
-                ORDER BY trade_time ASC
-                LIMIT :limit
-                """),
-                {"symbol_code": symbol_code, "timeframe": self._kline_timeframe, "limit": limit},
-            ).mappings().fetchall()
-            return [dict(r) for r in rows]
+            columns = self._query_kline_columns(session, [symbol_code], limit)
         finally:
             session.close()
 
+        cols = columns.get(symbol_code)
+        if cols is None:
+            return []
+        return _columns_to_bars(cols, ("trade_time",) + _BAR_FIELDS)
+
     def _load_watchlist_klines(self) -> List[RawMarketEvent]:
-        """Build KLINE events for each watchlist ticker using DB data."""
-        watchlist = self.get_watchlist()
-        events: List[RawMarketEvent] = []
+        """Build KLINE events for every watchlist ticker.
+
+        One session and one windowed query per poll: the latest
+        ``KLINE_BAR_LIMIT`` bars of all tickers are fetched together,
+        so cost does not grow with round trips per ticker.
+        """
+        from src.database import SessionLocal
 
+        session = SessionLocal()
+        try:
+            watchlist = self.get_watchlist(session)
+            tickers = [entry["ticker"] for entry in watchlist]
+            columns_by_ticker = self._query_kline_columns(session, tickers, KLINE_BAR_LIMIT)
+        finally:
+            session.close()
+
+        events: List[RawMarketEvent] = []
         for entry in watchlist:
             ticker = entry["ticker"]
-            bars = self.get_klines(ticker)
-            if not bars:
+            cols = columns_by_ticker.get(ticker)
+            if cols is None:
                 continue
 
             # Detectors expect data["bars"] as list of dicts with
             # keys: open, high, low, close, volume
-            bar_dicts = [
-                {
-                    "open": b["open"],
-                    "high": b["high"],
-                    "low": b["low"],
-                    "close": b["close"],
-                    "volume": b["volume"],
-                    "amount": b.get("amount", 0),
-                }
-                for b in bars
-            ]
+            bar_dicts = _columns_to_bars(cols, _BAR_FIELDS)
 
             # Latest bar timestamp
-            latest_time = bars[-1].get("trade_time", "")
-            ts = _parse_ts(latest_time)
+            ts = _parse_ts(cols["trade_time"][-1])
 
             events.append(
                 RawMarketEvent(
@@ -287,9 +302,10 @@ class MarketDataSource(DataSource):
                     symbol=ticker,
                     data={
                         "bars": bar_dicts,
+                        "columns": cols,
                         "category": entry.get("category", ""),
                         "is_focus": entry.get("is_focus", 0),
-                        "today": bar_dicts[-1] if bar_dicts else {},
+                        "today": bar_dicts[-1],
                     },
                     timestamp=ts,
                 )
@@ -297,10 +313,45 @@ class MarketDataSource(DataSource):
 
         return events
 
+    @staticmethod
+    def _query_watchlist(session: Any) -> List[Dict[str, Any]]:
+        rows = session.execute(
+            text("SELECT ticker, category, is_focus FROM watchlist ORDER BY is_focus DESC")
+        ).mappings().fetchall()
+        return [dict(r) for r in rows]
+
+    def _query_kline_columns(
+        self, session: Any, tickers: List[str], limit: int
+    ) -> Dict[str, Dict[str, Any]]:
+        """Latest *limit* bars per ticker as ascending column arrays."""
+        if not tickers:
+            return {}
+        return KlineRepository(session).find_latest_columns_by_symbols(
+            tickers, SymbolType.STOCK, self._kline_timeframe, limit
+        )
+
 
 # ── Helpers ──────────────────────────────────────────────────────────
 
 
+def _resolve_timeframe(raw: Any) -> KlineTimeframe:
+    if isinstance(raw, KlineTimeframe):
+        return raw
+    key = str(raw)
+    if key in KlineTimeframe.__members__:
+        return KlineTimeframe[key]
+    try:
+        return _TIMEFRAME_ALIASES[key.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported kline timeframe: {raw!r}") from None
+
+
+def _columns_to_bars(cols: Dict[str, Any], fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """Transpose column arrays into the list-of-dicts ``bars`` payload."""
+    values = [cols[f].tolist() for f in fields]
+    return [dict(zip(fields, row)) for row in zip(*values)]
+
+
 def _parse_ts(raw: Any) -> datetime:
     if isinstance(raw, datetime):
         return raw
@@ -6,16 +6,24 @@ Repository层 - 数据访问层
 
 from src.repositories.base_repository import BaseRepository
 from src.repositories.kline_repository import KlineRepository
+from src.repositories.kline_coverage_repository import KlineCoverageRepository
+from src.repositories.market_stats_repository import MarketStatsRepository
 from src.repositories.symbol_repository import SymbolRepository
 from src.repositories.board_mapping_repository import BoardMappingRepository
+from src.repositories.board_membership_repository import BoardMembershipRepository
 from src.repositories.industry_daily_repository import IndustryDailyRepository
 from src.repositories.concept_daily_repository import ConceptDailyRepository
+from src.repositories.technical_indicator_repository import TechnicalIndicatorRepository
 
 __all__ = [
     "BaseRepository",
     "KlineRepository",
+    "KlineCoverageRepository",
+    "MarketStatsRepository",
     "SymbolRepository",
     "BoardMappingRepository",
+    "BoardMembershipRepository",
     "IndustryDailyRepository",
     "ConceptDailyRepository",
+    "TechnicalIndicatorRepository",
 ]
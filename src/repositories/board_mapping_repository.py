@@ -2,6 +2,7 @@
 BoardMappingRepository - 板块映射数据访问层
 
 封装 BoardMapping 模型的数据库操作。
+upsert 时同步维护 board_membership 规范化关系表。
 """
 
 from typing import List, Optional
@@ -12,6 +13,7 @@ from sqlalchemy.orm import Session
 
 from src.models import BoardMapping
 from src.repositories.base_repository import BaseRepository
+from src.repositories.board_membership_repository import BoardMembershipRepository
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -88,6 +90,12 @@ class BoardMappingRepository(BaseRepository[BoardMapping]):
         )
 
         self.session.execute(stmt)
+        BoardMembershipRepository(self.session).replace_board(
+            board_mapping.board_name,
+            board_mapping.board_type,
+            board_mapping.constituents or [],
+            board_code=board_mapping.board_code,
+        )
         self.session.flush()
 
         return self.find_by_name_and_type(
@@ -0,0 +1,367 @@
+"""
+BoardMembershipRepository - 板块成分股关系数据访问层
+
+board_membership 表是 board_mapping.constituents (JSON) 的规范化展开，
+每个 (板块, 成分股) 一行，板块→成分股、成分股→板块两个方向都有索引。
+
+写入:
+- BoardMappingRepository.upsert 同步替换该板块的成分股
+- replace_boards() 按板块类型整体替换（一次批量写入）
+- rebuild() 从 board_mapping 全量重建；没有概念板块映射时，
+  概念关系从 symbol_metadata.concepts 反推（兼容只跑过概念脚本的旧库）
+
+读取:
+BoardMembershipIndex 是整张表的进程内只读索引（板块→成分股元组/集合、
+成分股→板块元组、板块代码→板块），按数据库 Engine 缓存；
+本进程写入后在事务结束时失效，另设TTL兜底其他进程直接写库。
+"""
+
+import threading
+import time
+import weakref
+from collections import defaultdict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from src.models import BoardMapping, BoardMembership, SymbolMetadata
+from src.repositories.base_repository import BaseRepository
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 索引有效期（秒），兜底跨进程写入
+MEMBERSHIP_INDEX_TTL_SECONDS = 600.0
+
+# session.info 中标记本事务写过成分股关系
+_DIRTY_INFO = "board_membership_dirty"
+
+# 每次 executemany 的行数
+_INSERT_CHUNK_ROWS = 5000
+
+# (board_name, board_code, constituents)
+BoardMembers = Tuple[str, Optional[str], Sequence[str]]
+# (board_type, board_name)
+BoardKey = Tuple[str, str]
+
+_membership = BoardMembership.__table__
+
+
+class BoardMembershipIndex:
+    """
+    板块成分股的进程内只读索引
+
+    构建后不再修改，可在多线程间共享；数据变化时整体重建一个新实例。
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str, Optional[str], str]], ttl_seconds: float = MEMBERSHIP_INDEX_TTL_SECONDS):
+        """
+        Args:
+            rows: (board_type, board_name, board_code, ticker)，按板块内成分股顺序排列
+            ttl_seconds: 有效期
+        """
+        constituents: Dict[BoardKey, List[str]] = defaultdict(list)
+        boards: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        codes: Dict[str, BoardKey] = {}
+        board_codes: Dict[BoardKey, str] = {}
+        for board_type, board_name, board_code, ticker in rows:
+            constituents[(board_type, board_name)].append(ticker)
+            boards[(board_type, ticker)].append(board_name)
+            if board_code:
+                codes.setdefault(board_code, (board_type, board_name))
+                board_codes.setdefault((board_type, board_name), board_code)
+
+        self._constituents: Dict[BoardKey, Tuple[str, ...]] = {
+            key: tuple(tickers) for key, tickers in constituents.items()
+        }
+        self._member_sets: Dict[BoardKey, FrozenSet[str]] = {
+            key: frozenset(tickers) for key, tickers in self._constituents.items()
+        }
+        self._boards: Dict[Tuple[str, str], Tuple[str, ...]] = {
+            key: tuple(names) for key, names in boards.items()
+        }
+        self._codes = codes
+        self._board_codes = board_codes
+        self._size = sum(len(tickers) for tickers in self._constituents.values())
+        self.expires_at = time.monotonic() + ttl_seconds
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at <= time.monotonic()
+
+    def has_board(self, board_name: str, board_type: str) -> bool:
+        """板块是否存在（有成分股）"""
+        return (board_type, board_name) in self._constituents
+
+    def constituents(self, board_name: str, board_type: str) -> List[str]:
+        """板块成分股（保持原列表顺序）；板块不存在时返回空列表"""
+        return list(self._constituents.get((board_type, board_name), ()))
+
+    def constituents_by_code(self, board_code: str) -> List[str]:
+        """按板块代码查询成分股"""
+        key = self._codes.get(board_code)
+        return list(self._constituents.get(key, ())) if key else []
+
+    def board_code(self, board_name: str, board_type: str) -> Optional[str]:
+        """板块代码；未知时返回None"""
+        return self._board_codes.get((board_type, board_name))
+
+    def boards_of(self, ticker: str, board_type: str) -> List[str]:
+        """股票所属的板块名称列表"""
+        return list(self._boards.get((board_type, ticker), ()))
+
+    def is_member(self, ticker: str, board_name: str, board_type: str) -> bool:
+        """股票是否属于某板块"""
+        return ticker in self._member_sets.get((board_type, board_name), frozenset())
+
+    def board_names(self, board_type: str) -> List[str]:
+        """某类型下全部板块名称"""
+        return [name for t, name in self._constituents if t == board_type]
+
+
+_indexes: "weakref.WeakKeyDictionary[Engine, BoardMembershipIndex]" = weakref.WeakKeyDictionary()
+_indexes_lock = threading.Lock()
+
+
+def _engine_of(bind: Any) -> Optional[Engine]:
+    if isinstance(bind, Session):
+        try:
+            bind = bind.get_bind()
+        except Exception:
+            return None
+    if isinstance(bind, Connection):
+        bind = bind.engine
+    return bind if isinstance(bind, Engine) else None
+
+
+def get_membership_index(session: Session) -> BoardMembershipIndex:
+    """
+    获取板块成分股索引（按 Engine 缓存，首次使用或过期时从数据库加载）
+
+    Args:
+        session: 数据库会话
+
+    Returns:
+        BoardMembershipIndex
+    """
+    engine = _engine_of(session)
+    if engine is not None:
+        with _indexes_lock:
+            index = _indexes.get(engine)
+        if index is not None and not index.expired:
+            return index
+
+    index = BoardMembershipRepository(session).load_index()
+    # 本事务有未提交的写入时不缓存，避免把可能回滚的数据留在索引里
+    if engine is not None and not session.info.get(_DIRTY_INFO):
+        with _indexes_lock:
+            _indexes[engine] = index
+    return index
+
+
+def invalidate_membership_index(bind: Any) -> None:
+    """使某个数据库的板块成分股索引失效"""
+    engine = _engine_of(bind)
+    if engine is None:
+        return
+    with _indexes_lock:
+        _indexes.pop(engine, None)
+
+
+class BoardMembershipRepository(BaseRepository[BoardMembership]):
+    """板块成分股关系Repository"""
+
+    def __init__(self, session: Session):
+        """初始化BoardMembershipRepository"""
+        super().__init__(session, BoardMembership)
+
+    def replace_board(
+        self,
+        board_name: str,
+        board_type: str,
+        constituents: Sequence[str],
+        board_code: Optional[str] = None,
+    ) -> int:
+        """
+        替换单个板块的成分股
+
+        Returns:
+            写入的关系数
+        """
+        connection = self.session.connection()
+        connection.execute(
+            delete(_membership).where(
+                _membership.c.board_type == board_type,
+                _membership.c.board_name == board_name,
+            )
+        )
+        return self._insert(board_type, [(board_name, board_code, constituents or [])])
+
+    def replace_boards(self, board_type: str, boards: Iterable[BoardMembers]) -> int:
+        """
+        整体替换某类型的全部板块成分股（一次删除 + 批量插入）
+
+        Args:
+            board_type: 板块类型（industry/concept）
+            boards: (板块名称, 板块代码, 成分股列表)
+
+        Returns:
+            写入的关系数
+        """
+        self.delete_by_type(board_type)
+        return self._insert(board_type, boards)
+
+    def delete_by_type(self, board_type: str) -> int:
+        """删除某类型的全部成分股关系"""
+        result = self.session.connection().execute(
+            delete(_membership).where(_membership.c.board_type == board_type)
+        )
+        self._mark_dirty()
+        return result.rowcount
+
+    def find_constituents(self, board_name: str, board_type: str) -> List[str]:
+        """查询板块成分股（按原列表顺序）"""
+        stmt = (
+            select(_membership.c.ticker)
+            .where(
+                _membership.c.board_type == board_type,
+                _membership.c.board_name == board_name,
+            )
+            .order_by(_membership.c.position)
+        )
+        return list(self.session.connection().execute(stmt).scalars())
+
+    def find_boards_by_ticker(self, ticker: str, board_type: str) -> List[str]:
+        """查询股票所属的板块"""
+        stmt = (
+            select(_membership.c.board_name)
+            .where(
+                _membership.c.ticker == ticker,
+                _membership.c.board_type == board_type,
+            )
+            .order_by(_membership.c.id)
+        )
+        return list(self.session.connection().execute(stmt).scalars())
+
+    def find_boards_by_tickers(self, board_type: str) -> Dict[str, List[str]]:
+        """
+        全部股票 → 所属板块（单次查询）
+
+        Returns:
+            {ticker: [板块名称, ...]}
+        """
+        stmt = (
+            select(_membership.c.ticker, _membership.c.board_name)
+            .where(_membership.c.board_type == board_type)
+            .order_by(_membership.c.id)
+        )
+        mapping: Dict[str, List[str]] = defaultdict(list)
+        for ticker, board_name in self.session.connection().execute(stmt):
+            mapping[ticker].append(board_name)
+        return dict(mapping)
+
+    def rebuild(self) -> int:
+        """
+        从 board_mapping 全量重建
+
+        board_mapping 中没有概念板块时，概念关系从 symbol_metadata.concepts 反推。
+
+        Returns:
+            写入的关系数
+        """
+        by_type: Dict[str, List[BoardMembers]] = defaultdict(list)
+        mappings = self.session.execute(
+            select(
+                BoardMapping.board_type,
+                BoardMapping.board_name,
+                BoardMapping.board_code,
+                BoardMapping.constituents,
+            ).order_by(BoardMapping.id)
+        )
+        for board_type, board_name, board_code, constituents in mappings:
+            by_type[board_type].append((board_name, board_code, constituents or []))
+
+        if not by_type.get("concept"):
+            concept_members: Dict[str, List[str]] = defaultdict(list)
+            symbols = self.session.execute(
+                select(SymbolMetadata.ticker, SymbolMetadata.concepts)
+                .where(SymbolMetadata.concepts.isnot(None))
+                .order_by(SymbolMetadata.ticker)
+            )
+            for ticker, concepts in symbols:
+                for concept in concepts or []:
+                    concept_members[concept].append(ticker)
+            by_type["concept"] = [
+                (name, None, tickers) for name, tickers in concept_members.items()
+            ]
+
+        self.session.connection().execute(delete(_membership))
+        total = sum(self._insert(board_type, boards) for board_type, boards in by_type.items())
+        logger.info(f"Rebuilt board membership: {total} rows")
+        return total
+
+    def needs_bootstrap(self) -> bool:
+        """关系表为空而 board_mapping / symbol_metadata.concepts 有数据时返回True"""
+        connection = self.session.connection()
+        if connection.execute(select(_membership.c.id).limit(1)).first() is not None:
+            return False
+        has_mappings = connection.execute(select(BoardMapping.id).limit(1)).first()
+        if has_mappings is not None:
+            return True
+        has_concepts = connection.execute(
+            select(SymbolMetadata.ticker)
+            .where(SymbolMetadata.concepts.isnot(None), func.json_array_length(SymbolMetadata.concepts) > 0)
+            .limit(1)
+        ).first()
+        return has_concepts is not None
+
+    def load_index(self) -> BoardMembershipIndex:
+        """从数据库加载索引（首次使用时先从 board_mapping 重建）"""
+        if self.needs_bootstrap():
+            self.rebuild()
+        rows = self.session.connection().execute(
+            select(
+                _membership.c.board_type,
+                _membership.c.board_name,
+                _membership.c.board_code,
+                _membership.c.ticker,
+            ).order_by(_membership.c.board_type, _membership.c.board_name, _membership.c.position)
+        )
+        return BoardMembershipIndex(rows)
+
+    def _insert(self, board_type: str, boards: Iterable[BoardMembers]) -> int:
+        rows = []
+        for board_name, board_code, constituents in boards:
+            seen = set()
+            for ticker in constituents:
+                if not ticker or ticker in seen:
+                    continue
+                seen.add(ticker)
+                rows.append({
+                    "board_name": board_name,
+                    "board_type": board_type,
+                    "board_code": board_code,
+                    "ticker": ticker,
+                    "position": len(seen) - 1,
+                })
+        connection = self.session.connection()
+        for start in range(0, len(rows), _INSERT_CHUNK_ROWS):
+            connection.execute(_membership.insert(), rows[start:start + _INSERT_CHUNK_ROWS])
+        self._mark_dirty()
+        return len(rows)
+
+    def _mark_dirty(self) -> None:
+        invalidate_membership_index(self.session)
+        self.session.info[_DIRTY_INFO] = True
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_after_transaction(session: Session) -> None:
+    if session.info.pop(_DIRTY_INFO, None):
+        invalidate_membership_index(session)
@@ -0,0 +1,254 @@
+"""
+KlineCache - 最近K线的进程内LRU缓存
+
+按 (symbol_type, symbol_code, timeframe) 缓存最近一段K线（时间正序），
+供 KlineService.get_klines 在查库前使用。
+
+失效策略:
+- KlineRepository 的写入/删除方法以及ORM flush 中的 Kline 变更，立即使对应条目失效，
+  并记录在 session.info 中，事务提交或回滚后再失效一次，
+  避免把未提交或已回滚的数据留在缓存里
+- 条目带TTL，兜底其他进程（脚本、独立调度进程）直接写库的情况
+
+缓存按数据库 Engine 隔离，不同数据库之间不共享条目。
+"""
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from src.models import Kline
+
+# 最多缓存的 (标的, 周期) 条目数
+KLINE_CACHE_MAX_ENTRIES = 512
+# 条目有效期（秒），兜底跨进程写入
+KLINE_CACHE_TTL_SECONDS = 300.0
+
+# session.info 中记录本事务内被写过的缓存键
+_DIRTY_KEYS_INFO = "kline_cache_dirty_keys"
+
+# 缓存的单根K线: (trade_time, open, high, low, close, volume, amount)
+CachedBar = Tuple[str, float, float, float, float, float, float]
+CacheKey = Tuple[str, str, str]
+
+
+def make_key(symbol_type: Any, symbol_code: str, timeframe: Any) -> CacheKey:
+    """构造缓存键（枚举取name，与数据库存储一致）"""
+    return (
+        getattr(symbol_type, "name", symbol_type),
+        symbol_code,
+        getattr(timeframe, "name", timeframe),
+    )
+
+
+@dataclass
+class _CacheEntry:
+    bars: List[CachedBar]
+    complete: bool  # True 表示已包含该标的全部K线
+    expires_at: float
+
+
+class KlineCache:
+    """
+    线程安全的LRU缓存
+
+    条目保存一次查询得到的最近N根K线；请求数量不超过N（或条目已包含全部数据）时命中，
+    否则视为未命中，由调用方回源后覆盖写入。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = KLINE_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = KLINE_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        """失效代数；回源前读取，写回时传给 put 以丢弃期间已失效的结果"""
+        return self._generation
+
+    def get(self, key: CacheKey, limit: int) -> Optional[List[CachedBar]]:
+        """
+        读取最近 limit 根K线（limit 为0表示全部）
+
+        Returns:
+            命中时返回时间正序的K线列表，未命中返回None
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            covered = entry is not None and (
+                entry.complete or (limit and len(entry.bars) >= limit)
+            )
+            if not covered:
+                self._misses += 1
+                return None
+            self._hits += 1
+            return entry.bars[-limit:] if limit else list(entry.bars)
+
+    def get_latest_trade_time(self, key: CacheKey) -> Tuple[bool, Optional[str]]:
+        """
+        从缓存读取最新K线时间
+
+        Returns:
+            (是否命中, 最新交易时间)
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None or (not entry.bars and not entry.complete):
+                self._misses += 1
+                return False, None
+            self._hits += 1
+            return True, entry.bars[-1][0] if entry.bars else None
+
+    def put(
+        self,
+        key: CacheKey,
+        bars: List[CachedBar],
+        complete: bool,
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        写入条目
+
+        Args:
+            key: 缓存键
+            bars: 时间正序的K线
+            complete: 是否已包含该标的全部K线
+            generation: 回源前读取的 generation；若期间发生过失效则放弃写入
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = _CacheEntry(
+                bars=bars,
+                complete=complete,
+                expires_at=time.monotonic() + self.ttl_seconds,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, keys: Iterable[CacheKey]) -> None:
+        """使指定键失效"""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self._invalidations += 1
+
+    def clear(self) -> None:
+        """清空缓存（统计保留）"""
+        with self._lock:
+            self._generation += 1
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """命中/未命中/淘汰统计"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+    def _lookup(self, key: CacheKey) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+
+_caches: "weakref.WeakKeyDictionary[Engine, KlineCache]" = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def get_kline_cache(bind: Any) -> Optional[KlineCache]:
+    """
+    获取某个数据库的K线缓存
+
+    Args:
+        bind: Session / Connection / Engine
+
+    Returns:
+        该 Engine 对应的缓存；无法确定 Engine 时返回None（不使用缓存）
+    """
+    if isinstance(bind, Session):
+        try:
+            bind = bind.get_bind()
+        except Exception:
+            return None
+    if isinstance(bind, Connection):
+        bind = bind.engine
+    if not isinstance(bind, Engine):
+        return None
+
+    with _caches_lock:
+        cache = _caches.get(bind)
+        if cache is None:
+            cache = KlineCache()
+            _caches[bind] = cache
+        return cache
+
+
+def invalidate_on_write(session: Session, keys: Iterable[CacheKey]) -> None:
+    """
+    写入K线后调用：立即失效，并在事务结束（提交/回滚）时再次失效
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    cache = get_kline_cache(session)
+    if cache is None:
+        return
+    cache.invalidate(keys)
+    session.info.setdefault(_DIRTY_KEYS_INFO, set()).update(keys)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_orm_writes(session: Session, flush_context: Any) -> None:
+    keys = {
+        make_key(obj.symbol_type, obj.symbol_code, obj.timeframe)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, Kline)
+    }
+    if keys:
+        invalidate_on_write(session, keys)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_dirty_keys(session: Session) -> None:
+    keys = session.info.pop(_DIRTY_KEYS_INFO, None)
+    if not keys:
+        return
+    cache = get_kline_cache(session)
+    if cache is not None:
+        cache.invalidate(keys)
@@ -0,0 +1,302 @@
+"""
+KlineCoverageRepository - K线覆盖摘要数据访问层
+
+维护 kline_coverage 表：每个 (标的, 周期) 一个自然日位图，记录哪些日期有K线。
+
+更新时机:
+- KlineRepository 的批量写入 (upsert_batch / upsert_columns) 增量置位
+- KlineRepository 的删除方法按标的重建
+- rebuild() 单次扫描 klines 全量重建，用于首次初始化或脚本直接写库
+  (session.add / 原生SQL，不经过 KlineRepository) 之后
+
+目前只维护日线 (COVERAGE_TIMEFRAMES)。
+所有读写都走 Core 连接。
+"""
+
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from src.models import Kline, KlineCoverage, KlineTimeframe, SymbolType, utcnow
+from src.repositories.base_repository import BaseRepository
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 维护覆盖位图的周期
+COVERAGE_TIMEFRAMES = (KlineTimeframe.DAY,)
+
+# IN 查询的分块大小 (避免超出 SQLite 变量上限)
+_KEY_CHUNK_SIZE = 300
+
+# (symbol_type, symbol_code, timeframe)
+CoverageKey = Tuple[SymbolType, str, KlineTimeframe]
+# (symbol_type, timeframe, symbol_code, symbol_name, trade_time)
+CoverageEntry = Tuple[Any, Any, str, Optional[str], str]
+
+_coverage = KlineCoverage.__table__
+_klines = Kline.__table__
+
+
+@lru_cache(maxsize=8192)
+def date_ordinal(value: str) -> Optional[int]:
+    """'YYYY-MM-DD...' → 日序号；无法解析时返回None"""
+    try:
+        return date.fromisoformat(value[:10]).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def ordinal_date(ordinal: int) -> str:
+    """日序号 → 'YYYY-MM-DD'"""
+    return date.fromordinal(ordinal).isoformat()
+
+
+def bitmap_from_ordinals(ordinals: Iterable[int]) -> Tuple[int, int]:
+    """
+    日序号集合 → (起始日序号, 位图整数)，第 i 位对应起始日之后第 i 天
+    """
+    ordinals = list(ordinals)
+    base = min(ordinals)
+    bits = bytearray(((max(ordinals) - base) >> 3) + 1)
+    for ordinal in ordinals:
+        offset = ordinal - base
+        bits[offset >> 3] |= 1 << (offset & 7)
+    return base, int.from_bytes(bits, "little")
+
+
+def _coverage_row(key: CoverageKey, name: Optional[str], base: int, bitmap: int) -> Dict[str, Any]:
+    symbol_type, symbol_code, timeframe = key
+    return {
+        "symbol_type": symbol_type,
+        "symbol_code": symbol_code,
+        "symbol_name": name,
+        "timeframe": timeframe,
+        "first_date": ordinal_date(base),
+        "last_date": ordinal_date(base + bitmap.bit_length() - 1),
+        "day_count": bitmap.bit_count(),
+        "bitmap": bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little"),
+        "updated_at": utcnow(),
+    }
+
+
+def _max_name(*names: Optional[str]) -> Optional[str]:
+    # 与 MAX(symbol_name) 一致：忽略空值取最大
+    present = [n for n in names if n]
+    return max(present) if present else None
+
+
+class KlineCoverageRepository(BaseRepository[KlineCoverage]):
+    """K线覆盖摘要Repository"""
+
+    def __init__(self, session: Session):
+        """初始化KlineCoverageRepository"""
+        super().__init__(session, KlineCoverage)
+
+    def record_trade_times(self, entries: Iterable[CoverageEntry]) -> int:
+        """
+        增量记录新写入的K线日期（位图按位或）
+
+        Args:
+            entries: (symbol_type, timeframe, symbol_code, symbol_name, trade_time)
+
+        Returns:
+            更新的覆盖记录数
+        """
+        pending: Dict[CoverageKey, Tuple[Set[int], Optional[str]]] = {}
+        for symbol_type, timeframe, code, name, trade_time in entries:
+            if timeframe not in COVERAGE_TIMEFRAMES:
+                continue
+            ordinal = date_ordinal(trade_time)
+            if ordinal is None:
+                continue
+            key = (symbol_type, code, timeframe)
+            ordinals, known_name = pending.get(key, (None, None))
+            if ordinals is None:
+                ordinals = set()
+            ordinals.add(ordinal)
+            pending[key] = (ordinals, _max_name(known_name, name))
+
+        if not pending:
+            return 0
+
+        existing = self._load(pending.keys())
+        rows = []
+        for key, (ordinals, name) in pending.items():
+            base, bitmap = bitmap_from_ordinals(ordinals)
+            current = existing.get(key)
+            if current is not None:
+                old_base = date_ordinal(current["first_date"])
+                old_bitmap = int.from_bytes(current["bitmap"], "little")
+                if old_base < base:
+                    bitmap = (bitmap << (base - old_base)) | old_bitmap
+                    base = old_base
+                else:
+                    bitmap |= old_bitmap << (old_base - base)
+                name = _max_name(current["symbol_name"], name)
+            rows.append(_coverage_row(key, name, base, bitmap))
+
+        self._upsert(rows)
+        return len(rows)
+
+    def rebuild(
+        self,
+        keys: Optional[Iterable[CoverageKey]] = None,
+        symbol_types: Optional[Iterable[SymbolType]] = None,
+    ) -> int:
+        """
+        从 klines 重建覆盖摘要（单次扫描）
+
+        Args:
+            keys: 只重建这些 (标的类型, 代码, 周期)；None 表示全部
+            symbol_types: 全量重建时限定的标的类型
+
+        Returns:
+            重建后的覆盖记录数
+        """
+        connection = self.session.connection()
+        ordinals: Dict[CoverageKey, Set[int]] = {}
+        names: Dict[CoverageKey, Optional[str]] = {}
+
+        def scan(stmt) -> None:
+            result = connection.execution_options(yield_per=20000).execute(stmt)
+            for symbol_type, code, timeframe, name, trade_time in result:
+                ordinal = date_ordinal(trade_time)
+                if ordinal is None:
+                    continue
+                key = (symbol_type, code, timeframe)
+                ordinals.setdefault(key, set()).add(ordinal)
+                if name:
+                    names[key] = _max_name(names.get(key), name)
+
+        columns = (
+            _klines.c.symbol_type, _klines.c.symbol_code, _klines.c.timeframe,
+            _klines.c.symbol_name, _klines.c.trade_time,
+        )
+        if keys is None:
+            stmt = select(*columns).where(_klines.c.timeframe.in_(COVERAGE_TIMEFRAMES))
+            clear = delete(_coverage).where(_coverage.c.timeframe.in_(COVERAGE_TIMEFRAMES))
+            if symbol_types is not None:
+                types = list(symbol_types)
+                stmt = stmt.where(_klines.c.symbol_type.in_(types))
+                clear = clear.where(_coverage.c.symbol_type.in_(types))
+            scan(stmt)
+            connection.execute(clear)
+        else:
+            keys = [k for k in set(keys) if k[2] in COVERAGE_TIMEFRAMES]
+            for chunk in _chunks(keys):
+                scan(select(*columns).where(
+                    tuple_(_klines.c.symbol_type, _klines.c.symbol_code, _klines.c.timeframe).in_(chunk)
+                ))
+                connection.execute(delete(_coverage).where(
+                    tuple_(_coverage.c.symbol_type, _coverage.c.symbol_code, _coverage.c.timeframe).in_(chunk)
+                ))
+
+        rows = [
+            _coverage_row(key, names.get(key), *bitmap_from_ordinals(days))
+            for key, days in ordinals.items()
+        ]
+        self._upsert(rows)
+        if keys is None:
+            logger.info(f"Rebuilt kline coverage for {len(rows)} symbols")
+        return len(rows)
+
+    def find_coverage(
+        self,
+        symbol_types: Iterable[SymbolType],
+        timeframe: KlineTimeframe = KlineTimeframe.DAY,
+        symbol_codes: Optional[Iterable[str]] = None,
+    ) -> List[Any]:
+        """
+        查询覆盖摘要
+
+        Returns:
+            行列表 (symbol_type, symbol_code, symbol_name, first_date, last_date, day_count, bitmap)，
+            按 symbol_code, symbol_type 排序
+        """
+        stmt = (
+            select(
+                _coverage.c.symbol_type,
+                _coverage.c.symbol_code,
+                _coverage.c.symbol_name,
+                _coverage.c.first_date,
+                _coverage.c.last_date,
+                _coverage.c.day_count,
+                _coverage.c.bitmap,
+            )
+            .where(
+                _coverage.c.symbol_type.in_(list(symbol_types)),
+                _coverage.c.timeframe == timeframe,
+            )
+            .order_by(_coverage.c.symbol_code, _coverage.c.symbol_type)
+        )
+        if symbol_codes is not None:
+            codes = list(symbol_codes)
+            rows: List[Any] = []
+            for start in range(0, len(codes), _KEY_CHUNK_SIZE):
+                chunk = codes[start:start + _KEY_CHUNK_SIZE]
+                rows.extend(self.session.connection().execute(
+                    stmt.where(_coverage.c.symbol_code.in_(chunk))
+                ).fetchall())
+            return sorted(rows, key=lambda r: (r.symbol_code, r.symbol_type.name))
+        return self.session.connection().execute(stmt).fetchall()
+
+    def needs_bootstrap(self, symbol_types: Iterable[SymbolType]) -> bool:
+        """覆盖表为空而 klines 有数据（首次使用或旧库）时返回True"""
+        types = list(symbol_types)
+        connection = self.session.connection()
+        has_coverage = connection.execute(
+            select(_coverage.c.id).where(_coverage.c.symbol_type.in_(types)).limit(1)
+        ).first()
+        if has_coverage is not None:
+            return False
+        has_klines = connection.execute(
+            select(_klines.c.id).where(
+                _klines.c.symbol_type.in_(types),
+                _klines.c.timeframe.in_(COVERAGE_TIMEFRAMES),
+            ).limit(1)
+        ).first()
+        return has_klines is not None
+
+    def _load(self, keys: Iterable[CoverageKey]) -> Dict[CoverageKey, Any]:
+        connection = self.session.connection()
+        found: Dict[CoverageKey, Any] = {}
+        for chunk in _chunks(list(keys)):
+            result = connection.execute(
+                select(
+                    _coverage.c.symbol_type,
+                    _coverage.c.symbol_code,
+                    _coverage.c.timeframe,
+                    _coverage.c.symbol_name,
+                    _coverage.c.first_date,
+                    _coverage.c.bitmap,
+                ).where(
+                    tuple_(_coverage.c.symbol_type, _coverage.c.symbol_code, _coverage.c.timeframe).in_(chunk)
+                )
+            )
+            for row in result.mappings():
+                found[(row["symbol_type"], row["symbol_code"], row["timeframe"])] = row
+        return found
+
+    def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        stmt = sqlite_insert(_coverage)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["symbol_type", "symbol_code", "timeframe"],
+            set_={
+                col: stmt.excluded[col]
+                for col in ("symbol_name", "first_date", "last_date", "day_count", "bitmap", "updated_at")
+            },
+        )
+        self.session.connection().execute(stmt, rows)
+
+
+def _chunks(keys: List[CoverageKey]) -> Iterable[List[CoverageKey]]:
+    for start in range(0, len(keys), _KEY_CHUNK_SIZE):
+        yield keys[start:start + _KEY_CHUNK_SIZE]
+
@@ -4,19 +4,63 @@ KlineRepository - K线数据访问层
 封装所有K线相关的数据库操作。
 """
 
-from datetime import datetime
-from typing import List, Optional
-
-from sqlalchemy import and_, delete, desc, func, select
+import weakref
+from datetime import datetime, timezone
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, List, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Row, and_, delete, desc, func, select, update
 from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
-from src.models import Kline, KlineTimeframe, SymbolType
+from src.database import Base
+from src.models import (
+    Kline,
+    KlineCoverage,
+    KlineIndicatorState,
+    KlineTimeframe,
+    MarketDailyStats,
+    SectorDailyStats,
+    SymbolType,
+)
 from src.repositories.base_repository import BaseRepository
+from src.repositories.kline_cache import invalidate_on_write, make_key
+from src.repositories.kline_coverage_repository import CoverageEntry, KlineCoverageRepository
+from src.repositories.market_stats_repository import MarketStatsRepository, is_stats_series
+from src.utils.indicators import MacdState
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# 列式写入每次 executemany 的行数。executemany 逐行绑定参数，不受 SQLite
+# 单条语句变量上限约束，分块只用于限制单批参数列表的内存占用
+UPSERT_CHUNK_ROWS = 5000
+
+# 列式写入支持的列 (symbol_code/trade_time 之外)
+_PRICE_COLUMNS = ("open", "high", "low", "close")
+_OPTIONAL_COLUMNS = ("volume", "amount")
+_INDICATOR_COLUMNS = ("dif", "dea", "macd")
+
+# 批量查询返回的轻量行字段
+_ROW_COLUMNS = (
+    "symbol_code", "trade_time", "open", "high", "low", "close", "volume", "amount",
+)
+# IN 查询的分块大小 (避免超出 SQLite 变量上限)
+SYMBOL_CHUNK_SIZE = 500
+
+# K线写入时一并维护的派生表；未执行 init_db 的旧库在首次写入前按需创建
+_BOOKKEEPING_TABLES = (
+    KlineCoverage.__table__,
+    MarketDailyStats.__table__,
+    SectorDailyStats.__table__,
+    KlineIndicatorState.__table__,
+)
+_bookkeeping_engines: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
 
 class KlineRepository(BaseRepository[Kline]):
     """K线数据Repository"""
@@ -140,9 +184,13 @@ class KlineRepository(BaseRepository[Kline]):
         symbol_type: SymbolType,
         timeframe: KlineTimeframe,
         limit_per_symbol: int = 100,
-    ) -> List[Kline]:
+    ) -> List[Row]:
         """
-        批量查询多个标的的K线数据
+        批量查询多个标的最近的K线数据
+
+        使用 ``ROW_NUMBER() OVER (PARTITION BY symbol_code ORDER BY trade_time DESC)``
+        在数据库端截取每个标的最近 limit_per_symbol 条，只返回轻量的行元组
+        （支持 ``row.close`` 属性访问），不构造ORM对象。
 
         Args:
             symbol_codes: 标的代码列表
@@ -151,31 +199,79 @@ class KlineRepository(BaseRepository[Kline]):
             limit_per_symbol: 每个标的的数量限制
 
         Returns:
-            K线数据列表
+            行元组列表（按 symbol_code 分组，组内按时间倒序），
+            字段: symbol_code, trade_time, open, high, low, close, volume, amount
         """
-        stmt = (
-            select(Kline)
+        rows: List[Row] = []
+        for start in range(0, len(symbol_codes), SYMBOL_CHUNK_SIZE):
+            chunk = symbol_codes[start:start + SYMBOL_CHUNK_SIZE]
+            stmt = self._latest_per_symbol_stmt(
+                chunk, symbol_type, timeframe, limit_per_symbol
+            )
+            rows.extend(self.session.execute(stmt).all())
+        return rows
+
+    def find_latest_columns_by_symbols(
+        self,
+        symbol_codes: List[str],
+        symbol_type: SymbolType,
+        timeframe: KlineTimeframe,
+        limit_per_symbol: int = 100,
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        批量查询多个标的最近的K线数据，按标的返回列数组
+
+        与 find_by_symbols 使用同一条窗口函数查询，结果转换为按时间正序的
+        NumPy 列数组，便于指标计算和检测器直接使用。
+
+        Args:
+            symbol_codes: 标的代码列表
+            symbol_type: 标的类型
+            timeframe: 时间周期
+            limit_per_symbol: 每个标的的数量限制
+
+        Returns:
+            {symbol_code: {"trade_time": ndarray[str], "open": ndarray[float], ...}}，
+            没有数据的标的不出现在结果中
+        """
+        rows = self.find_by_symbols(symbol_codes, symbol_type, timeframe, limit_per_symbol)
+
+        result: Dict[str, Dict[str, np.ndarray]] = {}
+        for code, group in groupby(rows, key=itemgetter(0)):
+            # 组内为时间倒序，反转为正序后按列转置
+            columns = list(zip(*reversed(list(group))))
+            result[code] = {
+                name: np.asarray(values, dtype=object if name == "trade_time" else float)
+                for name, values in zip(_ROW_COLUMNS[1:], columns[1:])
+            }
+        return result
+
+    def _latest_per_symbol_stmt(
+        self,
+        symbol_codes: List[str],
+        symbol_type: SymbolType,
+        timeframe: KlineTimeframe,
+        limit_per_symbol: int,
+    ):
+        """构造"每个标的最近N条"的窗口函数查询"""
+        row_number = func.row_number().over(
+            partition_by=Kline.symbol_code,
+            order_by=desc(Kline.trade_time),
+        ).label("rn")
+        ranked = (
+            select(*[getattr(Kline, name) for name in _ROW_COLUMNS], row_number)
             .filter(
                 Kline.symbol_code.in_(symbol_codes),
                 Kline.symbol_type == symbol_type,
                 Kline.timeframe == timeframe,
             )
-            .order_by(Kline.symbol_code, desc(Kline.trade_time))
+            .subquery()
+        )
+        return (
+            select(*[ranked.c[name] for name in _ROW_COLUMNS])
+            .where(ranked.c.rn <= limit_per_symbol)
+            .order_by(ranked.c.symbol_code, desc(ranked.c.trade_time))
         )
-
-        result = self.session.execute(stmt)
-        all_klines = list(result.scalars().all())
-
-        # 对每个标的限制数量
-        klines_by_symbol = {}
-        for kline in all_klines:
-            if kline.symbol_code not in klines_by_symbol:
-                klines_by_symbol[kline.symbol_code] = []
-            if len(klines_by_symbol[kline.symbol_code]) < limit_per_symbol:
-                klines_by_symbol[kline.symbol_code].append(kline)
-
-        # 展平结果
-        return [kline for klines in klines_by_symbol.values() for kline in klines]
 
     def upsert_batch(self, klines: List[Kline]) -> int:
         """
@@ -204,12 +300,15 @@ class KlineRepository(BaseRepository[Kline]):
                 "close": k.close,
                 "volume": k.volume,
                 "amount": k.amount,
+                "dif": k.dif,
+                "dea": k.dea,
+                "macd": k.macd,
                 "updated_at": k.updated_at,
             }
             for k in klines
         ]
 
-        # SQLite的upsert语法
+        # SQLite的upsert语法；指标为NULL时保留已有值
         stmt = sqlite_insert(Kline).values(kline_dicts)
         stmt = stmt.on_conflict_do_update(
             index_elements=["symbol_code", "symbol_type", "timeframe", "trade_time"],
@@ -220,16 +319,148 @@ class KlineRepository(BaseRepository[Kline]):
                 "close": stmt.excluded.close,
                 "volume": stmt.excluded.volume,
                 "amount": stmt.excluded.amount,
+                **{
+                    col: func.coalesce(stmt.excluded[col], Kline.__table__.c[col])
+                    for col in _INDICATOR_COLUMNS
+                },
                 "updated_at": stmt.excluded.updated_at,
             },
         )
 
+        self._ensure_bookkeeping_tables()
         result = self.session.execute(stmt)
         self.session.flush()
+        self._record_writes(
+            [(k.symbol_type, k.timeframe, k.symbol_code, k.symbol_name, k.trade_time) for k in klines]
+        )
 
         logger.info(f"Upserted {len(klines)} klines")
         return result.rowcount
 
+    def upsert_columns(
+        self,
+        data: Union[pd.DataFrame, Mapping[str, object]],
+        symbol_type: SymbolType,
+        timeframe: KlineTimeframe,
+        symbol_code: Optional[str] = None,
+        symbol_name: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+    ) -> int:
+        """
+        列式批量插入或更新K线数据（不构造ORM对象）
+
+        接受 DataFrame 或 {列名: NumPy数组} 映射，可包含单个或多个标的。
+        时间列向量化标准化后，按块以 executemany 执行同一条预编译的
+        ``INSERT ... ON CONFLICT DO UPDATE`` 语句。
+
+        Args:
+            data: 必须包含 trade_time, open, high, low, close 列；
+                  可选 symbol_code, volume, amount, dif, dea, macd 列
+                  （已有的行只更新提供了的列）
+            symbol_type: 标的类型
+            timeframe: 时间周期
+            symbol_code: data 中没有 symbol_code 列时使用的标的代码
+            symbol_name: 标的名称（仅新插入的行使用）
+            chunk_size: 每次 executemany 的行数，默认 UPSERT_CHUNK_ROWS
+
+        Returns:
+            写入的行数
+        """
+        from src.schemas.normalized import normalize_trade_times
+
+        frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        if frame.empty:
+            return 0
+
+        if "symbol_code" not in frame.columns:
+            if symbol_code is None:
+                raise ValueError("symbol_code 列缺失且未指定 symbol_code")
+            frame = frame.assign(symbol_code=symbol_code)
+
+        missing = [c for c in ("trade_time",) + _PRICE_COLUMNS if c not in frame.columns]
+        if missing:
+            raise ValueError(f"缺少必需的列: {missing}")
+
+        # 缺失的 volume/amount 只在新插入的行中补0，冲突时不覆盖已有值
+        supplied_columns = list(_PRICE_COLUMNS)
+        value_columns = list(_PRICE_COLUMNS)
+        for col in _OPTIONAL_COLUMNS:
+            value_columns.append(col)
+            if col in frame.columns:
+                supplied_columns.append(col)
+            else:
+                frame = frame.assign(**{col: 0.0})
+        indicator_columns = [c for c in _INDICATOR_COLUMNS if c in frame.columns]
+
+        # 向量化处理: 时间标准化、数值转换、NaN -> None
+        trade_times = normalize_trade_times(
+            frame["trade_time"], is_daily=timeframe == KlineTimeframe.DAY
+        )
+        valid = pd.notna(trade_times)
+        if not valid.all():
+            logger.warning(
+                f"丢弃 {int((~valid).sum())} 条时间无法解析的K线: "
+                f"{frame['trade_time'][~valid].head(5).tolist()}"
+            )
+            frame = frame[valid]
+            trade_times = trade_times[valid]
+            if frame.empty:
+                return 0
+        codes = frame["symbol_code"].astype(str).tolist()
+        values = frame[value_columns].astype(float).fillna(0.0)
+        columns = {col: values[col].tolist() for col in value_columns}
+        for col in indicator_columns:
+            series = pd.to_numeric(frame[col], errors="coerce").astype(object)
+            columns[col] = series.where(series.notna(), None).tolist()
+
+        now = datetime.now(timezone.utc)
+        value_names = value_columns + indicator_columns
+        value_lists = [columns[c] for c in value_names]
+        rows = [
+            {
+                "symbol_type": symbol_type,
+                "symbol_code": code,
+                "symbol_name": symbol_name,
+                "timeframe": timeframe,
+                "trade_time": trade_time,
+                **dict(zip(value_names, row_values)),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for code, trade_time, *row_values in zip(codes, trade_times, *value_lists)
+        ]
+
+        # 指标为NULL时保留已有值（与 upsert_batch 一致）
+        stmt = sqlite_insert(Kline.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["symbol_code", "symbol_type", "timeframe", "trade_time"],
+            set_={
+                **{col: stmt.excluded[col] for col in supplied_columns + ["updated_at"]},
+                **{
+                    col: func.coalesce(stmt.excluded[col], Kline.__table__.c[col])
+                    for col in indicator_columns
+                },
+            },
+        )
+
+        chunk_size = chunk_size or UPSERT_CHUNK_ROWS
+
+        # 使用 Core 连接执行，绕过 ORM bulk 持久化的逐行处理
+        self._ensure_bookkeeping_tables()
+        self.session.flush()
+        connection = self.session.connection()
+        for start in range(0, len(rows), chunk_size):
+            connection.execute(stmt, rows[start:start + chunk_size])
+        self._record_writes(
+            [
+                (symbol_type, timeframe, code, symbol_name, trade_time)
+                for code, trade_time in zip(codes, trade_times)
+            ]
+        )
+
+        logger.info(f"Upserted {len(rows)} klines (columnar)")
+        return len(rows)
+
     def delete_by_symbol(
         self,
         symbol_code: str,
@@ -247,6 +478,8 @@ class KlineRepository(BaseRepository[Kline]):
         Returns:
             删除的记录数
         """
+        self._ensure_bookkeeping_tables()
+        MarketStatsRepository(self.session).mark_symbol_stale(symbol_type, symbol_code, timeframe)
         stmt = delete(Kline).where(
             and_(
                 Kline.symbol_code == symbol_code,
@@ -257,6 +490,9 @@ class KlineRepository(BaseRepository[Kline]):
 
         result = self.session.execute(stmt)
         self.session.flush()
+        invalidate_on_write(self.session, [make_key(symbol_type, symbol_code, timeframe)])
+        self.delete_indicator_states(symbol_type, [symbol_code], timeframe)
+        KlineCoverageRepository(self.session).rebuild(keys=[(symbol_type, symbol_code, timeframe)])
 
         logger.info(
             f"Deleted {result.rowcount} klines for {symbol_code} ({symbol_type}, {timeframe})"
@@ -288,6 +524,10 @@ class KlineRepository(BaseRepository[Kline]):
         start_str = start_date.strftime("%Y-%m-%d")
         end_str = end_date.strftime("%Y-%m-%d")
 
+        self._ensure_bookkeeping_tables()
+        MarketStatsRepository(self.session).mark_symbol_stale(
+            symbol_type, symbol_code, timeframe, start_str, end_str
+        )
         stmt = delete(Kline).where(
             and_(
                 Kline.symbol_code == symbol_code,
@@ -300,9 +540,321 @@ class KlineRepository(BaseRepository[Kline]):
 
         result = self.session.execute(stmt)
         self.session.flush()
+        invalidate_on_write(self.session, [make_key(symbol_type, symbol_code, timeframe)])
+        self.delete_indicator_states(symbol_type, [symbol_code], timeframe, since=start_str)
+        KlineCoverageRepository(self.session).rebuild(keys=[(symbol_type, symbol_code, timeframe)])
 
         return result.rowcount
 
+    def find_closes(
+        self,
+        symbol_code: str,
+        symbol_type: SymbolType,
+        timeframe: KlineTimeframe,
+        start_time: Optional[str] = None,
+    ) -> List[Row]:
+        """
+        查询标的的收盘价序列（供指标计算）
+
+        Args:
+            symbol_code: 标的代码
+            symbol_type: 标的类型
+            timeframe: 时间周期
+            start_time: 起始时间（含），None 表示全部
+
+        Returns:
+            行元组列表（按时间正序），字段: id, trade_time, close
+        """
+        stmt = select(Kline.id, Kline.trade_time, Kline.close).filter(
+            Kline.symbol_code == symbol_code,
+            Kline.symbol_type == symbol_type,
+            Kline.timeframe == timeframe,
+        )
+        if start_time is not None:
+            stmt = stmt.filter(Kline.trade_time >= start_time)
+
+        result = self.session.execute(stmt.order_by(Kline.trade_time))
+        return list(result.all())
+
+    def find_closes_by_symbols(
+        self,
+        symbol_type: SymbolType,
+        timeframe: KlineTimeframe,
+        start_times: Mapping[str, str],
+    ) -> Dict[str, List[Row]]:
+        """
+        批量查询多个标的自各自起始时间以来的收盘价序列
+
+        起始时间相同的标的合并为一条查询；标的多于 SYMBOL_CHUNK_SIZE 时
+        不带 IN 条件，查询该类型/周期自起始时间以来的全部K线后在内存中过滤。
+
+        Args:
+            symbol_type: 标的类型
+            timeframe: 时间周期
+            start_times: {symbol_code: 起始时间（含）}
+
+        Returns:
+            {symbol_code: 行元组列表（按时间正序），字段: id, trade_time, close}
+        """
+        by_start: Dict[str, List[str]] = {}
+        for code, start_time in start_times.items():
+            by_start.setdefault(start_time, []).append(code)
+
+        result: Dict[str, List[Row]] = {code: [] for code in start_times}
+        for start_time, codes in by_start.items():
+            stmt = select(Kline.symbol_code, Kline.id, Kline.trade_time, Kline.close).filter(
+                Kline.symbol_type == symbol_type,
+                Kline.timeframe == timeframe,
+                Kline.trade_time >= start_time,
+            )
+            wanted = set(codes)
+            if len(codes) <= SYMBOL_CHUNK_SIZE:
+                stmt = stmt.filter(Kline.symbol_code.in_(codes))
+            for row in self.session.execute(stmt.order_by(Kline.trade_time)):
+                if row.symbol_code in wanted:
+                    result[row.symbol_code].append(row)
+        return result
+
+    def update_indicators(self, rows: List[Dict[str, object]]) -> int:
+        """
+        按主键批量更新已有K线的指标
+
+        Args:
+            rows: 每项包含 id, dif, dea, macd
+
+        Returns:
+            更新的行数
+        """
+        if not rows:
+            return 0
+
+        self.session.execute(update(Kline), rows)
+        self.session.flush()
+        return len(rows)
+
+    def get_indicator_state(
+        self,
+        symbol_code: str,
+        symbol_type: SymbolType,
+        timeframe: KlineTimeframe,
+    ) -> Optional[KlineIndicatorState]:
+        """
+        查询标的的指标递推状态
+
+        Args:
+            symbol_code: 标的代码
+            symbol_type: 标的类型
+            timeframe: 时间周期
+
+        Returns:
+            递推状态或None
+        """
+        self._ensure_bookkeeping_tables()
+        stmt = select(KlineIndicatorState).filter(
+            KlineIndicatorState.symbol_code == symbol_code,
+            KlineIndicatorState.symbol_type == symbol_type,
+            KlineIndicatorState.timeframe == timeframe,
+        )
+        return self.session.execute(stmt).scalar_one_or_none()
+
+    def get_indicator_states(
+        self,
+        symbol_codes: Iterable[str],
+        symbol_type: SymbolType,
+        timeframe: KlineTimeframe,
+    ) -> Dict[str, Row]:
+        """
+        批量查询多个标的的指标递推状态（单条查询）
+
+        标的多于 SYMBOL_CHUNK_SIZE 时不带 IN 条件，查询该类型/周期的全部状态
+        后在内存中过滤（全市场横截面时两者几乎相同）。
+
+        Args:
+            symbol_codes: 标的代码集合
+            symbol_type: 标的类型
+            timeframe: 时间周期
+
+        Returns:
+            {symbol_code: 状态行元组}，字段同 KlineIndicatorState；没有状态的标的不出现
+        """
+        self._ensure_bookkeeping_tables()
+        codes = set(symbol_codes)
+        if not codes:
+            return {}
+        table = KlineIndicatorState.__table__
+        stmt = select(table).where(
+            table.c.symbol_type == symbol_type,
+            table.c.timeframe == timeframe,
+        )
+        if len(codes) <= SYMBOL_CHUNK_SIZE:
+            stmt = stmt.where(table.c.symbol_code.in_(codes))
+        return {
+            row.symbol_code: row
+            for row in self.session.connection().execute(stmt)
+            if row.symbol_code in codes
+        }
+
+    def save_indicator_state(
+        self,
+        symbol_code: str,
+        symbol_type: SymbolType,
+        timeframe: KlineTimeframe,
+        last_trade_time: str,
+        state: MacdState,
+        prev_trade_time: Optional[str] = None,
+        prev_state: Optional[MacdState] = None,
+    ) -> None:
+        """
+        保存（upsert）标的的指标递推状态
+
+        Args:
+            symbol_code: 标的代码
+            symbol_type: 标的类型
+            timeframe: 时间周期
+            last_trade_time: 最后一根K线时间
+            state: 最后一根K线计算完成后的状态
+            prev_trade_time: 倒数第二根K线时间
+            prev_state: 倒数第二根K线计算完成后的状态
+        """
+        self.save_indicator_states(
+            symbol_type, timeframe,
+            [(symbol_code, last_trade_time, state, prev_trade_time, prev_state)],
+        )
+
+    def save_indicator_states(
+        self,
+        symbol_type: SymbolType,
+        timeframe: KlineTimeframe,
+        states: List[tuple],
+    ) -> int:
+        """
+        批量保存（upsert）多个标的的指标递推状态，一次 executemany
+
+        Args:
+            symbol_type: 标的类型
+            timeframe: 时间周期
+            states: [(symbol_code, last_trade_time, state, prev_trade_time, prev_state)]，
+                    参数含义同 save_indicator_state
+
+        Returns:
+            保存的状态数
+        """
+        if not states:
+            return 0
+
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "symbol_type": symbol_type,
+                "symbol_code": symbol_code,
+                "timeframe": timeframe,
+                "last_trade_time": last_trade_time,
+                "ema_fast": state.ema_fast,
+                "ema_slow": state.ema_slow,
+                "dea": state.dea,
+                "bar_count": state.bar_count,
+                "prev_trade_time": prev_trade_time,
+                "prev_ema_fast": prev_state.ema_fast if prev_state else None,
+                "prev_ema_slow": prev_state.ema_slow if prev_state else None,
+                "prev_dea": prev_state.dea if prev_state else None,
+                "updated_at": now,
+            }
+            for symbol_code, last_trade_time, state, prev_trade_time, prev_state in states
+        ]
+        self._ensure_bookkeeping_tables()
+        stmt = sqlite_insert(KlineIndicatorState.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["symbol_type", "symbol_code", "timeframe"],
+            set_={
+                col: stmt.excluded[col]
+                for col in rows[0]
+                if col not in ("symbol_type", "symbol_code", "timeframe")
+            },
+        )
+        self.session.flush()
+        self.session.connection().execute(stmt, rows)
+        return len(rows)
+
+    def delete_indicator_states(
+        self,
+        symbol_type: SymbolType,
+        symbol_codes: Iterable[str],
+        timeframe: KlineTimeframe,
+        since: Optional[str] = None,
+    ) -> int:
+        """
+        删除失效的指标递推状态
+
+        不经过 KlineService.save_klines 写入/删除K线时调用：状态对应的K线之前
+        (含)的数据被改动后，状态不再可信，下次保存时会全量重算。
+
+        Args:
+            symbol_type: 标的类型
+            symbol_codes: 标的代码集合
+            timeframe: 时间周期
+            since: 被改动的最早K线时间；None 表示无条件删除
+
+        Returns:
+            删除的记录数
+        """
+        self._ensure_bookkeeping_tables()
+        codes = list(symbol_codes)
+        deleted = 0
+        for start in range(0, len(codes), SYMBOL_CHUNK_SIZE):
+            stmt = delete(KlineIndicatorState).where(
+                KlineIndicatorState.symbol_type == symbol_type,
+                KlineIndicatorState.timeframe == timeframe,
+                KlineIndicatorState.symbol_code.in_(codes[start:start + SYMBOL_CHUNK_SIZE]),
+            )
+            if since is not None:
+                stmt = stmt.where(KlineIndicatorState.last_trade_time >= since)
+            deleted += self.session.execute(stmt).rowcount
+        return deleted
+
+    def _ensure_bookkeeping_tables(self) -> None:
+        """派生表不存在时创建（每个 engine 只检查一次）"""
+        connection = self.session.connection()
+        if connection.engine in _bookkeeping_engines:
+            return
+        Base.metadata.create_all(connection, tables=_BOOKKEEPING_TABLES, checkfirst=True)
+        _bookkeeping_engines.add(connection.engine)
+
+    def _record_writes(self, entries: List[CoverageEntry]) -> None:
+        """
+        批量写入K线后维护派生数据
+
+        缓存失效之外，覆盖位图、汇总 stale 标记、指标递推状态失效各执行
+        一次批量写入（而不是逐行处理）。
+
+        Args:
+            entries: (symbol_type, timeframe, symbol_code, symbol_name, trade_time)
+        """
+        invalidate_on_write(
+            self.session,
+            {make_key(symbol_type, code, timeframe) for symbol_type, timeframe, code, _, _ in entries},
+        )
+        KlineCoverageRepository(self.session).record_trade_times(entries)
+        # 汇总表只覆盖个股日线：指数/概念及分钟线写入不标记 stale
+        stats_entries = {
+            (symbol_type, timeframe, trade_time)
+            for symbol_type, timeframe, _, _, trade_time in entries
+            if is_stats_series(symbol_type, timeframe)
+        }
+        if stats_entries:
+            MarketStatsRepository(self.session).record_writes(stats_entries)
+
+        # 最早被改动的K线时间之后(含)的递推状态失效
+        codes: Dict[tuple, set] = {}
+        since: Dict[tuple, str] = {}
+        for symbol_type, timeframe, code, _, trade_time in entries:
+            key = (symbol_type, timeframe)
+            codes.setdefault(key, set()).add(code)
+            since[key] = min(since.get(key, trade_time), trade_time)
+        for (symbol_type, timeframe), group in codes.items():
+            self.delete_indicator_states(
+                symbol_type, group, timeframe, since=since[(symbol_type, timeframe)]
+            )
+
     def count_by_symbol(
         self,
         symbol_code: str,
@@ -0,0 +1,552 @@
+"""
+MarketStatsRepository - 全市场/赛道日线汇总数据访问层
+
+维护 market_daily_stats 与 sector_daily_stats 两张汇总表（仅个股日线）：
+每个交易日的家数、涨跌家数、涨跌停、成交量/成交额，以及按 stock_sectors
+赛道归属拆分的同类汇总。
+
+更新时机:
+- KlineRepository 的写入/删除把涉及的交易日标记为 stale
+- refresh() 重算 stale 交易日及其后一个交易日（涨跌以上一交易日收盘价为基准），
+  只由日线更新任务和夜间任务在写入后调用
+- rebuild() 单次扫描 klines 全量重建，用于首次初始化或脚本直接写库
+  (session.add / 原生SQL，不经过 KlineRepository) 之后
+- rebuild_sectors() 在赛道归属变化后重算指定赛道
+
+涨跌幅 = (收盘价 - 上一交易日收盘价) / 上一交易日收盘价 × 100，
+上一交易日无该股K线时以当日开盘价为基准；|涨跌幅| ≤ 0.01 视为平盘，
+≥ 9.9 / ≤ -9.9 近似视为涨停/跌停。
+查询方法只读：按交易日判断新鲜度，非 stale 交易日直接读汇总行，只有 stale
+交易日（及其后一个交易日）从 klines 现算，不写库也不提交；汇总表为空时全部现算。
+所有读写都走 Core 连接。
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, delete, distinct, inspect, select, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from src.models import (
+    Kline,
+    KlineTimeframe,
+    MarketDailyStats,
+    SectorDailyStats,
+    SymbolType,
+    utcnow,
+)
+from src.repositories.base_repository import BaseRepository
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 汇总的标的类型与周期
+STATS_SYMBOL_TYPE = SymbolType.STOCK
+STATS_TIMEFRAME = KlineTimeframe.DAY
+
+# 涨跌判定阈值 (%)
+FLAT_THRESHOLD = 0.01
+LIMIT_THRESHOLD = 9.9
+
+# IN 查询的分块大小 (避免超出 SQLite 变量上限)
+_DATE_CHUNK_SIZE = 300
+
+# (symbol_type, timeframe, trade_time)
+StatsEntry = Tuple[Any, Any, str]
+
+_market = MarketDailyStats.__table__
+_sector = SectorDailyStats.__table__
+_klines = Kline.__table__
+
+_STAT_COLUMNS = ("stock_count", "traded_count", "up_count", "down_count", "total_volume", "total_amount", "turnover")
+_MARKET_COLUMNS = _STAT_COLUMNS + ("flat_count", "limit_up_count", "limit_down_count")
+_SECTOR_COLUMNS = _STAT_COLUMNS + ("paired_count",)
+
+# 逐股涨跌幅；上一交易日取自 market_daily_stats.prev_date（现算时由参数给出）
+# 连接顺序由调用方决定：按日期过滤时类型/周期条件前加一元 "+"，阻止 SQLite
+# 选用低选择性的 timeframe 索引，改走 ix_klines_trade_time；按赛道过滤时
+# 以 stock_sectors 为外层 (CROSS JOIN 固定顺序)，逐股走 ix_klines_symbol
+_STOCK_ROWS_SQL = """
+    SELECT
+        c.trade_time AS trade_date,
+        {sector_column}
+        c.volume AS volume,
+        c.amount AS amount,
+        c.volume * c.close * 100 AS turnover,
+        p.id IS NOT NULL AS paired,
+        CASE WHEN COALESCE(p.close, c.open) > 0
+             THEN (c.close - COALESCE(p.close, c.open)) / COALESCE(p.close, c.open) * 100
+             ELSE 0 END AS change_pct
+    FROM {source}
+    {prev_join}
+    LEFT JOIN klines p
+        ON p.symbol_type = c.symbol_type
+        AND p.symbol_code = c.symbol_code
+        AND p.timeframe = c.timeframe
+        AND p.trade_time = {prev_date}
+    WHERE {hint}c.symbol_type = :symbol_type AND {hint}c.timeframe = :timeframe {where}
+"""
+
+_AGGREGATES_SQL = """
+    SELECT
+        trade_date, {group_column}
+        COUNT(*) AS stock_count,
+        COALESCE(SUM(volume > 0), 0) AS traded_count,
+        COALESCE(SUM(change_pct > :flat), 0) AS up_count,
+        COALESCE(SUM(change_pct < -:flat), 0) AS down_count,
+        COALESCE(SUM(change_pct >= :limit), 0) AS limit_up_count,
+        COALESCE(SUM(change_pct <= -:limit), 0) AS limit_down_count,
+        COALESCE(SUM(paired), 0) AS paired_count,
+        COALESCE(SUM(volume), 0) AS total_volume,
+        COALESCE(SUM(amount), 0) AS total_amount,
+        COALESCE(SUM(turnover), 0) AS turnover
+    FROM ({rows}) AS r
+    GROUP BY trade_date {group_by}
+"""
+
+# 现算单个交易日：补上 prev_date 与 flat_count，与汇总表的列对齐
+_LIVE_SQL = """
+    SELECT a.*, :prev_date AS prev_date, a.stock_count - a.up_count - a.down_count AS flat_count
+    FROM ({aggregates}) AS a
+"""
+
+
+def _aggregate_stmt(by_sector: bool, dates: bool = True, sectors: bool = False, live: bool = False):
+    where = ""
+    if live:
+        where += " AND c.trade_time = :trade_date"
+    elif dates:
+        where += " AND c.trade_time IN :dates"
+    if sectors:
+        where += " AND s.sector IN :sectors"
+    if not by_sector:
+        source = "klines c"
+    elif dates or live:
+        source = "klines c JOIN stock_sectors s ON s.ticker = c.symbol_code"
+    else:
+        source = "stock_sectors s CROSS JOIN klines c ON c.symbol_code = s.ticker"
+    rows = _STOCK_ROWS_SQL.format(
+        sector_column="s.sector AS sector," if by_sector else "",
+        source=source,
+        prev_join="" if live else "JOIN market_daily_stats m ON m.trade_date = c.trade_time",
+        prev_date=":prev_date" if live else "m.prev_date",
+        hint="+" if dates or live else "",
+        where=where,
+    )
+    aggregates = _AGGREGATES_SQL.format(
+        group_column="sector," if by_sector else "",
+        group_by=", sector" if by_sector else "",
+        rows=rows,
+    )
+    if live:
+        return text(_LIVE_SQL.format(aggregates=aggregates))
+    stmt = text(aggregates)
+    params = []
+    if dates:
+        params.append(bindparam("dates", expanding=True))
+    if sectors:
+        params.append(bindparam("sectors", expanding=True))
+    return stmt.bindparams(*params) if params else stmt
+
+
+def is_stats_series(symbol_type: Any, timeframe: Any) -> bool:
+    """是否为汇总覆盖的个股日线（接受枚举、枚举值或枚举名）"""
+    return _enum_name(SymbolType, symbol_type) == STATS_SYMBOL_TYPE.name and (
+        _enum_name(KlineTimeframe, timeframe) == STATS_TIMEFRAME.name
+    )
+
+
+def _enum_name(enum_cls: Any, value: Any) -> Optional[str]:
+    if isinstance(value, enum_cls):
+        return value.name
+    try:
+        return enum_cls(value).name
+    except ValueError:
+        return value if value in enum_cls.__members__ else None
+
+
+def _chunks(values: List[Any]) -> Iterable[List[Any]]:
+    for start in range(0, len(values), _DATE_CHUNK_SIZE):
+        yield values[start:start + _DATE_CHUNK_SIZE]
+
+
+class MarketStatsRepository(BaseRepository[MarketDailyStats]):
+    """全市场/赛道日线汇总Repository"""
+
+    def __init__(self, session: Session):
+        """初始化MarketStatsRepository"""
+        super().__init__(session, MarketDailyStats)
+
+    # ==================== 维护 ====================
+
+    def record_writes(self, entries: Iterable[StatsEntry]) -> int:
+        """
+        记录个股日线写入，把涉及的交易日标记为 stale
+
+        Args:
+            entries: (symbol_type, timeframe, trade_time)，其他类型/周期忽略
+
+        Returns:
+            标记的交易日数
+        """
+        return self.mark_stale(
+            trade_time
+            for symbol_type, timeframe, trade_time in entries
+            if is_stats_series(symbol_type, timeframe)
+        )
+
+    def mark_stale(self, trade_dates: Iterable[str]) -> int:
+        """把交易日标记为待重算（不存在的交易日插入占位行）"""
+        dates = sorted({d[:10] for d in trade_dates if d})
+        if not dates:
+            return 0
+        now = utcnow()
+        stmt = sqlite_insert(_market)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["trade_date"],
+            set_={"stale": True, "updated_at": stmt.excluded.updated_at},
+        )
+        self.session.connection().execute(
+            stmt, [{"trade_date": d, "stale": True, "updated_at": now} for d in dates]
+        )
+        return len(dates)
+
+    def mark_symbol_stale(
+        self,
+        symbol_type: SymbolType,
+        symbol_code: str,
+        timeframe: KlineTimeframe,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> int:
+        """删除K线前调用：把该标的现有K线所在的交易日标记为待重算"""
+        if not is_stats_series(symbol_type, timeframe):
+            return 0
+        stmt = select(_klines.c.trade_time).where(
+            _klines.c.symbol_type == symbol_type,
+            _klines.c.symbol_code == symbol_code,
+            _klines.c.timeframe == timeframe,
+        )
+        if start_date is not None:
+            stmt = stmt.where(_klines.c.trade_time >= start_date)
+        if end_date is not None:
+            stmt = stmt.where(_klines.c.trade_time <= end_date)
+        return self.mark_stale(self.session.connection().execute(stmt).scalars())
+
+    def refresh(self) -> int:
+        """
+        重算 stale 交易日（及其后一个交易日）的汇总
+
+        Returns:
+            重算的交易日数
+        """
+        connection = self.session.connection()
+        stale = set(connection.execute(
+            select(_market.c.trade_date).where(_market.c.stale.is_(True))
+        ).scalars())
+        if not stale:
+            return 0
+
+        # 已没有个股日线的交易日直接删除
+        present = set()
+        for chunk in _chunks(sorted(stale)):
+            present.update(connection.execute(
+                select(distinct(_klines.c.trade_time)).where(
+                    _klines.c.symbol_type == STATS_SYMBOL_TYPE,
+                    _klines.c.timeframe == STATS_TIMEFRAME,
+                    _klines.c.trade_time.in_(chunk),
+                )
+            ).scalars())
+        removed = sorted(stale - present)
+        for chunk in _chunks(removed):
+            connection.execute(delete(_market).where(_market.c.trade_date.in_(chunk)))
+            connection.execute(delete(_sector).where(_sector.c.trade_date.in_(chunk)))
+
+        # 后一个交易日的涨跌基准随之变化，一并重算
+        kept = sorted(connection.execute(select(_market.c.trade_date)).scalars())
+        affected = set(present)
+        for day in stale:
+            pos = bisect_right(kept, day)
+            if pos < len(kept):
+                affected.add(kept[pos])
+        affected = sorted(affected)
+
+        prev_dates = []
+        for day in affected:
+            pos = bisect_left(kept, day)
+            prev_dates.append({"day": day, "prev": kept[pos - 1] if pos else None})
+        connection.execute(
+            update(_market)
+            .where(_market.c.trade_date == bindparam("day"))
+            .values(prev_date=bindparam("prev")),
+            prev_dates,
+        )
+
+        has_sectors = inspect(connection).has_table("stock_sectors")
+        for chunk in _chunks(affected):
+            self._recompute(chunk, has_sectors)
+
+        logger.info(f"Refreshed market daily stats for {len(affected)} trade dates")
+        return len(affected)
+
+    def rebuild(self) -> int:
+        """
+        从 klines 全量重建汇总（单次扫描取交易日，再分块聚合）
+
+        Returns:
+            重建后的交易日数
+        """
+        connection = self.session.connection()
+        dates = list(connection.execute(
+            select(distinct(_klines.c.trade_time)).where(
+                _klines.c.symbol_type == STATS_SYMBOL_TYPE,
+                _klines.c.timeframe == STATS_TIMEFRAME,
+            )
+        ).scalars())
+        connection.execute(delete(_sector))
+        connection.execute(delete(_market))
+        self.mark_stale(dates)
+        return self.refresh()
+
+    def rebuild_sectors(self, sectors: Iterable[str]) -> int:
+        """
+        赛道归属变化后重算指定赛道的全部交易日
+
+        Returns:
+            写入的 (交易日, 赛道) 行数
+        """
+        sectors = sorted({s for s in sectors if s})
+        if not sectors:
+            return 0
+        connection = self.session.connection()
+        connection.execute(delete(_sector).where(_sector.c.sector.in_(sectors)))
+        if not inspect(connection).has_table("stock_sectors"):
+            return 0
+        result = connection.execute(
+            _aggregate_stmt(by_sector=True, dates=False, sectors=True),
+            self._aggregate_params(sectors=sectors),
+        )
+        rows = [self._sector_row(row) for row in result.mappings()]
+        self._upsert_sectors(rows)
+        return len(rows)
+
+    def needs_bootstrap(self) -> bool:
+        """汇总表为空而 klines 有个股日线（首次使用或旧库）时返回True"""
+        connection = self.session.connection()
+        if connection.execute(select(_market.c.id).limit(1)).first() is not None:
+            return False
+        has_klines = connection.execute(
+            select(_klines.c.id).where(
+                _klines.c.symbol_type == STATS_SYMBOL_TYPE,
+                _klines.c.timeframe == STATS_TIMEFRAME,
+            ).limit(1)
+        ).first()
+        return has_klines is not None
+
+    def is_fresh(self) -> bool:
+        """汇总表已初始化且没有 stale 交易日时返回True"""
+        stale = self.session.connection().execute(
+            select(_market.c.id).where(_market.c.stale.is_(True)).limit(1)
+        ).first()
+        return stale is None and not self.needs_bootstrap()
+
+    def ensure_fresh(self) -> int:
+        """写入路径调用：首次使用时全量重建，否则重算 stale 交易日，返回重算的交易日数"""
+        if self.needs_bootstrap():
+            return self.rebuild()
+        return self.refresh()
+
+    # ==================== 查询 ====================
+
+    def find_by_date(self, trade_date: str) -> Optional[Any]:
+        """查询某交易日的全市场汇总 (YYYY-MM-DD)"""
+        dates, live = self._read_plan()
+        if trade_date not in dates:
+            return None
+        if trade_date in live:
+            return self._live_market(trade_date, self._prev_date(dates, trade_date))
+        return self._stored_market([trade_date]).get(trade_date)
+
+    def find_recent(
+        self,
+        before: Optional[str] = None,
+        limit: int = 5,
+        min_traded_count: int = 0,
+    ) -> List[Any]:
+        """
+        查询最近的全市场汇总
+
+        Args:
+            before: 只取早于该日期的交易日；None 表示不限
+            limit: 返回条数
+            min_traded_count: 只取成交股票数大于该值的交易日
+
+        Returns:
+            按交易日降序的汇总行
+        """
+        if limit <= 0:
+            return []
+        dates, live = self._read_plan()
+        candidates = [d for d in dates if before is None or d < before]
+        rows: List[Any] = []
+        for start in range(0, len(candidates), limit):
+            window = candidates[start:start + limit]
+            stored = self._stored_market([d for d in window if d not in live])
+            for day in window:
+                if day in live:
+                    row = self._live_market(day, self._prev_date(dates, day))
+                else:
+                    row = stored.get(day)
+                if row is not None and row.traded_count > min_traded_count:
+                    rows.append(row)
+                    if len(rows) >= limit:
+                        return rows
+        return rows
+
+    def find_sector_stats(self, trade_dates: Iterable[str]) -> List[Any]:
+        """查询若干交易日的赛道汇总，按交易日、赛道排序"""
+        dates, live = self._read_plan()
+        requested = sorted(set(trade_dates) & set(dates))
+        connection = self.session.connection()
+        rows: List[Any] = []
+        for chunk in _chunks([d for d in requested if d not in live]):
+            rows.extend(connection.execute(
+                select(_sector).where(_sector.c.trade_date.in_(chunk))
+            ))
+        live_days = [d for d in requested if d in live]
+        if live_days and inspect(connection).has_table("stock_sectors"):
+            for day in live_days:
+                rows.extend(connection.execute(
+                    _aggregate_stmt(by_sector=True, live=True),
+                    self._live_params(day, self._prev_date(dates, day)),
+                ))
+        return sorted(rows, key=lambda row: (row.trade_date, row.sector))
+
+    # ==================== 内部方法 ====================
+
+    def _read_plan(self) -> Tuple[List[str], Set[str]]:
+        """
+        查询路径的交易日列表（降序）与需要现算的交易日
+
+        交易日取自 market_daily_stats（写入时新交易日会插入 stale 占位行）；
+        stale 交易日及其后一个交易日（涨跌基准随之变化）现算，其余直接读汇总行。
+        汇总表为空（尚未初始化）时退回扫描 klines，全部现算。
+        """
+        result = self.session.connection().execute(
+            select(_market.c.trade_date, _market.c.stale).order_by(_market.c.trade_date.desc())
+        ).fetchall()
+        if not result:
+            dates = self._live_dates()
+            return dates, set(dates)
+        dates = [row.trade_date for row in result]
+        live: Set[str] = set()
+        for pos, row in enumerate(result):
+            if row.stale:
+                live.add(row.trade_date)
+                if pos:
+                    live.add(dates[pos - 1])
+        return dates, live
+
+    @staticmethod
+    def _prev_date(dates: List[str], trade_date: str) -> Optional[str]:
+        """降序交易日列表中的上一交易日"""
+        pos = dates.index(trade_date) + 1
+        return dates[pos] if pos < len(dates) else None
+
+    def _stored_market(self, trade_dates: List[str]) -> Dict[str, Any]:
+        """读取若干交易日已物化的全市场汇总行"""
+        connection = self.session.connection()
+        rows: Dict[str, Any] = {}
+        for chunk in _chunks(trade_dates):
+            for row in connection.execute(select(_market).where(_market.c.trade_date.in_(chunk))):
+                rows[row.trade_date] = row
+        return rows
+
+    def _live_dates(self) -> List[str]:
+        """个股日线的全部交易日，降序（仅汇总表未初始化时使用）"""
+        return list(self.session.connection().execute(
+            select(distinct(_klines.c.trade_time))
+            .where(
+                _klines.c.symbol_type == STATS_SYMBOL_TYPE,
+                _klines.c.timeframe == STATS_TIMEFRAME,
+            )
+            .order_by(_klines.c.trade_time.desc())
+        ).scalars())
+
+    def _live_market(self, trade_date: str, prev_date: Optional[str]) -> Optional[Any]:
+        """从 klines 现算单个交易日的全市场汇总（只读）"""
+        return self.session.connection().execute(
+            _aggregate_stmt(by_sector=False, live=True),
+            self._live_params(trade_date, prev_date),
+        ).first()
+
+    def _live_params(self, trade_date: str, prev_date: Optional[str]) -> Dict[str, Any]:
+        params = self._aggregate_params()
+        params.update(trade_date=trade_date, prev_date=prev_date)
+        return params
+
+    def _recompute(self, dates: List[str], has_sectors: bool) -> None:
+        connection = self.session.connection()
+        now = utcnow()
+
+        result = connection.execute(
+            _aggregate_stmt(by_sector=False), self._aggregate_params(dates=dates)
+        )
+        market_rows = []
+        for row in result.mappings():
+            values = {col: row[col] for col in _MARKET_COLUMNS if col != "flat_count"}
+            values["flat_count"] = row["stock_count"] - row["up_count"] - row["down_count"]
+            market_rows.append({"day": row["trade_date"], **values, "stale": False, "updated_at": now})
+        if market_rows:
+            connection.execute(
+                update(_market)
+                .where(_market.c.trade_date == bindparam("day"))
+                .values({col: bindparam(col) for col in (*_MARKET_COLUMNS, "stale", "updated_at")}),
+                market_rows,
+            )
+        computed = {row["day"] for row in market_rows}
+        missing = [d for d in dates if d not in computed]
+        if missing:
+            connection.execute(delete(_market).where(_market.c.trade_date.in_(missing)))
+
+        connection.execute(delete(_sector).where(_sector.c.trade_date.in_(dates)))
+        if has_sectors:
+            result = connection.execute(
+                _aggregate_stmt(by_sector=True), self._aggregate_params(dates=dates)
+            )
+            self._upsert_sectors([self._sector_row(row) for row in result.mappings()])
+
+    @staticmethod
+    def _aggregate_params(dates: Optional[List[str]] = None, sectors: Optional[List[str]] = None) -> Dict[str, Any]:
+        params: Dict[str, Any] = {
+            "symbol_type": STATS_SYMBOL_TYPE.name,
+            "timeframe": STATS_TIMEFRAME.name,
+            "flat": FLAT_THRESHOLD,
+            "limit": LIMIT_THRESHOLD,
+        }
+        if dates is not None:
+            params["dates"] = dates
+        if sectors is not None:
+            params["sectors"] = sectors
+        return params
+
+    @staticmethod
+    def _sector_row(row: Any) -> Dict[str, Any]:
+        return {
+            "trade_date": row["trade_date"],
+            "sector": row["sector"],
+            **{col: row[col] for col in _SECTOR_COLUMNS},
+            "updated_at": utcnow(),
+        }
+
+    def _upsert_sectors(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        stmt = sqlite_insert(_sector)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["trade_date", "sector"],
+            set_={col: stmt.excluded[col] for col in (*_SECTOR_COLUMNS, "updated_at")},
+        )
+        self.session.connection().execute(stmt, rows)
+
@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 
 from src.models import SymbolMetadata
 from src.repositories.base_repository import BaseRepository
+from src.repositories.board_membership_repository import get_membership_index
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -116,12 +117,11 @@ class SymbolRepository(BaseRepository[SymbolMetadata]):
         Returns:
             标的元数据列表
         """
-        # JSON字段查询（SQLite需要使用json_each）
-        stmt = select(SymbolMetadata).filter(
-            SymbolMetadata.concepts.contains(concept)
-        )
-        result = self.session.execute(stmt)
-        return list(result.scalars().all())
+        # 板块成分股索引查询（精确匹配概念名称）
+        tickers = get_membership_index(self.session).constituents(concept, "concept")
+        if not tickers:
+            return []
+        return self.find_by_tickers(tickers)
 
     def find_by_market_value_range(
         self, min_mv: Optional[float] = None, max_mv: Optional[float] = None
@@ -0,0 +1,174 @@
+"""
+TechnicalIndicatorRepository - 技术指标数据访问层
+
+technical_indicators 保存每只股票每个交易日的指标；
+technical_indicators_latest 是它的快照，每只股票一行（最新两个交易日），
+供选股器整表读取，避免每次请求对历史表做窗口查询。
+
+更新时机:
+- 指标脚本写完一只股票后调用 refresh_snapshot([ticker])，走 (ticker, trade_date)
+  唯一索引取最近两行，与历史长度无关
+- 快照为空而历史表有数据时（首次升级或旧库），由指标脚本或应用启动时
+  needs_bootstrap() 判断后全量 rebuild()；读路径只读快照，不写库
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import delete, exists, func, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from src.models import TechnicalIndicator, TechnicalIndicatorSnapshot
+from src.models.technical_indicator import INDICATOR_COLUMNS
+from src.repositories.base_repository import BaseRepository
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+_indicators = TechnicalIndicator.__table__
+_snapshot = TechnicalIndicatorSnapshot.__table__
+
+_SNAPSHOT_COLUMNS = ("trade_date", "prev_trade_date") + INDICATOR_COLUMNS + tuple(
+    f"prev_{column}" for column in INDICATOR_COLUMNS
+)
+
+# 每只股票最近两行（全量重建用）
+_LATEST_TWO_SQL = text(f"""
+    SELECT ticker, trade_date, {", ".join(INDICATOR_COLUMNS)}
+    FROM (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY trade_date DESC) AS rn
+        FROM technical_indicators
+    )
+    WHERE rn <= 2
+    ORDER BY ticker, trade_date DESC
+""")
+
+# 每次 executemany 的行数
+_UPSERT_CHUNK_ROWS = 500
+
+
+class TechnicalIndicatorRepository(BaseRepository[TechnicalIndicator]):
+    """技术指标及其快照的读写"""
+
+    def __init__(self, session: Session):
+        super().__init__(session, TechnicalIndicator)
+
+    def find_latest(self, ticker: str, limit: int = 2) -> List[Dict[str, Any]]:
+        """
+        查询单只股票最近的指标行（按交易日倒序）
+
+        Args:
+            ticker: 股票代码
+            limit: 行数
+
+        Returns:
+            指标行字典列表
+        """
+        stmt = (
+            select(_indicators)
+            .where(_indicators.c.ticker == ticker)
+            .order_by(_indicators.c.trade_date.desc())
+            .limit(limit)
+        )
+        return [dict(row) for row in self.session.execute(stmt).mappings()]
+
+    def refresh_snapshot(self, tickers: Iterable[str]) -> int:
+        """
+        按股票增量刷新快照
+
+        Args:
+            tickers: 指标有变动的股票
+
+        Returns:
+            写入的快照行数
+        """
+        self.session.flush()
+        rows: List[Dict[str, Any]] = []
+        missing: List[str] = []
+        for ticker in dict.fromkeys(tickers):
+            latest = self.find_latest(ticker)
+            if latest:
+                rows.append(self._snapshot_row(ticker, latest))
+            else:
+                missing.append(ticker)
+
+        if missing:
+            self.session.execute(delete(_snapshot).where(_snapshot.c.ticker.in_(missing)))
+        self._upsert(rows)
+        return len(rows)
+
+    def compute_snapshot(self) -> List[Dict[str, Any]]:
+        """
+        从 technical_indicators 直接计算快照行（单次窗口查询，不写库）
+
+        Returns:
+            快照行字典列表（按股票代码排序）
+        """
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for row in self.session.execute(_LATEST_TWO_SQL).mappings():
+            grouped.setdefault(row["ticker"], []).append(dict(row))
+        return [self._snapshot_row(ticker, rows) for ticker, rows in grouped.items()]
+
+    def rebuild(self) -> int:
+        """
+        从 technical_indicators 全量重建快照
+
+        Returns:
+            快照行数
+        """
+        rows = self.compute_snapshot()
+        self.session.execute(delete(_snapshot))
+        self._upsert(rows)
+        logger.info(f"技术指标快照重建完成: {len(rows)} 只股票")
+        return len(rows)
+
+    def needs_bootstrap(self) -> bool:
+        """
+        快照为空且历史表有数据（需要一次全量 rebuild）
+
+        Returns:
+            是否需要重建
+        """
+        has_snapshot = self.session.execute(select(exists().select_from(_snapshot))).scalar()
+        if has_snapshot:
+            return False
+        return bool(self.session.execute(select(exists().select_from(_indicators))).scalar())
+
+    def find_snapshot(self) -> List[Dict[str, Any]]:
+        """
+        读取整张快照表
+
+        Returns:
+            快照行字典列表
+        """
+        stmt = select(_snapshot).order_by(_snapshot.c.ticker)
+        return [dict(row) for row in self.session.execute(stmt).mappings()]
+
+    def count_snapshot(self) -> int:
+        """快照行数"""
+        return self.session.execute(select(func.count()).select_from(_snapshot)).scalar() or 0
+
+    @staticmethod
+    def _snapshot_row(ticker: str, latest: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        current = latest[0]
+        previous: Optional[Dict[str, Any]] = latest[1] if len(latest) > 1 else None
+        row: Dict[str, Any] = {
+            "ticker": ticker,
+            "trade_date": current["trade_date"],
+            "prev_trade_date": previous["trade_date"] if previous else None,
+        }
+        for column in INDICATOR_COLUMNS:
+            row[column] = current[column]
+            row[f"prev_{column}"] = previous[column] if previous else None
+        return row
+
+    def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        stmt = sqlite_insert(_snapshot)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[_snapshot.c.ticker],
+            set_={column: stmt.excluded[column] for column in _SNAPSHOT_COLUMNS + ("updated_at",)},
+        )
+        for start in range(0, len(rows), _UPSERT_CHUNK_ROWS):
+            self.session.execute(stmt, rows[start:start + _UPSERT_CHUNK_ROWS])
@@ -407,3 +407,62 @@ def ticker_to_tushare(ticker: str) -> str:
 def ticker_to_sina(ticker: str) -> str:
     """快速转换ticker为Sina格式"""
     return NormalizedTicker(raw=ticker).to_sina()
+
+
+def normalize_trade_times(values, is_daily: bool):
+    """
+    向量化标准化一列K线时间，语义与 NormalizedDate / NormalizedDateTime 一致
+
+    用于列式批量写入，避免逐条构造 Pydantic 模型。
+
+    Args:
+        values: 日期时间序列 (datetime64 / Unix 秒 / YYYYMMDD / YYYYMMDDHHMM / ISO 字符串)
+        is_daily: True 输出 YYYY-MM-DD，False 输出 YYYY-MM-DD HH:MM:SS
+
+    Returns:
+        numpy object 数组；无法解析的值为 None（与逐条校验一样拒绝，由调用方丢弃）
+    """
+    import pandas as pd
+    from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+
+    series = pd.Series(values).reset_index(drop=True)
+    fmt = "%Y-%m-%d" if is_daily else "%Y-%m-%d %H:%M:%S"
+
+    if is_datetime64_any_dtype(series):
+        parsed = series
+        if parsed.dt.tz is not None:
+            # 日线取其本地日期部分；分钟线统一转换为上海时间
+            if not is_daily:
+                parsed = parsed.dt.tz_convert(TZ_SHANGHAI)
+            parsed = parsed.dt.tz_localize(None)
+    elif is_numeric_dtype(series):
+        # Unix timestamp (秒)，按上海时间解释
+        parsed = (
+            pd.to_datetime(series, unit="s", utc=True)
+            .dt.tz_convert(TZ_SHANGHAI)
+            .dt.tz_localize(None)
+        )
+    else:
+        text = series.astype(str).str.strip()
+        parsed = pd.Series(pd.NaT, index=text.index, dtype="datetime64[ns]")
+
+        compact_day = text.str.fullmatch(r"\d{8}")
+        compact_min = text.str.fullmatch(r"\d{12}")
+        iso = ~(compact_day | compact_min)
+
+        if compact_day.any():
+            parsed[compact_day] = pd.to_datetime(
+                text[compact_day], format="%Y%m%d", errors="coerce"
+            )
+        if compact_min.any():
+            parsed[compact_min] = pd.to_datetime(
+                text[compact_min], format="%Y%m%d%H%M", errors="coerce"
+            )
+        if iso.any():
+            parsed[iso] = pd.to_datetime(
+                text[iso].str.slice(0, 19), format="ISO8601", errors="coerce"
+            )
+
+    result = parsed.dt.strftime(fmt).to_numpy(dtype=object)
+    result[parsed.isna().to_numpy()] = None
+    return result
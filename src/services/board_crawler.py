@@ -0,0 +1,263 @@
+"""Concurrent board constituent crawler used by BoardService.
+
+Fetches THS board constituents with a pool of worker threads. Throughput is
+governed by the shared provider token bucket (``TushareClient`` draws from the
+``tushare`` bucket on every call) instead of a fixed sleep between boards.
+
+- Resumable: boards that finished are recorded in a JSON checkpoint under
+  ``data/``; an interrupted run (or one that ran out of call budget) picks up
+  where it stopped. The checkpoint is cleared when a run completes.
+- Incremental: results are diffed against the previous snapshot and only
+  boards whose constituents changed are handed to ``on_changed``.
+
+Database writes stay on the calling thread; workers only fetch.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from src.services.rate_limiter import TokenBucket
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# A checkpoint older than this is ignored and the run starts over
+CHECKPOINT_MAX_AGE = timedelta(hours=24)
+
+# Rewrite the checkpoint file every N finished boards
+CHECKPOINT_FLUSH_EVERY = 10
+
+
+@dataclass
+class CrawlStats:
+    """Outcome of one crawl run."""
+
+    total: int = 0
+    fetched: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    skipped: int = 0  # already done in the resumed checkpoint
+    remaining: int = 0  # not attempted because the call budget ran out
+    calls: int = 0
+    elapsed: float = 0.0
+    failures: List[str] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return self.remaining == 0 and self.failed == 0
+
+
+class CrawlCheckpoint:
+    """Board codes finished in the current run, persisted as JSON."""
+
+    def __init__(self, path: Path, key: str):
+        self.path = path
+        self.key = key
+        self.started_at = datetime.now(timezone.utc)
+        self.done: Set[str] = set()
+
+    def load(self) -> None:
+        """Resume from the file if it holds a recent run for this key."""
+        runs = self._read()
+        run = runs.get(self.key)
+        if not run:
+            return
+        try:
+            started_at = datetime.fromisoformat(run["started_at"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if datetime.now(timezone.utc) - started_at > CHECKPOINT_MAX_AGE:
+            logger.info(f"Ignoring stale {self.key} crawl checkpoint from {run['started_at']}")
+            return
+        self.started_at = started_at
+        self.done = set(run.get("done", []))
+        logger.info(f"Resuming {self.key} crawl: {len(self.done)} boards already done")
+
+    def save(self) -> None:
+        runs = self._read()
+        runs[self.key] = {
+            "started_at": self.started_at.isoformat(),
+            "done": sorted(self.done),
+        }
+        self._write(runs)
+
+    def clear(self) -> None:
+        runs = self._read()
+        if runs.pop(self.key, None) is None:
+            return
+        if runs:
+            self._write(runs)
+        else:
+            self.path.unlink(missing_ok=True)
+
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, runs: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(runs, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+class BoardCrawler:
+    """Fetch constituents for many boards under a shared rate budget.
+
+    Args:
+        fetch: ``board_code -> tickers``; called from worker threads.
+        workers: Number of concurrent fetches.
+        max_calls: Total calls allowed for this run (0 = unlimited). Boards
+            not reached stay in the checkpoint for the next run.
+        max_retries: Attempts per board before it is counted as failed.
+        retry_backoff: Base of the exponential backoff between attempts.
+        checkpoint: Where finished boards are recorded (None = not resumable).
+        rate_limiter: Extra cap on top of the provider bucket ``fetch`` already
+            draws from (None = provider limit only).
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], List[str]],
+        workers: int = 4,
+        max_calls: int = 0,
+        max_retries: int = 3,
+        retry_backoff: float = 5.0,
+        checkpoint: Optional[CrawlCheckpoint] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+    ):
+        self.fetch = fetch
+        self.rate_limiter = rate_limiter
+        self.workers = max(1, workers)
+        self.max_calls = max_calls
+        self.max_retries = max(1, max_retries)
+        self.retry_backoff = retry_backoff
+        self.checkpoint = checkpoint
+
+        self._calls = 0
+        self._calls_lock = threading.Lock()
+
+    def crawl(
+        self,
+        boards: Iterable[Tuple[str, str]],
+        previous: Dict[str, Sequence[str]],
+        on_changed: Callable[[str, str, List[str]], None],
+    ) -> CrawlStats:
+        """Crawl ``(board_name, board_code)`` pairs.
+
+        Args:
+            boards: Boards to fetch.
+            previous: Last stored constituents by board name.
+            on_changed: ``(board_name, board_code, constituents)`` for every
+                board whose constituents differ from ``previous``; runs on
+                the calling thread, in completion order.
+
+        Returns:
+            CrawlStats for the run.
+        """
+        started = time.monotonic()
+        boards = list(boards)
+        stats = CrawlStats(total=len(boards))
+
+        if self.checkpoint is not None:
+            self.checkpoint.load()
+            done = self.checkpoint.done
+        else:
+            done = set()
+
+        pending = [(name, code) for name, code in boards if code not in done]
+        stats.skipped = len(boards) - len(pending)
+        finished_since_flush = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="board-crawl") as pool:
+            queue = iter(pending)
+            running: Dict[Future, Tuple[str, str]] = {}
+
+            def submit_next() -> bool:
+                if self._budget_spent():
+                    return False
+                board = next(queue, None)
+                if board is None:
+                    return False
+                running[pool.submit(self._fetch_with_retry, board[1])] = board
+                return True
+
+            for _ in range(self.workers):
+                if not submit_next():
+                    break
+
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, code = running.pop(future)
+                    try:
+                        constituents = future.result()
+                    except Exception as e:
+                        stats.failed += 1
+                        stats.failures.append(name)
+                        logger.error(f"Failed to crawl board '{name}' ({code}): {e}")
+                    else:
+                        stats.fetched += 1
+                        if set(constituents) != set(previous.get(name) or ()):
+                            on_changed(name, code, constituents)
+                            stats.changed += 1
+                        else:
+                            stats.unchanged += 1
+                        if self.checkpoint is not None:
+                            self.checkpoint.done.add(code)
+                            finished_since_flush += 1
+                    submit_next()
+
+                if self.checkpoint is not None and finished_since_flush >= CHECKPOINT_FLUSH_EVERY:
+                    self.checkpoint.save()
+                    finished_since_flush = 0
+
+            stats.remaining = sum(1 for _ in queue)
+
+        stats.calls = self._calls
+        stats.elapsed = time.monotonic() - started
+
+        if self.checkpoint is not None:
+            if stats.complete:
+                self.checkpoint.clear()
+            else:
+                self.checkpoint.save()
+
+        logger.info(
+            f"Board crawl: {stats.fetched}/{len(pending)} fetched, {stats.changed} changed, "
+            f"{stats.failed} failed, {stats.remaining} left for next run "
+            f"({stats.calls} calls, {stats.elapsed:.1f}s)"
+        )
+        return stats
+
+    def _budget_spent(self) -> bool:
+        return self.max_calls > 0 and self._calls >= self.max_calls
+
+    def _fetch_with_retry(self, board_code: str) -> List[str]:
+        for attempt in range(self.max_retries):
+            with self._calls_lock:
+                self._calls += 1
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                return self.fetch(board_code)
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    raise
+                wait_time = self.retry_backoff * (2 ** attempt)
+                logger.warning(
+                    f"Retry {attempt + 1}/{self.max_retries} for {board_code} after {wait_time:.0f}s: {e}"
+                )
+                time.sleep(wait_time)
+        return []
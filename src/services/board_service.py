@@ -11,21 +11,24 @@ Replaces:
 from __future__ import annotations
 
 import csv
-import random
-import time
-from collections import defaultdict
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import pandas as pd
-from sqlalchemy import delete, select
+from sqlalchemy import delete, select, update
 from sqlalchemy.orm import Session
 
 from src.config import Settings, get_settings
 from src.models import BoardMapping, SymbolMetadata
 from src.repositories.board_mapping_repository import BoardMappingRepository
+from src.repositories.board_membership_repository import (
+    BoardMembershipRepository,
+    get_membership_index,
+)
 from src.repositories.symbol_repository import SymbolRepository
+from src.services.board_crawler import BoardCrawler, CrawlCheckpoint
+from src.services.rate_limiter import TokenBucket
 from src.services.tushare_client import TushareClient
 from src.utils.logging import LOGGER, get_logger
 from src.utils.ticker_utils import TickerNormalizer
@@ -37,7 +40,8 @@ class BoardService:
     """Unified board service for industry and concept board management.
 
     Capabilities:
-    1. Build industry/concept board → stock mappings (with retry & checkpoint resume)
+    1. Build industry/concept board → stock mappings (concurrent, rate-budgeted,
+       checkpoint resume, only changed boards written)
     2. Sync concept boards from THS via Tushare
     3. Query stock → concepts, board → constituents
     4. Verify board composition changes
@@ -54,9 +58,7 @@ class BoardService:
         self.symbol_repo = symbol_repo
         self.settings = settings or get_settings()
 
-        # Rate limiting for THS API
-        self.rate_limit_delay = 10
-        self.random_jitter = 5
+        # Per-board attempts in the constituent crawler
         self.max_retries = 3
 
         self.client = TushareClient(
@@ -91,7 +93,8 @@ class BoardService:
                          Include 'concept' for full concept sync (slow).
 
         Returns:
-            Stats dict, e.g. {'industry': 90, 'concept': 0}
+            Boards written per type (unchanged boards are skipped),
+            e.g. {'industry': 3, 'concept': 0}
         """
         if board_types is None:
             board_types = ["industry"]
@@ -128,6 +131,7 @@ class BoardService:
         # Delete old concept boards
         stmt = delete(BoardMapping).where(BoardMapping.board_type == "concept")
         result = self.board_repo.session.execute(stmt)
+        BoardMembershipRepository(self.board_repo.session).delete_by_type("concept")
         logger.info(f"Deleted {result.rowcount} old concept board records")
 
         synced_count = 0
@@ -175,15 +179,7 @@ class BoardService:
     def get_stock_concepts(self, ticker: str) -> List[str]:
         """Get concept boards that a stock belongs to."""
         ticker = TickerNormalizer.normalize(ticker)
-
-        # Try symbol_metadata first (fast path)
-        symbol = self.symbol_repo.find_by_ticker(ticker)
-        if symbol and symbol.concepts:
-            return symbol.concepts
-
-        # Fallback: scan board mappings
-        boards = self.board_repo.find_by_type("concept")
-        return [b.board_name for b in boards if ticker in b.constituents]
+        return get_membership_index(self.board_repo.session).boards_of(ticker, "concept")
 
     def get_industry_boards(self) -> List[Dict[str, Any]]:
         """Get all industry boards with metadata."""
@@ -197,11 +193,11 @@ class BoardService:
         self, board_name: str, board_type: str = "industry"
     ) -> List[str]:
         """Get stock tickers in a board."""
-        board = self.board_repo.find_by_name_and_type(board_name, board_type)
-        if not board:
+        index = get_membership_index(self.board_repo.session)
+        if not index.has_board(board_name, board_type):
             logger.warning(f"Board not found: name={board_name}, type={board_type}")
             return []
-        return board.constituents or []
+        return index.constituents(board_name, board_type)
 
     def verify_changes(self, board_name: str, board_type: str) -> Dict[str, Any]:
         """Check if a board's constituents have changed vs. database."""
@@ -256,7 +252,7 @@ class BoardService:
     # ── Internal: Build helpers ──────────────────────────────────────
 
     def _build_industry_mappings(self) -> int:
-        """Build all industry board mappings with retry and checkpoint resume."""
+        """Build all industry board mappings (resumable, only changed boards are written)."""
         LOGGER.info("Building industry board mappings...")
 
         boards_df = self._get_industry_boards()
@@ -264,104 +260,67 @@ class BoardService:
             LOGGER.error("Failed to fetch industry boards from Tushare")
             return 0
 
-        total_boards = len(boards_df)
-        LOGGER.info(f"Found {total_boards} industry boards")
-
-        completed_boards = self.board_repo.find_by_type("industry")
-        completed_board_names = {
-            b.board_name for b in completed_boards if b.constituents
-        }
-        LOGGER.info(f"{len(completed_board_names)} already completed, will skip")
-
-        count = 0
-        for idx, row in enumerate(boards_df.itertuples(index=False), start=1):
-            board_name = row.industry
-            board_code = row.ts_code
-
-            if board_name in completed_board_names:
-                LOGGER.info(f"[{idx}/{total_boards}] Skipping '{board_name}' (completed)")
-                continue
-
-            constituents = self._fetch_with_retry(board_code, board_name)
-
-            if constituents is not None:
-                mapping = BoardMapping(
-                    board_name=board_name,
-                    board_type="industry",
-                    board_code=board_code,
-                    constituents=constituents,
-                )
-                self.board_repo.upsert(mapping)
-                count += 1
-                LOGGER.info(
-                    f"[{idx}/{total_boards}] ✓ Saved '{board_name}': {len(constituents)} stocks"
-                )
-            else:
-                LOGGER.warning(f"[{idx}/{total_boards}] ✗ Skipped '{board_name}'")
-
-            # Rate limiting with jitter
-            delay = self.rate_limit_delay + random.randint(
-                -self.random_jitter, self.random_jitter
-            )
-            delay = max(30, delay)
-            if idx < total_boards:
-                time.sleep(delay)
-
-        return count
+        LOGGER.info(f"Found {len(boards_df)} industry boards")
+        boards = list(zip(boards_df["industry"], boards_df["ts_code"]))
+        return self._crawl_boards("industry", boards)
 
     def _build_concept_mappings(self) -> int:
-        """Build all concept board mappings (slow: 400+ boards)."""
-        LOGGER.warning("Building concept board mappings... This may take 1-2 hours!")
+        """Build all concept board mappings (400+ boards, bounded by the THS quota)."""
+        LOGGER.info("Building concept board mappings...")
 
         boards_df = self._get_concept_boards()
         if boards_df.empty:
             LOGGER.error("Failed to fetch concept boards from Tushare")
             return 0
 
-        count = 0
-        for row in boards_df.itertuples(index=False):
-            board_name = row.name
-            board_code = row.ts_code
+        LOGGER.info(f"Found {len(boards_df)} concept boards")
+        boards = list(zip(boards_df["name"], boards_df["ts_code"]))
+        return self._crawl_boards("concept", boards)
 
-            try:
-                constituents = self._fetch_board_constituents(board_code)
-                mapping = BoardMapping(
+    def _crawl_boards(self, board_type: str, boards: List[tuple]) -> int:
+        """Fetch constituents concurrently and upsert the boards that changed.
+
+        Returns:
+            Number of boards written.
+        """
+        previous = {
+            b.board_name: b.constituents or []
+            for b in self.board_repo.find_by_type(board_type)
+        }
+
+        def save(board_name: str, board_code: str, constituents: List[str]) -> None:
+            self.board_repo.upsert(
+                BoardMapping(
                     board_name=board_name,
-                    board_type="concept",
+                    board_type=board_type,
                     board_code=board_code,
                     constituents=constituents,
+                    last_updated=datetime.now(timezone.utc),
                 )
-                self.board_repo.upsert(mapping)
-                count += 1
-                LOGGER.info(
-                    f"[{count}/{len(boards_df)}] Saved concept '{board_name}': {len(constituents)} stocks"
-                )
-                time.sleep(self.rate_limit_delay)
-
-            except Exception as e:
-                LOGGER.warning(f"Failed to process concept '{board_name}': {e}")
-                continue
-
-        return count
-
-    def _fetch_with_retry(self, board_code: str, board_name: str) -> Optional[List[str]]:
-        """Fetch board constituents with exponential backoff retry."""
-        for retry in range(self.max_retries):
-            try:
-                return self._fetch_board_constituents(board_code)
-            except Exception as e:
-                wait_time = (2 ** retry) * 30
-                if retry < self.max_retries - 1:
-                    LOGGER.warning(
-                        f"Retry {retry + 1}/{self.max_retries} for '{board_name}' "
-                        f"after {wait_time}s: {e}"
-                    )
-                    time.sleep(wait_time)
-                else:
-                    LOGGER.error(
-                        f"Failed '{board_name}' after {self.max_retries} retries: {e}"
-                    )
-        return None
+            )
+            # Commit per board so progress survives an interrupted run
+            self.board_repo.session.commit()
+            LOGGER.info(f"✓ Saved {board_type} '{board_name}': {len(constituents)} stocks")
+
+        # Tushare calls already draw from the shared tushare bucket; an extra
+        # cap only applies when BOARD_CRAWL_CALLS_PER_MINUTE is set
+        calls_per_minute = self.settings.board_crawl_calls_per_minute
+        crawler = BoardCrawler(
+            fetch=self._fetch_board_constituents,
+            workers=self.settings.board_crawl_workers,
+            max_calls=self.settings.board_crawl_max_calls,
+            max_retries=self.max_retries,
+            checkpoint=CrawlCheckpoint(
+                self.settings.data_dir / "board_crawl_checkpoint.json", board_type
+            ),
+            rate_limiter=TokenBucket("board-crawl", calls_per_minute, burst=self.settings.board_crawl_workers)
+            if calls_per_minute > 0
+            else None,
+        )
+        stats = crawler.crawl(boards, previous, save)
+        if stats.failures:
+            LOGGER.warning(f"Failed {board_type} boards: {', '.join(stats.failures)}")
+        return stats.changed
 
     def _fetch_board_constituents(self, board_code: str) -> List[str]:
         """Fetch board constituents from THS via Tushare."""
@@ -380,34 +339,28 @@ class BoardService:
         """Rebuild reverse index: stock → concepts + super_category."""
         LOGGER.info("Updating symbol concepts from board mappings...")
 
-        ticker_to_concepts: Dict[str, List[str]] = defaultdict(list)
-        concept_mappings = self.board_repo.find_by_type("concept")
-
-        for mapping in concept_mappings:
-            for ticker in mapping.constituents:
-                ticker_to_concepts[ticker].append(mapping.board_name)
-
-        # Update symbols with concepts
-        for ticker, concepts in ticker_to_concepts.items():
-            symbol = self.symbol_repo.find_by_ticker(ticker)
-            if symbol:
-                symbol.concepts = concepts
-                if symbol.industry_lv1:
-                    symbol.super_category = self._super_category_map.get(
-                        symbol.industry_lv1
-                    )
-
-        # Ensure super_category for all remaining symbols
-        all_tickers = self.symbol_repo.get_all_tickers()
-        for ticker in all_tickers:
-            if ticker not in ticker_to_concepts:
-                symbol = self.symbol_repo.find_by_ticker(ticker)
-                if symbol and symbol.industry_lv1:
-                    symbol.super_category = self._super_category_map.get(
-                        symbol.industry_lv1
-                    )
-
-        self.symbol_repo.session.commit()
+        session = self.symbol_repo.session
+        ticker_to_concepts = BoardMembershipRepository(session).find_boards_by_tickers("concept")
+
+        # One pass over symbol_metadata, then a single executemany UPDATE
+        rows = session.execute(select(SymbolMetadata.ticker, SymbolMetadata.industry_lv1))
+        params = []
+        for ticker, industry_lv1 in rows:
+            values: Dict[str, Any] = {"ticker": ticker}
+            if ticker in ticker_to_concepts:
+                values["concepts"] = ticker_to_concepts[ticker]
+            if industry_lv1:
+                values["super_category"] = self._super_category_map.get(industry_lv1)
+            if len(values) > 1:
+                params.append(values)
+
+        # executemany needs a uniform parameter set per statement
+        for keys in ({"concepts", "super_category"}, {"concepts"}, {"super_category"}):
+            batch = [p for p in params if set(p) - {"ticker"} == keys]
+            if batch:
+                session.execute(update(SymbolMetadata), batch)
+
+        session.commit()
         LOGGER.info(f"Updated concepts for {len(ticker_to_concepts)} stocks")
 
     # ── Internal: Cache & helpers ────────────────────────────────────
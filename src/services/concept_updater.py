@@ -9,12 +9,13 @@ import re
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-import httpx
 import pandas as pd
 
 from src.models import KlineTimeframe, SymbolType
 from src.schemas.normalized import NormalizedDate, NormalizedDateTime
+from src.services.http_clients import get_http_clients
 from src.services.kline_service import KlineService
+from src.services.rate_limiter import get_rate_limiter
 from src.utils.logging import get_logger
 
 if TYPE_CHECKING:
@@ -88,49 +89,49 @@ class ConceptUpdater:
         url = f"{THS_BASE_URL}/line/bk_{code}/{period}/last.js"
 
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(url, headers=THS_HEADERS, timeout=10.0)
-                resp.raise_for_status()
-
-                # 解析 JSONP 响应
-                text = resp.text
-                match = re.search(r"\((\{.*\})\)", text, re.DOTALL)
-                if not match:
-                    return "", []
-
-                data = json.loads(match.group(1))
-                name = data.get("name", "")
-                data_str = data.get("data", "")
-
-                if not data_str:
-                    return name, []
-
-                klines = []
-                for item in data_str.split(";"):
-                    parts = item.split(",")
-                    if len(parts) >= 7 and parts[1]:
-                        try:
-                            raw_time = parts[0]
-                            # 日线格式: YYYYMMDD, 30分钟格式: YYYYMMDDHHMM
-                            if period == "01":
-                                trade_time = NormalizedDate(value=raw_time).to_iso()
-                            else:
-                                trade_time = NormalizedDateTime(value=raw_time).to_iso()
-
-                            klines.append({
-                                "datetime": trade_time,
-                                "open": float(parts[1]),
-                                "high": float(parts[2]),
-                                "low": float(parts[3]),
-                                "close": float(parts[4]),
-                                "volume": int(parts[5]),
-                                "amount": float(parts[6]),
-                            })
-                        except (ValueError, IndexError) as e:
-                            logger.debug(f"解析K线数据失败: {e}")
-                            continue
-
-                return name, klines
+            await get_rate_limiter("ths").acquire_async()
+            resp = await get_http_clients().get(url, headers=THS_HEADERS, timeout=10.0)
+            resp.raise_for_status()
+
+            # 解析 JSONP 响应
+            text = resp.text
+            match = re.search(r"\((\{.*\})\)", text, re.DOTALL)
+            if not match:
+                return "", []
+
+            data = json.loads(match.group(1))
+            name = data.get("name", "")
+            data_str = data.get("data", "")
+
+            if not data_str:
+                return name, []
+
+            klines = []
+            for item in data_str.split(";"):
+                parts = item.split(",")
+                if len(parts) >= 7 and parts[1]:
+                    try:
+                        raw_time = parts[0]
+                        # 日线格式: YYYYMMDD, 30分钟格式: YYYYMMDDHHMM
+                        if period == "01":
+                            trade_time = NormalizedDate(value=raw_time).to_iso()
+                        else:
+                            trade_time = NormalizedDateTime(value=raw_time).to_iso()
+
+                        klines.append({
+                            "datetime": trade_time,
+                            "open": float(parts[1]),
+                            "high": float(parts[2]),
+                            "low": float(parts[3]),
+                            "close": float(parts[4]),
+                            "volume": int(parts[5]),
+                            "amount": float(parts[6]),
+                        })
+                    except (ValueError, IndexError) as e:
+                        logger.debug(f"解析K线数据失败: {e}")
+                        continue
+
+            return name, klines
 
         except Exception as e:
             logger.error(f"获取概念 {code} K线失败: {e}")
@@ -186,9 +187,6 @@ class ConceptUpdater:
                     logger.error(f"  {name}: 保存失败 - {e}")
                     failed_count += 1
 
-            # 批次间延迟
-            await asyncio.sleep(0.5)
-
             # 进度日志（每5批输出一次）
             if (batch_idx + 1) % 5 == 0:
                 logger.info(f"  进度: {batch_idx + 1}/{total_batches} 批")
@@ -245,8 +243,6 @@ class ConceptUpdater:
                     logger.error(f"  {name}: 保存失败 - {e}")
                     failed_count += 1
 
-            await asyncio.sleep(0.5)
-
             if (batch_idx + 1) % 5 == 0:
                 logger.info(f"  进度: {batch_idx + 1}/{total_batches} 批")
 
@@ -3,11 +3,15 @@
 整合 CoinGecko 和 Binance 公共API，提供加密货币价格、K线、市场概览等数据
 """
 import asyncio
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import httpx
 from urllib.parse import urlencode
 
+from src.services.crypto_ws import MiniKline, get_crypto_ws_manager
+from src.services.http_clients import get_http_clients
+from src.services.rate_limiter import get_rate_limiter
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -73,27 +77,26 @@ class CryptoService:
             crypto_ids = ','.join(self.MAJOR_CRYPTOS.keys())
             url = f"https://api.coingecko.com/api/v3/simple/price?ids={crypto_ids}&vs_currencies=usd&include_24hr_change=true&include_24hr_vol=true&include_market_cap=true"
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                
-                result = []
-                for crypto_id, symbol in self.MAJOR_CRYPTOS.items():
-                    if crypto_id in data:
-                        crypto_data = data[crypto_id]
-                        result.append({
-                            'symbol': symbol,
-                            'name': crypto_id.replace('-', ' ').title(),
-                            'price': crypto_data.get('usd', 0),
-                            'change_24h': crypto_data.get('usd_24h_change', 0),
-                            'volume_24h': crypto_data.get('usd_24h_vol', 0),
-                            'market_cap': crypto_data.get('usd_market_cap', 0),
-                            'last_update': datetime.now().isoformat()
-                        })
-                
-                return result
-                
+            response = await get_http_clients().get(url, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            
+            result = []
+            for crypto_id, symbol in self.MAJOR_CRYPTOS.items():
+                if crypto_id in data:
+                    crypto_data = data[crypto_id]
+                    result.append({
+                        'symbol': symbol,
+                        'name': crypto_id.replace('-', ' ').title(),
+                        'price': crypto_data.get('usd', 0),
+                        'change_24h': crypto_data.get('usd_24h_change', 0),
+                        'volume_24h': crypto_data.get('usd_24h_vol', 0),
+                        'market_cap': crypto_data.get('usd_market_cap', 0),
+                        'last_update': datetime.now().isoformat()
+                    })
+            
+            return result
+            
         except Exception as e:
             logger.error(f"获取加密货币价格失败: {e}")
             return []
@@ -113,31 +116,30 @@ class CryptoService:
                 
             url = f"https://api.coingecko.com/api/v3/coins/{crypto_id}?localization=false&tickers=false&market_data=true&community_data=false&developer_data=false"
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                
-                market_data = data.get('market_data', {})
-                
-                return {
-                    'symbol': symbol.upper(),
-                    'name': data.get('name', ''),
-                    'price': market_data.get('current_price', {}).get('usd', 0),
-                    'change_24h': market_data.get('price_change_percentage_24h', 0),
-                    'change_7d': market_data.get('price_change_percentage_7d', 0), 
-                    'volume_24h': market_data.get('total_volume', {}).get('usd', 0),
-                    'market_cap': market_data.get('market_cap', {}).get('usd', 0),
-                    'market_cap_rank': data.get('market_cap_rank', 0),
-                    'circulating_supply': market_data.get('circulating_supply', 0),
-                    'total_supply': market_data.get('total_supply', 0),
-                    'ath': market_data.get('ath', {}).get('usd', 0),
-                    'ath_change_percentage': market_data.get('ath_change_percentage', {}).get('usd', 0),
-                    'atl': market_data.get('atl', {}).get('usd', 0),
-                    'atl_change_percentage': market_data.get('atl_change_percentage', {}).get('usd', 0),
-                    'last_update': datetime.now().isoformat()
-                }
-                
+            response = await get_http_clients().get(url, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            
+            market_data = data.get('market_data', {})
+            
+            return {
+                'symbol': symbol.upper(),
+                'name': data.get('name', ''),
+                'price': market_data.get('current_price', {}).get('usd', 0),
+                'change_24h': market_data.get('price_change_percentage_24h', 0),
+                'change_7d': market_data.get('price_change_percentage_7d', 0), 
+                'volume_24h': market_data.get('total_volume', {}).get('usd', 0),
+                'market_cap': market_data.get('market_cap', {}).get('usd', 0),
+                'market_cap_rank': data.get('market_cap_rank', 0),
+                'circulating_supply': market_data.get('circulating_supply', 0),
+                'total_supply': market_data.get('total_supply', 0),
+                'ath': market_data.get('ath', {}).get('usd', 0),
+                'ath_change_percentage': market_data.get('ath_change_percentage', {}).get('usd', 0),
+                'atl': market_data.get('atl', {}).get('usd', 0),
+                'atl_change_percentage': market_data.get('atl_change_percentage', {}).get('usd', 0),
+                'last_update': datetime.now().isoformat()
+            }
+            
         except Exception as e:
             logger.error(f"获取 {symbol} 报价失败: {e}")
             return None
@@ -157,6 +159,13 @@ class CryptoService:
                 
             binance_interval = self.INTERVAL_MAPPING[interval]
             
+            # 实时流已缓冲足够K线时直接从内存返回
+            manager = get_crypto_ws_manager()
+            bars = manager.get_bars(binance_symbol, binance_interval, limit=limit, include_live=True)
+            if manager.is_connected and len(bars) >= limit and not bars[-1].is_closed:
+                return [self._format_kline(bar.open_time, bar.open, bar.high, bar.low, bar.close, bar.volume)
+                        for bar in bars]
+            
             url = f"https://api.binance.com/api/v3/klines"
             params = {
                 'symbol': binance_symbol,
@@ -164,32 +173,47 @@ class CryptoService:
                 'limit': min(limit, 1000)  # Binance 限制
             }
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                result = []
-                for kline in data:
-                    timestamp = int(kline[0])
-                    dt = datetime.fromtimestamp(timestamp / 1000)
-                    
-                    result.append({
-                        'time': dt.isoformat(),
-                        'timestamp': timestamp,
-                        'open': float(kline[1]),
-                        'high': float(kline[2]),
-                        'low': float(kline[3]),
-                        'close': float(kline[4]),
-                        'volume': float(kline[5])
-                    })
-                
-                return result
-                
+            await get_rate_limiter("binance-rest").acquire_async()
+            response = await get_http_clients().get(url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            
+            result = [
+                self._format_kline(int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]))
+                for k in data
+            ]
+            
+            # 回填实时流的K线缓冲（仅已收盘K线）
+            now_ms = int(time.time() * 1000)
+            manager.seed_bars(binance_symbol, binance_interval, (
+                MiniKline(
+                    symbol=binance_symbol, interval=binance_interval,
+                    open_time=int(k[0]), close_time=int(k[6]),
+                    open=float(k[1]), high=float(k[2]), low=float(k[3]), close=float(k[4]),
+                    volume=float(k[5]), is_closed=int(k[6]) < now_ms,
+                )
+                for k in data
+                if len(k) > 6
+            ))
+            
+            return result
+            
         except Exception as e:
             logger.error(f"获取 {symbol} K线数据失败: {e}")
             return []
 
+    @staticmethod
+    def _format_kline(timestamp: int, open_: float, high: float, low: float, close: float, volume: float) -> Dict[str, Any]:
+        return {
+            'time': datetime.fromtimestamp(timestamp / 1000).isoformat(),
+            'timestamp': timestamp,
+            'open': open_,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': volume
+        }
+
     async def get_funding_rates(self) -> List[Dict[str, Any]]:
         """获取永续合约资金费率 (Binance API)"""
         try:
@@ -199,31 +223,33 @@ class CryptoService:
             url = "https://fapi.binance.com/fapi/v1/fundingRate"
             
             tasks = []
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                for binance_symbol in major_symbols:
-                    params = {'symbol': binance_symbol, 'limit': 1}
-                    tasks.append(self._get_funding_rate(client, binance_symbol, params))
-                
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                funding_rates = []
-                for i, result in enumerate(results):
-                    if isinstance(result, Exception):
-                        logger.warning(f"获取 {major_symbols[i]} 资金费率失败: {result}")
-                        continue
-                    if result:
-                        funding_rates.extend(result)
-                
-                return funding_rates
-                
+            for binance_symbol in major_symbols:
+                params = {'symbol': binance_symbol, 'limit': 1}
+                tasks.append(self._get_funding_rate(binance_symbol, params))
+            
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            
+            funding_rates = []
+            for i, result in enumerate(results):
+                if isinstance(result, Exception):
+                    logger.warning(f"获取 {major_symbols[i]} 资金费率失败: {result}")
+                    continue
+                if result:
+                    funding_rates.extend(result)
+            
+            return funding_rates
+            
         except Exception as e:
             logger.error(f"获取资金费率失败: {e}")
             return []
 
-    async def _get_funding_rate(self, client: httpx.AsyncClient, symbol: str, params: Dict) -> List[Dict[str, Any]]:
+    async def _get_funding_rate(self, symbol: str, params: Dict) -> List[Dict[str, Any]]:
         """获取单个币种资金费率"""
         try:
-            response = await client.get("https://fapi.binance.com/fapi/v1/fundingRate", params=params)
+            await get_rate_limiter("binance-rest").acquire_async()
+            response = await get_http_clients().get(
+                "https://fapi.binance.com/fapi/v1/fundingRate", params=params, timeout=self.timeout
+            )
             response.raise_for_status()
             data = response.json()
             
@@ -252,24 +278,23 @@ class CryptoService:
         try:
             url = "https://api.coingecko.com/api/v3/global"
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                
-                global_data = data.get('data', {})
-                
-                return {
-                    'total_market_cap_usd': global_data.get('total_market_cap', {}).get('usd', 0),
-                    'total_volume_24h_usd': global_data.get('total_volume', {}).get('usd', 0),
-                    'bitcoin_dominance': global_data.get('market_cap_percentage', {}).get('btc', 0),
-                    'ethereum_dominance': global_data.get('market_cap_percentage', {}).get('eth', 0),
-                    'active_cryptocurrencies': global_data.get('active_cryptocurrencies', 0),
-                    'markets': global_data.get('markets', 0),
-                    'market_cap_change_24h': global_data.get('market_cap_change_percentage_24h_usd', 0),
-                    'last_update': datetime.now().isoformat()
-                }
-                
+            response = await get_http_clients().get(url, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            
+            global_data = data.get('data', {})
+            
+            return {
+                'total_market_cap_usd': global_data.get('total_market_cap', {}).get('usd', 0),
+                'total_volume_24h_usd': global_data.get('total_volume', {}).get('usd', 0),
+                'bitcoin_dominance': global_data.get('market_cap_percentage', {}).get('btc', 0),
+                'ethereum_dominance': global_data.get('market_cap_percentage', {}).get('eth', 0),
+                'active_cryptocurrencies': global_data.get('active_cryptocurrencies', 0),
+                'markets': global_data.get('markets', 0),
+                'market_cap_change_24h': global_data.get('market_cap_change_percentage_24h_usd', 0),
+                'last_update': datetime.now().isoformat()
+            }
+            
         except Exception as e:
             logger.error(f"获取市场概览失败: {e}")
             return {}
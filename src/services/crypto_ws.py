@@ -2,12 +2,18 @@
 Crypto WebSocket 实时数据流
 连接 Binance WebSocket API，维护实时价格缓存
 支持自动重连、心跳、多流订阅
+
+- 每个 symbol+interval 保留最近 BAR_HISTORY_SIZE 根已收盘K线（环形缓冲，
+  始终连续；断流造成缺口时从缺口后重新累积，可用 REST 结果 seed_bars 回填）
+- 推送：一个上游连接扇出给多个订阅者（StreamSubscriber），每个订阅者
+  每个 key 只保留最新一帧，慢客户端的旧帧直接被新帧替换
 """
 import asyncio
 import json
 import time
+from collections import deque
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any, Set, Callable
+from typing import Deque, Dict, Iterable, List, Optional, Any, Set, Callable
 from dataclasses import dataclass, field
 
 import websockets
@@ -36,6 +42,20 @@ RECONNECT_BACKOFF = 2.0
 PING_INTERVAL = 30  # seconds
 STALE_THRESHOLD = 120  # seconds - mark data stale if no update in 2min
 
+# Closed bars kept per symbol+interval
+BAR_HISTORY_SIZE = 500
+
+# Push subscribers per manager
+MAX_STREAM_SUBSCRIBERS = 200
+
+
+def to_pair(symbol: str) -> str:
+    """'btc' / 'BTCUSDT' -> 'BTCUSDT'"""
+    pair = symbol.upper()
+    if not pair.endswith("USDT"):
+        pair = f"{pair}USDT"
+    return pair
+
 
 @dataclass
 class TickerSnapshot:
@@ -114,6 +134,51 @@ class MiniKline:
         }
 
 
+class StreamSubscriber:
+    """
+    One push client of the manager.
+
+    Holds at most one pending frame per key ("ticker:BTCUSDT",
+    "kline:BTCUSDT_1m", "bar:BTCUSDT_1m"): a newer frame replaces one the
+    client has not taken yet, so a slow client skips stale frames instead of
+    queueing them. Frames are pre-encoded JSON shared by all subscribers.
+    Must be used from the event loop that runs the manager.
+    """
+
+    def __init__(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        intervals: Optional[Iterable[str]] = None,
+    ):
+        self.symbols: Optional[Set[str]] = {to_pair(s) for s in symbols} if symbols else None
+        self.intervals: Optional[Set[str]] = set(intervals) if intervals else None
+        self._pending: Dict[str, str] = {}
+        self._ready = asyncio.Event()
+        self.delivered = 0
+        self.dropped = 0
+
+    def wants(self, pair: str, interval: Optional[str] = None) -> bool:
+        if self.symbols is not None and pair not in self.symbols:
+            return False
+        return interval is None or self.intervals is None or interval in self.intervals
+
+    def offer(self, key: str, frame: str) -> None:
+        """Queue a frame, replacing the pending one for the same key"""
+        if key in self._pending:
+            self.dropped += 1
+        self._pending[key] = frame
+        self._ready.set()
+
+    async def get(self) -> List[str]:
+        """Wait for and take all pending frames (oldest key first)"""
+        await self._ready.wait()
+        self._ready.clear()
+        frames = list(self._pending.values())
+        self._pending.clear()
+        self.delivered += len(frames)
+        return frames
+
+
 class CryptoWebSocketManager:
     """
     Manages Binance WebSocket connections for real-time crypto data.
@@ -122,7 +187,8 @@ class CryptoWebSocketManager:
     - Combined stream subscription (multiple symbols in one connection)
     - Auto-reconnect with exponential backoff
     - In-memory ticker cache
-    - Optional kline streaming
+    - Optional kline streaming, closed bar history per symbol+interval
+    - Push fan-out to subscribers
     - Health monitoring
     """
 
@@ -132,15 +198,19 @@ class CryptoWebSocketManager:
         kline_intervals: Optional[List[str]] = None,
         on_ticker: Optional[Callable] = None,
         on_kline: Optional[Callable] = None,
+        bar_history_size: int = BAR_HISTORY_SIZE,
     ):
         self.symbols = symbols or DEFAULT_SYMBOLS
         self.kline_intervals = kline_intervals or []  # e.g., ["1m", "5m"]
         self.on_ticker = on_ticker  # callback(TickerSnapshot)
         self.on_kline = on_kline  # callback(MiniKline)
+        self.bar_history_size = bar_history_size
 
         # State
         self._tickers: Dict[str, TickerSnapshot] = {}
         self._latest_klines: Dict[str, MiniKline] = {}  # key: "BTCUSDT_1m"
+        self._bars: Dict[str, Deque[MiniKline]] = {}  # key: "BTCUSDT_1m", oldest first
+        self._subscribers: Set[StreamSubscriber] = set()
         self._ws = None
         self._running = False
         self._reconnect_delay = INITIAL_RECONNECT_DELAY
@@ -162,10 +232,7 @@ class CryptoWebSocketManager:
 
     def get_ticker(self, symbol: str) -> Optional[TickerSnapshot]:
         """Get latest ticker for a symbol (e.g., 'BTCUSDT' or 'BTC')"""
-        pair = symbol.upper()
-        if not pair.endswith("USDT"):
-            pair = f"{pair}USDT"
-        return self._tickers.get(pair)
+        return self._tickers.get(to_pair(symbol))
 
     def get_all_tickers(self) -> Dict[str, TickerSnapshot]:
         """Get all cached tickers"""
@@ -182,11 +249,113 @@ class CryptoWebSocketManager:
 
     def get_kline(self, symbol: str, interval: str) -> Optional[MiniKline]:
         """Get latest kline for symbol+interval"""
-        pair = symbol.upper()
-        if not pair.endswith("USDT"):
-            pair = f"{pair}USDT"
-        key = f"{pair}_{interval}"
-        return self._latest_klines.get(key)
+        return self._latest_klines.get(f"{to_pair(symbol)}_{interval}")
+
+    def get_bars(
+        self,
+        symbol: str,
+        interval: str,
+        limit: Optional[int] = None,
+        include_live: bool = False,
+    ) -> List[MiniKline]:
+        """
+        Recent bars for symbol+interval, oldest first.
+
+        Args:
+            symbol: 'BTC' or 'BTCUSDT'
+            interval: Kline interval (must be streamed)
+            limit: Max bars returned (None = whole buffer)
+            include_live: Append the current unclosed bar (when it follows the
+                last buffered one), like Binance REST
+        """
+        key = f"{to_pair(symbol)}_{interval}"
+        bars = list(self._bars.get(key, ()))
+        if include_live:
+            live = self._latest_klines.get(key)
+            if live is not None and not live.is_closed and (not bars or live.open_time == bars[-1].close_time + 1):
+                bars.append(live)
+        if limit is not None:
+            bars = bars[-limit:] if limit > 0 else []
+        return bars
+
+    def seed_bars(self, symbol: str, interval: str, bars: Iterable[MiniKline]) -> int:
+        """
+        Merge closed bars fetched over REST into the buffer.
+
+        Only streamed intervals are buffered; the merged buffer keeps its
+        newest contiguous run.
+
+        Returns:
+            Bars now buffered for the key
+        """
+        if interval not in self.kline_intervals:
+            return 0
+        key = f"{to_pair(symbol)}_{interval}"
+        merged = {bar.open_time: bar for bar in bars if bar.is_closed}
+        merged.update((bar.open_time, bar) for bar in self._bars.get(key, ()))
+        ordered = _contiguous_tail(sorted(merged.values(), key=lambda b: b.open_time))
+        self._bars[key] = deque(ordered, maxlen=self.bar_history_size)
+        return len(self._bars[key])
+
+    # ── Push subscribers ──
+
+    def subscribe(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        intervals: Optional[Iterable[str]] = None,
+    ) -> StreamSubscriber:
+        """
+        Register a push subscriber (None = all symbols / intervals).
+
+        Raises:
+            RuntimeError: Subscriber limit reached
+        """
+        if len(self._subscribers) >= MAX_STREAM_SUBSCRIBERS:
+            raise RuntimeError(f"Too many stream subscribers ({MAX_STREAM_SUBSCRIBERS})")
+        subscriber = StreamSubscriber(symbols, intervals)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: StreamSubscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def snapshot_frame(self, subscriber: StreamSubscriber) -> str:
+        """Current tickers and live klines a subscriber wants, as one frame"""
+        tickers = [t for t in self._tickers.values() if subscriber.wants(t.symbol)]
+        tickers.sort(key=lambda t: t.quote_volume_24h, reverse=True)
+        klines = [k for k in self._latest_klines.values() if subscriber.wants(k.symbol, k.interval)]
+        return json.dumps({
+            "type": "snapshot",
+            "tickers": [t.to_dict() for t in tickers],
+            "klines": [k.to_dict() for k in klines],
+        })
+
+    def _publish(self, kind: str, key: str, pair: str, interval: Optional[str], data: Dict[str, Any]):
+        if not self._subscribers:
+            return
+        targets = [s for s in self._subscribers if s.wants(pair, interval)]
+        if not targets:
+            return
+        frame = json.dumps({"type": kind, "data": data})
+        for subscriber in targets:
+            subscriber.offer(f"{kind}:{key}", frame)
+
+    def _append_bar(self, kline: MiniKline) -> None:
+        key = f"{kline.symbol}_{kline.interval}"
+        ring = self._bars.get(key)
+        if ring is None:
+            ring = self._bars[key] = deque(maxlen=self.bar_history_size)
+        if ring:
+            last = ring[-1]
+            if kline.open_time == last.open_time:
+                ring[-1] = kline
+                return
+            if kline.open_time < last.open_time:
+                return
+            if kline.open_time != last.close_time + 1:
+                # Missed bars while disconnected: keep the buffer contiguous
+                ring.clear()
+        ring.append(kline)
 
     def get_status(self) -> Dict[str, Any]:
         """Health/status info"""
@@ -207,6 +376,9 @@ class CryptoWebSocketManager:
                 else None
             ),
             "reconnect_delay": self._reconnect_delay,
+            "bar_buffers": len(self._bars),
+            "subscribers": len(self._subscribers),
+            "frames_dropped": sum(s.dropped for s in self._subscribers),
         }
 
     # ── Lifecycle ──
@@ -351,6 +523,7 @@ class CryptoWebSocketManager:
             )
 
             self._tickers[symbol] = snapshot
+            self._publish("ticker", symbol, symbol, None, snapshot.to_dict())
 
             # Callback
             if self.on_ticker:
@@ -387,6 +560,9 @@ class CryptoWebSocketManager:
 
             key = f"{symbol}_{interval}"
             self._latest_klines[key] = kline
+            if kline.is_closed:
+                self._append_bar(kline)
+            self._publish("bar" if kline.is_closed else "kline", key, symbol, interval, kline.to_dict())
 
             # Callback
             if self.on_kline and kline.is_closed:
@@ -399,6 +575,14 @@ class CryptoWebSocketManager:
             logger.warning(f"Invalid kline data: {e}")
 
 
+def _contiguous_tail(bars: List[MiniKline]) -> List[MiniKline]:
+    """Newest run of bars where each opens right after the previous closes"""
+    start = len(bars) - 1
+    while start > 0 and bars[start].open_time == bars[start - 1].close_time + 1:
+        start -= 1
+    return bars[max(start, 0):]
+
+
 # ── Singleton ──
 
 _ws_manager: Optional[CryptoWebSocketManager] = None
@@ -6,21 +6,21 @@ Orchestrates data collection from multiple sources and applies labeling algorith
 """
 
 import asyncio
-import json
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
 from src.models.kline import Kline
-from src.models.board import IndustryDaily, ConceptDaily, BoardMapping
+from src.models.board import IndustryDaily, ConceptDaily
 from src.models.symbol import SymbolMetadata
+from src.repositories.board_membership_repository import get_membership_index
 from src.repositories.kline_repository import KlineRepository
 from src.repositories.industry_daily_repository import IndustryDailyRepository
 from src.repositories.concept_daily_repository import ConceptDailyRepository
+from src.repositories.market_stats_repository import MarketStatsRepository
 from src.repositories.symbol_repository import SymbolRepository
 from src.utils.kline_analyzer import KlinePatternAnalyzer
 from src.utils.market_sentiment_analyzer import MarketSentimentAnalyzer
@@ -68,6 +68,7 @@ class DailyReviewDataService:
         self.industry_repo = IndustryDailyRepository(session)
         self.concept_repo = ConceptDailyRepository(session)
         self.symbol_repo = SymbolRepository(session)
+        self.stats_repo = MarketStatsRepository(session)
         self.pattern_analyzer = KlinePatternAnalyzer()
         self.sentiment_analyzer = MarketSentimentAnalyzer()
         self._fundamental_analyzer = None
@@ -346,78 +347,32 @@ class DailyReviewDataService:
         # Convert YYYYMMDD to YYYY-MM-DD format
         formatted_date = f"{trade_date[:4]}-{trade_date[4:6]}-{trade_date[6:8]}"
 
-        # Query all stock K-lines for the date
-        all_stocks = self.session.query(Kline).filter(
-            Kline.trade_time == formatted_date,
-            Kline.symbol_type == 'stock',
-            Kline.timeframe == 'DAY'
-        ).all()
-
-        if not all_stocks:
+        # Breadth and turnover come from market_daily_stats (computed read-only when stale)
+        stats = self.stats_repo.find_by_date(formatted_date)
+        if stats is None or not stats.stock_count:
             raise ValueError(f"No stock data found for {trade_date}")
 
-        # Get previous day for comparison
-        prev_date = (datetime.strptime(trade_date, "%Y%m%d") - timedelta(days=1)).strftime("%Y-%m-%d")
-        prev_stocks = {k.symbol_code: k.close for k in self.session.query(Kline).filter(
-            Kline.trade_time == prev_date,
-            Kline.symbol_type == 'stock',
-            Kline.timeframe == 'DAY'
-        ).all()}
-
-        # Count advance/decline
-        up_count = 0
-        down_count = 0
-        flat_count = 0
-        limit_up_count = 0
-        limit_down_count = 0
-        total_amount = 0
-
-        for stock in all_stocks:
-            prev_close = prev_stocks.get(stock.symbol_code, stock.open)
-            change_pct = ((stock.close - prev_close) / prev_close * 100
-                         if prev_close > 0 else 0)
-
-            if change_pct > 0.01:
-                up_count += 1
-            elif change_pct < -0.01:
-                down_count += 1
-            else:
-                flat_count += 1
-
-            # Check for limit boards (approximately ±10% for A-shares, ±20% for ST)
-            if change_pct >= 9.9:
-                limit_up_count += 1
-            elif change_pct <= -9.9:
-                limit_down_count += 1
-
-            total_amount += stock.amount
+        up_count = stats.up_count
+        down_count = stats.down_count
+        flat_count = stats.flat_count
+        limit_up_count = stats.limit_up_count
+        limit_down_count = stats.limit_down_count
+        total_amount = stats.total_amount
 
         # Calculate ratios
         up_down_ratio = up_count / down_count if down_count > 0 else 5.0
 
-        # Get yesterday's total amount for comparison
-        yesterday = (datetime.strptime(trade_date, "%Y%m%d") - timedelta(days=1)).strftime("%Y-%m-%d")
-        yesterday_stocks = self.session.query(func.sum(Kline.amount)).filter(
-            Kline.trade_time == yesterday,
-            Kline.symbol_type == 'stock',
-            Kline.timeframe == 'DAY'
-        ).scalar() or total_amount
-
-        vs_yesterday = total_amount / yesterday_stocks if yesterday_stocks > 0 else 1.0
-
-        # Get 5-day average
-        recent_amounts = []
-        for i in range(1, 8):  # Last 7 days
-            check_date = (datetime.strptime(trade_date, "%Y%m%d") - timedelta(days=i)).strftime("%Y-%m-%d")
-            day_amount = self.session.query(func.sum(Kline.amount)).filter(
-                Kline.trade_time == check_date,
-                Kline.symbol_type == 'stock',
-                Kline.timeframe == 'DAY'
-            ).scalar()
-            if day_amount:
-                recent_amounts.append(day_amount)
-
-        avg_5d = sum(recent_amounts[:5]) / len(recent_amounts[:5]) if recent_amounts else total_amount
+        # Compare with the previous trading days' total amount
+        recent_amounts = [
+            row.total_amount
+            for row in self.stats_repo.find_recent(before=formatted_date, limit=5)
+            if row.total_amount
+        ]
+
+        yesterday_amount = recent_amounts[0] if recent_amounts else total_amount
+        vs_yesterday = total_amount / yesterday_amount if yesterday_amount > 0 else 1.0
+
+        avg_5d = sum(recent_amounts) / len(recent_amounts) if recent_amounts else total_amount
         vs_5d_avg = total_amount / avg_5d if avg_5d > 0 else 1.0
 
         # Calculate overall sentiment
@@ -561,7 +516,7 @@ class DailyReviewDataService:
 
     async def _get_board_constituents(self, board_code: str) -> List[str]:
         """
-        Get constituent tickers from board mapping.
+        Get constituent tickers from the board membership index.
 
         Args:
             board_code: Board/sector code
@@ -569,22 +524,7 @@ class DailyReviewDataService:
         Returns:
             List of constituent tickers
         """
-        board = self.session.query(BoardMapping).filter(
-            BoardMapping.board_code == board_code
-        ).first()
-
-        if board and board.constituents:
-            # constituents is a JSON array of tickers
-            if isinstance(board.constituents, list):
-                return board.constituents
-            # If it's stored as string, parse it
-            try:
-                return json.loads(board.constituents)
-            except (json.JSONDecodeError, TypeError) as e:
-                logger.warning(f"Failed to parse board constituents: {e}")
-                return []
-
-        return []
+        return get_membership_index(self.session).constituents_by_code(board_code)
 
     async def _get_constituent_stats(self, board_code: str, trade_date: str) -> Tuple[int, int, int]:
         """
@@ -2,7 +2,7 @@
 Decision Loop V1 — daily repeatable trading decision protocol.
 
 Three components:
-  1. InputAssembler  — gathers data from existing API endpoints
+  1. InputAssembler  — gathers data from the services behind the API, concurrently
   2. AnalysisEngine  — Claude API call with structured prompt
   3. DecisionLoopService — orchestrates the full cycle
 """
@@ -34,26 +34,86 @@ _TZ_SHANGHAI = timezone(timedelta(hours=8))
 _TIMEOUT = 15.0  # seconds per API call
 
 
+# Per-input timeouts (seconds); an input that runs over is reported missing
+INPUT_TIMEOUTS: Dict[str, float] = {
+    "ashare_indexes": 10.0,
+    "us_market": 20.0,
+    "commodities": 20.0,
+    "crypto": 15.0,
+    "intel_signals": 10.0,
+    "perception_context": 60.0,  # may trigger the first perception scan
+}
+
+_ASHARE_INDEXES = [
+    ("000001.SH", "上证指数"),
+    ("399001.SZ", "深证成指"),
+    ("000300.SH", "沪深300"),
+    ("399006.SZ", "创业板指"),
+]
+
+_US_SYMBOLS = [
+    ("^GSPC", "S&P 500"),
+    ("^IXIC", "Nasdaq"),
+    ("^NDX", "Nasdaq 100"),
+    ("^VIX", "VIX"),
+    ("^TNX", "10Y Treasury"),
+    ("DX-Y.NYB", "DXY"),
+]
+
+
 class InputAssembler:
-    """Gathers data from existing quant-data-pipeline endpoints."""
+    """Gathers the V1 input package, fetching the six inputs concurrently.
+
+    By default inputs are read in-process from the same services and
+    endpoint implementations that back the API, without an HTTP round trip
+    into our own app. Pass ``base_url`` to fetch over HTTP instead (e.g. when
+    running outside the API process).
 
-    def __init__(self, base_url: str = "http://127.0.0.1:8000", api_key: str = ""):
-        self.base_url = base_url.rstrip("/")
+    Each input has its own timeout (``INPUT_TIMEOUTS``). An input that
+    fails or times out is listed in ``missing_fields`` and the others are
+    kept, so a run takes as long as its slowest input.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: str = "",
+        timeouts: Optional[Dict[str, float]] = None,
+    ):
+        self.base_url = base_url.rstrip("/") if base_url else None
         self.api_key = api_key or os.getenv("API_KEY", "")
         self._headers = {"X-API-Key": self.api_key} if self.api_key else {}
+        self.timeouts = {**INPUT_TIMEOUTS, **(timeouts or {})}
+        self._client: Optional[httpx.AsyncClient] = None
+        self.last_timings: Dict[str, float] = {}
 
     async def assemble(self) -> InputPackage:
-        """Assemble the full V1 input package from existing API endpoints."""
+        """Assemble the full V1 input package."""
         t0 = time.monotonic()
         missing: List[str] = []
 
-        async with httpx.AsyncClient(timeout=_TIMEOUT, headers=self._headers) as client:
-            ashare = await self._fetch_ashare_indexes(client, missing)
-            us = await self._fetch_us_market(client, missing)
-            commodities = await self._fetch_commodities(client, missing)
-            crypto = await self._fetch_crypto(client, missing)
-            intel = await self._fetch_intel_signals(client, missing)
-            perception = await self._fetch_perception_context(client, missing)
+        if self.base_url:
+            async with httpx.AsyncClient(timeout=_TIMEOUT, headers=self._headers) as client:
+                self._client = client
+                try:
+                    raw = await self._gather_inputs()
+                finally:
+                    self._client = None
+        else:
+            raw = await self._gather_inputs()
+
+        ashare = self._build_ashare_indexes(raw["ashare_indexes"], missing)
+        us = self._build_us_market(raw["us_market"], missing)
+        commodities = self._build_commodities(raw["commodities"], missing)
+        crypto = self._build_crypto(raw["crypto"], missing)
+        intel = self._build_context(raw["intel_signals"], "intel_signals", missing)
+        perception = self._build_context(raw["perception_context"], "perception_context", missing)
+
+        logger.info(
+            "Inputs assembled in %.0fms (%s)",
+            (time.monotonic() - t0) * 1000,
+            ", ".join(f"{name}={ms:.0f}ms" for name, ms in self.last_timings.items()),
+        )
 
         now = datetime.now(_TZ_SHANGHAI)
         # Only flag low confidence when core quantitative data is missing
@@ -74,21 +134,110 @@ class InputAssembler:
             is_low_confidence=len(core_missing) > 0,
         )
 
-    # ── Data fetchers ──
+    async def _gather_inputs(self) -> Dict[str, Any]:
+        """Run every input loader concurrently, each under its own timeout."""
+        loaders = {
+            "ashare_indexes": self._load_ashare_indexes,
+            "us_market": self._load_us_market,
+            "commodities": self._load_commodities,
+            "crypto": self._load_crypto,
+            "intel_signals": self._load_intel_signals,
+            "perception_context": self._load_perception_context,
+        }
+        self.last_timings = {}
+        results = await asyncio.gather(*(self._timed(name, loader) for name, loader in loaders.items()))
+        return dict(zip(loaders, results))
+
+    async def _timed(self, name: str, loader) -> Any:
+        """Run one loader; None on timeout or error (partial result)."""
+        started = time.monotonic()
+        try:
+            return await asyncio.wait_for(loader(), self.timeouts.get(name))
+        except asyncio.TimeoutError:
+            logger.warning("Input %s timed out after %.0fs", name, self.timeouts.get(name))
+            return None
+        except Exception as exc:
+            logger.warning("Input %s failed: %s", name, exc)
+            return None
+        finally:
+            self.last_timings[name] = (time.monotonic() - started) * 1000
+
+    # ── Loaders: raw data shaped like the API responses ──
+
+    async def _load_ashare_indexes(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Realtime quotes per index code (/api/index/realtime)."""
+        if self.base_url:
+            fetches = [self._get(f"/api/index/realtime/{code}") for code, _ in _ASHARE_INDEXES]
+        else:
+            from src.api.routes_index import get_index_realtime
+
+            fetches = [_quiet(get_index_realtime(code)) for code, _ in _ASHARE_INDEXES]
+        quotes = await asyncio.gather(*fetches)
+        return {code: quote for (code, _), quote in zip(_ASHARE_INDEXES, quotes)}
+
+    async def _load_us_market(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """US quotes per symbol (/api/us-stock/quote), one batch in-process."""
+        symbols = [sym for sym, _ in _US_SYMBOLS]
+        if self.base_url:
+            quotes = await asyncio.gather(*(self._get(f"/api/us-stock/quote/{sym}") for sym in symbols))
+            return dict(zip(symbols, quotes))
+
+        from src.services.us_stock import get_us_stock_service
+
+        return await asyncio.to_thread(get_us_stock_service().get_quotes, symbols)
+
+    async def _load_commodities(self) -> Optional[Dict[str, Any]]:
+        """Commodity quotes (/api/commodities/realtime)."""
+        if self.base_url:
+            return await self._get("/api/commodities/realtime")
 
-    async def _fetch_ashare_indexes(
-        self, client: httpx.AsyncClient, missing: List[str]
+        from src.api.routes_commodities import fetch_commodities_realtime
+
+        # Blocking yfinance calls; run the sync fetch off our loop
+        response = await asyncio.to_thread(fetch_commodities_realtime)
+        return response.model_dump()
+
+    async def _load_crypto(self) -> Optional[Dict[str, Any]]:
+        """Crypto prices (/api/crypto/prices)."""
+        if self.base_url:
+            return await self._get("/api/crypto/prices")
+
+        from src.services.crypto_service import get_crypto_service
+
+        return {"prices": await get_crypto_service().get_prices()}
+
+    async def _load_intel_signals(self) -> Optional[Dict[str, Any]]:
+        """Qualitative intel (/api/intel/signals, proxied from park-intel)."""
+        if self.base_url:
+            return await self._get("/api/intel/signals", params={"hours": 24})
+
+        from src.api.routes_intel import intel_signals
+
+        response = await intel_signals(hours=24, compare_hours=24, min_relevance=1, source=None)
+        if response.status_code != 200:
+            logger.warning("Intel signals returned %d", response.status_code)
+            return None
+        return json.loads(response.body)
+
+    async def _load_perception_context(self) -> Optional[Dict[str, Any]]:
+        """Perception market context (/api/perception/market-context)."""
+        if self.base_url:
+            return await self._get("/api/perception/market-context")
+
+        from src.api.routes_perception import get_market_context
+
+        return await get_market_context()
+
+    # ── Builders ──
+
+    @staticmethod
+    def _build_ashare_indexes(
+        quotes: Optional[Dict[str, Optional[Dict[str, Any]]]], missing: List[str]
     ) -> List[MarketSnapshot]:
-        """Fetch A-share core indexes via /api/index/realtime."""
-        indexes = [
-            ("000001.SH", "上证指数"),
-            ("399001.SZ", "深证成指"),
-            ("000300.SH", "沪深300"),
-            ("399006.SZ", "创业板指"),
-        ]
+        quotes = quotes or {}
         results = []
-        for code, name in indexes:
-            data = await self._get(client, f"/api/index/realtime/{code}")
+        for code, name in _ASHARE_INDEXES:
+            data = quotes.get(code)
             if data:
                 results.append(MarketSnapshot(
                     symbol=code,
@@ -104,21 +253,14 @@ class InputAssembler:
                 missing.append(f"ashare_index:{code}")
         return results
 
-    async def _fetch_us_market(
-        self, client: httpx.AsyncClient, missing: List[str]
+    @staticmethod
+    def _build_us_market(
+        quotes: Optional[Dict[str, Optional[Dict[str, Any]]]], missing: List[str]
     ) -> List[MarketSnapshot]:
-        """Fetch US market quotes via /api/us-stock/quote."""
-        symbols = [
-            ("^GSPC", "S&P 500"),
-            ("^IXIC", "Nasdaq"),
-            ("^NDX", "Nasdaq 100"),
-            ("^VIX", "VIX"),
-            ("^TNX", "10Y Treasury"),
-            ("DX-Y.NYB", "DXY"),
-        ]
+        quotes = quotes or {}
         results = []
-        for sym, name in symbols:
-            data = await self._get(client, f"/api/us-stock/quote/{sym}")
+        for sym, name in _US_SYMBOLS:
+            data = quotes.get(sym)
             if data:
                 results.append(MarketSnapshot(
                     symbol=sym,
@@ -134,11 +276,8 @@ class InputAssembler:
                 missing.append(f"us_market:{sym}")
         return results
 
-    async def _fetch_commodities(
-        self, client: httpx.AsyncClient, missing: List[str]
-    ) -> List[MarketSnapshot]:
-        """Fetch commodities via /api/commodities/realtime."""
-        data = await self._get(client, "/api/commodities/realtime")
+    @staticmethod
+    def _build_commodities(data: Optional[Dict[str, Any]], missing: List[str]) -> List[MarketSnapshot]:
         if not data or "commodities" not in data:
             missing.append("commodities")
             return []
@@ -152,12 +291,9 @@ class InputAssembler:
             for c in data["commodities"]
         ]
 
-    async def _fetch_crypto(
-        self, client: httpx.AsyncClient, missing: List[str]
-    ) -> List[MarketSnapshot]:
-        """Fetch crypto prices via /api/crypto/prices."""
-        data = await self._get(client, "/api/crypto/prices")
-        if not data or "prices" not in data:
+    @staticmethod
+    def _build_crypto(data: Optional[Dict[str, Any]], missing: List[str]) -> List[MarketSnapshot]:
+        if not data or not data.get("prices"):
             missing.append("crypto")
             return []
         return [
@@ -174,33 +310,18 @@ class InputAssembler:
             for c in data["prices"][:10]  # top 10
         ]
 
-    async def _fetch_intel_signals(
-        self, client: httpx.AsyncClient, missing: List[str]
-    ) -> Dict[str, Any]:
-        """Fetch qualitative intel via /api/intel/signals."""
-        data = await self._get(client, "/api/intel/signals", params={"hours": 24})
+    @staticmethod
+    def _build_context(data: Optional[Dict[str, Any]], field: str, missing: List[str]) -> Dict[str, Any]:
         if not data:
-            missing.append("intel_signals")
+            missing.append(field)
             return {}
         return data
 
-    async def _fetch_perception_context(
-        self, client: httpx.AsyncClient, missing: List[str]
-    ) -> Dict[str, Any]:
-        """Fetch perception market context via /api/perception/market-context."""
-        data = await self._get(client, "/api/perception/market-context")
-        if not data:
-            missing.append("perception_context")
-            return {}
-        return data
-
-    async def _get(
-        self, client: httpx.AsyncClient, path: str, params: Optional[Dict] = None
-    ) -> Optional[Dict[str, Any]]:
-        """GET helper with error handling."""
+    async def _get(self, path: str, params: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
+        """GET helper with error handling (HTTP mode)."""
         url = f"{self.base_url}{path}"
         try:
-            resp = await client.get(url, params=params)
+            resp = await self._client.get(url, params=params)
             if resp.status_code == 200:
                 return resp.json()
             logger.warning("GET %s returned %d", path, resp.status_code)
@@ -210,6 +331,15 @@ class InputAssembler:
             return None
 
 
+async def _quiet(awaitable) -> Optional[Dict[str, Any]]:
+    """Await an endpoint call; None if it raises (e.g. HTTPException)."""
+    try:
+        return await awaitable
+    except Exception as exc:
+        logger.warning("In-process fetch failed: %s", exc)
+        return None
+
+
 # ── Analysis Engine ──
 
 
@@ -390,7 +520,7 @@ class DecisionLoopService:
 
     def __init__(
         self,
-        base_url: str = "http://127.0.0.1:8000",
+        base_url: Optional[str] = None,
         api_key: str = "",
         model: str = "claude-sonnet-4-5-20250929",
     ):
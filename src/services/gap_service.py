@@ -0,0 +1,228 @@
+"""
+K线缺口检测服务
+
+基于 kline_coverage 覆盖位图计算缺失的交易日：
+交易日历转为同样以日序号为位的位图，每个标的的缺口即
+``交易日位图 & ~覆盖位图``（截掉上市/回补起始日之前的位），
+全部标的一次查询、纯位运算完成，不再逐标的查询 klines。
+
+覆盖表为空（旧库首次使用）或显式 refresh 时，先单次扫描 klines 重建。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from src.models import KlineTimeframe, SymbolType, TradeCalendar
+from src.repositories.kline_coverage_repository import (
+    KlineCoverageRepository,
+    bitmap_from_ordinals,
+    date_ordinal,
+    ordinal_date,
+)
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 历史回补起始日：早于该日的缺口不计
+BACKFILL_START_DATE = "2021-01-04"
+
+# 参与缺口检测的标的类型
+GAP_SYMBOL_TYPES = (SymbolType.STOCK, SymbolType.INDEX)
+
+
+def _bit_dates(mask: int, base: int) -> List[str]:
+    """位图中置位的日期（升序）"""
+    dates = []
+    while mask:
+        low = mask & -mask
+        dates.append(ordinal_date(base + low.bit_length() - 1))
+        mask ^= low
+    return dates
+
+
+class GapService:
+    """K线缺口检测服务"""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.coverage_repo = KlineCoverageRepository(session)
+
+    def gap_report(self, detail_limit: int = 50, refresh: bool = False) -> Dict[str, Any]:
+        """
+        全市场缺口报告（/api/health/gaps）
+
+        Args:
+            detail_limit: details 中返回缺口最多的前N个标的
+            refresh: 是否先从 klines 重建覆盖摘要
+
+        Returns:
+            total_gaps, by_type, details, calendar_coverage,
+            total_tracked_stocks, stocks_with_zero_gaps
+        """
+        self.ensure_coverage(refresh)
+
+        gap_details = []
+        by_type = {
+            t.name: {"symbols_with_gaps": 0, "total_missing_days": 0}
+            for t in GAP_SYMBOL_TYPES
+        }
+        total_tracked_stocks = 0
+        stocks_with_zero_gaps = 0
+        total_gaps = 0
+
+        for row, missing, base in self._iter_missing(GAP_SYMBOL_TYPES):
+            type_name = row.symbol_type.name
+            if row.symbol_type == SymbolType.STOCK:
+                total_tracked_stocks += 1
+
+            gap_count = missing.bit_count()
+            if gap_count:
+                gap_details.append((gap_count, row, missing, base))
+                by_type[type_name]["symbols_with_gaps"] += 1
+                by_type[type_name]["total_missing_days"] += gap_count
+                total_gaps += gap_count
+            elif row.symbol_type == SymbolType.STOCK:
+                stocks_with_zero_gaps += 1
+
+        # 按缺口数降序，只展开前N个的缺失日期
+        gap_details.sort(key=lambda item: item[0], reverse=True)
+        details = [
+            {
+                "symbol_code": row.symbol_code,
+                "symbol_name": row.symbol_name or row.symbol_code,
+                "symbol_type": row.symbol_type.name,
+                "gap_count": gap_count,
+                "missing_dates": _bit_dates(missing, base),
+            }
+            for gap_count, row, missing, base in gap_details[:detail_limit]
+        ]
+
+        return {
+            "total_gaps": total_gaps,
+            "by_type": by_type,
+            "details": details,
+            "calendar_coverage": self.calendar_coverage(),
+            "total_tracked_stocks": total_tracked_stocks,
+            "stocks_with_zero_gaps": stocks_with_zero_gaps,
+        }
+
+    def missing_dates(
+        self,
+        symbol_type: SymbolType,
+        symbol_codes: Optional[Iterable[str]] = None,
+        refresh: bool = False,
+    ) -> Dict[str, List[str]]:
+        """
+        查询缺失的交易日（供回补脚本使用）
+
+        Args:
+            symbol_type: 标的类型
+            symbol_codes: 只查这些标的；None 表示该类型全部已有数据的标的
+            refresh: 是否先从 klines 重建覆盖摘要
+
+        Returns:
+            {symbol_code: [缺失日期 YYYY-MM-DD, ...]}，只包含有缺口的标的
+        """
+        self.ensure_coverage(refresh)
+        return {
+            row.symbol_code: _bit_dates(missing, base)
+            for row, missing, base in self._iter_missing((symbol_type,), symbol_codes)
+            if missing
+        }
+
+    def ensure_coverage(self, refresh: bool = False) -> None:
+        """覆盖摘要缺失（或要求刷新）时从 klines 重建并提交"""
+        if refresh or self.coverage_repo.needs_bootstrap(GAP_SYMBOL_TYPES):
+            self.coverage_repo.rebuild(symbol_types=GAP_SYMBOL_TYPES)
+            self.session.commit()
+
+    def calendar_coverage(self) -> Dict[str, Any]:
+        """交易日历覆盖范围"""
+        cal_min, cal_max, trading_days = self.session.execute(
+            select(
+                func.min(TradeCalendar.date),
+                func.max(TradeCalendar.date),
+                func.count(),
+            ).where(TradeCalendar.is_trading_day == 1)
+        ).one()
+        return {
+            "min_date": cal_min or "unknown",
+            "max_date": cal_max or "unknown",
+            "trading_days": trading_days or 0,
+        }
+
+    def _iter_missing(
+        self,
+        symbol_types: Iterable[SymbolType],
+        symbol_codes: Optional[Iterable[str]] = None,
+    ) -> Iterable[Tuple[Any, int, int]]:
+        """
+        逐标的计算缺口位图
+
+        Yields:
+            (覆盖行, 缺口位图, 位图起始日序号)
+        """
+        base, trading_mask = self._trading_day_mask()
+        rows = self.coverage_repo.find_coverage(
+            symbol_types, KlineTimeframe.DAY, symbol_codes
+        )
+        if not trading_mask:
+            for row in rows:
+                yield row, 0, base
+            return
+
+        list_dates = self._listing_dates()
+        for row in rows:
+            # 上市日晚于回补起始日的股票，从上市日开始计
+            start = BACKFILL_START_DATE
+            if row.symbol_type == SymbolType.STOCK:
+                list_date = list_dates.get(row.symbol_code)
+                if list_date and list_date > BACKFILL_START_DATE:
+                    start = list_date
+            start_offset = max(date_ordinal(start) - base, 0)
+            expected = trading_mask >> start_offset << start_offset
+
+            have = int.from_bytes(row.bitmap, "little")
+            shift = date_ordinal(row.first_date) - base
+            have = have << shift if shift >= 0 else have >> -shift
+
+            yield row, expected & ~have, base
+
+    def _trading_day_mask(self) -> Tuple[int, int]:
+        """回补起始日之后的交易日位图 (起始日序号, 位图)"""
+        days = self.session.execute(
+            select(TradeCalendar.date).where(
+                TradeCalendar.is_trading_day == 1,
+                TradeCalendar.date >= BACKFILL_START_DATE,
+            )
+        ).scalars()
+        ordinals = [o for o in map(date_ordinal, days) if o is not None]
+        if not ordinals:
+            return date_ordinal(BACKFILL_START_DATE), 0
+        return bitmap_from_ordinals(ordinals)
+
+    def _listing_dates(self) -> Dict[str, str]:
+        """
+        股票上市日期 {纯代码: YYYY-MM-DD}
+
+        stock_basic 使用 ts_code 格式 (如 "000001.SZ")，取点号前的纯代码匹配 klines
+        """
+        stock_list_dates: Dict[str, str] = {}
+        try:
+            list_dates_result = self.session.execute(text(
+                "SELECT ts_code, list_date FROM stock_basic WHERE list_date IS NOT NULL"
+            )).fetchall()
+        except Exception as e:
+            # 没有 stock_basic 时所有股票都从回补起始日开始计
+            logger.warning(f"Failed to load stock listing dates: {e}")
+            return stock_list_dates
+
+        for ts_code, list_date in list_dates_result:
+            if not list_date:
+                continue
+            plain_symbol = ts_code.split('.')[0] if '.' in ts_code else ts_code
+            if len(list_date) == 8 and list_date.isdigit():
+                stock_list_dates[plain_symbol] = f"{list_date[:4]}-{list_date[4:6]}-{list_date[6:8]}"
+        return stock_list_dates
@@ -0,0 +1,252 @@
+"""
+共享异步 HTTP 客户端池
+所有出站抓取（新浪、同花顺、CoinGecko、Binance 等）复用同一组按主机划分的
+httpx.AsyncClient，保持长连接，避免每次请求重新建立 TCP+TLS 连接
+
+- 每个主机一个客户端：独立的连接池上限、keep-alive 数量、超时，
+  主机支持且安装了 h2 时启用 HTTP/2
+- 每个主机一个并发信号量：批量 asyncio.gather 扇出时最多同时占用 N 个连接，
+  其余请求排队
+- 统计：请求数、错误数、在途/峰值并发、排队等待与耗时，供 /api/health/http-clients 查看
+
+客户端和信号量绑定到创建它们的事件循环；脚本里 asyncio.run() 的新循环会
+自动得到自己的一组客户端，并在该循环结束时（shutdown_asyncgens）关闭，
+不会遗留未关闭的连接。
+"""
+import asyncio
+import importlib.util
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass(frozen=True)
+class HostProfile:
+    """单个主机的连接参数"""
+    max_concurrency: int = 10  # 同时在途的请求数
+    max_keepalive: int = 10  # 保持的空闲长连接数
+    timeout: float = 15.0  # 默认超时（秒），调用方传入 timeout 时以调用方为准
+    http2: bool = False  # 主机支持 HTTP/2（需安装 h2）
+
+
+DEFAULT_PROFILE = HostProfile()
+
+HOST_PROFILES: Dict[str, HostProfile] = {
+    # 新浪行情：限流严格，控制并发
+    "hq.sinajs.cn": HostProfile(max_concurrency=8, max_keepalive=8, timeout=10.0),
+    "quotes.sina.cn": HostProfile(max_concurrency=8, max_keepalive=8, timeout=15.0),
+    "money.finance.sina.com.cn": HostProfile(max_concurrency=8, max_keepalive=8, timeout=10.0),
+    # 同花顺板块行情
+    "d.10jqka.com.cn": HostProfile(max_concurrency=8, max_keepalive=8, timeout=10.0),
+    # 加密货币
+    "api.coingecko.com": HostProfile(max_concurrency=4, max_keepalive=4, timeout=10.0, http2=True),
+    "api.binance.com": HostProfile(max_concurrency=10, max_keepalive=10, timeout=10.0, http2=True),
+    "fapi.binance.com": HostProfile(max_concurrency=10, max_keepalive=10, timeout=10.0, http2=True),
+}
+
+
+@dataclass
+class HostStats:
+    """单个主机的请求统计"""
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    queued: int = 0
+    wait_seconds: float = 0.0
+    request_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "queued": self.queued,
+            "avg_wait_ms": round(self.wait_seconds / self.requests * 1000, 2) if self.requests else 0.0,
+            "avg_latency_ms": round(self.request_seconds / self.requests * 1000, 2) if self.requests else 0.0,
+        }
+
+
+@dataclass
+class _HostPool:
+    client: httpx.AsyncClient
+    semaphore: asyncio.Semaphore
+    profile: HostProfile
+    stats: HostStats = field(default_factory=HostStats)
+
+
+class HttpClientRegistry:
+    """按 (事件循环, 主机) 管理共享 httpx.AsyncClient"""
+
+    def __init__(
+        self,
+        profiles: Optional[Dict[str, HostProfile]] = None,
+        default_profile: HostProfile = DEFAULT_PROFILE,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Args:
+            profiles: 主机 → 连接参数，默认 HOST_PROFILES
+            default_profile: 未配置主机的连接参数
+            transport: 自定义传输层（测试用）
+        """
+        self.profiles = dict(HOST_PROFILES if profiles is None else profiles)
+        self.default_profile = default_profile
+        self._transport = transport
+        self._pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, _HostPool]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        # 每个事件循环一个守护 async generator，循环关闭时负责关闭该循环的客户端
+        self._guards: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def profile_for(self, host: str) -> HostProfile:
+        return self.profiles.get(host, self.default_profile)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """GET 请求，参数同 httpx.AsyncClient.get"""
+        return await self._send(url, "GET", kwargs)
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """任意方法请求，参数同 httpx.AsyncClient.request"""
+        return await self._send(url, method, kwargs)
+
+    async def aclose(self) -> None:
+        """关闭当前事件循环下的全部客户端"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pools = self._pools.pop(loop, {})
+        for pool in pools.values():
+            await pool.client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """按主机汇总各事件循环的统计"""
+        hosts: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            pools = [p for loop_pools in self._pools.values() for p in loop_pools.items()]
+        for host, pool in pools:
+            entry = pool.stats.to_dict()
+            if host in hosts:
+                merged = hosts[host]
+                for key in ("requests", "errors", "in_flight", "queued"):
+                    merged[key] += entry[key]
+                merged["peak_in_flight"] = max(merged["peak_in_flight"], entry["peak_in_flight"])
+                merged["clients"] += 1
+                continue
+            entry.update(
+                clients=1,
+                max_concurrency=pool.profile.max_concurrency,
+                max_keepalive=pool.profile.max_keepalive,
+                http2=pool.profile.http2 and HTTP2_AVAILABLE,
+            )
+            hosts[host] = entry
+        return {"http2_available": HTTP2_AVAILABLE, "hosts": hosts}
+
+    async def _send(self, url: str, method: str, kwargs: Dict[str, Any]) -> httpx.Response:
+        pool = self._pool(urlsplit(url).hostname or "")
+        await self._guard_loop()
+        stats = pool.stats
+
+        stats.queued += 1
+        wait_started = time.monotonic()
+        async with pool.semaphore:
+            stats.queued -= 1
+            stats.wait_seconds += time.monotonic() - wait_started
+            stats.requests += 1
+            stats.in_flight += 1
+            stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+            started = time.monotonic()
+            try:
+                if method == "GET":
+                    return await pool.client.get(url, **kwargs)
+                return await pool.client.request(method, url, **kwargs)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.in_flight -= 1
+                stats.request_seconds += time.monotonic() - started
+
+    async def _guard_loop(self) -> None:
+        """首次在某个事件循环上使用时，登记循环结束时的关闭钩子"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop in self._guards:
+                return
+            guard = self._guards[loop] = self._close_on_loop_shutdown()
+        # 首次迭代把 generator 登记到循环的 asyncgen 集合中
+        await guard.__anext__()
+
+    async def _close_on_loop_shutdown(self):
+        # asyncio.run() 结束前 loop.shutdown_asyncgens() 会关闭此 generator
+        try:
+            yield
+        finally:
+            await self.aclose()
+
+    def _pool(self, host: str) -> _HostPool:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pools = self._pools.get(loop)
+            if pools is None:
+                pools = self._pools[loop] = {}
+            pool = pools.get(host)
+            if pool is None:
+                profile = self.profile_for(host)
+                pool = pools[host] = _HostPool(
+                    client=httpx.AsyncClient(
+                        timeout=httpx.Timeout(profile.timeout),
+                        limits=httpx.Limits(
+                            max_connections=profile.max_concurrency,
+                            max_keepalive_connections=profile.max_keepalive,
+                        ),
+                        http2=profile.http2 and HTTP2_AVAILABLE,
+                        transport=self._transport,
+                    ),
+                    semaphore=asyncio.Semaphore(profile.max_concurrency),
+                    profile=profile,
+                )
+        return pool
+
+
+# ── Singleton ──
+
+_registry: Optional[HttpClientRegistry] = None
+
+
+def get_http_clients() -> HttpClientRegistry:
+    """获取全局共享客户端池"""
+    global _registry
+    if _registry is None:
+        _registry = HttpClientRegistry()
+    return _registry
+
+
+async def start_http_clients() -> HttpClientRegistry:
+    """启动时创建全局客户端池"""
+    registry = get_http_clients()
+    logger.info(
+        f"HTTP client pool ready ({len(registry.profiles)} host profiles, "
+        f"HTTP/2 {'on' if HTTP2_AVAILABLE else 'unavailable'})"
+    )
+    return registry
+
+
+async def stop_http_clients() -> None:
+    """关闭时释放当前事件循环下的连接"""
+    if _registry is not None:
+        await _registry.aclose()
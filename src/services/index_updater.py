@@ -6,10 +6,10 @@
 import asyncio
 from typing import TYPE_CHECKING
 
-import httpx
-
 from src.models import KlineTimeframe, SymbolType
+from src.services.http_clients import get_http_clients
 from src.services.kline_service import KlineService
+from src.services.rate_limiter import get_rate_limiter
 from src.utils.logging import get_logger
 
 if TYPE_CHECKING:
@@ -91,33 +91,33 @@ class IndexUpdater:
         )
 
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(url, headers=SINA_HEADERS, timeout=15.0)
-                resp.raise_for_status()
-
-                data = resp.json()
-                if not data:
-                    return []
-
-                klines = []
-                for k in data:
-                    # 日线格式: "2026-01-12", 分钟线: "2026-01-12 10:30:00"
-                    if scale == 240:
-                        trade_time = k["day"].split(" ")[0]
-                    else:
-                        trade_time = k["day"]
-
-                    klines.append({
-                        "datetime": trade_time,
-                        "open": float(k["open"]),
-                        "high": float(k["high"]),
-                        "low": float(k["low"]),
-                        "close": float(k["close"]),
-                        "volume": int(float(k["volume"])),
-                        "amount": float(k.get("amount", 0)),
-                    })
-
-                return klines
+            await get_rate_limiter("sina").acquire_async()
+            resp = await get_http_clients().get(url, headers=SINA_HEADERS, timeout=15.0)
+            resp.raise_for_status()
+
+            data = resp.json()
+            if not data:
+                return []
+
+            klines = []
+            for k in data:
+                # 日线格式: "2026-01-12", 分钟线: "2026-01-12 10:30:00"
+                if scale == 240:
+                    trade_time = k["day"].split(" ")[0]
+                else:
+                    trade_time = k["day"]
+
+                klines.append({
+                    "datetime": trade_time,
+                    "open": float(k["open"]),
+                    "high": float(k["high"]),
+                    "low": float(k["low"]),
+                    "close": float(k["close"]),
+                    "volume": int(float(k["volume"])),
+                    "amount": float(k.get("amount", 0)),
+                })
+
+            return klines
         except Exception as e:
             logger.error(f"获取 {name} K线数据失败: {e}")
             return []
@@ -15,26 +15,19 @@ from typing import Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from src.models import Kline, KlineTimeframe, SymbolType, TradeCalendar
+from src.config import get_settings
+from src.models import SymbolType, TradeCalendar
 from src.services.kline_updater import KlineUpdater
 from src.services.data_consistency_validator import DataConsistencyValidator
+from src.tasks.job_graph import GraphRun
+from src.tasks.nightly import latest_daily_trade_date, run_nightly
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-def _normalize_date(date_value: datetime | str | None) -> str | None:
-    """Normalize DB date/datetime value into YYYY-MM-DD string."""
-    if date_value is None:
-        return None
-    if isinstance(date_value, str):
-        return date_value[:10]
-    return date_value.strftime("%Y-%m-%d")
-
-
 def should_run_startup_backfill(
     *,
     now: datetime,
@@ -81,6 +74,8 @@ class KlineScheduler:
         self.updater = KlineUpdater.create_with_session(self.session)
         self.validator = DataConsistencyValidator.create_with_session(self.session)
         self._is_running = False
+        self._nightly_lock = asyncio.Lock()
+        self.last_nightly_run: Optional[GraphRun] = None
 
     @classmethod
     def create_with_session(cls, session: Session) -> "KlineScheduler":
@@ -147,7 +142,7 @@ class KlineScheduler:
     # ==================== 任务函数 ====================
 
     async def _job_daily_update(self):
-        """每日更新任务 (16:00 执行，给新浪API足够时间合并日线数据)"""
+        """指数/概念/自选股日线更新任务 (手动触发；定时更新由收盘后任务图完成)"""
         if not self.is_trading_day():
             logger.info("非交易日，跳过日线更新")
             return
@@ -171,6 +166,26 @@ class KlineScheduler:
         except Exception as e:
             logger.exception(f"每日更新任务失败: {e}")
 
+    async def _job_nightly(self):
+        """
+        收盘后任务图 (交易日 DAILY_REFRESH_CRON 启动)
+
+        日历 → 个股/指数/概念日线 → 汇总/指标/截图/一致性验证，以及行业、ETF 脚本；
+        各节点在上游完成且当日数据已发布后立即执行，见 src.tasks.nightly
+        """
+        if not self.is_trading_day():
+            logger.info("非交易日，跳过收盘后任务图")
+            return
+        if self._nightly_lock.locked():
+            logger.warning("收盘后任务图正在运行，跳过本次触发")
+            return
+
+        async with self._nightly_lock:
+            try:
+                self.last_nightly_run = await run_nightly()
+            except Exception as e:
+                logger.exception(f"收盘后任务图失败: {e}")
+
     async def _job_30m_update(self):
         """30分钟更新任务"""
         if not self.is_trading_day():
@@ -243,7 +258,7 @@ class KlineScheduler:
             logger.exception(f"自选股30分钟更新失败: {e}")
 
     async def _job_all_stock_daily(self):
-        """全市场日线更新任务 (手动触发或定时22:00执行)"""
+        """全市场日线更新任务 (手动触发)"""
         if not self.is_trading_day():
             logger.info("非交易日，跳过全市场日线更新")
             return
@@ -255,7 +270,7 @@ class KlineScheduler:
             logger.exception(f"全市场日线更新失败: {e}")
 
     async def _job_data_validation(self):
-        """数据一致性验证任务 (交易日 15:45 执行)"""
+        """数据一致性验证任务 (手动触发)"""
         if not self.is_trading_day():
             logger.info("非交易日，跳过数据一致性验证")
             return
@@ -301,20 +316,11 @@ class KlineScheduler:
             latest_index_date,
             latest_stock_date,
         )
-        await self._job_daily_update()
-        await self._job_all_stock_daily()
+        await self._job_nightly()
 
     def _latest_daily_trade_date(self, symbol_type: SymbolType) -> str | None:
         """Read latest DAY kline date for a symbol type."""
-        latest = (
-            self.session.query(func.max(Kline.trade_time))
-            .filter(
-                Kline.symbol_type == symbol_type,
-                Kline.timeframe == KlineTimeframe.DAY,
-            )
-            .scalar()
-        )
-        return _normalize_date(latest)
+        return latest_daily_trade_date(self.session, symbol_type)
 
     # ==================== 调度器控制 ====================
 
@@ -326,12 +332,16 @@ class KlineScheduler:
 
         logger.info("正在启动K线数据调度器...")
 
-        # 1. 每日更新任务 (交易日 18:05，规避收盘后数据落库延迟)
+        # 1. 收盘后任务图 (交易日收盘后启动，节点轮询等待当日数据发布)
+        settings = get_settings()
         self.scheduler.add_job(
-            self._job_daily_update,
-            CronTrigger(hour=18, minute=5),
-            id="daily_update",
-            name="每日K线更新",
+            self._job_nightly,
+            CronTrigger.from_crontab(
+                settings.scheduler.daily_refresh_cron,
+                timezone=settings.scheduler.timezone,
+            ),
+            id="nightly",
+            name="收盘后任务图",
             replace_existing=True,
             coalesce=True,
             max_instances=1,
@@ -372,42 +382,7 @@ class KlineScheduler:
             max_instances=1,
         )
 
-        # 5. 全市场日线更新任务 (交易日 18:20)
-        self.scheduler.add_job(
-            self._job_all_stock_daily,
-            CronTrigger(hour=18, minute=20),
-            id="all_stock_daily",
-            name="全市场日线更新",
-            replace_existing=True,
-            coalesce=True,
-            max_instances=1,
-            misfire_grace_time=7200,
-        )
-
-        # 5.1 兜底补跑（交易日 21:30）
-        self.scheduler.add_job(
-            self._job_all_stock_daily,
-            CronTrigger(hour=21, minute=30),
-            id="all_stock_daily_retry",
-            name="全市场日线补跑",
-            replace_existing=True,
-            coalesce=True,
-            max_instances=1,
-            misfire_grace_time=7200,
-        )
-
-        # 6. 数据一致性验证任务 (交易日 20:45)
-        self.scheduler.add_job(
-            self._job_data_validation,
-            CronTrigger(hour=20, minute=45),
-            id="data_validation",
-            name="数据一致性验证",
-            replace_existing=True,
-            coalesce=True,
-            max_instances=1,
-        )
-
-        # 7. 启动后一次性补跑检查（延迟20秒，避免和启动峰值争用）
+        # 5. 启动后一次性补跑检查（延迟20秒，避免和启动峰值争用）
         self.scheduler.add_job(
             self._job_startup_backfill,
             DateTrigger(run_date=datetime.now() + timedelta(seconds=20)),
@@ -458,6 +433,7 @@ class KlineScheduler:
             是否成功触发
         """
         job_map = {
+            "nightly": self._job_nightly,
             "daily_update": self._job_daily_update,
             "30m_update": self._job_30m_update,
             "calendar_update": self._job_calendar_update,
@@ -465,6 +441,7 @@ class KlineScheduler:
             "stock_daily": self._job_stock_daily,
             "stock_30m": self._job_stock_30m,
             "all_stock_daily": self._job_all_stock_daily,
+            "data_validation": self._job_data_validation,
         }
 
         if job_id not in job_map:
@@ -8,24 +8,29 @@
 from datetime import datetime, timezone
 from typing import Optional
 
+import pandas as pd
 from sqlalchemy.orm import Session
 
 from src.models import KlineTimeframe, SymbolType
+from src.repositories.kline_cache import get_kline_cache, make_key
 from src.repositories.kline_repository import KlineRepository
 from src.repositories.symbol_repository import SymbolRepository
 from src.schemas.normalized import NormalizedDate, NormalizedTicker
-from src.utils.indicators import calculate_macd
+from src.utils.indicators import MacdState, calculate_macd, calculate_macd_incremental
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# MACD 参数 (与 calculate_macd 默认值一致)
+MACD_SLOW_PERIOD = 26
+
 
 class KlineService:
     """
     K线数据业务服务
 
     职责:
-    - 查询K线数据（委托给Repository）
+    - 查询K线数据（委托给Repository，最近N根经由 KlineCache 缓存）
     - 计算技术指标（MACD等）
     - 组装返回数据格式
     """
@@ -44,6 +49,7 @@ class KlineService:
         """
         self.kline_repo = kline_repo
         self.symbol_repo = symbol_repo
+        self.kline_cache = get_kline_cache(getattr(kline_repo, "session", None))
 
     @classmethod
     def create_with_session(cls, session: Session) -> "KlineService":
@@ -119,30 +125,55 @@ class KlineService:
                 start_date=start_datetime,
                 end_date=end_datetime,
             )
+            bars = [_kline_to_bar(k) for k in klines]
         else:
-            klines = self.kline_repo.find_by_symbol(
-                symbol_code=symbol_code,
-                symbol_type=symbol_type,
-                timeframe=timeframe,
-                limit=limit,
-            )
-            # Repository返回的是倒序，需要反转
-            klines = list(reversed(klines))
+            bars = self._get_recent_bars(symbol_type, symbol_code, timeframe, limit)
 
         # 转换为字典格式
         return [
             {
-                "datetime": k.trade_time,  # Return as 'datetime' for API backward compatibility
-                "open": k.open,
-                "high": k.high,
-                "low": k.low,
-                "close": k.close,
-                "volume": k.volume,
-                "amount": k.amount,
+                "datetime": trade_time,  # Return as 'datetime' for API backward compatibility
+                "open": open_,
+                "high": high,
+                "low": low,
+                "close": close,
+                "volume": volume,
+                "amount": amount,
             }
-            for k in klines
+            for trade_time, open_, high, low, close, volume, amount in bars
         ]
 
+    def _get_recent_bars(
+        self,
+        symbol_type: SymbolType,
+        symbol_code: str,
+        timeframe: KlineTimeframe,
+        limit: int,
+    ) -> list[tuple]:
+        """读取最近 limit 根K线（时间正序），优先走缓存"""
+        cache = self.kline_cache
+        key = make_key(symbol_type, symbol_code, timeframe)
+        if cache is not None:
+            bars = cache.get(key, limit)
+            if bars is not None:
+                return bars
+            generation = cache.generation
+
+        klines = self.kline_repo.find_by_symbol(
+            symbol_code=symbol_code,
+            symbol_type=symbol_type,
+            timeframe=timeframe,
+            limit=limit,
+        )
+        # Repository返回的是倒序，需要反转
+        bars = [_kline_to_bar(k) for k in reversed(klines)]
+
+        if cache is not None:
+            cache.put(
+                key, bars, complete=not limit or len(bars) < limit, generation=generation
+            )
+        return bars
+
     def get_klines_with_indicators(
         self,
         symbol_type: SymbolType,
@@ -288,6 +319,13 @@ class KlineService:
         Returns:
             最新交易时间的ISO字符串或None
         """
+        if self.kline_cache is not None:
+            hit, trade_time = self.kline_cache.get_latest_trade_time(
+                make_key(symbol_type, symbol_code, timeframe)
+            )
+            if hit:
+                return trade_time
+
         kline = self.kline_repo.find_latest_by_symbol(
             symbol_code, symbol_type, timeframe
         )
@@ -369,20 +407,10 @@ class KlineService:
             except ValueError:
                 pass
 
-        # 按时间排序
-        klines = sorted(klines, key=lambda k: k.get("datetime", ""))
-
-        # 计算 MACD
-        if calculate_indicators:
-            closes = [float(k.get("close", 0)) for k in klines]
-            macd_data = calculate_macd(closes)
-        else:
-            macd_data = {"dif": [None] * len(klines), "dea": [None] * len(klines), "macd": [None] * len(klines)}
-
-        # 准备数据，标准化日期格式
+        # 标准化日期格式，按时间排序（同一时间保留最后一条）
         is_daily = timeframe == KlineTimeframe.DAY
-        records = []
-        for i, k in enumerate(klines):
+        by_time: dict[str, dict] = {}
+        for k in klines:
             raw_time = k.get("datetime", "")
             # 标准化日期时间
             try:
@@ -392,8 +420,28 @@ class KlineService:
                     trade_time = NormalizedDateTime(value=raw_time).to_iso()
             except ValueError:
                 trade_time = raw_time  # 保持原值
+            by_time[trade_time] = k
+        trade_times = sorted(by_time)
+        klines = [by_time[t] for t in trade_times]
+
+        # 计算 MACD：从已保存的递推状态继续，只计算变化的K线
+        indicators: dict[str, tuple] = {}
+        stored_updates: list[dict] = []
+        new_state = None
+        if calculate_indicators:
+            indicators, stored_updates, new_state = self._update_macd(
+                symbol_type,
+                symbol_code,
+                timeframe,
+                trade_times,
+                [float(k.get("close", 0)) for k in klines],
+            )
 
-            now = datetime.now(timezone.utc)
+        # 准备数据；未重算指标的K线传None，upsert 时保留已有值
+        now = datetime.now(timezone.utc)
+        records = []
+        for trade_time, k in zip(trade_times, klines):
+            dif, dea, macd = indicators.get(trade_time, (None, None, None))
             records.append(
                 Kline(
                     symbol_type=symbol_type,
@@ -407,13 +455,224 @@ class KlineService:
                     close=float(k.get("close", 0)),
                     volume=float(k.get("volume", 0)),
                     amount=float(k.get("amount", 0)),
-                    dif=macd_data["dif"][i],
-                    dea=macd_data["dea"][i],
-                    macd=macd_data["macd"][i],
+                    dif=dif,
+                    dea=dea,
+                    macd=macd,
                     created_at=now,
                     updated_at=now,
                 )
             )
 
         # 使用repository保存
-        return self.kline_repo.upsert_batch(records)
+        count = self.kline_repo.upsert_batch(records)
+        self.kline_repo.update_indicators(stored_updates)
+        if new_state is not None:
+            self.kline_repo.save_indicator_state(symbol_code, symbol_type, timeframe, *new_state)
+        return count
+
+    def save_klines_columns(
+        self,
+        frame: pd.DataFrame,
+        symbol_type: SymbolType,
+        timeframe: KlineTimeframe,
+        chunk_size: Optional[int] = None,
+    ) -> int:
+        """
+        列式保存多个标的的K线 (upsert)，MACD 与 save_klines 一样增量计算
+
+        用于全市场横截面等批量写入：K线经由 KlineRepository.upsert_columns 写入，
+        每个标的从 kline_indicator_state 继续递推 MACD 并更新状态。
+
+        Args:
+            frame: 包含 symbol_code, trade_time, open, high, low, close 列，
+                   可选 volume, amount
+            symbol_type: 标的类型
+            timeframe: 时间周期
+            chunk_size: 每次 executemany 的行数
+
+        Returns:
+            保存的记录数
+        """
+        from src.schemas.normalized import normalize_trade_times
+
+        if frame.empty:
+            return 0
+
+        # 标准化时间（丢弃无法解析的行），按标的、时间排序（同一时间保留最后一条）
+        trade_times = normalize_trade_times(
+            frame["trade_time"], is_daily=timeframe == KlineTimeframe.DAY
+        )
+        valid = pd.notna(trade_times)
+        if not valid.all():
+            logger.warning(
+                f"丢弃 {int((~valid).sum())} 条时间无法解析的K线: "
+                f"{frame['trade_time'][~valid].head(5).tolist()}"
+            )
+            frame = frame[valid]
+            trade_times = trade_times[valid]
+            if frame.empty:
+                return 0
+        frame = frame.assign(trade_time=trade_times, close=frame["close"].astype(float))
+        frame = (
+            frame.drop_duplicates(["symbol_code", "trade_time"], keep="last")
+            .sort_values(["symbol_code", "trade_time"])
+            .reset_index(drop=True)
+        )
+
+        groups = [
+            (symbol_code, group["trade_time"].tolist(), group["close"].tolist())
+            for symbol_code, group in frame.groupby("symbol_code", sort=False)
+        ]
+
+        # 一次读出全部标的的递推状态，以及可以续算的标的自状态以来的已存收盘价
+        states = self.kline_repo.get_indicator_states(
+            [code for code, _, _ in groups], symbol_type, timeframe
+        )
+        start_times = {}
+        for code, trade_times, _ in groups:
+            row = states.get(code)
+            if row is not None and row.bar_count >= MACD_SLOW_PERIOD:
+                start_times[code] = min(trade_times[0], row.prev_trade_time or row.last_trade_time)
+        stored_closes = self.kline_repo.find_closes_by_symbols(symbol_type, timeframe, start_times)
+
+        # 计算 MACD：未重算指标的K线为None，upsert 时保留已有值
+        macd_values: list[tuple] = []
+        stored_updates: list[dict] = []
+        new_states: list[tuple] = []
+        for symbol_code, trade_times, closes in groups:
+            indicators, updates, new_state = self._update_macd(
+                symbol_type, symbol_code, timeframe, trade_times, closes,
+                prefetched=(states.get(symbol_code), stored_closes.get(symbol_code)),
+            )
+            macd_values.extend(indicators.get(t, (None, None, None)) for t in trade_times)
+            stored_updates.extend(updates)
+            if new_state is not None:
+                new_states.append((symbol_code, *new_state))
+
+        dif, dea, macd = zip(*macd_values)
+        frame = frame.assign(dif=list(dif), dea=list(dea), macd=list(macd))
+
+        count = self.kline_repo.upsert_columns(
+            frame, symbol_type=symbol_type, timeframe=timeframe, chunk_size=chunk_size
+        )
+        self.kline_repo.update_indicators(stored_updates)
+        self.kline_repo.save_indicator_states(symbol_type, timeframe, new_states)
+        return count
+
+    def _update_macd(
+        self,
+        symbol_type: SymbolType,
+        symbol_code: str,
+        timeframe: KlineTimeframe,
+        trade_times: list[str],
+        closes: list[float],
+        prefetched: Optional[tuple] = None,
+    ) -> tuple[dict[str, tuple], list[dict], Optional[tuple]]:
+        """
+        增量计算MACD
+
+        从 kline_indicator_state 中最后一根（或最后一根被修订时的倒数第二根）K线的
+        EMA状态继续，只对收盘价有变化的K线及其之后的K线递推，O(新增K线数)。
+        没有可用状态或修改了更早的历史时，按全部历史重算。
+
+        Args:
+            symbol_type: 标的类型
+            symbol_code: 标的代码
+            timeframe: 时间周期
+            trade_times: 待保存K线的时间（正序、去重）
+            closes: 对应的收盘价
+            prefetched: 批量预读的 (递推状态行, 自续算起点以来的已存收盘价)；
+                        None 表示逐个查询
+
+        Returns:
+            (待保存K线 {trade_time: (dif, dea, macd)},
+             需更新指标的已存K线 [{id, dif, dea, macd}],
+             新的递推状态参数 (last_trade_time, state, prev_trade_time, prev_state) 或None)
+        """
+        new_closes = dict(zip(trade_times, closes))
+        if prefetched is None:
+            row = self.kline_repo.get_indicator_state(symbol_code, symbol_type, timeframe)
+            prefetched_closes = None
+        else:
+            row, prefetched_closes = prefetched
+
+        seed: Optional[MacdState] = None
+        seed_time: Optional[str] = None
+        stored = None
+        if row is not None and row.bar_count >= MACD_SLOW_PERIOD:
+            if prefetched_closes is not None:
+                stored = prefetched_closes
+            else:
+                stored = self.kline_repo.find_closes(
+                    symbol_code, symbol_type, timeframe,
+                    start_time=min(trade_times[0], row.prev_trade_time or row.last_trade_time),
+                )
+            stored_closes = {r.trade_time: r.close for r in stored}
+            # 收盘价变化的K线 + 状态之后写入但尚未计算的已存K线
+            dirty = [t for t in trade_times if stored_closes.get(t) != new_closes[t]]
+            dirty += [r.trade_time for r in stored if r.trade_time > row.last_trade_time]
+            current = MacdState(row.ema_fast, row.ema_slow, row.dea, row.bar_count)
+            prev = None
+            if row.prev_trade_time is not None:
+                prev = MacdState(
+                    row.prev_ema_fast, row.prev_ema_slow, row.prev_dea, row.bar_count - 1
+                )
+            if not dirty:
+                # 收盘价均未变化：指标保持不变，原样保留状态
+                return {}, [], (row.last_trade_time, current, row.prev_trade_time, prev)
+
+            dirty_from = min(dirty)
+            if dirty_from > row.last_trade_time:
+                seed, seed_time = current, row.last_trade_time
+            elif prev is not None and dirty_from > row.prev_trade_time:
+                seed, seed_time = prev, row.prev_trade_time
+
+        if seed is None:
+            # 全量重算
+            stored = self.kline_repo.find_closes(symbol_code, symbol_type, timeframe)
+
+        stored_ids = {
+            r.trade_time: (r.id, r.close)
+            for r in stored
+            if seed_time is None or r.trade_time > seed_time
+        }
+        series = sorted(
+            set(stored_ids) | {t for t in trade_times if seed_time is None or t > seed_time}
+        )
+        if not series:
+            return {}, [], None
+
+        series_closes = [
+            new_closes[t] if t in new_closes else stored_ids[t][1] for t in series
+        ]
+        macd_data, states = calculate_macd_incremental(series_closes, seed)
+
+        indicators: dict[str, tuple] = {}
+        stored_updates: list[dict] = []
+        for i, t in enumerate(series):
+            values = (macd_data["dif"][i], macd_data["dea"][i], macd_data["macd"][i])
+            if t in new_closes:
+                indicators[t] = values
+            else:
+                stored_updates.append(
+                    {"id": stored_ids[t][0], "dif": values[0], "dea": values[1], "macd": values[2]}
+                )
+
+        if len(series) >= 2:
+            prev_time, prev_state = series[-2], states[-2]
+        else:
+            prev_time, prev_state = seed_time, seed
+        return indicators, stored_updates, (series[-1], states[-1], prev_time, prev_state)
+
+
+def _kline_to_bar(kline) -> tuple:
+    """ORM对象 -> 缓存使用的K线元组"""
+    return (
+        kline.trade_time,
+        kline.open,
+        kline.high,
+        kline.low,
+        kline.close,
+        kline.volume,
+        kline.amount,
+    )
@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 from collections import deque
 
 from .news_service import NewsService, get_news_service
+from src.utils.keyword_matcher import KeywordMatcher, build_matcher
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -29,6 +30,9 @@ class NewsAggregator:
         self._history: deque = deque(maxlen=history_size)
         self._keywords: List[str] = []
         self._exclude_keywords: List[str] = []
+        # 关键词自动机，set_keywords 时重建
+        self._include_matcher: KeywordMatcher = build_matcher([])
+        self._exclude_matcher: KeywordMatcher = build_matcher([])
     
     def _hash_news(self, news: Dict[str, Any]) -> str:
         """生成新闻的唯一哈希"""
@@ -49,8 +53,10 @@ class NewsAggregator:
         """
         if include is not None:
             self._keywords = [k.lower() for k in include]
+            self._include_matcher = build_matcher(self._keywords)
         if exclude is not None:
             self._exclude_keywords = [k.lower() for k in exclude]
+            self._exclude_matcher = build_matcher(self._exclude_keywords)
         
         logger.info(f"Keywords set: include={self._keywords}, exclude={self._exclude_keywords}")
     
@@ -59,16 +65,12 @@ class NewsAggregator:
         text = f"{news.get('title', '')} {news.get('content', '')}".lower()
         
         # 排除关键词检查
-        for kw in self._exclude_keywords:
-            if kw in text:
-                return False
+        if self._exclude_matcher.matches(text):
+            return False
         
         # 包含关键词检查（如果设置了）
         if self._keywords:
-            for kw in self._keywords:
-                if kw in text:
-                    return True
-            return False
+            return self._include_matcher.matches(text)
         
         return True
     
@@ -1,145 +1,126 @@
 """
 K线形态匹配服务
-使用简化的DTW/欧氏距离算法找相似形态
+
+从本地 klines 表读取日线收盘价，用 z 归一化欧氏距离找相似形态：
+- 查询形态与所有历史窗口的距离一次向量化算出（src/utils/similarity.py），
+  不逐窗口归一化/插值
+- 全市场搜索按 SYMBOL_CHUNK_SIZE 分块读取，每块拼接成一条长序列计算距离，
+  用当前第 k 名的距离作为阈值剪枝，只对候选窗口排序
+- 同一只股票相邻的窗口几乎重合，选取时排除 pattern_days // 2 以内的近邻
 """
-from typing import List, Dict, Optional, Tuple
+import heapq
+from typing import Dict, Iterable, List, Optional, Sequence
+
 import numpy as np
-from datetime import datetime, timedelta
-from sqlalchemy import text
+from sqlalchemy.orm import Session
+
 from src.database import SessionLocal
-import tushare as ts
-from src.config import get_settings
+from src.models import KlineTimeframe, SymbolType
+from src.repositories.kline_repository import SYMBOL_CHUNK_SIZE, KlineRepository
+from src.utils.logging import get_logger
+from src.utils.similarity import (
+    distance_to_similarity,
+    is_flat,
+    similarity_to_distance,
+    znorm_distance_profile,
+)
+
+logger = get_logger(__name__)
+
+# 形态结束后统计涨跌的天数
+FORWARD_DAYS = 10
+
+# 只保留相似度高于该值的形态
+MIN_SIMILARITY = 50.0
+
+# 全市场搜索默认回溯的K线数（约3年）
+MARKET_LOOKBACK_BARS = 750
 
 
 class PatternMatcher:
     """K线形态匹配"""
-    
-    def __init__(self):
-        self.session = SessionLocal()
-        settings = get_settings()
-        self.pro = ts.pro_api(settings.tushare_token)
-    
+
+    def __init__(self, session: Optional[Session] = None):
+        self._owns_session = session is None
+        self.session = session or SessionLocal()
+        self.repo = KlineRepository(self.session)
+
     def close(self):
-        self.session.close()
-    
+        if self._owns_session:
+            self.session.close()
+
     def get_stock_klines(self, ticker: str, days: int = 120) -> Optional[np.ndarray]:
-        """获取股票K线数据"""
-        try:
-            if ticker.startswith('6'):
-                ts_code = f"{ticker}.SH"
-            elif ticker.startswith('0') or ticker.startswith('3'):
-                ts_code = f"{ticker}.SZ"
-            else:
-                ts_code = f"{ticker}.BJ"
-            
-            end_date = datetime.now().strftime('%Y%m%d')
-            start_date = (datetime.now() - timedelta(days=days*2)).strftime('%Y%m%d')
-            
-            df = self.pro.daily(ts_code=ts_code, start_date=start_date, end_date=end_date)
-            
-            if df is None or len(df) < 30:
-                return None
-            
-            # 按日期排序
-            df = df.sort_values('trade_date').reset_index(drop=True)
-            
-            # 返回收盘价数组
-            return df['close'].values[-days:]
-            
-        except Exception as e:
+        """获取股票最近 days 根日线的收盘价（时间正序）"""
+        series = self._load_series([ticker], days).get(ticker)
+        if series is None or len(series["close"]) < 30:
             return None
-    
-    def normalize_pattern(self, prices: np.ndarray) -> np.ndarray:
-        """归一化价格序列到0-1区间"""
-        if len(prices) < 2:
-            return prices
-        
-        min_p = np.min(prices)
-        max_p = np.max(prices)
-        
-        if max_p == min_p:
-            return np.zeros_like(prices)
-        
-        return (prices - min_p) / (max_p - min_p)
-    
-    def calculate_similarity(self, pattern1: np.ndarray, pattern2: np.ndarray) -> float:
-        """计算两个形态的相似度 (0-100)"""
-        if len(pattern1) != len(pattern2):
-            # 简单插值对齐
-            min_len = min(len(pattern1), len(pattern2))
-            pattern1 = np.interp(np.linspace(0, 1, min_len), 
-                                np.linspace(0, 1, len(pattern1)), pattern1)
-            pattern2 = np.interp(np.linspace(0, 1, min_len),
-                                np.linspace(0, 1, len(pattern2)), pattern2)
-        
-        # 归一化
-        norm1 = self.normalize_pattern(pattern1)
-        norm2 = self.normalize_pattern(pattern2)
-        
-        # 计算欧氏距离
-        distance = np.sqrt(np.sum((norm1 - norm2) ** 2))
-        
-        # 转换为相似度 (0-100)
-        max_distance = np.sqrt(len(norm1))  # 最大可能距离
-        similarity = max(0, 100 * (1 - distance / max_distance))
-        
-        return similarity
-    
-    def find_similar_patterns(self, ticker: str, pattern_days: int = 20, 
-                             lookback_days: int = 100, top_n: int = 5) -> List[Dict]:
+        return series["close"]
+
+    def find_similar_patterns(self, ticker: str, pattern_days: int = 20,
+                              lookback_days: int = 100, top_n: int = 5) -> List[Dict]:
         """
-        在历史数据中找相似形态
-        
+        在股票自身历史中找相似形态
+
         Args:
             ticker: 股票代码
             pattern_days: 当前形态天数
             lookback_days: 回溯天数
             top_n: 返回前N个相似形态
         """
-        # 获取历史K线
-        prices = self.get_stock_klines(ticker, lookback_days + pattern_days + 50)
-        
-        if prices is None or len(prices) < pattern_days + 30:
+        series = self._load_series([ticker], lookback_days + pattern_days + 50)
+        if ticker not in series or len(series[ticker]["close"]) < pattern_days + 30:
             return []
-        
-        # 当前形态 (最近N天)
-        current_pattern = prices[-pattern_days:]
-        
-        # 在历史中滑动窗口匹配
-        matches = []
-        
-        for i in range(len(prices) - pattern_days - 10 - pattern_days):  # 留出后续空间
-            historical_pattern = prices[i:i + pattern_days]
-            similarity = self.calculate_similarity(current_pattern, historical_pattern)
-            
-            if similarity > 50:  # 只保留相似度>50%的
-                # 计算该形态后的涨跌
-                future_prices = prices[i + pattern_days:i + pattern_days + 10]
-                if len(future_prices) > 0:
-                    future_return = (future_prices[-1] - historical_pattern[-1]) / historical_pattern[-1] * 100
-                else:
-                    future_return = 0
-                
-                matches.append({
-                    'start_idx': i,
-                    'end_idx': i + pattern_days,
-                    'similarity': similarity,
-                    'future_return': future_return,
-                    'pattern_start_price': float(historical_pattern[0]),
-                    'pattern_end_price': float(historical_pattern[-1]),
-                })
-        
-        # 按相似度排序
-        matches.sort(key=lambda x: x['similarity'], reverse=True)
-        
-        return matches[:top_n]
-    
-    def analyze_pattern_outcome(self, ticker: str, pattern_days: int = 20) -> Dict:
+
+        query = series[ticker]["close"][-pattern_days:]
+        return self._search(query, ticker, [series], top_n)
+
+    def search_market(self, ticker: str, pattern_days: int = 20,
+                      lookback_days: int = MARKET_LOOKBACK_BARS, top_n: int = 20,
+                      tickers: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        在全市场（或指定股票池）的历史中找与该股票当前形态相似的走势
+
+        Args:
+            ticker: 股票代码（取最近 pattern_days 根K线作为查询形态）
+            pattern_days: 形态天数
+            lookback_days: 每只股票回溯的K线数
+            top_n: 返回前N个相似形态
+            tickers: 股票池，None 表示本地有日线的全部股票
+
+        Returns:
+            按相似度倒序的形态列表（含 ticker、起止日期）
+        """
+        query_series = self._load_series([ticker], pattern_days).get(ticker)
+        if query_series is None or len(query_series["close"]) < pattern_days:
+            return []
+
+        if tickers is None:
+            tickers = self.repo.find_symbols_with_data(SymbolType.STOCK, KlineTimeframe.DAY)
+        tickers = list(dict.fromkeys(tickers))
+
+        blocks = (
+            self._load_series(tickers[start:start + SYMBOL_CHUNK_SIZE], lookback_days)
+            for start in range(0, len(tickers), SYMBOL_CHUNK_SIZE)
+        )
+        matches = self._search(query_series["close"], ticker, blocks, top_n)
+        logger.info(f"全市场形态搜索 {ticker}: {len(tickers)} 只股票, 命中 {len(matches)} 个")
+        return matches
+
+    def analyze_pattern_outcome(self, ticker: str, pattern_days: int = 20,
+                                market: bool = False) -> Dict:
         """
         分析当前形态的历史胜率
+
+        Args:
+            ticker: 股票代码
+            pattern_days: 形态天数
+            market: 为True时在全市场历史中匹配，否则只看自身历史
         """
-        matches = self.find_similar_patterns(ticker, pattern_days, lookback_days=200, top_n=20)
-        
+        if market:
+            matches = self.search_market(ticker, pattern_days, top_n=20)
+        else:
+            matches = self.find_similar_patterns(ticker, pattern_days, lookback_days=200, top_n=20)
+
         if not matches:
             return {
                 'ticker': ticker,
@@ -147,30 +128,152 @@ class PatternMatcher:
                 'similar_count': 0,
                 'win_rate': None,
                 'avg_return': None,
+                'avg_similarity': None,
+                'best_match': None,
+                'matches': [],
                 'message': '未找到足够的相似形态'
             }
-        
+
         # 统计
-        win_count = sum(1 for m in matches if m['future_return'] > 0)
-        avg_return = np.mean([m['future_return'] for m in matches])
+        returns = np.array([m['future_return'] for m in matches])
         avg_similarity = np.mean([m['similarity'] for m in matches])
-        
+
         return {
             'ticker': ticker,
             'pattern_days': pattern_days,
             'similar_count': len(matches),
-            'win_rate': win_count / len(matches) * 100,
-            'avg_return': avg_return,
-            'avg_similarity': avg_similarity,
-            'best_match': matches[0] if matches else None,
+            'win_rate': float(np.mean(returns > 0) * 100),
+            'avg_return': float(returns.mean()),
+            'avg_similarity': float(avg_similarity),
+            'best_match': matches[0],
             'matches': matches[:5]
         }
 
+    def _load_series(self, tickers: Sequence[str], bars: int) -> Dict[str, Dict[str, np.ndarray]]:
+        """批量读取最近 bars 根日线（列数组，时间正序）"""
+        if not tickers:
+            return {}
+        return self.repo.find_latest_columns_by_symbols(
+            list(tickers), SymbolType.STOCK, KlineTimeframe.DAY, limit_per_symbol=bars
+        )
+
+    def _search(self, query: np.ndarray, query_ticker: str,
+                blocks: Iterable[Dict[str, Dict[str, np.ndarray]]], top_n: int) -> List[Dict]:
+        """逐块计算距离并维护全局前 top_n（距离越小越相似）"""
+        m = len(query)
+        if is_flat(query):
+            return []
+
+        bound = similarity_to_distance(MIN_SIMILARITY, m)
+        best: List[tuple] = []  # 大顶堆: (-distance, ticker, start)
+        series_by_ticker: Dict[str, Dict[str, np.ndarray]] = {}
+
+        for block in blocks:
+            for distance, ticker, start in _search_block(query, query_ticker, block, top_n, bound):
+                entry = (-distance, ticker, start)
+                if len(best) < top_n:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+                else:
+                    continue
+                series_by_ticker[ticker] = block[ticker]
+            if len(best) == top_n:
+                bound = min(bound, -best[0][0])
+
+        matches = [
+            _match_record(series_by_ticker[ticker], ticker, start, m, -neg_distance)
+            for neg_distance, ticker, start in sorted(best, reverse=True)
+        ]
+        return matches
+
+
+def _search_block(query: np.ndarray, query_ticker: str,
+                  block: Dict[str, Dict[str, np.ndarray]], top_n: int, bound: float) -> List[tuple]:
+    """
+    在一块股票上搜索
+
+    Returns:
+        [(distance, ticker, start)]，距离升序，最多 top_n 个
+    """
+    m = len(query)
+    parts: List[np.ndarray] = []
+    owners: List[tuple] = []  # (ticker, 在拼接序列中的起点)
+    valid_ranges: List[tuple] = []
+    offset = 0
+    for ticker, columns in block.items():
+        closes = columns["close"]
+        # 窗口之后要留出 FORWARD_DAYS 统计涨跌；查询股票自身的窗口还要在查询形态之前结束
+        last_start = len(closes) - m - FORWARD_DAYS
+        if ticker == query_ticker:
+            last_start -= m
+        scale = closes.mean() if len(closes) else 0.0
+        if last_start < 0 or not np.isfinite(scale) or scale <= 0:
+            continue
+        parts.append(closes / scale)  # 缩放不影响 z 归一化距离，只控制累加和量级
+        owners.append((ticker, offset))
+        valid_ranges.append((offset, offset + last_start + 1))
+        offset += len(closes)
+
+    if not parts:
+        return []
+
+    profile = znorm_distance_profile(query, np.concatenate(parts))
+    valid = np.zeros(len(profile), dtype=bool)
+    for lo, hi in valid_ranges:
+        valid[lo:hi] = True
+    profile[~valid] = np.inf
+
+    # 排除区内只取最优的一个：前 top_n * (2 * exclusion + 1) 个候选足以选出 top_n 个
+    exclusion = max(m // 2, 1)
+    candidates = np.flatnonzero(profile < bound)
+    limit = top_n * (2 * exclusion + 1)
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(profile[candidates], limit)[:limit]]
+    candidates = candidates[np.argsort(profile[candidates], kind="stable")]
+
+    chosen: List[int] = []
+    for index in candidates:
+        # 不同股票的有效窗口之间至少相隔 m + FORWARD_DAYS，不会被误排除
+        if all(abs(index - other) > exclusion for other in chosen):
+            chosen.append(int(index))
+            if len(chosen) == top_n:
+                break
+
+    offsets = np.array([start for _, start in owners])
+    results = []
+    for index in chosen:
+        owner = int(np.searchsorted(offsets, index, side="right")) - 1
+        ticker, start = owners[owner]
+        results.append((float(profile[index]), ticker, index - start))
+    return results
+
+
+def _match_record(series: Dict[str, np.ndarray], ticker: str, start: int,
+                  m: int, distance: float) -> Dict:
+    """相似形态明细（含之后 FORWARD_DAYS 天的涨跌）"""
+    closes = series["close"]
+    end = start + m
+    pattern_end_price = closes[end - 1]
+    future_price = closes[end - 1 + FORWARD_DAYS]
+    return {
+        'ticker': ticker,
+        'start_idx': start,
+        'end_idx': end,
+        'start_date': str(series["trade_time"][start]),
+        'end_date': str(series["trade_time"][end - 1]),
+        'similarity': float(distance_to_similarity(distance, m)),
+        'distance': distance,
+        'future_return': float((future_price - pattern_end_price) / pattern_end_price * 100),
+        'pattern_start_price': float(closes[start]),
+        'pattern_end_price': float(pattern_end_price),
+    }
+
 
-def analyze_stock_pattern(ticker: str, pattern_days: int = 20) -> Dict:
+def analyze_stock_pattern(ticker: str, pattern_days: int = 20, market: bool = False) -> Dict:
     """分析股票形态（供API调用）"""
     matcher = PatternMatcher()
     try:
-        return matcher.analyze_pattern_outcome(ticker, pattern_days)
+        return matcher.analyze_pattern_outcome(ticker, pattern_days, market=market)
     finally:
         matcher.close()
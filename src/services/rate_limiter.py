@@ -0,0 +1,179 @@
+"""
+统一限流服务
+按数据源命名的令牌桶（tushare、sina、ths、yahoo、binance-rest），
+进程内全局共享：API 请求、调度任务、线程池里的抓取共用同一份额度
+
+- 同步调用方用 acquire()（time.sleep），协程用 acquire_async()（asyncio.sleep），
+  两者在同一个桶里排队
+- 令牌按需预约：获取时立即记账，计算出需要等待的时间后再睡眠，
+  每次记账 O(1)，并发调用方按到达顺序依次错开
+- 未超额时不等待，超额时等待时间恰好等于令牌补充所需时间
+
+各数据源默认额度见 PROVIDER_LIMITS；TushareClient 会按积分等级重新配置 tushare 桶。
+独立进程运行的脚本各自持有一份额度。
+"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """单个数据源的额度"""
+    per_minute: float  # 每分钟调用数
+    burst: float = 1.0  # 桶容量：空闲后允许的突发调用数
+
+
+PROVIDER_LIMITS: Dict[str, RateLimit] = {
+    "tushare": RateLimit(per_minute=180, burst=5),  # 15000积分档，TushareClient 按积分覆盖
+    "sina": RateLimit(per_minute=120, burst=4),  # 新浪行情/K线，过快返回 456
+    "ths": RateLimit(per_minute=240, burst=8),  # 同花顺 d.10jqka.com.cn
+    "yahoo": RateLimit(per_minute=60, burst=5),
+    "binance-rest": RateLimit(per_minute=1200, burst=20),
+}
+
+# 未登记的数据源
+DEFAULT_LIMIT = RateLimit(per_minute=60, burst=1)
+
+
+class TokenBucket:
+    """线程安全的令牌桶，同时支持同步与 asyncio 等待"""
+
+    def __init__(self, name: str, per_minute: float, burst: float = 1.0):
+        """
+        Args:
+            name: 数据源名称
+            per_minute: 每分钟令牌数
+            burst: 桶容量
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._configure(per_minute, burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+        self._acquired = 0
+        self._waited = 0
+        self._wait_seconds = 0.0
+
+    @property
+    def per_minute(self) -> float:
+        return self.rate * 60.0
+
+    def configure(self, per_minute: float, burst: Optional[float] = None) -> None:
+        """调整额度（已预约的令牌不受影响）"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._configure(per_minute, self.capacity if burst is None else burst)
+            self._tokens = min(self._tokens, self.capacity)
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        预约令牌，返回需要等待的秒数（0 表示立即可用）
+
+        调用方负责等待；一般直接用 acquire()/acquire_async()。
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self._acquired += 1
+            if wait > 0:
+                self._waited += 1
+                self._wait_seconds += wait
+        return wait
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """有令牌时立即获取并返回True，否则不等待直接返回False"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            self._acquired += 1
+            return True
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """获取令牌（阻塞当前线程），返回实际等待秒数"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """获取令牌（挂起当前协程），返回实际等待秒数"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # 取消的请求不占用额度
+                self._refund(tokens)
+                raise
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "per_minute": round(self.per_minute, 2),
+                "burst": self.capacity,
+                "available": round(self._tokens, 2),
+                "acquired": self._acquired,
+                "waited": self._waited,
+                "wait_seconds": round(self._wait_seconds, 2),
+            }
+
+    def _configure(self, per_minute: float, burst: float) -> None:
+        if per_minute <= 0:
+            raise ValueError(f"{self.name}: per_minute must be positive")
+        self.rate = per_minute / 60.0
+        self.capacity = max(float(burst), 1.0)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _refund(self, tokens: float) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str) -> TokenBucket:
+    """获取数据源的共享令牌桶（首次使用时按 PROVIDER_LIMITS 创建）"""
+    bucket = _buckets.get(name)
+    if bucket is not None:
+        return bucket
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            limit = PROVIDER_LIMITS.get(name, DEFAULT_LIMIT)
+            bucket = _buckets[name] = TokenBucket(name, limit.per_minute, limit.burst)
+    return bucket
+
+
+def configure_rate_limiter(name: str, per_minute: float, burst: Optional[float] = None) -> TokenBucket:
+    """调整数据源额度并返回其令牌桶"""
+    bucket = get_rate_limiter(name)
+    if bucket.per_minute != per_minute or (burst is not None and bucket.capacity != burst):
+        bucket.configure(per_minute, burst)
+        logger.info(f"Rate limit [{name}]: {per_minute:g}/min, burst {bucket.capacity:g}")
+    return bucket
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """全部令牌桶的统计"""
+    with _buckets_lock:
+        buckets = list(_buckets.values())
+    return {bucket.name: bucket.stats() for bucket in buckets}
@@ -14,6 +14,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 
+import numpy as np
 import pandas as pd
 import mplfinance as mpf
 import matplotlib.pyplot as plt
@@ -123,11 +124,34 @@ class ScreenshotService:
         )
         return [(r[0], r[1] or r[0]) for r in results]
 
+    _TIMEFRAME_MAP = {
+        "day": KlineTimeframe.DAY,
+        "30m": KlineTimeframe.MINS_30,
+        "5m": KlineTimeframe.MINS_5,
+        "1m": KlineTimeframe.MINS_1,
+    }
+
+    def _load_bars(
+        self,
+        tickers: List[str],
+        timeframe: str = "day",
+        limit: int = 120,
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """一次查询加载多只股票最近 limit 根K线 (列数组，时间正序)"""
+        kline_tf = self._TIMEFRAME_MAP.get(timeframe, KlineTimeframe.DAY)
+        return self.kline_repo.find_latest_columns_by_symbols(
+            symbol_codes=tickers,
+            symbol_type=SymbolType.STOCK,
+            timeframe=kline_tf,
+            limit_per_symbol=limit,
+        )
+
     def _get_kline_data(
         self,
         ticker: str,
         timeframe: str = "day",
-        limit: int = 120
+        limit: int = 120,
+        bars: Optional[Dict[str, np.ndarray]] = None,
     ) -> Optional[pd.DataFrame]:
         """
         获取K线数据并转换为 mplfinance 格式
@@ -136,49 +160,29 @@ class ScreenshotService:
             ticker: 股票代码
             timeframe: 时间周期
             limit: K线数量
+            bars: 预先批量加载的列数组 (未提供时单独查询)
 
         Returns:
             DataFrame with DatetimeIndex and OHLCV columns
         """
-        # 映射 timeframe
-        tf_map = {
-            "day": KlineTimeframe.DAY,
-            "30m": KlineTimeframe.MINS_30,
-            "5m": KlineTimeframe.MINS_5,
-            "1m": KlineTimeframe.MINS_1,
-        }
-        kline_tf = tf_map.get(timeframe, KlineTimeframe.DAY)
-
         try:
-            # 使用 repository 查询K线数据
-            klines = self.kline_repo.find_by_symbol_and_timeframe(
-                symbol_code=ticker,
-                symbol_type=SymbolType.STOCK,
-                timeframe=kline_tf,
-                limit=limit,
-                order_desc=True
-            )
+            if bars is None:
+                bars = self._load_bars([ticker], timeframe, limit).get(ticker)
 
-            if not klines:
+            if not bars or len(bars["trade_time"]) == 0:
                 logger.warning(f"{ticker} 没有K线数据")
                 return None
 
-            # 转换为DataFrame
-            data = []
-            for k in klines:
-                data.append({
-                    "Date": k.trade_time,
-                    "Open": float(k.open) if k.open else 0,
-                    "High": float(k.high) if k.high else 0,
-                    "Low": float(k.low) if k.low else 0,
-                    "Close": float(k.close) if k.close else 0,
-                    "Volume": float(k.volume) if k.volume else 0,
-                })
-
-            df = pd.DataFrame(data)
-            df["Date"] = pd.to_datetime(df["Date"])
-            df = df.set_index("Date")
-            df = df.sort_index()  # 按时间正序排列
+            # 转换为DataFrame (列数组已按时间正序)
+            df = pd.DataFrame({
+                "Open": bars["open"],
+                "High": bars["high"],
+                "Low": bars["low"],
+                "Close": bars["close"],
+                "Volume": bars["volume"],
+            }, index=pd.to_datetime(bars["trade_time"]))
+            df.index.name = "Date"
+            df = df.fillna({"Open": 0, "High": 0, "Low": 0, "Close": 0, "Volume": 0})
 
             # 计算均线
             df["MA5"] = df["Close"].rolling(window=5).mean()
@@ -208,6 +212,7 @@ class ScreenshotService:
         include_volume: bool = True,
         include_macd: bool = True,
         output_dir: Optional[Path] = None,
+        bars: Optional[Dict[str, np.ndarray]] = None,
     ) -> Optional[str]:
         """
         生成单只股票的K线截图
@@ -220,12 +225,13 @@ class ScreenshotService:
             include_volume: 是否包含成交量
             include_macd: 是否包含MACD
             output_dir: 输出目录
+            bars: 预先批量加载的列数组 (可选)
 
         Returns:
             生成的文件路径，失败返回None
         """
         # 获取K线数据
-        df = self._get_kline_data(ticker, timeframe, limit)
+        df = self._get_kline_data(ticker, timeframe, limit, bars=bars)
         if df is None or df.empty:
             return None
 
@@ -360,6 +366,11 @@ class ScreenshotService:
 
         logger.info(f"开始批量生成截图: {len(stock_list)} 只股票")
 
+        # 一次查询加载所有股票的K线
+        bars_by_ticker = self._load_bars(
+            [ticker for ticker, _ in stock_list], timeframe, limit
+        )
+
         # 逐个生成
         generated_files = []
         failed_tickers = []
@@ -373,6 +384,7 @@ class ScreenshotService:
                 include_volume=include_volume,
                 include_macd=include_macd,
                 output_dir=output_dir,
+                bars=bars_by_ticker.get(ticker, {}),
             )
 
             if filepath:
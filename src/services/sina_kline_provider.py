@@ -2,12 +2,18 @@
 新浪财经K线数据提供者
 用于获取分钟级K线数据
 """
+import asyncio
 import time
+
+import httpx
 import requests
 from typing import List, Optional
 from datetime import datetime
 import pandas as pd
 
+from src.config import get_settings
+from src.services.http_clients import get_http_clients
+from src.services.rate_limiter import TokenBucket, configure_rate_limiter, get_rate_limiter
 from src.utils.logging import get_logger
 
 LOGGER = get_logger(__name__)
@@ -26,6 +32,11 @@ class SinaKlineProvider:
 
     BASE_URL = "https://money.finance.sina.com.cn/quotes_service/api/json_v2.php/CN_MarketData.getKLineData"
 
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'Referer': 'https://finance.sina.com.cn/'
+    }
+
     # 周期映射
     PERIOD_MAP = {
         "5m": 5,
@@ -37,7 +48,7 @@ class SinaKlineProvider:
 
     def __init__(
         self,
-        delay: float = 3.0,
+        delay: Optional[float] = None,
         max_consecutive_failures: int = 5,
         backoff_base: float = 5.0,
         backoff_max: float = 60.0,
@@ -46,29 +57,36 @@ class SinaKlineProvider:
         初始化
 
         Args:
-            delay: 请求间隔（秒），默认3秒（保守策略）
+            delay: 兼容旧参数：请求频率由进程内共享的 sina 令牌桶控制，
+                   传 0 表示不限流（仅测试使用）
             max_consecutive_failures: 连续失败多少次后中止批量请求
             backoff_base: 指数退避基础秒数
             backoff_max: 指数退避最大秒数
         """
         self.delay = delay
+        self.rate_limiter = None if delay == 0 else self._shared_rate_limiter()
         self.max_consecutive_failures = max_consecutive_failures
         self.backoff_base = backoff_base
         self.backoff_max = backoff_max
 
         self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Referer': 'https://finance.sina.com.cn/'
-        })
-        self._last_request_time = 0
+        self.session.headers.update(self.HEADERS)
         self._consecutive_failures = 0
         self._rate_limited = False
         LOGGER.info(
-            f"SinaKlineProvider 初始化，请求间隔: {delay}秒, "
+            f"SinaKlineProvider 初始化，限流: "
+            f"{f'{self.rate_limiter.per_minute:g}次/分钟' if self.rate_limiter else '无'}, "
             f"最大连续失败: {max_consecutive_failures}"
         )
 
+    @staticmethod
+    def _shared_rate_limiter() -> TokenBucket:
+        """sina 令牌桶，SINA_CALLS_PER_MINUTE > 0 时按配置调整额度"""
+        per_minute = get_settings().sina_calls_per_minute
+        if per_minute > 0:
+            return configure_rate_limiter("sina", per_minute)
+        return get_rate_limiter("sina")
+
     @property
     def consecutive_failures(self) -> int:
         """Current consecutive failure count (read-only)."""
@@ -85,14 +103,16 @@ class SinaKlineProvider:
         self._rate_limited = False
 
     def _wait_for_rate_limit(self):
-        """等待以满足频率限制"""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self.delay:
-            sleep_time = self.delay - elapsed
-            time.sleep(sleep_time)
-        self._last_request_time = time.time()
+        """等待以满足频率限制（共享 sina 令牌桶，未超额时不等待）"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
 
-    def _backoff_sleep(self):
+    async def _wait_for_rate_limit_async(self):
+        """协程版 _wait_for_rate_limit，与同步调用共用同一个令牌桶"""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async()
+
+    def _backoff_seconds(self) -> float:
         """Exponential backoff based on consecutive failure count."""
         exponent = max(0, self._consecutive_failures - 1)
         sleep_secs = min(self.backoff_base * (2 ** exponent), self.backoff_max)
@@ -100,7 +120,40 @@ class SinaKlineProvider:
             f"Rate-limited — backing off {sleep_secs:.1f}s "
             f"(consecutive failures: {self._consecutive_failures})"
         )
-        time.sleep(sleep_secs)
+        return sleep_secs
+
+    def _backoff_sleep(self):
+        time.sleep(self._backoff_seconds())
+
+    async def _backoff_sleep_async(self):
+        await asyncio.sleep(self._backoff_seconds())
+
+    def _on_rate_limited(self, ticker: str, status_code: int):
+        self._consecutive_failures += 1
+        self._rate_limited = True
+        LOGGER.warning(
+            f"{ticker} 被限流 (HTTP {status_code})，"
+            f"连续失败: {self._consecutive_failures}"
+        )
+
+    def _on_failure(self, ticker: str, action: str, error: Exception):
+        self._consecutive_failures += 1
+        LOGGER.warning(
+            f"{ticker} {action}失败: {error} "
+            f"(连续失败: {self._consecutive_failures})"
+        )
+
+    def _build_params(self, ticker: str, period: str, limit: int) -> Optional[dict]:
+        """构造请求参数，周期不支持时返回 None"""
+        if period not in self.PERIOD_MAP:
+            LOGGER.error(f"不支持的周期: {period}")
+            return None
+        return {
+            'symbol': self._convert_ticker(ticker),
+            'scale': self.PERIOD_MAP[period],
+            'ma': 'no',
+            'datalen': min(limit, 1023)
+        }
 
     def _convert_ticker(self, ticker: str) -> str:
         """
@@ -136,33 +189,18 @@ class SinaKlineProvider:
         Returns:
             DataFrame with columns: timestamp, open, high, low, close, volume
         """
-        if period not in self.PERIOD_MAP:
-            LOGGER.error(f"不支持的周期: {period}")
+        params = self._build_params(ticker, period, limit)
+        if params is None:
             return None
 
-        scale = self.PERIOD_MAP[period]
-        symbol = self._convert_ticker(ticker)
-
         self._wait_for_rate_limit()
 
         try:
-            params = {
-                'symbol': symbol,
-                'scale': scale,
-                'ma': 'no',
-                'datalen': min(limit, 1023)
-            }
-
             response = self.session.get(self.BASE_URL, params=params, timeout=10)
 
             # --- rate-limit detection ---
             if response.status_code in RATE_LIMIT_CODES:
-                self._consecutive_failures += 1
-                self._rate_limited = True
-                LOGGER.warning(
-                    f"{ticker} 被限流 (HTTP {response.status_code})，"
-                    f"连续失败: {self._consecutive_failures}"
-                )
+                self._on_rate_limited(ticker, response.status_code)
                 self._backoff_sleep()
                 return None
 
@@ -172,53 +210,96 @@ class SinaKlineProvider:
             self._consecutive_failures = 0
             self._rate_limited = False
 
-            # 解析JSON响应
-            data = response.json()
+            return self._parse_klines(response.json(), ticker)
 
-            if not data:
-                LOGGER.debug(f"{ticker} 无数据返回")
-                return None
+        except requests.exceptions.RequestException as e:
+            self._on_failure(ticker, "请求", e)
+            return None
+        except Exception as e:
+            self._on_failure(ticker, "解析", e)
+            return None
 
-            # 转换为DataFrame
-            df = pd.DataFrame(data)
+    async def fetch_kline_async(
+        self,
+        ticker: str,
+        period: str = "30m",
+        limit: int = 500
+    ) -> Optional[pd.DataFrame]:
+        """
+        fetch_kline 的协程版本
 
-            # 重命名列
-            df = df.rename(columns={
-                'day': 'timestamp',
-                'open': 'open',
-                'high': 'high',
-                'low': 'low',
-                'close': 'close',
-                'volume': 'volume'
-            })
+        通过共享 HTTP 连接池请求，限流、退避与连续失败计数与同步版本一致，
+        可由多个协程并发调用同一实例。
 
-            # 转换数据类型
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            for col in ['open', 'high', 'low', 'close']:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            df['volume'] = pd.to_numeric(df['volume'], errors='coerce').fillna(0).astype(int)
+        Args:
+            ticker: 6位股票代码
+            period: 周期 (5m, 15m, 30m, 60m)
+            limit: 获取数量，最大1023
 
-            # 添加ticker列
-            df['ticker'] = ticker
+        Returns:
+            DataFrame with columns: timestamp, open, high, low, close, volume
+        """
+        params = self._build_params(ticker, period, limit)
+        if params is None:
+            return None
 
-            LOGGER.debug(f"{ticker} 获取 {len(df)} 条K线")
-            return df
+        await self._wait_for_rate_limit_async()
 
-        except requests.exceptions.RequestException as e:
-            self._consecutive_failures += 1
-            LOGGER.warning(
-                f"{ticker} 请求失败: {e} "
-                f"(连续失败: {self._consecutive_failures})"
+        try:
+            response = await get_http_clients().get(
+                self.BASE_URL, params=params, headers=self.HEADERS, timeout=10.0
             )
+
+            if response.status_code in RATE_LIMIT_CODES:
+                self._on_rate_limited(ticker, response.status_code)
+                await self._backoff_sleep_async()
+                return None
+
+            response.raise_for_status()
+
+            self._consecutive_failures = 0
+            self._rate_limited = False
+
+            return self._parse_klines(response.json(), ticker)
+
+        except httpx.HTTPError as e:
+            self._on_failure(ticker, "请求", e)
             return None
         except Exception as e:
-            self._consecutive_failures += 1
-            LOGGER.warning(
-                f"{ticker} 解析失败: {e} "
-                f"(连续失败: {self._consecutive_failures})"
-            )
+            self._on_failure(ticker, "解析", e)
+            return None
+
+    def _parse_klines(self, data, ticker: str) -> Optional[pd.DataFrame]:
+        """解析新浪K线JSON为DataFrame"""
+        if not data:
+            LOGGER.debug(f"{ticker} 无数据返回")
             return None
 
+        # 转换为DataFrame
+        df = pd.DataFrame(data)
+
+        # 重命名列
+        df = df.rename(columns={
+            'day': 'timestamp',
+            'open': 'open',
+            'high': 'high',
+            'low': 'low',
+            'close': 'close',
+            'volume': 'volume'
+        })
+
+        # 转换数据类型
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        for col in ['open', 'high', 'low', 'close']:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        df['volume'] = pd.to_numeric(df['volume'], errors='coerce').fillna(0).astype(int)
+
+        # 添加ticker列
+        df['ticker'] = ticker
+
+        LOGGER.debug(f"{ticker} 获取 {len(df)} 条K线")
+        return df
+
     def fetch_batch(
         self,
         tickers: List[str],
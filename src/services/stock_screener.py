@@ -1,126 +1,167 @@
 """
 股票筛选器 - 基于技术指标的选股规则引擎
+
+规则在 technical_indicators_latest 快照（每只股票最新两个交易日的指标）上
+整表向量化求值：一次读取快照，所有规则各算一个布尔掩码，
+耗时只与股票数有关，与指标历史长度无关。
 """
-from typing import List, Dict, Optional
-from sqlalchemy import text
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+from sqlalchemy.orm import Session
+
 from src.database import SessionLocal
+from src.models.technical_indicator import INDICATOR_COLUMNS
+from src.repositories.technical_indicator_repository import TechnicalIndicatorRepository
+
+# 快照中参与计算的数值列
+_NUMERIC_COLUMNS = INDICATOR_COLUMNS + tuple(f"prev_{column}" for column in INDICATOR_COLUMNS)
+
+
+@dataclass(frozen=True)
+class ScreenRule:
+    """
+    选股规则
+
+    Attributes:
+        key: 结果分组名
+        signal: 信号名称
+        condition: 快照 DataFrame -> 布尔 Series（整表向量化条件，NaN 比较为 False）
+        details: 输出字段 -> 快照列
+    """
+
+    key: str
+    signal: str
+    condition: Callable[[pd.DataFrame], pd.Series]
+    details: Dict[str, str] = field(default_factory=dict)
+
+
+def golden_cross_rule() -> ScreenRule:
+    """MA5 上穿 MA10"""
+    return ScreenRule(
+        key="golden_cross",
+        signal="MA金叉",
+        condition=lambda f: (f["prev_ma5"] < f["prev_ma10"]) & (f["ma5"] > f["ma10"]),
+        details={"ma5": "ma5", "ma10": "ma10"},
+    )
+
+
+def macd_golden_cross_rule() -> ScreenRule:
+    """MACD DIF 上穿 DEA"""
+    return ScreenRule(
+        key="macd_golden_cross",
+        signal="MACD金叉",
+        condition=lambda f: (f["prev_macd_dif"] < f["prev_macd_dea"]) & (f["macd_dif"] > f["macd_dea"]),
+        details={"dif": "macd_dif", "dea": "macd_dea"},
+    )
+
+
+def oversold_bounce_rule(rsi_threshold: float = 30) -> ScreenRule:
+    """RSI6 从阈值下方回升"""
+    return ScreenRule(
+        key="oversold_bounce",
+        signal="超卖反弹",
+        condition=lambda f: (f["prev_rsi6"] < rsi_threshold) & (f["rsi6"] > f["prev_rsi6"]),
+        details={"rsi6": "rsi6", "prev_rsi6": "prev_rsi6"},
+    )
+
+
+def bollinger_breakout_rule() -> ScreenRule:
+    """布林带突破"""
+    # 需要获取当前价格来比较，这里简化处理
+    return ScreenRule(
+        key="bollinger_breakout",
+        signal="布林突破",
+        condition=lambda f: f["boll_upper"].notna(),
+        details={"upper": "boll_upper", "mid": "boll_mid", "lower": "boll_lower"},
+    )
+
+
+# run_all_screens 默认执行的规则
+DEFAULT_RULES = (golden_cross_rule(), macd_golden_cross_rule(), oversold_bounce_rule())
+
+
+def evaluate_rules(snapshot: pd.DataFrame, rules: Iterable[ScreenRule]) -> Dict[str, List[Dict]]:
+    """
+    在快照上一次性求值多条规则
+
+    Args:
+        snapshot: 快照 DataFrame（ticker、trade_date 及指标列）
+        rules: 规则列表
+
+    Returns:
+        {规则 key: [{'ticker', 'date', 明细字段..., 'signal'}]}
+    """
+    results: Dict[str, List[Dict]] = {}
+    for rule in rules:
+        if snapshot.empty:
+            results[rule.key] = []
+            continue
+        matched = snapshot.loc[rule.condition(snapshot).fillna(False).astype(bool)]
+        columns = ["ticker", "trade_date", *rule.details.values()]
+        renamed = matched[columns].set_axis(["ticker", "date", *rule.details.keys()], axis=1)
+        records = renamed.astype(object).where(renamed.notna(), None).to_dict("records")
+        for record in records:
+            record["signal"] = rule.signal
+        results[rule.key] = records
+    return results
 
 
 class StockScreener:
     """技术指标选股器"""
-    
-    def __init__(self):
-        self.session = SessionLocal()
-    
+
+    def __init__(self, session: Optional[Session] = None):
+        self._owns_session = session is None
+        self.session = session or SessionLocal()
+        self.repo = TechnicalIndicatorRepository(self.session)
+
     def close(self):
-        self.session.close()
-    
+        if self._owns_session:
+            self.session.close()
+
     def get_latest_indicators(self, ticker: str) -> Optional[Dict]:
         """获取股票最新的技术指标"""
-        result = self.session.execute(text("""
-            SELECT * FROM technical_indicators 
-            WHERE ticker = :ticker 
-            ORDER BY trade_date DESC LIMIT 2
-        """), {'ticker': ticker}).fetchall()
-        
+        result = self.repo.find_latest(ticker)
+
         if len(result) < 2:
             return None
-        
-        cols = ['id', 'ticker', 'trade_date', 'ma5', 'ma10', 'ma20', 'ma60',
-                'macd_dif', 'macd_dea', 'macd_hist', 'rsi6', 'rsi12', 'rsi24',
-                'boll_upper', 'boll_mid', 'boll_lower', 'volume_ratio', 'turnover_rate', 'created_at']
-        
-        current = dict(zip(cols, result[0]))
-        previous = dict(zip(cols, result[1]))
-        
-        return {'current': current, 'previous': previous}
-    
+
+        return {'current': result[0], 'previous': result[1]}
+
+    def load_snapshot(self) -> pd.DataFrame:
+        """读取指标快照（快照尚未建立时直接从历史表计算，不写库）"""
+        rows = self.repo.find_snapshot() or self.repo.compute_snapshot()
+        frame = pd.DataFrame(
+            rows,
+            columns=["ticker", "trade_date", "prev_trade_date", *_NUMERIC_COLUMNS],
+        )
+        frame[list(_NUMERIC_COLUMNS)] = frame[list(_NUMERIC_COLUMNS)].astype(float)
+        return frame
+
+    def screen(self, rules: Iterable[ScreenRule]) -> Dict[str, List[Dict]]:
+        """读取一次快照并求值多条规则"""
+        return evaluate_rules(self.load_snapshot(), rules)
+
     def screen_golden_cross(self) -> List[Dict]:
         """筛选金叉股票 (MA5上穿MA10)"""
-        results = self.session.execute(text("""
-            WITH ranked AS (
-                SELECT ticker, trade_date, ma5, ma10,
-                       LAG(ma5) OVER (PARTITION BY ticker ORDER BY trade_date) as prev_ma5,
-                       LAG(ma10) OVER (PARTITION BY ticker ORDER BY trade_date) as prev_ma10,
-                       ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY trade_date DESC) as rn
-                FROM technical_indicators
-                WHERE ma5 IS NOT NULL AND ma10 IS NOT NULL
-            )
-            SELECT ticker, trade_date, ma5, ma10, prev_ma5, prev_ma10
-            FROM ranked
-            WHERE rn = 1
-              AND prev_ma5 < prev_ma10  -- 之前在下方
-              AND ma5 > ma10            -- 现在在上方
-        """)).fetchall()
-        
-        return [{'ticker': r[0], 'date': r[1], 'ma5': r[2], 'ma10': r[3], 
-                 'signal': 'MA金叉'} for r in results]
-    
+        return self.screen([golden_cross_rule()])['golden_cross']
+
     def screen_macd_golden_cross(self) -> List[Dict]:
         """筛选MACD金叉 (DIF上穿DEA)"""
-        results = self.session.execute(text("""
-            WITH ranked AS (
-                SELECT ticker, trade_date, macd_dif, macd_dea,
-                       LAG(macd_dif) OVER (PARTITION BY ticker ORDER BY trade_date) as prev_dif,
-                       LAG(macd_dea) OVER (PARTITION BY ticker ORDER BY trade_date) as prev_dea,
-                       ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY trade_date DESC) as rn
-                FROM technical_indicators
-                WHERE macd_dif IS NOT NULL AND macd_dea IS NOT NULL
-            )
-            SELECT ticker, trade_date, macd_dif, macd_dea
-            FROM ranked
-            WHERE rn = 1
-              AND prev_dif < prev_dea
-              AND macd_dif > macd_dea
-        """)).fetchall()
-        
-        return [{'ticker': r[0], 'date': r[1], 'dif': r[2], 'dea': r[3],
-                 'signal': 'MACD金叉'} for r in results]
-    
+        return self.screen([macd_golden_cross_rule()])['macd_golden_cross']
+
     def screen_oversold_bounce(self, rsi_threshold: float = 30) -> List[Dict]:
         """筛选超卖反弹 (RSI从<30回升)"""
-        results = self.session.execute(text("""
-            WITH ranked AS (
-                SELECT ticker, trade_date, rsi6, rsi12,
-                       LAG(rsi6) OVER (PARTITION BY ticker ORDER BY trade_date) as prev_rsi6,
-                       ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY trade_date DESC) as rn
-                FROM technical_indicators
-                WHERE rsi6 IS NOT NULL
-            )
-            SELECT ticker, trade_date, rsi6, prev_rsi6
-            FROM ranked
-            WHERE rn = 1
-              AND prev_rsi6 < :threshold
-              AND rsi6 > prev_rsi6
-        """), {'threshold': rsi_threshold}).fetchall()
-        
-        return [{'ticker': r[0], 'date': r[1], 'rsi6': r[2], 'prev_rsi6': r[3],
-                 'signal': '超卖反弹'} for r in results]
-    
+        return self.screen([oversold_bounce_rule(rsi_threshold)])['oversold_bounce']
+
     def screen_bollinger_breakout(self) -> List[Dict]:
         """筛选布林带突破 (价格突破上轨)"""
-        results = self.session.execute(text("""
-            SELECT t.ticker, t.trade_date, t.boll_upper, t.boll_mid, t.boll_lower
-            FROM technical_indicators t
-            INNER JOIN (
-                SELECT ticker, MAX(trade_date) as max_date
-                FROM technical_indicators
-                GROUP BY ticker
-            ) latest ON t.ticker = latest.ticker AND t.trade_date = latest.max_date
-            WHERE t.boll_upper IS NOT NULL
-        """)).fetchall()
-        
-        # 需要获取当前价格来比较，这里简化处理
-        return [{'ticker': r[0], 'date': r[1], 'upper': r[2], 'mid': r[3], 'lower': r[4],
-                 'signal': '布林突破'} for r in results]
-    
+        return self.screen([bollinger_breakout_rule()])['bollinger_breakout']
+
     def run_all_screens(self) -> Dict[str, List[Dict]]:
         """运行所有筛选规则"""
-        return {
-            'golden_cross': self.screen_golden_cross(),
-            'macd_golden_cross': self.screen_macd_golden_cross(),
-            'oversold_bounce': self.screen_oversold_bounce(),
-        }
+        return self.screen(DEFAULT_RULES)
 
 
 def get_screener_results() -> Dict:
@@ -4,10 +4,13 @@
 """
 
 import asyncio
+import math
 import time
+from datetime import datetime
 from typing import TYPE_CHECKING
 
 from src.models import KlineTimeframe, SymbolType, Watchlist
+from src.repositories.market_stats_repository import MarketStatsRepository
 from src.services.kline_service import KlineService
 from src.utils.logging import get_logger
 
@@ -20,6 +23,17 @@ logger = get_logger(__name__)
 # Circuit-breaker threshold — abort after this many consecutive None results
 CIRCUIT_BREAKER_THRESHOLD = 10
 
+# 自选股30分钟更新: 写入任务每批提交的股票数，及未满一批时的最长等待秒数
+WATCHLIST_30M_BATCH_SIZE = 50
+WATCHLIST_30M_FLUSH_SECONDS = 2.0
+
+# 横截面模式: 检查最近多少个交易日的覆盖情况 (与原逐只更新的20条一致)
+CROSS_SECTION_LOOKBACK_DAYS = 20
+# 某交易日个股日线条数低于股票总数的该比例时视为缺失 (容忍停牌)
+CROSS_SECTION_COVERAGE_RATIO = 0.9
+# 横截面写入每次 executemany 的行数 (约一个交易日的全市场)
+CROSS_SECTION_CHUNK_SIZE = 6000
+
 
 class StockUpdater:
     """股票K线更新器"""
@@ -96,13 +110,20 @@ class StockUpdater:
         logger.info(f"自选股日线更新完成，共 {total_updated} 条，失败 {failed_count} 个")
         return total_updated
 
-    async def update_watchlist_30m(self) -> int:
+    async def update_watchlist_30m(self, workers: int | None = None) -> int:
         """更新自选股30分钟K线数据 (新浪财经)
 
-        Runs the synchronous SinaKlineProvider in a thread so the event loop
-        stays responsive.  Includes a circuit-breaker: aborts if 10+
-        consecutive stocks return None (likely rate-limited).
+        Fetches concurrently with ``SinaKlineProvider.fetch_kline_async``:
+        a bounded pool of fetch coroutines draws from the shared sina rate
+        budget, and a single writer task upserts results in batches as they
+        arrive, so early tickers are committed while the rest are in flight.
+        Circuit-breaker: aborts after 10+ consecutive empty results, or when
+        the provider reports too many consecutive failures.
+
+        Args:
+            workers: 并发抓取数，默认 WATCHLIST_30M_WORKERS
         """
+        from src.config import get_settings
         from src.services.sina_kline_provider import SinaKlineProvider
 
         logger.info("开始更新自选股30分钟数据...")
@@ -112,91 +133,315 @@ class StockUpdater:
             logger.info("自选股列表为空，跳过更新")
             return 0
 
-        logger.info(f"共 {len(tickers)} 只自选股需要更新")
-        provider = SinaKlineProvider(delay=0.5)
+        workers = workers or get_settings().watchlist_30m_workers
+        logger.info(f"共 {len(tickers)} 只自选股需要更新，并发 {workers}")
+        provider = SinaKlineProvider()
         kline_service = KlineService(self.kline_repo, self.symbol_repo)
 
-        # Offload the blocking loop to a thread
-        total_updated = await asyncio.to_thread(
-            self._sync_update_30m, tickers, provider, kline_service
-        )
-        return total_updated
+        return await self._concurrent_update_30m(tickers, provider, kline_service, workers)
 
-    def _sync_update_30m(
+    async def _concurrent_update_30m(
         self,
         tickers: list[str],
         provider,
         kline_service,
+        workers: int,
     ) -> int:
-        """Synchronous inner loop for 30-min updates (runs in a thread)."""
-        total_updated = 0
-        failed_count = 0
+        """Fan out 30-min fetches to *workers* coroutines; one writer persists batches."""
+        start_time = time.time()
+        pending = iter(tickers)
+        results: asyncio.Queue = asyncio.Queue(maxsize=WATCHLIST_30M_BATCH_SIZE * 2)
+        stop = asyncio.Event()
         consecutive_none = 0
-
-        for i, ticker in enumerate(tickers):
-            # Circuit breaker
-            if consecutive_none >= CIRCUIT_BREAKER_THRESHOLD:
-                logger.warning(
-                    f"连续 {consecutive_none} 只股票返回空数据，"
-                    f"中止30分钟更新 (已处理 {i}/{len(tickers)})"
-                )
-                break
-
-            # Also honour the provider-level circuit breaker
-            if provider.consecutive_failures >= provider.max_consecutive_failures:
-                logger.warning(
-                    f"SinaKlineProvider 连续 {provider.consecutive_failures} 次请求失败，"
-                    f"中止30分钟更新 (已处理 {i}/{len(tickers)})"
-                )
-                break
-
-            try:
-                df = provider.fetch_kline(ticker, period="30m", limit=500)
+        attempted = 0
+
+        def trip(reason: str) -> None:
+            if not stop.is_set():
+                logger.warning(f"{reason}，中止30分钟更新 (已处理 {attempted}/{len(tickers)})")
+                stop.set()
+
+        async def fetch_worker() -> None:
+            nonlocal consecutive_none, attempted
+            # 所有协程共用同一个迭代器，每只股票只会被取走一次
+            for ticker in pending:
+                if stop.is_set():
+                    return
+                if provider.consecutive_failures >= provider.max_consecutive_failures:
+                    trip(f"SinaKlineProvider 连续 {provider.consecutive_failures} 次请求失败")
+                    return
+
+                attempted += 1
+                df = await provider.fetch_kline_async(ticker, period="30m", limit=500)
                 if df is None or df.empty:
                     consecutive_none += 1
                     logger.debug(f"{ticker} 无30分钟数据 (连续空: {consecutive_none})")
+                    if consecutive_none >= CIRCUIT_BREAKER_THRESHOLD:
+                        trip(f"连续 {consecutive_none} 只股票返回空数据")
                     continue
 
                 # Got data — reset streak
                 consecutive_none = 0
+                await results.put((ticker, df))
 
-                klines = []
-                for _, row in df.iterrows():
-                    klines.append({
-                        "datetime": row["timestamp"].strftime("%Y-%m-%d %H:%M:%S"),
-                        "open": row["open"],
-                        "high": row["high"],
-                        "low": row["low"],
-                        "close": row["close"],
-                        "volume": row["volume"],
-                        "amount": 0,
-                    })
+        fetchers = [asyncio.create_task(fetch_worker()) for _ in range(max(1, workers))]
+        writer = asyncio.create_task(self._write_30m_batches(results, kline_service))
+        # 写入任务异常退出时取消抓取，避免抓取协程阻塞在已满的队列上
+        writer.add_done_callback(lambda _: [task.cancel() for task in fetchers])
+        try:
+            try:
+                await asyncio.gather(*fetchers)
+            except asyncio.CancelledError:
+                if not writer.done():
+                    raise
+            if not writer.done():
+                await results.put(None)
+            total_updated, failed_count, written = await writer
+        finally:
+            writer.cancel()
+            for task in fetchers:
+                task.cancel()
+
+        elapsed = time.time() - start_time
+        logger.info(
+            f"自选股30分钟更新完成，{written} 只共 {total_updated} 条，"
+            f"失败 {failed_count} 个，耗时 {elapsed:.1f}秒"
+        )
+        return total_updated
 
-                count = kline_service.save_klines(
-                    symbol_type=SymbolType.STOCK,
-                    symbol_code=ticker,
-                    symbol_name=None,
-                    timeframe=KlineTimeframe.MINS_30,
-                    klines=klines,
+    async def _write_30m_batches(
+        self,
+        results: asyncio.Queue,
+        kline_service,
+    ) -> tuple[int, int, int]:
+        """
+        写入任务：从队列取 (ticker, DataFrame)，攒够一批或等待超时后写入并提交
+
+        队列中的 None 表示抓取结束。
+
+        Returns:
+            (写入条数, 失败股票数, 成功股票数)
+        """
+        loop = asyncio.get_running_loop()
+        total_updated = failed_count = written = 0
+        batch: list = []
+        done = False
+
+        while not done:
+            # 第一条结果到达后开始计时，最多等待 WATCHLIST_30M_FLUSH_SECONDS 凑满一批
+            deadline = None
+            while len(batch) < WATCHLIST_30M_BATCH_SIZE:
+                timeout = None if deadline is None else deadline - loop.time()
+                if timeout is not None and timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(results.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = loop.time() + WATCHLIST_30M_FLUSH_SECONDS
+
+            if batch:
+                count, failed = await asyncio.to_thread(
+                    self._save_30m_batch, batch, kline_service
                 )
                 total_updated += count
+                failed_count += failed
+                written += len(batch) - failed
+                logger.info(f"  30分钟写入: {written} 只, 共 {total_updated} 条")
+                batch = []
+
+        return total_updated, failed_count, written
+
+    def _save_30m_batch(self, batch: list, kline_service) -> tuple[int, int]:
+        """Upsert one batch of 30-min frames and commit (runs in a thread).
+
+        Each ticker is written inside a SAVEPOINT, so a failed ticker is rolled
+        back on its own and the rest of the batch still commits.
+        """
+        session = self.kline_repo.session
+        total_updated = 0
+        failed_count = 0
+
+        for ticker, df in batch:
+            try:
+                klines = df.assign(
+                    datetime=df["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S"),
+                    amount=0,
+                )[["datetime", "open", "high", "low", "close", "volume", "amount"]].to_dict("records")
+
+                with session.begin_nested():
+                    count = kline_service.save_klines(
+                        symbol_type=SymbolType.STOCK,
+                        symbol_code=ticker,
+                        symbol_name=None,
+                        timeframe=KlineTimeframe.MINS_30,
+                        klines=klines,
+                    )
+                total_updated += count
                 logger.debug(f"{ticker} 30分钟: {count} 条")
 
             except Exception as e:
                 logger.warning(f"{ticker} 30分钟更新失败: {e}")
                 failed_count += 1
+
+        session.commit()
+        return total_updated, failed_count
+
+    async def update_all_daily(self, by_trade_date: bool = True) -> int:
+        """
+        更新全市场股票日线数据 (Tushare Pro)
+
+        默认按交易日横截面更新: 每个缺失的交易日调用一次 ``daily(trade_date=...)``
+        获取全市场数据并批量写入，夜间增量只需少量请求。交易日历不可用时
+        回退到逐只股票更新。
+
+        Args:
+            by_trade_date: 是否使用按交易日横截面模式
+        """
+        if by_trade_date:
+            # 缺失交易日的查询和写入都在线程中执行，不阻塞事件循环
+            updated = await asyncio.to_thread(self._sync_update_all_daily_by_trade_date)
+            if updated is not None:
+                return updated
+            logger.warning("交易日历为空，回退到逐只股票更新全市场日线")
+
+        return await self._update_all_daily_per_ticker()
+
+    def _get_missing_trade_dates(
+        self,
+        lookback_days: int = CROSS_SECTION_LOOKBACK_DAYS,
+        today: str | None = None,
+    ) -> list[str] | None:
+        """
+        找出最近 lookback_days 个交易日中全市场日线未覆盖完整的交易日
+
+        某交易日的个股日线条数低于股票总数 × CROSS_SECTION_COVERAGE_RATIO
+        即视为缺失 (停牌股票本就没有K线，不要求100%覆盖)。
+
+        Returns:
+            升序的交易日列表 (YYYY-MM-DD)；交易日历为空时返回 None
+        """
+        from sqlalchemy import func
+
+        from src.models import Kline, SymbolMetadata, TradeCalendar
+
+        session = self.kline_repo.session
+        today = today or datetime.now().strftime("%Y-%m-%d")
+
+        recent_days = [
+            row[0]
+            for row in session.query(TradeCalendar.date)
+            .filter(TradeCalendar.is_trading_day == 1, TradeCalendar.date <= today)
+            .order_by(TradeCalendar.date.desc())
+            .limit(lookback_days)
+            .all()
+        ]
+        if not recent_days:
+            return None
+        recent_days.reverse()
+
+        expected = session.query(func.count(SymbolMetadata.ticker)).scalar() or 0
+        threshold = math.ceil(expected * CROSS_SECTION_COVERAGE_RATIO)
+
+        coverage = dict(
+            session.query(Kline.trade_time, func.count(Kline.id))
+            .filter(
+                Kline.symbol_type == SymbolType.STOCK,
+                Kline.timeframe == KlineTimeframe.DAY,
+                Kline.trade_time >= recent_days[0],
+                Kline.trade_time <= recent_days[-1],
+            )
+            .group_by(Kline.trade_time)
+            .all()
+        )
+
+        # 股票元数据为空时 threshold 为 0，此时只把完全没有数据的交易日视为缺失
+        return [
+            day for day in recent_days
+            if coverage.get(day, 0) < max(threshold, 1)
+        ]
+
+    def _sync_update_all_daily_by_trade_date(
+        self, trade_dates: list[str] | None = None
+    ) -> int | None:
+        """Cross-sectional inner loop: one Tushare call per trade date (runs in a thread).
+
+        Args:
+            trade_dates: 要更新的交易日，None 表示取 _get_missing_trade_dates()
+
+        Returns:
+            写入条数；交易日历为空时返回 None
+        """
+        from src.models import SymbolMetadata
+        from src.services.tushare_data_provider import TushareDataProvider
+
+        if trade_dates is None:
+            trade_dates = self._get_missing_trade_dates()
+            if trade_dates is None:
+                return None
+
+        logger.info("=" * 50)
+        logger.info(f"开始按交易日更新全市场日线，缺失交易日 {len(trade_dates)} 个")
+        logger.info("=" * 50)
+
+        if not trade_dates:
+            logger.info("全市场日线已是最新，无需更新")
+            return 0
+
+        session = self.kline_repo.session
+        universe = {t[0] for t in session.query(SymbolMetadata.ticker).all()}
+        provider = TushareDataProvider()
+
+        total_updated = 0
+        start_time = time.time()
+
+        for trade_date in trade_dates:
+            try:
+                frame = provider.fetch_daily_cross_section(trade_date)
+            except Exception as e:
+                logger.warning(f"{trade_date} 全市场日线获取失败: {e}")
                 continue
 
-            # 每50只股票打印一次进度
-            if (i + 1) % 50 == 0:
-                logger.info(f"  进度: {i + 1}/{len(tickers)}")
+            if frame.empty:
+                # 当日数据尚未发布（收盘后约 16:00 才可用），留待下次补齐
+                logger.info(f"{trade_date} 暂无全市场日线数据")
+                continue
 
-        logger.info(f"自选股30分钟更新完成，共 {total_updated} 条，失败 {failed_count} 个")
+            if universe:
+                frame = frame[frame["ticker"].isin(universe)]
+
+            count = self._upsert_cross_section(frame)
+            MarketStatsRepository(session).refresh()
+            session.commit()
+            total_updated += count
+            logger.info(f"{trade_date} 全市场日线: {count} 条")
+
+        elapsed = time.time() - start_time
+        logger.info("=" * 50)
+        logger.info(
+            f"全市场日线更新完成 | 耗时: {elapsed:.1f}秒 | "
+            f"交易日: {len(trade_dates)} | 共 {total_updated} 条"
+        )
+        logger.info("=" * 50)
         return total_updated
 
-    async def update_all_daily(self) -> int:
+    def _upsert_cross_section(self, frame) -> int:
+        """将一个交易日的全市场日线列式写入 klines（同时增量计算 MACD）"""
+        kline_service = KlineService(self.kline_repo, self.symbol_repo)
+        return kline_service.save_klines_columns(
+            frame.rename(columns={"ticker": "symbol_code"}),
+            symbol_type=SymbolType.STOCK,
+            timeframe=KlineTimeframe.DAY,
+            chunk_size=CROSS_SECTION_CHUNK_SIZE,
+        )
+
+    async def _update_all_daily_per_ticker(self) -> int:
         """
-        更新全市场股票日线数据 (新浪财经)
+        逐只股票更新全市场日线 (回退路径)
 
         每只股票只获取最近20条日线，用于每日增量更新
         预计耗时: 5450只 × 0.1秒 ≈ 9分钟
@@ -267,6 +512,10 @@ class StockUpdater:
                         f"预计剩余: {remaining/60:.1f}分钟"
                     )
 
+            # 全部写完后统一重算涉及交易日的市场汇总
+            MarketStatsRepository(self.kline_repo.session).refresh()
+            self.kline_repo.session.commit()
+
             elapsed = time.time() - start_time
             logger.info("=" * 50)
             logger.info(
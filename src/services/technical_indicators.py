@@ -8,6 +8,7 @@
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple
+from src.utils import indicators
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -88,104 +89,50 @@ class TechnicalIndicators:
 
     def _ma(self, data: np.ndarray, period: int) -> np.ndarray:
         """移动平均线"""
-        result = np.full(len(data), np.nan)
-        if len(data) >= period:
-            for i in range(period - 1, len(data)):
-                result[i] = np.mean(data[i - period + 1:i + 1])
-        return result
+        return indicators.sma(data, period)
 
     def _ema(self, data: np.ndarray, period: int) -> np.ndarray:
-        """指数移动平均线"""
-        result = np.full(len(data), np.nan)
-        if len(data) < period:
-            return result
-
-        # 初始值用简单平均
-        result[period - 1] = np.mean(data[:period])
-        multiplier = 2.0 / (period + 1)
-
-        for i in range(period, len(data)):
-            result[i] = (data[i] - result[i - 1]) * multiplier + result[i - 1]
-
-        return result
+        """指数移动平均线（以前 period 个有效值的均值为初值）"""
+        return indicators.ema(data, period, seed="sma")
 
     def _macd(
         self, close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """MACD 指标"""
-        ema_fast = self._ema(close, fast)
-        ema_slow = self._ema(close, slow)
-        dif = ema_fast - ema_slow
-        dea = self._ema(dif, signal)
-        macd = (dif - dea) * 2
-        return dif, dea, macd
+        return indicators.macd(close, fast, slow, signal, seed="sma")
 
     def _kdj(
         self, close: np.ndarray, high: np.ndarray, low: np.ndarray, n: int = 9
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """KDJ 指标"""
-        length = len(close)
-        k = np.full(length, 50.0)
-        d = np.full(length, 50.0)
+        close = np.asarray(close, dtype=float)
+        k = np.full(len(close), 50.0)
+        d = np.full(len(close), 50.0)
 
-        for i in range(n - 1, length):
-            high_n = np.max(high[i - n + 1:i + 1])
-            low_n = np.min(low[i - n + 1:i + 1])
+        if len(close) >= n:
+            high_n = indicators.rolling_max(high, n)[n - 1:]
+            low_n = indicators.rolling_min(low, n)[n - 1:]
+            spread = high_n - low_n
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rsv = np.where(spread != 0, (close[n - 1:] - low_n) / spread * 100, 50.0)
 
-            if high_n != low_n:
-                rsv = (close[i] - low_n) / (high_n - low_n) * 100
-            else:
-                rsv = 50
-
-            k[i] = 2 / 3 * k[i - 1] + 1 / 3 * rsv
-            d[i] = 2 / 3 * d[i - 1] + 1 / 3 * k[i]
+            # K = 2/3 * K[-1] + 1/3 * RSV, D = 2/3 * D[-1] + 1/3 * K，初值 50
+            k[n - 1:] = indicators.ema(rsv, n, alpha=1 / 3, init=50.0)
+            d[n - 1:] = indicators.ema(k[n - 1:], n, alpha=1 / 3, init=50.0)
 
         j = 3 * k - 2 * d
         return k, d, j
 
     def _rsi(self, close: np.ndarray, period: int = 14) -> np.ndarray:
         """RSI 指标"""
-        result = np.full(len(close), np.nan)
-        if len(close) < period + 1:
-            return result
-
-        # 计算价格变化
-        delta = np.diff(close)
-        gains = np.where(delta > 0, delta, 0)
-        losses = np.where(delta < 0, -delta, 0)
-
-        # 初始平均
-        avg_gain = np.mean(gains[:period])
-        avg_loss = np.mean(losses[:period])
-
-        if avg_loss == 0:
-            result[period] = 100
-        else:
-            rs = avg_gain / avg_loss
-            result[period] = 100 - (100 / (1 + rs))
-
-        # 后续值使用平滑
-        for i in range(period + 1, len(close)):
-            avg_gain = (avg_gain * (period - 1) + gains[i - 1]) / period
-            avg_loss = (avg_loss * (period - 1) + losses[i - 1]) / period
-
-            if avg_loss == 0:
-                result[i] = 100
-            else:
-                rs = avg_gain / avg_loss
-                result[i] = 100 - (100 / (1 + rs))
-
-        return result
+        return indicators.rsi(close, period)
 
     def _boll(
         self, close: np.ndarray, period: int = 20, std_dev: float = 2.0
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """布林带"""
         mid = self._ma(close, period)
-        std = np.full(len(close), np.nan)
-
-        for i in range(period - 1, len(close)):
-            std[i] = np.std(close[i - period + 1:i + 1])
+        std = indicators.rolling_std(close, period)
 
         upper = mid + std_dev * std
         lower = mid - std_dev * std
@@ -5,67 +5,24 @@ Tushare Pro API Client
 
 import time
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Optional
 
 import pandas as pd
 import tushare as ts
 
+from src.services.rate_limiter import configure_rate_limiter
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-class RateLimiter:
-    """
-    智能限流器，根据积分等级控制 API 调用频率
-
-    Tushare 限流规则：
-    - < 2000积分：约 60次/分钟
-    - 2000-5000积分：约 120次/分钟
-    - 5000+积分：约 200次/分钟
-    - 15000+积分：约 200-300次/分钟
-    """
-
-    def __init__(self, max_calls: int = 200, time_window: int = 60):
-        """
-        Args:
-            max_calls: 时间窗口内的最大调用次数
-            time_window: 时间窗口（秒）
-        """
-        self.max_calls = max_calls
-        self.time_window = time_window
-        self.calls: List[datetime] = []
-
-    def wait_if_needed(self):
-        """如果需要，等待直到可以发起新请求"""
-        now = datetime.now()
-
-        # 清理超出时间窗口的调用记录
-        cutoff = now - timedelta(seconds=self.time_window)
-        self.calls = [t for t in self.calls if t > cutoff]
-
-        # 如果已达到限制，等待
-        if len(self.calls) >= self.max_calls:
-            oldest = self.calls[0]
-            wait_time = (oldest + timedelta(seconds=self.time_window) - now).total_seconds()
-            if wait_time > 0:
-                logger.warning(
-                    f"达到调用限制 ({self.max_calls}次/{self.time_window}秒)，"
-                    f"等待 {wait_time:.1f} 秒"
-                )
-                time.sleep(wait_time + 0.1)  # 额外0.1秒缓冲
-
-        # 记录本次调用
-        self.calls.append(datetime.now())
-
-
 class TushareClient:
     """
     Tushare Pro API 客户端
 
     功能：
     - 封装所有常用的 Tushare API
-    - 自动限流（基于积分等级）
+    - 自动限流（基于积分等级，进程内所有实例共享 tushare 令牌桶）
     - 自动重试（失败后等待1秒重试）
     - 数据格式标准化
     """
@@ -81,7 +38,7 @@ class TushareClient:
         Args:
             token: Tushare Pro Token
             points: 积分等级（决定调用频率限制）
-            delay: 每次请求后的基础延迟（秒）
+            delay: 兼容旧配置保留，不再在每次请求后固定休眠（限流由令牌桶负责）
             max_retries: 最大重试次数
         """
         if not token:
@@ -100,11 +57,11 @@ class TushareClient:
             logger.error(f"Tushare 初始化失败: {e}")
             raise
 
-        # 根据积分等级设置 Rate Limiter
+        # 根据积分等级设置共享令牌桶
         max_calls_per_minute = self._get_max_calls(points)
-        self.rate_limiter = RateLimiter(max_calls=max_calls_per_minute, time_window=60)
+        self.rate_limiter = configure_rate_limiter("tushare", max_calls_per_minute)
 
-        logger.info(f"限流设置：{max_calls_per_minute} 次/分钟，基础延迟 {delay} 秒")
+        logger.info(f"限流设置：{max_calls_per_minute} 次/分钟")
 
     def _get_max_calls(self, points: int) -> int:
         """根据积分等级返回每分钟最大调用次数"""
@@ -133,15 +90,12 @@ class TushareClient:
         """
         for attempt in range(1, self.max_retries + 1):
             try:
-                # 限流等待
-                self.rate_limiter.wait_if_needed()
+                # 限流等待（未超额时不等待）
+                self.rate_limiter.acquire()
 
                 # 调用 API
                 df = func(*args, **kwargs)
 
-                # 基础延迟
-                time.sleep(self.delay)
-
                 return df if df is not None else pd.DataFrame()
 
             except Exception as e:
@@ -204,6 +204,48 @@ class TushareDataProvider:
 
         return frame
 
+    def fetch_daily_cross_section(self, trade_date: str) -> pd.DataFrame:
+        """
+        获取指定交易日的全市场日线（横截面，一次API调用）
+
+        Args:
+            trade_date: 交易日期，YYYYMMDD 或 YYYY-MM-DD
+
+        Returns:
+            DataFrame: 包含以下列的数据，无数据时返回空DataFrame
+                - ticker: str (6位代码)
+                - trade_time: str (YYYY-MM-DD)
+                - open, high, low, close: float
+                - volume: float (手)
+                - amount: float (元，与 _normalize_candle_data 一致)
+        """
+        trade_date = trade_date.replace('-', '')
+        LOGGER.info("获取全市场日线 | trade_date=%s", trade_date)
+
+        raw_df = self.client.fetch_daily(trade_date=trade_date)
+        if raw_df is None or raw_df.empty:
+            return pd.DataFrame()
+
+        frame = pd.DataFrame({
+            'ticker': raw_df['ts_code'].str.split('.').str[0],
+            'trade_time': pd.to_datetime(
+                raw_df['trade_date'].astype(str), format='%Y%m%d'
+            ).dt.strftime('%Y-%m-%d'),
+        })
+        for src_col, dst_col in (
+            ('open', 'open'), ('high', 'high'), ('low', 'low'), ('close', 'close'),
+            ('vol', 'volume'), ('amount', 'amount'),
+        ):
+            frame[dst_col] = pd.to_numeric(raw_df[src_col], errors='coerce')
+
+        frame = frame.dropna(subset=['open', 'high', 'low', 'close'])
+        frame[['volume', 'amount']] = frame[['volume', 'amount']].fillna(0.0)
+        # Tushare 的 amount 单位是千元，转换为元
+        frame['amount'] = frame['amount'] * 1000
+
+        LOGGER.debug("全市场日线 | trade_date=%s rows=%d", trade_date, len(frame))
+        return frame.reset_index(drop=True)
+
     def _normalize_candle_data(self, raw_df: pd.DataFrame, limit: int | None, is_mins: bool = False) -> pd.DataFrame:
         """
         将 Tushare 原始数据转换为标准格式
@@ -0,0 +1,157 @@
+"""
+美股报价缓存
+
+按 symbol 缓存报价（TTL），指数、板块、监控列表等接口共用同一份缓存：
+- get_many() 只为过期/缺失的 symbol 发起一次批量请求
+- single-flight：某个 symbol 正在被其他请求拉取时，等待那次结果而不是重复下载
+- 返回报价的副本，调用方可以随意添加字段（如 cn_name）
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 默认缓存有效期（秒）
+QUOTE_TTL_SECONDS = 60.0
+
+# 等待其他请求拉取结果的最长时间（秒）
+INFLIGHT_WAIT_SECONDS = 30.0
+
+Quote = Dict[str, Any]
+# symbols -> 报价列表（每条含 'symbol'；拉取失败的 symbol 直接缺省）
+BatchFetcher = Callable[[List[str]], List[Quote]]
+
+
+@dataclass
+class _Flight:
+    """一次进行中的批量拉取"""
+
+    symbols: List[str]
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+class QuoteCache:
+    """按 symbol 的报价 TTL 缓存（线程安全，single-flight 批量刷新）"""
+
+    def __init__(
+        self,
+        fetch_batch: BatchFetcher,
+        ttl: float = QUOTE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            fetch_batch: 批量拉取函数
+            ttl: 有效期（秒）
+            clock: 时钟（测试可注入）
+        """
+        self.fetch_batch = fetch_batch
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: Dict[str, tuple] = {}  # symbol -> (expires_at, quote)
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.fetches = 0
+        self.fetched_symbols = 0
+        self.hits = 0
+
+    def get(self, symbol: str) -> Optional[Quote]:
+        """获取单个报价（过期则拉取）"""
+        return self.get_many([symbol]).get(symbol)
+
+    def get_many(self, symbols: Iterable[str]) -> Dict[str, Quote]:
+        """
+        批量获取报价
+
+        Args:
+            symbols: 代码列表
+
+        Returns:
+            {symbol: 报价副本}，拉取失败的 symbol 不在结果中
+        """
+        wanted = list(dict.fromkeys(symbols))
+        if not wanted:
+            return {}
+
+        result: Dict[str, Quote] = {}
+        flight: Optional[_Flight] = None
+        waits: List[_Flight] = []
+        with self._lock:
+            now = self._clock()
+            missing: List[str] = []
+            for symbol in wanted:
+                entry = self._entries.get(symbol)
+                if entry is not None and entry[0] > now:
+                    result[symbol] = dict(entry[1])
+                    self.hits += 1
+                elif symbol in self._inflight:
+                    if self._inflight[symbol] not in waits:
+                        waits.append(self._inflight[symbol])
+                else:
+                    missing.append(symbol)
+            if missing:
+                flight = _Flight(missing)
+                for symbol in missing:
+                    self._inflight[symbol] = flight
+
+        if flight is not None:
+            self._run(flight)
+            waits.append(flight)
+
+        for other in waits:
+            if not other.done.wait(INFLIGHT_WAIT_SECONDS):
+                logger.warning(f"等待报价拉取超时: {', '.join(other.symbols[:5])}")
+
+        with self._lock:
+            for symbol in wanted:
+                if symbol not in result and symbol in self._entries:
+                    result[symbol] = dict(self._entries[symbol][1])
+        return result
+
+    def invalidate(self, symbols: Optional[Iterable[str]] = None) -> None:
+        """使缓存失效（None = 全部）"""
+        with self._lock:
+            if symbols is None:
+                self._entries.clear()
+            else:
+                for symbol in symbols:
+                    self._entries.pop(symbol, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        with self._lock:
+            now = self._clock()
+            return {
+                "cached": len(self._entries),
+                "fresh": sum(1 for expires_at, _ in self._entries.values() if expires_at > now),
+                "inflight": len(self._inflight),
+                "hits": self.hits,
+                "fetches": self.fetches,
+                "fetched_symbols": self.fetched_symbols,
+                "ttl": self.ttl,
+            }
+
+    def _run(self, flight: _Flight) -> None:
+        quotes: List[Quote] = []
+        try:
+            quotes = self.fetch_batch(flight.symbols) or []
+        except Exception as e:
+            logger.error(f"批量获取报价失败 ({len(flight.symbols)} 个): {e}")
+        finally:
+            with self._lock:
+                expires_at = self._clock() + self.ttl
+                for quote in quotes:
+                    symbol = quote.get("symbol")
+                    if symbol:
+                        self._entries[symbol] = (expires_at, quote)
+                for symbol in flight.symbols:
+                    if self._inflight.get(symbol) is flight:
+                        del self._inflight[symbol]
+                self.fetches += 1
+                self.fetched_symbols += len(flight.symbols)
+            flight.done.set()
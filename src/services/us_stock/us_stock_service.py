@@ -1,11 +1,15 @@
 """
 美股服务
 整合 Yahoo Finance 数据，提供美股行情、K线、板块、商品、债券监控
+
+报价统一经过 QuoteCache（按 symbol 的 TTL 缓存，各接口共享）：
+一组 symbol 只为过期的部分发起一次批量请求，并发请求同一 symbol 时只下载一次
 """
-from typing import List, Dict, Any, Optional
+from typing import Iterable, List, Dict, Any, Optional
 from datetime import datetime
 import pandas as pd
 
+from src.services.us_stock.quote_cache import QUOTE_TTL_SECONDS, QuoteCache
 from src.services.yahoo_finance_provider import YahooFinanceProvider
 from src.utils.logging import get_logger
 
@@ -143,33 +147,34 @@ class USStockService:
         'DX-Y.NYB': '美元指数',
     }
 
-    def __init__(self):
-        self.provider = YahooFinanceProvider()
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._cache_ttl = 60  # 缓存60秒
+    def __init__(self, provider=None, quote_ttl: float = QUOTE_TTL_SECONDS):
+        """
+        Args:
+            provider: 报价提供器（需实现 get_quotes_batch / get_kline），默认 YahooFinanceProvider
+            quote_ttl: 报价缓存有效期（秒）
+        """
+        self.provider = provider or YahooFinanceProvider()
+        self.quotes = QuoteCache(self.provider.get_quotes_batch, ttl=quote_ttl)
         logger.info("US Stock Service initialized")
 
-    def _is_cache_valid(self, key: str) -> bool:
-        """检查缓存是否有效"""
-        if key not in self._cache:
-            return False
-        cached = self._cache[key]
-        elapsed = (datetime.now() - cached['timestamp']).total_seconds()
-        return elapsed < self._cache_ttl
-
     def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
         """获取单个股票实时报价"""
-        cache_key = f"quote_{symbol}"
-        if self._is_cache_valid(cache_key):
-            return self._cache[cache_key]['data']
-
-        quote = self.provider.get_quote(symbol)
-        if quote:
-            self._cache[cache_key] = {
-                'data': quote,
-                'timestamp': datetime.now()
-            }
-        return quote
+        return self.quotes.get(symbol)
+
+    def get_quotes(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """批量获取报价（一次批量请求拉取所有过期的 symbol）"""
+        return self.quotes.get_many(symbols)
+
+    def _named_quotes(self, group: Dict[str, str]) -> List[Dict[str, Any]]:
+        """按 group 顺序返回报价，附带中文名"""
+        quotes = self.get_quotes(group.keys())
+        result = []
+        for symbol, cn_name in group.items():
+            quote = quotes.get(symbol)
+            if quote:
+                quote['cn_name'] = cn_name
+                result.append(quote)
+        return result
 
     def get_watchlist_quotes(self, watchlist: str = 'indexes') -> List[Dict[str, Any]]:
         """获取监控列表报价"""
@@ -177,16 +182,7 @@ class USStockService:
             logger.warning(f"Unknown watchlist: {watchlist}")
             return []
 
-        symbols = list(self.WATCHLISTS[watchlist].keys())
-        quotes = []
-
-        for symbol in symbols:
-            quote = self.get_quote(symbol)
-            if quote:
-                quote['cn_name'] = self.WATCHLISTS[watchlist].get(symbol, '')
-                quotes.append(quote)
-
-        return quotes
+        return self._named_quotes(self.WATCHLISTS[watchlist])
 
     # ── 便捷板块方法 ──
 
@@ -219,9 +215,12 @@ class USStockService:
             'stocks': [],
         }
 
+        # ETF 与个股一次批量预取
+        etf_symbol = self.SECTOR_ETFS.get(name)
+        self.get_quotes(([etf_symbol] if etf_symbol else []) + list(self.WATCHLISTS.get(name, {})))
+
         # 板块ETF
-        if name in self.SECTOR_ETFS:
-            etf_symbol = self.SECTOR_ETFS[name]
+        if etf_symbol:
             etf_quote = self.get_quote(etf_symbol)
             if etf_quote:
                 result['etf'] = etf_quote
@@ -236,6 +235,7 @@ class USStockService:
         """获取所有板块概览"""
         # 跳过 indexes — 单独获取
         sector_keys = [k for k in self.WATCHLISTS if k != 'indexes']
+        etf_quotes = self.get_quotes(self.SECTOR_ETFS[k] for k in sector_keys if k in self.SECTOR_ETFS)
         sectors = []
         for key in sector_keys:
             sector = {
@@ -246,10 +246,7 @@ class USStockService:
             }
             # 板块ETF报价
             if key in self.SECTOR_ETFS:
-                etf_symbol = self.SECTOR_ETFS[key]
-                etf_quote = self.get_quote(etf_symbol)
-                if etf_quote:
-                    sector['etf'] = etf_quote
+                sector['etf'] = etf_quotes.get(self.SECTOR_ETFS[key])
             sectors.append(sector)
         return sectors
 
@@ -257,13 +254,7 @@ class USStockService:
 
     def _get_symbol_group(self, group: Dict[str, str]) -> List[Dict[str, Any]]:
         """通用方法：获取一组 symbol 的报价"""
-        quotes = []
-        for symbol, cn_name in group.items():
-            quote = self.get_quote(symbol)
-            if quote:
-                quote['cn_name'] = cn_name
-                quotes.append(quote)
-        return quotes
+        return self._named_quotes(group)
 
     def get_commodities(self) -> List[Dict[str, Any]]:
         """获取期货/商品"""
@@ -318,6 +309,12 @@ class USStockService:
             'china_adr_summary': {},
         }
 
+        # 概览用到的所有 symbol 一次批量预取，后续都命中缓存
+        self.get_quotes(
+            [*self.WATCHLISTS['indexes'], *self.WATCHLISTS['mag7'], *self.SECTOR_ETFS.values(),
+             *self.COMMODITIES, *self.BONDS, *self.FOREX, *self.WATCHLISTS['china_adr']]
+        )
+
         # 指数
         summary['indexes'] = self.get_indexes()
 
@@ -5,10 +5,17 @@ WatchlistService - 自选股业务逻辑服务
 路由层变为薄包装，只负责参数校验和调用服务层。
 """
 
+import threading
+import time
+import weakref
 from collections import defaultdict
-from typing import Any, Dict, List
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
 
+import numpy as np
+import pandas as pd
 from sqlalchemy import and_, func
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
 from src.models import Kline, KlineTimeframe, SymbolMetadata, SymbolType, Watchlist
@@ -16,6 +23,21 @@ from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# 组合净值的日收盘价缓存超过该时间（秒）后全量重建，兜底历史K线被补录的情况
+PORTFOLIO_HISTORY_REBUILD_SECONDS = 3600.0
+
+
+@dataclass
+class _PortfolioHistoryEntry:
+    signature: Tuple[Tuple[str, str, float], ...]  # (ticker, 买入日期, 股数)
+    closes: pd.DataFrame  # 日期 × 股票 的日收盘价（未填充）
+    built_at: float
+
+
+# 按数据库 Engine 隔离的日收盘价缓存
+_history_cache: "weakref.WeakKeyDictionary[Engine, _PortfolioHistoryEntry]" = weakref.WeakKeyDictionary()
+_history_lock = threading.Lock()
+
 
 class WatchlistService:
     """自选股业务服务"""
@@ -78,7 +100,12 @@ class WatchlistService:
     # calculate_portfolio_history  (对应 GET /watchlist/portfolio/history)
     # ------------------------------------------------------------------
     def calculate_portfolio_history(self) -> Dict[str, Any]:
-        """计算投资组合历史净值曲线"""
+        """计算投资组合历史净值曲线
+
+        日收盘价按 日期 × 股票 组织成矩阵并前向填充（某只股票当日缺数据时沿用上一收盘价），
+        与持仓矩阵（买入日之后为持有股数，之前为0）相乘后按行求和，一次得到每日市值。
+        日收盘价矩阵按数据库缓存，再次请求时只重新读取最新一天的K线。
+        """
 
         # 获取所有自选股
         watchlist_items = self.db.query(Watchlist).filter(
@@ -86,108 +113,62 @@ class WatchlistService:
             Watchlist.shares.isnot(None),
         ).all()
 
+        empty = {
+            "dates": [],
+            "absolute_values": [],
+            "normalized_values": [],
+            "initial_investment": 0,
+            "current_value": 0,
+            "total_return": 0,
+            "return_pct": 0,
+        }
         if not watchlist_items:
-            return {
-                "dates": [],
-                "absolute_values": [],
-                "normalized_values": [],
-                "initial_investment": 0,
-                "current_value": 0,
-                "total_return": 0,
-                "return_pct": 0,
-            }
+            return empty
+
+        # 只计算有买入日期的股票
+        positions = sorted(
+            (item.ticker, item.purchase_date.strftime('%Y-%m-%d'), float(item.shares))
+            for item in watchlist_items
+            if item.purchase_date
+        )
+        if not positions:
+            return {**empty, "stock_count": len(watchlist_items)}
 
         # 计算初始投资总额
         initial_investment = len(watchlist_items) * 10000.0
 
-        # 获取最早的买入日期
-        earliest_date = min(
-            item.purchase_date for item in watchlist_items if item.purchase_date
-        )
-        earliest_date_str = earliest_date.strftime('%Y-%m-%d')
+        closes = self._get_daily_closes(positions)
+        tickers = [ticker for ticker, _, _ in positions]
+        dates = closes.index.to_numpy(dtype=str)
 
-        # 获取所有交易日（从最早买入日期到现在）
-        tickers = [item.ticker for item in watchlist_items]
+        prices = closes.ffill().to_numpy(dtype=float)
+        purchase_dates = np.array([purchase_date for _, purchase_date, _ in positions])
+        shares = np.array([shares for _, _, shares in positions])
 
-        # 查询这些股票的所有历史K线数据（从 klines 表）
-        # 注：股票K线目前只有30分钟数据，使用MINS_30
-        klines_query = self.db.query(
-            Kline.trade_time,
-            Kline.symbol_code,
-            Kline.close,
-        ).filter(
-            Kline.symbol_code.in_(tickers),
-            Kline.symbol_type == SymbolType.STOCK,
-            Kline.timeframe == KlineTimeframe.MINS_30,
-            Kline.trade_time >= earliest_date_str,
-        ).order_by(Kline.trade_time).all()
+        # 持仓矩阵: 买入日(含)之后持有 shares 股
+        held = dates[:, np.newaxis] >= purchase_dates[np.newaxis, :]
+        priced = held & ~np.isnan(prices)
+        values = (np.where(priced, prices, 0.0) * shares).sum(axis=1)
 
-        # 按日期组织数据
-        date_to_prices: Dict[str, Dict[str, float]] = defaultdict(dict)
-
-        for kline in klines_query:
-            date_str = kline.trade_time[:10]  # trade_time 是字符串格式 'YYYY-MM-DD'
-            date_to_prices[date_str][kline.symbol_code] = float(kline.close)
-
-        # 创建ticker到watchlist item的映射
-        ticker_to_item = {item.ticker: item for item in watchlist_items}
-
-        # 计算每个交易日的投资组合价值
-        dates: List[str] = []
-        absolute_values: List[float] = []
-        normalized_values: List[float] = []
-
-        for date_str in sorted(date_to_prices.keys()):
-            prices = date_to_prices[date_str]
-
-            # 计算当日总市值
-            total_value = 0.0
-            valid_count = 0
-            expected_count = 0  # 应该有数据的股票数量
-
-            for ticker, shares_owned in [
-                (item.ticker, item.shares) for item in watchlist_items
-            ]:
-                # 只计算已经买入的股票
-                item = ticker_to_item[ticker]
-                purchase_date_str = (
-                    item.purchase_date.strftime('%Y-%m-%d')
-                    if item.purchase_date
-                    else None
-                )
+        # 只在数据完整度>=70%时记录（避免数据不完整导致计算错误）
+        valid_count = priced.sum(axis=1)
+        keep = (valid_count > 0) & (valid_count >= held.sum(axis=1) * 0.7)
 
-                if purchase_date_str and date_str >= purchase_date_str:
-                    expected_count += 1
-                    if ticker in prices:
-                        total_value += prices[ticker] * shares_owned
-                        valid_count += 1
-
-            # 只在数据完整度>=70%时记录（避免数据不完整导致计算错误）
-            if valid_count > 0 and (valid_count >= expected_count * 0.7):
-                dates.append(date_str)
-                absolute_values.append(round(total_value, 2))
-
-                # 归一化值 = 当前总市值 / 初始投资
-                normalized_value = (
-                    total_value / initial_investment
-                    if initial_investment > 0
-                    else 1.0
-                )
-                normalized_values.append(round(normalized_value, 4))
+        absolute_values = np.round(values[keep], 2)
+        # 归一化值 = 当前总市值 / 初始投资
+        normalized_values = np.round(values[keep] / initial_investment, 4)
 
         # 计算当前市值和收益
-        current_value = absolute_values[-1] if absolute_values else 0
+        current_value = float(absolute_values[-1]) if len(absolute_values) else 0
         total_return = current_value - initial_investment
-        return_pct = (
-            (total_return / initial_investment * 100)
-            if initial_investment > 0
-            else 0
-        )
+        return_pct = total_return / initial_investment * 100
+
+        logger.debug(f"组合净值: {len(dates)} 个交易日 × {len(tickers)} 只股票")
 
         return {
-            "dates": dates,
-            "absolute_values": absolute_values,
-            "normalized_values": normalized_values,
+            "dates": dates[keep].tolist(),
+            "absolute_values": absolute_values.tolist(),
+            "normalized_values": normalized_values.tolist(),
             "initial_investment": round(initial_investment, 2),
             "current_value": round(current_value, 2),
             "total_return": round(total_return, 2),
@@ -195,6 +176,57 @@ class WatchlistService:
             "stock_count": len(watchlist_items),
         }
 
+    def _get_daily_closes(self, positions: List[Tuple[str, str, float]]) -> pd.DataFrame:
+        """日收盘价矩阵（日期 × 股票，未填充），命中缓存时只增量读取最新一天"""
+        tickers = [ticker for ticker, _, _ in positions]
+        earliest_date_str = min(purchase_date for _, purchase_date, _ in positions)
+        signature = tuple(positions)
+        bind = self.db.get_bind()
+
+        with _history_lock:
+            entry = _history_cache.get(bind)
+        fresh = (
+            entry is not None
+            and entry.signature == signature
+            and time.monotonic() - entry.built_at < PORTFOLIO_HISTORY_REBUILD_SECONDS
+            and not entry.closes.empty
+        )
+
+        if fresh:
+            # 最新一天可能仍在更新，从该日起重新读取并替换
+            last_date = entry.closes.index[-1]
+            closes = pd.concat([
+                entry.closes[entry.closes.index < last_date],
+                self._load_daily_closes(tickers, last_date),
+            ])
+            built_at = entry.built_at
+        else:
+            closes = self._load_daily_closes(tickers, earliest_date_str)
+            built_at = time.monotonic()
+
+        with _history_lock:
+            _history_cache[bind] = _PortfolioHistoryEntry(signature, closes, built_at)
+        return closes
+
+    def _load_daily_closes(self, tickers: List[str], since: str) -> pd.DataFrame:
+        """读取 since(含) 以来的K线，取每日最后一根的收盘价并透视为 日期 × 股票"""
+        # 注：股票K线目前只有30分钟数据，使用MINS_30
+        rows = self.db.query(
+            Kline.trade_time,
+            Kline.symbol_code,
+            Kline.close,
+        ).filter(
+            Kline.symbol_code.in_(tickers),
+            Kline.symbol_type == SymbolType.STOCK,
+            Kline.timeframe == KlineTimeframe.MINS_30,
+            Kline.trade_time >= since,
+        ).order_by(Kline.trade_time).all()
+
+        frame = pd.DataFrame(rows, columns=["trade_time", "symbol_code", "close"])
+        frame["date"] = frame["trade_time"].str[:10]  # trade_time 是字符串格式 'YYYY-MM-DD ...'
+        closes = frame.groupby(["date", "symbol_code"])["close"].last().unstack()
+        return closes.reindex(columns=tickers).astype(float).sort_index()
+
     # ------------------------------------------------------------------
     # calculate_analytics  (对应 GET /watchlist/analytics)
     # ------------------------------------------------------------------
@@ -3,14 +3,20 @@ Yahoo Finance 数据提供器
 获取美股实时行情和 K 线数据
 """
 
+import threading
+import time
 import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
+from src.services.rate_limiter import get_rate_limiter
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# 市值/市盈率缓存有效期（秒）；日内变化不大，批量报价不必每次单独请求
+FUNDAMENTALS_TTL_SECONDS = 6 * 3600
+
 
 class YahooFinanceProvider:
     """Yahoo Finance 数据提供器"""
@@ -54,6 +60,11 @@ class YahooFinanceProvider:
     }
 
     def __init__(self):
+        # 代码 -> 名称；批量行情不含名称，用已知名称或单只报价时记录的名称
+        self._names: Dict[str, str] = {**self.US_INDEXES, **self.POPULAR_STOCKS, **self.CHINA_ADRS}
+        # 代码 -> (过期时间, {'market_cap', 'pe_ratio'})；批量行情不含基本面，单独缓存
+        self._fundamentals: Dict[str, tuple] = {}
+        self._fundamentals_lock = threading.Lock()
         logger.info("Yahoo Finance 提供器已初始化")
 
     def get_quote(self, symbol: str) -> Optional[Dict]:
@@ -77,6 +88,7 @@ class YahooFinanceProvider:
             }
         """
         try:
+            get_rate_limiter("yahoo").acquire()
             ticker = yf.Ticker(symbol)
             info = ticker.info
 
@@ -86,9 +98,13 @@ class YahooFinanceProvider:
             change = price - prev_close if prev_close else 0
             change_pct = (change / prev_close * 100) if prev_close else 0
 
+            name = info.get('shortName') or info.get('longName', symbol)
+            self._names[symbol] = name
+            self._store_fundamentals(symbol, info)
+
             return {
                 'symbol': symbol,
-                'name': info.get('shortName') or info.get('longName', symbol),
+                'name': name,
                 'price': price,
                 'change': round(change, 2),
                 'change_pct': round(change_pct, 2),
@@ -104,21 +120,106 @@ class YahooFinanceProvider:
 
     def get_quotes_batch(self, symbols: List[str]) -> List[Dict]:
         """
-        批量获取实时报价
+        批量获取实时报价（一次 yf.download 请求）
+
+        价格/涨跌取最近两根日线收盘价；市值、市盈率取自单独缓存的
+        Ticker.info（FUNDAMENTALS_TTL_SECONDS），取不到时为 None。
+        单只代码时走 get_quote 以保留完整字段。
 
         Args:
             symbols: 股票代码列表
 
         Returns:
-            报价列表
+            报价列表（按输入顺序，无数据的代码缺省）
         """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return []
+        if len(symbols) == 1:
+            quote = self.get_quote(symbols[0])
+            return [quote] if quote else []
+
+        try:
+            get_rate_limiter("yahoo").acquire()
+            df = yf.download(
+                symbols,
+                period="5d",
+                interval="1d",
+                group_by="ticker",
+                auto_adjust=False,
+                progress=False,
+                threads=False,
+                multi_level_index=True,
+            )
+        except Exception as e:
+            logger.error(f"批量获取报价失败 ({len(symbols)} 个): {e}")
+            return []
+
+        if df is None or df.empty:
+            logger.warning(f"批量报价无数据: {', '.join(symbols[:5])}")
+            return []
+
+        last_update = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        available = set(df.columns.get_level_values(0))
         results = []
         for symbol in symbols:
-            quote = self.get_quote(symbol)
+            if symbol not in available:
+                continue
+            quote = self._quote_from_bars(symbol, df[symbol], last_update)
             if quote:
                 results.append(quote)
         return results
 
+    def _quote_from_bars(self, symbol: str, bars: pd.DataFrame, last_update: str) -> Optional[Dict]:
+        """由最近日线构造报价"""
+        bars = bars.dropna(subset=['Close'])
+        if bars.empty:
+            return None
+
+        price = float(bars['Close'].iloc[-1])
+        prev_close = float(bars['Close'].iloc[-2]) if len(bars) > 1 else price
+        change = price - prev_close if prev_close else 0
+        change_pct = (change / prev_close * 100) if prev_close else 0
+        volume = bars['Volume'].iloc[-1] if 'Volume' in bars else 0
+
+        return {
+            'symbol': symbol,
+            'name': self._names.get(symbol, symbol),
+            'price': price,
+            'change': round(change, 2),
+            'change_pct': round(change_pct, 2),
+            'volume': 0 if pd.isna(volume) else int(volume),
+            **self._get_fundamentals(symbol),
+            'last_update': last_update
+        }
+
+    def _get_fundamentals(self, symbol: str) -> Dict:
+        """市值/市盈率（缓存过期时请求一次 Ticker.info）"""
+        # 指数、期货、外汇没有基本面数据
+        if symbol.startswith('^') or '=' in symbol:
+            return {'market_cap': None, 'pe_ratio': None}
+
+        with self._fundamentals_lock:
+            entry = self._fundamentals.get(symbol)
+        if entry is not None and entry[0] > time.monotonic():
+            return dict(entry[1])
+
+        info: Dict = {}
+        try:
+            get_rate_limiter("yahoo").acquire()
+            info = yf.Ticker(symbol).info or {}
+        except Exception as e:
+            # 失败也缓存，避免每次批量报价都重试
+            logger.warning(f"获取 {symbol} 市值/市盈率失败: {e}")
+        return self._store_fundamentals(symbol, info)
+
+    def _store_fundamentals(self, symbol: str, info: Dict) -> Dict:
+        """从 Ticker.info 提取市值/市盈率并缓存"""
+        fundamentals = {'market_cap': info.get('marketCap'), 'pe_ratio': info.get('trailingPE')}
+        with self._fundamentals_lock:
+            self._fundamentals[symbol] = (time.monotonic() + FUNDAMENTALS_TTL_SECONDS, fundamentals)
+        return dict(fundamentals)
+
     def get_kline(
         self,
         symbol: str,
@@ -137,6 +238,7 @@ class YahooFinanceProvider:
             DataFrame with columns: datetime, open, high, low, close, volume
         """
         try:
+            get_rate_limiter("yahoo").acquire()
             ticker = yf.Ticker(symbol)
             df = ticker.history(period=period, interval=interval)
 
@@ -187,6 +289,7 @@ class YahooFinanceProvider:
             }
         """
         try:
+            get_rate_limiter("yahoo").acquire()
             # 使用 SPY ETF 获取市场状态
             spy = yf.Ticker("SPY")
             info = spy.info
@@ -0,0 +1,272 @@
+"""Declarative job graph: run dependent refresh steps as soon as their inputs are ready.
+
+A graph is a set of ``JobNode``s with named dependencies. ``JobGraph.run``
+starts every node whose dependencies have finished, so independent branches
+run in parallel and each node starts the moment its inputs are fresh rather
+than at a fixed wall-clock slot.
+
+Freshness: a node may declare ``is_fresh``, a predicate over its *output*
+(e.g. "index day bars for the trade date exist"). A node that is already
+fresh is not run. After running, a node that is still not fresh (provider
+has not published yet) is retried every ``poll_interval`` seconds until the
+graph deadline; if the deadline passes it ends ``stale`` and its dependents
+are skipped instead of running on yesterday's data.
+
+Every node's status, attempts and timings are collected in a ``GraphRun``.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.logging import LOGGER
+
+# Node statuses
+DONE = "done"  # ran and (if checked) produced fresh output
+FRESH = "fresh"  # output already current; not run
+STALE = "stale"  # ran, but output still not fresh at the deadline
+FAILED = "failed"  # raised on the last attempt
+SKIPPED = "skipped"  # an upstream node did not succeed
+
+SUCCESS_STATUSES = frozenset({DONE, FRESH})
+
+
+@dataclass(frozen=True)
+class JobNode:
+    """One step of a job graph.
+
+    Attributes:
+        name: Unique node name.
+        action: Callable run for the node. Coroutine functions are awaited;
+            plain functions run in a worker thread.
+        deps: Names of nodes that must succeed first.
+        is_fresh: Optional predicate over the node's output; see module doc.
+            Called in a worker thread.
+        poll_interval: Seconds between attempts while the output is not
+            fresh or the action raised (0 = single attempt).
+        timeout: Seconds allowed per attempt (None = unbounded).
+        not_before: Aware datetime before which the node does not start
+            (e.g. data that is only published in the evening).
+    """
+
+    name: str
+    action: Callable[[], Any]
+    deps: Tuple[str, ...] = ()
+    is_fresh: Optional[Callable[[], bool]] = None
+    poll_interval: float = 0.0
+    timeout: Optional[float] = None
+    not_before: Optional[datetime] = None
+
+
+@dataclass
+class NodeRun:
+    """Outcome and timings of one node in one graph run."""
+
+    name: str
+    status: str = SKIPPED
+    attempts: int = 0
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: float = 0.0  # first attempt start -> end
+    result: Any = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "attempts": self.attempts,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": round(self.duration_seconds, 1),
+            "error": self.error,
+        }
+
+
+@dataclass
+class GraphRun:
+    """All node outcomes of one graph run."""
+
+    name: str
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    nodes: Dict[str, NodeRun] = field(default_factory=dict)
+
+    @property
+    def success(self) -> bool:
+        return all(node.status in SUCCESS_STATUSES for node in self.nodes.values())
+
+    @property
+    def duration_seconds(self) -> float:
+        if self.finished_at is None:
+            return 0.0
+        return (self.finished_at - self.started_at).total_seconds()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": round(self.duration_seconds, 1),
+            "success": self.success,
+            "nodes": [node.to_dict() for node in self.nodes.values()],
+        }
+
+
+class JobGraph:
+    """Validated set of ``JobNode``s.
+
+    Raises:
+        ValueError: On duplicate names, unknown dependencies or cycles.
+    """
+
+    def __init__(self, name: str, nodes: Iterable[JobNode]):
+        self.name = name
+        self.nodes: Dict[str, JobNode] = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate job node: {node.name}")
+            self.nodes[node.name] = node
+        for node in self.nodes.values():
+            unknown = [dep for dep in node.deps if dep not in self.nodes]
+            if unknown:
+                raise ValueError(f"Job node {node.name} depends on unknown {unknown}")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        remaining = {name: set(node.deps) for name, node in self.nodes.items()}
+        order: List[str] = []
+        while remaining:
+            ready = sorted(name for name, deps in remaining.items() if not deps)
+            if not ready:
+                raise ValueError(f"Job graph {self.name} has a cycle among {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+            order.extend(ready)
+        return order
+
+    def subgraph(self, targets: Iterable[str]) -> "JobGraph":
+        """The given nodes plus everything they depend on."""
+        wanted: set = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.nodes:
+                raise ValueError(f"Unknown job node: {name}")
+            if name not in wanted:
+                wanted.add(name)
+                stack.extend(self.nodes[name].deps)
+        return JobGraph(self.name, (self.nodes[name] for name in self.order if name in wanted))
+
+    async def run(self, deadline: Optional[datetime] = None) -> GraphRun:
+        """Run the graph until every node has finished.
+
+        Args:
+            deadline: Aware datetime after which nodes stop polling for fresh
+                output (None = one attempt per node).
+
+        Returns:
+            GraphRun with one NodeRun per node.
+        """
+        run = GraphRun(name=self.name, started_at=datetime.now(timezone.utc))
+        run.nodes = {name: NodeRun(name=name) for name in self.order}
+        finished = {name: asyncio.Event() for name in self.order}
+
+        async def run_node(node: JobNode) -> None:
+            record = run.nodes[node.name]
+            try:
+                for dep in node.deps:
+                    await finished[dep].wait()
+                blocked = [dep for dep in node.deps if run.nodes[dep].status not in SUCCESS_STATUSES]
+                if blocked:
+                    record.status = SKIPPED
+                    record.error = f"upstream not ready: {', '.join(blocked)}"
+                    LOGGER.warning("[%s] %s skipped (%s)", self.name, node.name, record.error)
+                    return
+                await self._run_node(node, record, deadline)
+            finally:
+                finished[node.name].set()
+
+        await asyncio.gather(*(run_node(self.nodes[name]) for name in self.order))
+
+        run.finished_at = datetime.now(timezone.utc)
+        summary = ", ".join(
+            f"{node.name}={node.status}({node.duration_seconds:.0f}s)" for node in run.nodes.values()
+        )
+        LOGGER.info("[%s] finished in %.1fs: %s", self.name, run.duration_seconds, summary)
+        return run
+
+    async def _run_node(self, node: JobNode, record: NodeRun, deadline: Optional[datetime]) -> None:
+        if node.is_fresh is not None and await self._check_fresh(node):
+            record.status = FRESH
+            LOGGER.info("[%s] %s already fresh", self.name, node.name)
+            return
+
+        if node.not_before is not None:
+            wait = node.not_before.timestamp() - time.time()
+            if wait > 0:
+                LOGGER.info("[%s] %s waiting %.0fs until %s", self.name, node.name, wait, node.not_before)
+                await asyncio.sleep(wait)
+
+        record.started_at = datetime.now(timezone.utc)
+        started = time.monotonic()
+        LOGGER.info("[%s] %s started", self.name, node.name)
+
+        while True:
+            record.attempts += 1
+            try:
+                record.result = await self._call(node)
+                record.error = None
+                if node.is_fresh is None or await asyncio.to_thread(node.is_fresh):
+                    record.status = DONE
+                    break
+                record.status = STALE
+                record.error = "output not fresh yet"
+            except Exception as e:
+                record.status = FAILED
+                record.error = f"{type(e).__name__}: {e}"
+                LOGGER.warning("[%s] %s attempt %d failed: %s", self.name, node.name, record.attempts, e)
+
+            if not self._can_retry(node, deadline):
+                break
+            LOGGER.info(
+                "[%s] %s %s, retrying in %.0fs",
+                self.name, node.name, record.error, node.poll_interval,
+            )
+            await asyncio.sleep(node.poll_interval)
+
+        record.finished_at = datetime.now(timezone.utc)
+        record.duration_seconds = time.monotonic() - started
+        log = LOGGER.info if record.status == DONE else LOGGER.error
+        log(
+            "[%s] %s %s after %d attempt(s), %.1fs%s",
+            self.name, node.name, record.status, record.attempts, record.duration_seconds,
+            f" — {record.error}" if record.error else "",
+        )
+
+    async def _check_fresh(self, node: JobNode) -> bool:
+        try:
+            return bool(await asyncio.to_thread(node.is_fresh))
+        except Exception as e:
+            LOGGER.warning("[%s] %s freshness check failed: %s", self.name, node.name, e)
+            return False
+
+    @staticmethod
+    async def _call(node: JobNode) -> Any:
+        if inspect.iscoroutinefunction(node.action):
+            awaitable = node.action()
+        else:
+            awaitable = asyncio.to_thread(node.action)
+        return await asyncio.wait_for(awaitable, node.timeout)
+
+    @staticmethod
+    def _can_retry(node: JobNode, deadline: Optional[datetime]) -> bool:
+        if node.poll_interval <= 0 or deadline is None:
+            return False
+        return time.time() + node.poll_interval < deadline.timestamp()
@@ -0,0 +1,333 @@
+"""Post-close refresh pipeline as a job graph.
+
+    calendar ─┬─ stock_daily ─┬─ aggregates
+              │               ├─ indicators ── screenshots
+              │               └─┐
+              ├─ index_daily ───┼─ validation
+              ├─ concept_daily ─┘
+              ├─ industry_daily
+              ├─ concept_stats
+              └─ etf_summary ── etf_filtered ── etf_flow ── etf_klines ── etf_flow_history
+
+The graph starts right after the close. Kline nodes check their own output
+for the trade date (at least ``KLINE_COVERAGE_RATIO`` of the expected symbols
+have a bar) and poll until the provider has published it, so each
+downstream node starts as soon as its inputs are actually fresh. Script nodes
+run ``scripts/*.py`` through ``run_script`` and are retried on failure until
+the deadline. The industry and concept scripts also check their tables for
+the trade date, since the industry script falls back to the previous trading
+day (and exits 0) when today's data is not out yet. The ETF scripts write
+CSVs with no trade date to check, so the chain does not start before
+``ETF_NOT_BEFORE``. Every node gets its own session.
+
+Per-node outcomes and timings are written to ``data_update_log`` as
+``nightly.<node>`` rows; nodes that end failed or stale also raise an alert.
+"""
+from __future__ import annotations
+
+import math
+from datetime import datetime, time
+from typing import Callable, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from src.config import get_settings
+from src.models import (
+    ConceptDaily,
+    DataUpdateLog,
+    DataUpdateStatus,
+    IndustryDaily,
+    Kline,
+    KlineTimeframe,
+    SymbolMetadata,
+    SymbolType,
+    TradeCalendar,
+)
+from src.tasks.job_graph import FAILED, STALE, SUCCESS_STATUSES, GraphRun, JobGraph, JobNode
+from src.tasks.task_runner import run_script
+from src.utils.alerting import get_alert_manager
+from src.utils.logging import LOGGER
+
+GRAPH_NAME = "nightly"
+
+# Seconds between attempts while a node waits for the provider to publish
+KLINE_POLL_SECONDS = 300
+SCRIPT_RETRY_SECONDS = 600
+
+# Share of the expected universe that needs a bar on the trade date before a
+# kline node counts as fresh (suspended symbols have no bar)
+KLINE_COVERAGE_RATIO = 0.9
+
+# ETF data is published in the evening and its CSVs carry no trade date
+ETF_NOT_BEFORE = time(18, 10)
+
+# Alert sources for nodes that end failed or stale (others: "scheduler.nightly")
+ALERT_SOURCES = {
+    "industry_daily": "scheduler.industry",
+    "concept_stats": "scheduler.concept",
+    "etf_summary": "scheduler.etf",
+    "etf_filtered": "scheduler.etf",
+    "etf_flow": "scheduler.etf",
+    "etf_klines": "scheduler.etf",
+    "etf_flow_history": "scheduler.etf",
+}
+
+
+def latest_daily_trade_date(session: Session, symbol_type: SymbolType) -> Optional[str]:
+    """Latest DAY kline date (YYYY-MM-DD) stored for a symbol type."""
+    latest = (
+        session.query(func.max(Kline.trade_time))
+        .filter(Kline.symbol_type == symbol_type, Kline.timeframe == KlineTimeframe.DAY)
+        .scalar()
+    )
+    if latest is None:
+        return None
+    if isinstance(latest, str):
+        return latest[:10]
+    return latest.strftime("%Y-%m-%d")
+
+
+def daily_coverage(session: Session, symbol_type: SymbolType, trade_date: str) -> int:
+    """Number of symbols with a DAY kline on ``trade_date`` (YYYY-MM-DD)."""
+    return (
+        session.query(func.count(func.distinct(Kline.symbol_code)))
+        .filter(
+            Kline.symbol_type == symbol_type,
+            Kline.timeframe == KlineTimeframe.DAY,
+            Kline.trade_time.between(trade_date, f"{trade_date} 23:59:59"),
+        )
+        .scalar()
+        or 0
+    )
+
+
+def expected_daily_universe(session: Session, symbol_type: SymbolType, trade_date: str) -> int:
+    """Number of symbols expected to have a DAY kline on ``trade_date``.
+
+    Stocks use the ``symbol_metadata`` universe. Other types, and stocks when
+    the metadata table is empty, use the symbols present on the latest earlier
+    date with DAY klines.
+    """
+    if symbol_type == SymbolType.STOCK:
+        expected = session.query(func.count(SymbolMetadata.ticker)).scalar() or 0
+        if expected:
+            return expected
+    previous = (
+        session.query(func.max(Kline.trade_time))
+        .filter(
+            Kline.symbol_type == symbol_type,
+            Kline.timeframe == KlineTimeframe.DAY,
+            Kline.trade_time < trade_date,
+        )
+        .scalar()
+    )
+    if previous is None:
+        return 0
+    return daily_coverage(session, symbol_type, previous[:10])
+
+
+def nightly_deadline(trade_date: str) -> datetime:
+    """When nodes stop polling for ``trade_date`` (``scheduler.nightly_deadline``)."""
+    hour, minute = (int(part) for part in get_settings().scheduler.nightly_deadline.split(":"))
+    return _at(trade_date, time(hour, minute))
+
+
+def _at(trade_date: str, at: time) -> datetime:
+    """``trade_date`` at a wall-clock time in the scheduler timezone."""
+    day = datetime.strptime(trade_date, "%Y-%m-%d")
+    return datetime.combine(day.date(), at, tzinfo=ZoneInfo(get_settings().scheduler.timezone))
+
+
+def build_nightly_graph(
+    trade_date: str,
+    session_factory: Optional[Callable[[], Session]] = None,
+) -> JobGraph:
+    """Build the post-close job graph for ``trade_date`` (YYYY-MM-DD)."""
+    if session_factory is None:
+        from src.database import SessionLocal
+
+        session_factory = SessionLocal
+
+    from src.services.kline_updater import KlineUpdater
+
+    def kline_fresh(symbol_type: SymbolType) -> Callable[[], bool]:
+        """Enough of the universe has a bar on the trade date (not just one symbol)."""
+
+        def check() -> bool:
+            with session_factory() as session:
+                covered = daily_coverage(session, symbol_type, trade_date)
+                expected = expected_daily_universe(session, symbol_type, trade_date)
+            return covered >= max(math.ceil(expected * KLINE_COVERAGE_RATIO), 1)
+
+        return check
+
+    def rows_fresh(model) -> Callable[[], bool]:
+        """Rows for the trade date exist (tables keyed by YYYYMMDD trade_date)."""
+        compact_date = trade_date.replace("-", "")
+
+        def check() -> bool:
+            with session_factory() as session:
+                return session.query(model.trade_date).filter(model.trade_date == compact_date).first() is not None
+
+        return check
+
+    def calendar_fresh() -> bool:
+        with session_factory() as session:
+            return session.query(TradeCalendar.date).filter(TradeCalendar.date == trade_date).first() is not None
+
+    def update_calendar() -> int:
+        with session_factory() as session:
+            return KlineUpdater.create_with_session(session).update_trade_calendar()
+
+    def kline_update(method: str) -> Callable[[], object]:
+        async def update() -> int:
+            with session_factory() as session:
+                return await getattr(KlineUpdater.create_with_session(session), method)()
+
+        return update
+
+    def refresh_aggregates() -> int:
+        from src.repositories.market_stats_repository import MarketStatsRepository
+
+        with session_factory() as session:
+            count = MarketStatsRepository(session).ensure_fresh()
+            session.commit()
+        return count
+
+    async def validate() -> bool:
+        from src.services.data_consistency_validator import DataConsistencyValidator
+
+        with session_factory() as session:
+            healthy = await DataConsistencyValidator.create_with_session(session).validate_and_report()
+        if not healthy:
+            LOGGER.warning("Nightly consistency check found mismatches, see validator log")
+        return healthy
+
+    def generate_screenshots() -> int:
+        from src.services.screenshot_service import ScreenshotService
+
+        with session_factory() as session:
+            result = ScreenshotService.create_with_session(session).batch_generate(scope="watchlist")
+        return result.get("generated", 0)
+
+    def kline_node(name: str, method: str, symbol_type: SymbolType) -> JobNode:
+        return JobNode(
+            name,
+            kline_update(method),
+            deps=("calendar",),
+            is_fresh=kline_fresh(symbol_type),
+            poll_interval=KLINE_POLL_SECONDS,
+        )
+
+    def script_node(name: str, script: str, timeout: int, deps=("calendar",), **kwargs) -> JobNode:
+        return JobNode(
+            name,
+            script_action(script, timeout),
+            deps=tuple(deps),
+            poll_interval=SCRIPT_RETRY_SECONDS,
+            **kwargs,
+        )
+
+    return JobGraph(GRAPH_NAME, [
+        JobNode("calendar", update_calendar, is_fresh=calendar_fresh),
+        kline_node("stock_daily", "update_all_stock_daily", SymbolType.STOCK),
+        kline_node("index_daily", "update_index_daily", SymbolType.INDEX),
+        kline_node("concept_daily", "update_concept_daily", SymbolType.CONCEPT),
+        JobNode("aggregates", refresh_aggregates, deps=("stock_daily",)),
+        script_node("indicators", "calculate_technical_indicators.py", 1800, deps=("stock_daily",)),
+        JobNode("screenshots", generate_screenshots, deps=("indicators",)),
+        JobNode("validation", validate, deps=("stock_daily", "index_daily", "concept_daily")),
+        script_node("industry_daily", "update_industry_daily.py", 1800, is_fresh=rows_fresh(IndustryDaily)),
+        script_node("concept_stats", "update_concept_daily.py", 900, is_fresh=rows_fresh(ConceptDaily)),
+        # ETF scripts share data/etf_daily_summary_filtered.csv, so they stay a chain
+        script_node(
+            "etf_summary", "update_etf_daily_summary.py", 2400,
+            not_before=_at(trade_date, ETF_NOT_BEFORE),
+        ),
+        script_node("etf_filtered", "build_etf_filtered.py", 300, deps=("etf_summary",)),
+        script_node("etf_flow", "update_etf_daily_flow.py", 1800, deps=("etf_filtered",)),
+        script_node("etf_klines", "download_etf_klines.py", 1800, deps=("etf_flow",)),
+        script_node("etf_flow_history", "calc_etf_flow_history.py", 1800, deps=("etf_klines",)),
+    ])
+
+
+def script_action(script_name: str, timeout: int) -> Callable[[], float]:
+    """Run a script, raising on a non-zero exit so the node is retried."""
+
+    def run() -> float:
+        result = run_script(script_name, timeout=timeout)
+        if not result.success:
+            stderr = result.stderr[:400] if result.stderr else "no stderr"
+            raise RuntimeError(
+                f"{script_name} failed (exit={result.exit_code}, {result.duration_seconds:.1f}s): {stderr}"
+            )
+        return result.duration_seconds
+
+    return run
+
+
+def record_graph_run(session: Session, run: GraphRun) -> None:
+    """Write one ``data_update_log`` row per node."""
+    for node in run.nodes.values():
+        success = node.status in SUCCESS_STATUSES
+        session.add(DataUpdateLog(
+            update_type=f"{run.name}.{node.name}",
+            status=DataUpdateStatus.COMPLETED if success else DataUpdateStatus.FAILED,
+            records_updated=node.result if isinstance(node.result, int) and not isinstance(node.result, bool) else 0,
+            error_message=None if success else f"{node.status}: {node.error}",
+            started_at=node.started_at or run.started_at,
+            completed_at=node.finished_at or (run.finished_at if success else None),
+        ))
+    session.commit()
+
+
+def alert_unfinished_nodes(run: GraphRun) -> None:
+    """Emit an error alert for each node that ended failed or stale."""
+    alerts = get_alert_manager()
+    for node in run.nodes.values():
+        if node.status in (FAILED, STALE):
+            alerts.emit(
+                "error",
+                ALERT_SOURCES.get(node.name, "scheduler.nightly"),
+                f"{run.name}.{node.name} {node.status}: {node.error}",
+                attempts=node.attempts,
+            )
+
+
+async def run_nightly(
+    trade_date: Optional[str] = None,
+    targets: Optional[list[str]] = None,
+    session_factory: Optional[Callable[[], Session]] = None,
+) -> GraphRun:
+    """Run the post-close graph (or just ``targets`` and their dependencies).
+
+    Args:
+        trade_date: Trade date to refresh, default today.
+        targets: Node names to run; None runs the whole graph.
+        session_factory: Session factory, default ``SessionLocal``.
+    """
+    if session_factory is None:
+        from src.database import SessionLocal
+
+        session_factory = SessionLocal
+
+    tz = ZoneInfo(get_settings().scheduler.timezone)
+    trade_date = trade_date or datetime.now(tz).strftime("%Y-%m-%d")
+
+    graph = build_nightly_graph(trade_date, session_factory)
+    if targets:
+        graph = graph.subgraph(targets)
+
+    LOGGER.info("Nightly pipeline for %s: %d nodes", trade_date, len(graph.nodes))
+    run = await graph.run(deadline=nightly_deadline(trade_date))
+    alert_unfinished_nodes(run)
+
+    try:
+        with session_factory() as session:
+            record_graph_run(session, run)
+    except Exception as e:
+        LOGGER.warning("Failed to record nightly run: %s", e)
+    return run
+
@@ -1,14 +1,43 @@
-"""Run external scripts with timeout, output capture, and exit code tracking.
+"""Run scripts with timeout, output capture, and exit code tracking.
 
 Replaces fire-and-forget subprocess.Popen patterns with monitored execution.
+
+Scripts listed in ``JOB_REGISTRY`` run in-process: their entry function is
+called in a shared worker thread pool (or, for CPU-heavy jobs, a warm
+process pool), so they reuse the already imported modules, the DB engine,
+HTTP pools and caches instead of paying interpreter and import startup on
+every run. Other scripts still run as ``sys.executable scripts/<name>``.
+
+In-process jobs report exactly like subprocesses: ``print`` output and log
+records emitted on the job's thread are captured into stdout/stderr, the
+entry's return value or ``sys.exit`` code becomes the exit code, and an
+uncaught exception becomes exit code 1 with its traceback in stderr.
+While a job runs, a root logger above INFO is lowered to INFO so the job's
+progress logs are captured (a script's own ``logging.basicConfig`` is a
+no-op in-process); the other root handlers keep their original threshold.
+A thread cannot be killed, so a timed-out thread job keeps running in the
+background and the same job is refused (exit code -4, with how long the
+stuck run has been going in stderr) until it finishes; ``running_jobs()``
+lists such runs. A timed-out process job has its pool terminated, which
+frees the job at once.
 """
 from __future__ import annotations
 
+import contextlib
+import importlib
+import io
+import logging
+import multiprocessing
 import subprocess
 import sys
+import threading
 import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
 
 from src.utils.logging import LOGGER
 
@@ -33,23 +62,87 @@ class TaskResult:
 _SCRIPTS_DIR = Path(__file__).parent.parent.parent / "scripts"
 _LOGS_DIR = Path(__file__).parent.parent.parent / "logs"
 
+# Captured output kept per run (tail)
+_STDOUT_LIMIT = 5000
+_STDERR_LIMIT = 2000
+
+
+def _tail(text: str, limit: int) -> str:
+    return text[-limit:] if len(text) > limit else text
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    """A script that can run in-process.
+
+    Attributes:
+        script_name: File name in scripts/.
+        entry: Module-level function to call; returns an exit code or None.
+        pool: ``"thread"`` (shares engine and caches) or ``"process"``
+            (warm worker process, for CPU-bound jobs).
+    """
+
+    script_name: str
+    entry: str = "main"
+    pool: str = "thread"
+
+
+JOB_REGISTRY: Dict[str, JobSpec] = {
+    spec.script_name: spec
+    for spec in (
+        JobSpec("update_industry_daily.py"),
+        JobSpec("update_concept_daily.py"),
+        JobSpec("update_etf_daily_summary.py"),
+        JobSpec("build_etf_filtered.py"),
+        JobSpec("update_etf_daily_flow.py"),
+        JobSpec("download_etf_klines.py"),
+        JobSpec("calc_etf_flow_history.py"),
+        # Rolling MA/MACD/RSI/Bollinger over every watchlist stock
+        JobSpec("calculate_technical_indicators.py", pool="process"),
+    )
+}
+
+THREAD_POOL_WORKERS = 4
+PROCESS_POOL_WORKERS = 2
+
+
+def register_job(script_name: str, entry: str = "main", pool: str = "thread") -> JobSpec:
+    """Register (or replace) an in-process job."""
+    if pool not in ("thread", "process"):
+        raise ValueError(f"Unknown job pool: {pool}")
+    spec = JOB_REGISTRY[script_name] = JobSpec(script_name, entry, pool)
+    return spec
+
 
 def run_script(
     script_name: str,
     *,
     timeout: int = 600,
     log_to_file: bool = True,
+    in_process: bool = True,
 ) -> TaskResult:
     """Run a Python script synchronously with timeout and full output capture.
 
     Args:
         script_name: Name of the script file in scripts/ directory.
-        timeout: Max seconds before killing the process. Default 600 (10 min).
+        timeout: Max seconds before the run is abandoned. Default 600 (10 min).
         log_to_file: Whether to also write stdout to logs/{script_stem}.log.
+        in_process: Run registered jobs in the worker pools; False forces a
+            subprocess.
 
     Returns:
         Immutable TaskResult with exit code, output, and timing info.
     """
+    spec = JOB_REGISTRY.get(script_name) if in_process else None
+    if spec is not None:
+        result = _run_job(spec, timeout)
+    else:
+        result = _run_subprocess(script_name, timeout)
+    _report(result, log_to_file)
+    return result
+
+
+def _run_subprocess(script_name: str, timeout: int) -> TaskResult:
     script_path = _SCRIPTS_DIR / script_name
     if not script_path.exists():
         LOGGER.error("Script not found: %s", script_path)
@@ -81,8 +174,8 @@ def run_script(
             task_name=script_name,
             exit_code=completed.returncode,
             duration_seconds=round(duration, 1),
-            stdout=completed.stdout[-5000:] if len(completed.stdout) > 5000 else completed.stdout,
-            stderr=completed.stderr[-2000:] if len(completed.stderr) > 2000 else completed.stderr,
+            stdout=_tail(completed.stdout, _STDOUT_LIMIT),
+            stderr=_tail(completed.stderr, _STDERR_LIMIT),
             started_at=started_at,
             finished_at=finished_at,
         )
@@ -113,6 +206,12 @@ def run_script(
             finished_at=finished_at,
         )
 
+    return result
+
+
+def _report(result: TaskResult, log_to_file: bool) -> None:
+    script_name = result.task_name
+
     # Log outcome
     if result.success:
         LOGGER.info(
@@ -135,4 +234,315 @@ def run_script(
         except OSError as e:
             LOGGER.warning("Failed to write log file %s: %s", log_path, e)
 
-    return result
+
+# ── In-process execution ─────────────────────────────────────────────
+
+class _Capture:
+    """stdout/stderr buffers for the job running on the current thread."""
+
+    _local = threading.local()
+
+    def __init__(self) -> None:
+        self.stdout = io.StringIO()
+        self.stderr = io.StringIO()
+
+    @classmethod
+    def current(cls) -> Optional["_Capture"]:
+        return getattr(cls._local, "capture", None)
+
+    @contextlib.contextmanager
+    def active(self):
+        _install_capture_hooks()
+        _hold_info_level()
+        self._local.capture = self
+        try:
+            yield self
+        finally:
+            self._local.capture = None
+            _release_info_level()
+
+
+class _ThreadRoutedStream:
+    """Sends writes from a capturing thread to its buffer, others to ``target``."""
+
+    def __init__(self, target, buffer_name: str) -> None:
+        self.target = target
+        self.buffer_name = buffer_name
+
+    def _stream(self):
+        capture = _Capture.current()
+        return getattr(capture, self.buffer_name) if capture is not None else self.target
+
+    def write(self, text: str) -> int:
+        return self._stream().write(text)
+
+    def flush(self) -> None:
+        self._stream().flush()
+
+    def __getattr__(self, item):
+        return getattr(self.target, item)
+
+
+class _CaptureLogHandler(logging.Handler):
+    """Copies log records emitted on a capturing thread into its stderr."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        capture = _Capture.current()
+        if capture is None:
+            return
+        try:
+            capture.stderr.write(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+
+class _OriginalLevelFilter(logging.Filter):
+    """Keeps a handler at the root level in force before a job lowered it.
+
+    Records from loggers with their own level passed the handler before too,
+    so only records that rely on the root level are checked.
+    """
+
+    def __init__(self, level: int) -> None:
+        super().__init__()
+        self.level = level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.level:
+            return True
+        logger = logging.getLogger(record.name)
+        while logger.parent is not None:
+            if logger.level:
+                return record.levelno >= logger.level
+            logger = logger.parent
+        return False
+
+
+_hooks_lock = threading.Lock()
+_log_handler = _CaptureLogHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+# Jobs currently holding the root logger at INFO, and what to restore
+_level_holds = 0
+_level_filter: Optional[_OriginalLevelFilter] = None
+
+
+def _install_capture_hooks() -> None:
+    with _hooks_lock:
+        for name in ("stdout", "stderr"):
+            stream = getattr(sys, name)
+            if not isinstance(stream, _ThreadRoutedStream):
+                setattr(sys, name, _ThreadRoutedStream(stream, name))
+        root = logging.getLogger()
+        if _log_handler not in root.handlers:
+            root.addHandler(_log_handler)
+
+
+def _hold_info_level() -> None:
+    """Lower a root logger above INFO to INFO while any job runs."""
+    global _level_holds, _level_filter
+    with _hooks_lock:
+        _level_holds += 1
+        root = logging.getLogger()
+        if _level_filter is not None or root.level <= logging.INFO:
+            return
+        _level_filter = _OriginalLevelFilter(root.level)
+        for handler in root.handlers:
+            if handler is not _log_handler:
+                handler.addFilter(_level_filter)
+        root.setLevel(logging.INFO)
+
+
+def _release_info_level() -> None:
+    global _level_holds, _level_filter
+    with _hooks_lock:
+        _level_holds -= 1
+        if _level_holds or _level_filter is None:
+            return
+        root = logging.getLogger()
+        for handler in root.handlers:
+            handler.removeFilter(_level_filter)
+        root.setLevel(_level_filter.level)
+        _level_filter = None
+
+
+def _load_entry(spec: JobSpec, scripts_dir: str) -> Callable[[], object]:
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+    module = importlib.import_module(Path(spec.script_name).stem)
+    return getattr(module, spec.entry)
+
+
+def _exit_code(value: object) -> int:
+    """Map an entry return value / ``SystemExit.code`` to an exit code."""
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    print(value, file=sys.stderr)
+    return 1
+
+
+def _call_entry(spec: JobSpec, scripts_dir: str) -> Tuple[int, str, str]:
+    """Run a job's entry function with output captured (worker thread or process)."""
+    capture = _Capture()
+    with capture.active():
+        try:
+            exit_code = _exit_code(_load_entry(spec, scripts_dir)())
+        except SystemExit as e:
+            exit_code = _exit_code(e.code)
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+    return exit_code, capture.stdout.getvalue(), capture.stderr.getvalue()
+
+
+def _warm_worker() -> None:
+    """Process pool initializer: pay the heavy imports once per worker."""
+    import pandas  # noqa: F401
+
+    import src.database  # noqa: F401
+
+
+@dataclass
+class _RunningJob:
+    """Bookkeeping for a job that has been submitted and not yet finished."""
+
+    started_at: float
+    timeout: int
+    timed_out_at: Optional[float] = None
+
+
+_pool_lock = threading.Lock()
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_running: Dict[str, _RunningJob] = {}
+
+
+def running_jobs() -> Dict[str, Dict[str, object]]:
+    """In-process jobs still running, including thread jobs past their timeout."""
+    now = time.time()
+    with _pool_lock:
+        return {
+            name: {
+                "running_seconds": round(now - job.started_at, 1),
+                "timeout": job.timeout,
+                "timed_out": job.timed_out_at is not None,
+            }
+            for name, job in _running.items()
+        }
+
+
+def _get_pool(kind: str):
+    global _thread_pool, _process_pool
+    with _pool_lock:
+        if kind == "process":
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=PROCESS_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker,
+                )
+            return _process_pool
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(
+                max_workers=THREAD_POOL_WORKERS, thread_name_prefix="job"
+            )
+        return _thread_pool
+
+
+def _terminate_process_pool() -> None:
+    """Kill the process pool (after a timeout); the next job starts a new one."""
+    global _process_pool
+    with _pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is None:
+        return
+    for process in list(getattr(pool, "_processes", {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_job(spec: JobSpec, timeout: int) -> TaskResult:
+    script_name = spec.script_name
+    started_at = time.time()
+
+    def result(exit_code: int, stdout: str, stderr: str) -> TaskResult:
+        finished_at = time.time()
+        return TaskResult(
+            task_name=script_name,
+            exit_code=exit_code,
+            duration_seconds=round(finished_at - started_at, 1),
+            stdout=_tail(stdout, _STDOUT_LIMIT),
+            stderr=_tail(stderr, _STDERR_LIMIT),
+            started_at=started_at,
+            finished_at=finished_at,
+        )
+
+    with _pool_lock:
+        previous = _running.get(script_name)
+        if previous is None:
+            job = _running[script_name] = _RunningJob(started_at, timeout)
+    if previous is not None:
+        running_for = started_at - previous.started_at
+        if previous.timed_out_at is not None:
+            message = (
+                f"Previous run timed out after {previous.timeout}s and is still running "
+                f"({running_for:.0f}s); a thread job cannot be stopped, so this job is "
+                "refused until that run finishes"
+            )
+        else:
+            message = f"Still running from a previous run ({running_for:.0f}s)"
+        LOGGER.error("Job refused: %s — %s", script_name, message)
+        return result(-4, "", message)
+
+    LOGGER.info("Running job in %s pool: %s (timeout=%ds)", spec.pool, script_name, timeout)
+
+    def release(_: Optional[Future]) -> None:
+        with _pool_lock:
+            if _running.get(script_name) is job:
+                del _running[script_name]
+        if job.timed_out_at is not None:
+            LOGGER.warning(
+                "Timed-out job finished after %.0fs: %s", time.time() - job.started_at, script_name
+            )
+
+    try:
+        future = _get_pool(spec.pool).submit(_call_entry, spec, str(_SCRIPTS_DIR))
+    except Exception as e:
+        release(None)
+        LOGGER.error("Job submission error: %s — %s", script_name, e)
+        return result(-3, "", str(e))
+    future.add_done_callback(release)
+
+    try:
+        exit_code, stdout, stderr = future.result(timeout=timeout)
+    except FutureTimeoutError:
+        LOGGER.error("Job timed out after %ds: %s", timeout, script_name)
+        if spec.pool == "process":
+            _terminate_process_pool()
+            release(None)
+            return result(-2, "", f"Timed out after {timeout}s")
+        job.timed_out_at = time.time()
+        return result(
+            -2, "", f"Timed out after {timeout}s; the job thread keeps running in the background"
+        )
+    except Exception as e:
+        LOGGER.error("Job execution error: %s — %s", script_name, e)
+        if spec.pool == "process":
+            _terminate_process_pool()
+        return result(-3, "", str(e))
+
+    return result(exit_code, stdout, stderr)
+
+
+def shutdown_job_pools() -> None:
+    """Stop the worker pools (application shutdown)."""
+    global _thread_pool
+    with _pool_lock:
+        pool, _thread_pool = _thread_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+    _terminate_process_pool()
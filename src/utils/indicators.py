@@ -1,9 +1,242 @@
 """
 技术指标计算工具
 
-提供常用的技术指标计算函数，如MACD、MA等
+提供常用的技术指标计算函数，如MACD、MA等。
+
+底层是一组 NumPy 指标内核 (sma / ema / rsi / macd / rolling_*)：输入可以是
+一维序列，也可以是二维数组 (标的 × 时间，时间正序，历史较短的标的左侧用 NaN 补齐)，
+一次调用即可算出全市场的指标。
 """
+from dataclasses import dataclass
+from typing import Optional
+
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# ==================== 向量化指标内核 ====================
+
+
+def _as_2d(values) -> tuple[np.ndarray, bool]:
+    """转换为 (标的 × 时间) 的二维 float 数组，返回是否需要还原为一维"""
+    arr = np.asarray(values, dtype=float)
+    if arr.ndim == 1:
+        return arr[np.newaxis, :], True
+    return arr, False
+
+
+def _first_valid(x: np.ndarray) -> np.ndarray:
+    """每行第一个非 NaN 的位置（全为 NaN 时为列数）"""
+    valid = ~np.isnan(x)
+    return np.where(valid.any(axis=1), valid.argmax(axis=1), x.shape[1])
+
+
+def sma(values, period: int, partial: bool = False) -> np.ndarray:
+    """
+    简单移动平均（累加和差分，O(n)）
+
+    Args:
+        values: 一维序列或二维数组 (标的 × 时间)
+        period: 周期
+        partial: 为True时不足 period 的前期使用累积平均，否则为NaN
+
+    Returns:
+        与输入形状相同的数组
+    """
+    x, squeeze = _as_2d(values)
+    window_sum = _window_sums(np.where(np.isnan(x), 0.0, x), period)
+    window_count = _window_sums((~np.isnan(x)).astype(float), period)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if partial:
+            out = np.where(window_count > 0, window_sum / window_count, np.nan)
+        else:
+            out = np.where(window_count == period, window_sum / period, np.nan)
+    return out[0] if squeeze else out
+
+
+def _cumsum0(x: np.ndarray) -> np.ndarray:
+    """沿时间轴的累加和，左侧补一列0"""
+    sums = np.zeros((x.shape[0], x.shape[1] + 1))
+    np.cumsum(x, axis=1, out=sums[:, 1:])
+    return sums
+
+
+def _window_sums(x: np.ndarray, period: int) -> np.ndarray:
+    """最近 period 个值的和（前期不足时为已有值的和）"""
+    sums = _cumsum0(x)
+    n = x.shape[1]
+    out = np.empty_like(x)
+    head = min(period - 1, n)
+    out[:, :head] = sums[:, 1:head + 1]
+    if n >= period:
+        out[:, period - 1:] = sums[:, period:] - sums[:, :n + 1 - period]
+    return out
+
+
+def _ema_recurrence(
+    x: np.ndarray, k: float, seed_col: np.ndarray, seed_val: np.ndarray
+) -> np.ndarray:
+    """
+    y[t] = (x[t] - y[t-1]) * k + y[t-1]，每行从 seed_col 处的 seed_val 开始
+
+    单行时直接用 Python 浮点循环（开销最小），多行时沿时间轴逐列递推、
+    每一步对所有标的向量化计算；两种方式逐位结果相同。
+    """
+    rows, n = x.shape
+    out = np.full((rows, n), np.nan)
+
+    if rows == 1:
+        start = int(seed_col[0])
+        if start >= n:
+            return out
+        row = x[0].tolist()
+        cur = float(seed_val[0])
+        values = [cur]
+        for price in row[start + 1:]:
+            cur = (price - cur) * k + cur
+            values.append(cur)
+        out[0, start:] = values
+        return out
+
+    # 转为 (时间 × 标的) 连续内存，逐列递推时按行读取
+    xt = np.ascontiguousarray(x.T)
+    out_t = np.full((n, rows), np.nan)
+    cur = np.full(rows, np.nan)
+    for t in range(int(seed_col.min()) if rows else n, n):
+        cur = (xt[t] - cur) * k + cur
+        seeded = seed_col == t
+        if seeded.any():
+            cur[seeded] = seed_val[seeded]
+        out_t[t] = cur
+    return out_t.T
+
+
+def ema(
+    values,
+    period: int,
+    alpha: Optional[float] = None,
+    seed: str = "first",
+    init=None,
+) -> np.ndarray:
+    """
+    指数移动平均 EMA[t] = (x[t] - EMA[t-1]) * alpha + EMA[t-1]
+
+    Args:
+        values: 一维序列或二维数组 (标的 × 时间)
+        period: 周期，默认 alpha = 2 / (period + 1)
+        alpha: 平滑系数，指定时覆盖 period 推导的值（如 Wilder 平滑用 1/period）
+        seed: 初值方式，"first" 用第一个有效值，"sma" 用前 period 个有效值的均值
+        init: 上一时刻的EMA值（标量或每个标的一个值），指定时忽略 seed，
+              从第一列开始继续递推
+
+    Returns:
+        与输入形状相同的数组，初值之前为NaN
+    """
+    x, squeeze = _as_2d(values)
+    k = 2.0 / (period + 1) if alpha is None else alpha
+    rows, n = x.shape
+
+    if init is not None:
+        init_col = np.broadcast_to(np.asarray(init, dtype=float), (rows,))
+        extended = np.hstack([init_col[:, np.newaxis], x])
+        out = _ema_recurrence(extended, k, np.zeros(rows, dtype=int), init_col)[:, 1:]
+        return out[0] if squeeze else out
+
+    first = _first_valid(x)
+    row_idx = np.arange(rows)
+    if seed == "sma":
+        seed_col = first + period - 1
+        # 前 period 个有效值的均值
+        sums = _cumsum0(np.where(np.isnan(x), 0.0, x))
+        end = np.minimum(seed_col + 1, n)
+        seed_val = (sums[row_idx, end] - sums[row_idx, np.minimum(first, n)]) / period
+    elif seed == "first":
+        seed_col = first
+        seed_val = x[row_idx, np.minimum(first, n - 1)] if n else np.full(rows, np.nan)
+    else:
+        raise ValueError(f"Unknown EMA seed: {seed!r}")
+
+    out = _ema_recurrence(x, k, seed_col, seed_val)
+    return out[0] if squeeze else out
+
+
+def rsi(closes, period: int = 14) -> np.ndarray:
+    """
+    Wilder RSI
+
+    Args:
+        closes: 一维序列或二维数组 (标的 × 时间)
+        period: 周期
+
+    Returns:
+        与输入形状相同的数组，前 period 个位置为NaN
+    """
+    x, squeeze = _as_2d(closes)
+    delta = np.diff(x, axis=1)
+    missing = np.isnan(delta)
+    pad = np.full((x.shape[0], 1), np.nan)
+    gains = np.hstack([pad, np.where(missing, np.nan, np.maximum(delta, 0.0))])
+    losses = np.hstack([pad, np.where(missing, np.nan, np.maximum(-delta, 0.0))])
+
+    avg_gain = ema(gains, period, alpha=1.0 / period, seed="sma")
+    avg_loss = ema(losses, period, alpha=1.0 / period, seed="sma")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    out = np.where(avg_loss == 0, 100.0, out)
+    return out[0] if squeeze else out
+
+
+def macd(
+    closes,
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9,
+    seed: str = "first",
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    MACD 指标数组
+
+    Args:
+        closes: 一维序列或二维数组 (标的 × 时间)
+        fast_period: 快线周期
+        slow_period: 慢线周期
+        signal_period: 信号线周期
+        seed: EMA初值方式，见 ema
+
+    Returns:
+        (DIF, DEA, MACD柱 = (DIF - DEA) * 2)
+    """
+    dif = ema(closes, fast_period, seed=seed) - ema(closes, slow_period, seed=seed)
+    dea = ema(dif, signal_period, seed=seed)
+    return dif, dea, (dif - dea) * 2
+
+
+def _rolling(values, period: int, reducer) -> np.ndarray:
+    x, squeeze = _as_2d(values)
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= period:
+        out[:, period - 1:] = reducer(sliding_window_view(x, period, axis=1), axis=-1)
+    return out[0] if squeeze else out
+
+
+def rolling_std(values, period: int) -> np.ndarray:
+    """滚动总体标准差 (ddof=0)，不足 period 的位置为NaN"""
+    return _rolling(values, period, np.std)
+
+
+def rolling_max(values, period: int) -> np.ndarray:
+    """滚动最大值，不足 period 的位置为NaN"""
+    return _rolling(values, period, np.max)
+
+
+def rolling_min(values, period: int) -> np.ndarray:
+    """滚动最小值，不足 period 的位置为NaN"""
+    return _rolling(values, period, np.min)
+
+
+# ==================== 列表接口 ====================
 
 
 def calculate_ma(prices: list[float], period: int) -> list[float]:
@@ -15,27 +248,16 @@ def calculate_ma(prices: list[float], period: int) -> list[float]:
         period: MA周期
 
     Returns:
-        MA值列表,长度与输入相同
+        MA值列表,长度与输入相同（前期数据不足时使用累积平均）
 
     Example:
         >>> prices = [10, 11, 12, 13, 14]
         >>> calculate_ma(prices, 3)
         [10.0, 10.5, 11.0, 12.0, 13.0]
     """
-    if len(prices) < period:
-        # 数据不足时使用累积平均
-        return [sum(prices[:i+1]) / (i+1) for i in range(len(prices))]
-
-    result = []
-    for i in range(len(prices)):
-        if i < period - 1:
-            # 前期数据不足,使用累积平均
-            result.append(sum(prices[:i+1]) / (i+1))
-        else:
-            # 计算period周期的MA
-            result.append(sum(prices[i-period+1:i+1]) / period)
-
-    return result
+    if len(prices) == 0:
+        return []
+    return sma(prices, period, partial=True).tolist()
 
 
 def calculate_macd(
@@ -67,45 +289,87 @@ def calculate_macd(
         >>> result.keys()
         dict_keys(['dif', 'dea', 'macd'])
     """
+    result, _ = calculate_macd_incremental(
+        close_prices,
+        fast_period=fast_period,
+        slow_period=slow_period,
+        signal_period=signal_period,
+    )
+    return result
+
+
+@dataclass(frozen=True)
+class MacdState:
+    """
+    MACD递推状态（某根K线计算完成后的EMA值）
+
+    Attributes:
+        ema_fast: 快线EMA
+        ema_slow: 慢线EMA
+        dea: 信号线 (DIF的EMA)
+        bar_count: 截至该K线参与计算的K线数量
+    """
+    ema_fast: float
+    ema_slow: float
+    dea: float
+    bar_count: int
+
+
+def calculate_macd_incremental(
+    close_prices: list[float],
+    state: Optional[MacdState] = None,
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9,
+) -> tuple[dict[str, list[float | None]], list[MacdState]]:
+    """
+    从已有状态继续计算MACD（O(新增K线数)）
+
+    EMA[i] = (Price[i] - EMA[i-1]) * multiplier + EMA[i-1]，multiplier = 2 / (period + 1)。
+    state 为None时以第一根K线的收盘价作为EMA初值，结果与 calculate_macd 一致；
+    传入上一根K线的状态时，结果与对完整历史调用 calculate_macd 逐位相同。
+
+    Args:
+        close_prices: 新增K线的收盘价（时间正序）
+        state: 上一根K线计算完成后的状态，None 表示从头计算
+        fast_period: 快线周期，默认12
+        slow_period: 慢线周期，默认26
+        signal_period: 信号线周期，默认9
+
+    Returns:
+        (包含 dif, dea, macd 的字典, 每根K线计算完成后的状态列表)；
+        累计K线数不足 slow_period 时指标值为None（状态照常返回）
+    """
+    closes = np.asarray(close_prices, dtype=float)
+    if state is None:
+        if closes.size == 0:
+            return {"dif": [], "dea": [], "macd": []}, []
+        ema_fast = ema(closes, fast_period)
+        ema_slow = ema(closes, slow_period)
+        dif = ema_fast - ema_slow
+        dea = ema(dif, signal_period)
+        base_count = 0
+    else:
+        ema_fast = ema(closes, fast_period, init=state.ema_fast)
+        ema_slow = ema(closes, slow_period, init=state.ema_slow)
+        dif = ema_fast - ema_slow
+        dea = ema(dif, signal_period, init=state.dea)
+        base_count = state.bar_count
+
+    states = [
+        MacdState(f, s, d, base_count + i + 1)
+        for i, (f, s, d) in enumerate(zip(ema_fast.tolist(), ema_slow.tolist(), dea.tolist()))
+    ]
+    difs = dif.tolist()
+    deas = dea.tolist()
+
     # 数据量不足时返回None值
-    if len(close_prices) < slow_period:
-        return {
-            "dif": [None] * len(close_prices),
-            "dea": [None] * len(close_prices),
-            "macd": [None] * len(close_prices),
-        }
-
-    closes = np.array(close_prices, dtype=float)
-
-    def ema(data: np.ndarray, period: int) -> np.ndarray:
-        """
-        计算指数移动平均 (Exponential Moving Average)
-
-        EMA[i] = (Price[i] - EMA[i-1]) * multiplier + EMA[i-1]
-        其中 multiplier = 2 / (period + 1)
-        """
-        result = np.zeros(len(data))
-        multiplier = 2 / (period + 1)
-        result[0] = data[0]
-        for i in range(1, len(data)):
-            result[i] = (data[i] - result[i - 1]) * multiplier + result[i - 1]
-        return result
-
-    # 计算快线和慢线EMA
-    ema_fast = ema(closes, fast_period)
-    ema_slow = ema(closes, slow_period)
-
-    # DIF = 快线EMA - 慢线EMA
-    dif = ema_fast - ema_slow
-
-    # DEA = DIF的EMA (信号线)
-    dea = ema(dif, signal_period)
-
-    # MACD柱状图 = (DIF - DEA) * 2
-    macd_bar = (dif - dea) * 2
+    if base_count + len(difs) < slow_period:
+        none = [None] * len(difs)
+        return {"dif": none, "dea": list(none), "macd": list(none)}, states
 
     return {
-        "dif": [round(v, 4) for v in dif.tolist()],
-        "dea": [round(v, 4) for v in dea.tolist()],
-        "macd": [round(v, 4) for v in macd_bar.tolist()],
-    }
+        "dif": [round(v, 4) for v in difs],
+        "dea": [round(v, 4) for v in deas],
+        "macd": [round((d - e) * 2, 4) for d, e in zip(difs, deas)],
+    }, states
@@ -0,0 +1,153 @@
+"""
+多关键词匹配（Aho–Corasick 自动机）
+
+一次构建，对文本单次扫描即可找出全部命中的关键词，耗时与文本长度线性相关，
+不随关键词数量增长。供 KeywordDetector（关键词规则 + 自选股代码/名称）
+和 NewsAggregator（包含/排除词）使用。
+
+大小写:
+- ignore_case=True 的关键词对 ASCII 字母不区分大小写
+- 其余关键词（中文、股票代码/名称等）按原文精确匹配
+
+扫描在 ASCII 小写化后的文本上进行（逐字符映射，位置与原文一一对应），
+精确匹配的关键词命中后再与原文对应片段比对确认。
+"""
+
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Set
+
+# 仅折叠 ASCII 字母，保证折叠前后长度不变
+_ASCII_LOWER = {code: code + 32 for code in range(ord("A"), ord("Z") + 1)}
+
+
+class KeywordMatcher:
+    """
+    Aho–Corasick 多模式匹配器
+
+    用法::
+
+        matcher = KeywordMatcher()
+        matcher.add("DeepSeek", key="ai", ignore_case=True)
+        matcher.add("芯片", key="chip")
+        matcher.build()
+        matcher.search("deepseek发布芯片")  # ["ai", "chip"]
+
+    build() 之后只读，可在多线程间共享；关键词变化时重新构建一个新实例。
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 节点 → 在该节点结束的关键词编号（含 fail 链上的）
+        self._output: List[List[int]] = [[]]
+        self._patterns: List[str] = []
+        self._exact: List[bool] = []
+        self._keys: List[Hashable] = []
+        # key → 首次 add 的顺序，决定 search 返回顺序
+        self._key_order: Dict[Hashable, int] = {}
+        # 空关键词：任何文本都命中（与 "" in text 一致）
+        self._always: List[int] = []
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def add(self, keyword: str, key: Hashable = None, ignore_case: bool = False) -> None:
+        """
+        添加关键词
+
+        Args:
+            keyword: 关键词
+            key: 命中时返回的标识（默认为关键词本身）；多个关键词可共用一个key
+            ignore_case: 是否忽略 ASCII 大小写
+        """
+        if self._built:
+            raise RuntimeError("KeywordMatcher is already built")
+        key = keyword if key is None else key
+        idx = len(self._patterns)
+        self._patterns.append(keyword)
+        self._exact.append(not ignore_case)
+        self._keys.append(key)
+        self._key_order.setdefault(key, len(self._key_order))
+
+        if not keyword:
+            self._always.append(idx)
+            return
+
+        node = 0
+        for ch in keyword.translate(_ASCII_LOWER):
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = nxt
+        self._output[node].append(idx)
+
+    def build(self) -> "KeywordMatcher":
+        """计算 fail 链接（BFS），之后不可再 add"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+        self._built = True
+        return self
+
+    def search(self, text: str) -> List[Hashable]:
+        """
+        查找文本中命中的全部关键词
+
+        Returns:
+            命中的 key 列表（去重，按 key 首次 add 的顺序）
+        """
+        matched = self._scan(text, stop_at_first=False)
+        keys = {self._keys[idx] for idx in matched}
+        return sorted(keys, key=self._key_order.__getitem__)
+
+    def matches(self, text: str) -> bool:
+        """文本是否命中任一关键词（命中即停止扫描）"""
+        return bool(self._scan(text, stop_at_first=True))
+
+    def _scan(self, text: str, stop_at_first: bool) -> Set[int]:
+        if not self._built:
+            raise RuntimeError("KeywordMatcher.build() must be called before searching")
+
+        found: Set[int] = set(self._always)
+        if found and stop_at_first:
+            return found
+
+        goto, fail, output = self._goto, self._fail, self._output
+        patterns, exact = self._patterns, self._exact
+        node = 0
+        for pos, ch in enumerate(text.translate(_ASCII_LOWER)):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for idx in output[node]:
+                if idx in found:
+                    continue
+                if exact[idx]:
+                    pattern = patterns[idx]
+                    if text[pos - len(pattern) + 1:pos + 1] != pattern:
+                        continue
+                found.add(idx)
+                if stop_at_first:
+                    return found
+        return found
+
+
+def build_matcher(keywords: Iterable[str], ignore_case: bool = False) -> KeywordMatcher:
+    """用一组关键词构建匹配器（key 为关键词本身）"""
+    matcher = KeywordMatcher()
+    for keyword in keywords:
+        matcher.add(keyword, ignore_case=ignore_case)
+    return matcher.build()
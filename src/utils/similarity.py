@@ -0,0 +1,115 @@
+"""
+序列相似度计算工具
+
+z 归一化欧氏距离的 NumPy 内核（MASS 算法）：
+查询序列与目标序列所有窗口的距离一次算出，不逐窗口归一化。
+
+    d(i)^2 = 2m * (1 - (QT(i) - m * μq * μt(i)) / (m * σq * σt(i)))
+
+- QT 为滑动点积：短查询直接 np.correlate (O(nm))，长查询用 FFT (O(n log n))
+- μt / σt 为窗口滚动均值和标准差，由累加和差分得到 (O(n))
+- 目标序列可以是多只股票首尾拼接的长序列，跨股票的窗口由调用方屏蔽
+"""
+from typing import Tuple
+
+import numpy as np
+
+# 查询长度超过该值时滑动点积改用 FFT
+FFT_MIN_QUERY_LENGTH = 64
+
+# 窗口标准差（相对窗口均值）低于该值视为平盘（如停牌），距离记为 inf
+FLAT_REL_STD = 1e-8
+
+
+def is_flat(values: np.ndarray) -> bool:
+    """序列是否为平盘（标准差相对均值可以忽略）"""
+    values = np.asarray(values, dtype=float)
+    return bool(values.std() <= FLAT_REL_STD * max(abs(values.mean()), 1.0))
+
+
+def sliding_dot(query: np.ndarray, series: np.ndarray) -> np.ndarray:
+    """
+    查询序列与目标序列每个窗口的点积
+
+    Args:
+        query: 长度 m 的查询序列
+        series: 长度 n 的目标序列 (n >= m)
+
+    Returns:
+        长度 n - m + 1 的数组，第 i 项为 dot(query, series[i:i+m])
+    """
+    m, n = len(query), len(series)
+    if m <= FFT_MIN_QUERY_LENGTH:
+        return np.correlate(series, query, mode="valid")
+
+    size = 1 << (n + m - 1).bit_length()
+    product = np.fft.rfft(series, size) * np.fft.rfft(query[::-1], size)
+    return np.fft.irfft(product, size)[m - 1:n]
+
+
+def rolling_mean_std(series: np.ndarray, m: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    长度为 m 的滑动窗口均值和（总体）标准差
+
+    Args:
+        series: 目标序列
+        m: 窗口长度
+
+    Returns:
+        (均值, 标准差)，长度均为 n - m + 1
+    """
+    sums = np.concatenate(([0.0], np.cumsum(series)))
+    sq_sums = np.concatenate(([0.0], np.cumsum(series * series)))
+    mean = (sums[m:] - sums[:-m]) / m
+    var = (sq_sums[m:] - sq_sums[:-m]) / m - mean * mean
+    return mean, np.sqrt(np.maximum(var, 0.0))
+
+
+def znorm_distance_profile(query: np.ndarray, series: np.ndarray) -> np.ndarray:
+    """
+    查询序列与目标序列所有窗口的 z 归一化欧氏距离
+
+    距离范围 [0, 2√m]：0 为形态相同，√(2m) 为不相关，2√m 为完全反向。
+    z 归一化对每个窗口的平移和缩放不敏感，因此目标序列可以先整体缩放
+    （如除以均值）以控制累加和的量级，结果不变。
+
+    Args:
+        query: 长度 m 的查询序列（不能是平盘）
+        series: 长度 n 的目标序列
+
+    Returns:
+        长度 n - m + 1 的距离数组，平盘窗口为 inf；n < m 时为空数组
+    """
+    query = np.asarray(query, dtype=float)
+    series = np.asarray(series, dtype=float)
+    m = len(query)
+    if len(series) < m:
+        return np.empty(0)
+
+    if is_flat(query):
+        raise ValueError("查询序列为平盘，无法做 z 归一化")
+    q_mean, q_std = query.mean(), query.std()
+
+    qt = sliding_dot(query, series)
+    mean, std = rolling_mean_std(series, m)
+
+    flat = std <= FLAT_REL_STD * np.maximum(np.abs(mean), 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = (qt - m * q_mean * mean) / (m * q_std * std)
+    dist = np.sqrt(np.maximum(2 * m * (1 - np.clip(corr, -1.0, 1.0)), 0.0))
+    dist[flat] = np.inf
+    return dist
+
+
+def distance_to_similarity(distance, m: int):
+    """
+    z 归一化距离转换为相似度 (0-100)
+
+    100 为形态相同，50 为距离 √m（相关系数 0.5），约 29 为不相关，0 为完全反向
+    """
+    return np.clip(100 * (1 - np.asarray(distance) / (2 * np.sqrt(m))), 0, 100)
+
+
+def similarity_to_distance(similarity: float, m: int) -> float:
+    """相似度 (0-100) 转换为 z 归一化距离上界"""
+    return (1 - similarity / 100) * 2 * np.sqrt(m)
@@ -518,3 +518,19 @@ class TestHealthFailures:
         assert failure["error_message"] == "TuShare API rate limit exceeded"
         assert failure["started_at"] is not None
         assert failure["completed_at"] is not None
+
+
+class TestHealthKlineCache:
+    """Tests for GET /api/health/kline-cache endpoint"""
+
+    def test_reports_cache_stats(self, client, db_session: Session):
+        from src.repositories.kline_cache import get_kline_cache
+
+        get_kline_cache(db_session).get(("STOCK", "600519", "DAY"), 10)
+
+        resp = client.get("/api/health/kline-cache")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["enabled"] is True
+        assert data["misses"] == 1
+        assert {"hits", "evictions", "size", "hit_rate"} <= data.keys()
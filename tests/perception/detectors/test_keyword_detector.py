@@ -380,6 +380,17 @@ class TestDynamicConfig:
         signals = d.detect(_make_event(title="贵州茅台"))
         assert len(signals) == 1
 
+    def test_mixed_cjk_keyword_is_case_sensitive(self):
+        d = KeywordDetector(rules=[KeywordRule("A股", Priority.HIGH)])
+        assert len(d.detect(_make_event(title="A股大涨"))) == 1
+        assert d.detect(_make_event(title="a股大涨")) == []
+
+    def test_many_rules_keep_rule_order(self):
+        rules = [KeywordRule(f"关键词{i:04d}", Priority.NORMAL) for i in range(2000)]
+        d = KeywordDetector(rules=rules)
+        signals = d.detect(_make_event(title="关键词1500 与 关键词0007 同时出现"))
+        assert signals[0].metadata["matched_keywords"] == ["关键词0007", "关键词1500"]
+
     def test_get_rules_snapshot(self):
         d = KeywordDetector(rules=[KeywordRule("X", Priority.NORMAL)])
         rules = d.get_rules()
@@ -19,6 +19,7 @@ import pytest
 
 from src.perception.aggregator import AggregationReport, SignalAggregator
 from src.perception.detectors.anomaly_detector import AnomalyDetector
+from src.perception.detectors.base import Detector
 from src.perception.detectors.flow_detector import FlowDetector
 from src.perception.detectors.keyword_detector import KeywordDetector
 from src.perception.detectors.price_detector import PriceDetector
@@ -198,7 +199,7 @@ def temp_db() -> str:
                (symbol_type, symbol_code, timeframe, trade_time,
                 open, high, low, close, volume, amount)
                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            ("stock", "600519", "daily", day, o, h, lo, c, vol, amt),
+            ("STOCK", "600519", "DAY", day, o, h, lo, c, vol, amt),
         )
 
     conn.commit()
@@ -522,6 +523,42 @@ class TestMarketDataSource:
         assert "close" in bars[0]
         assert "volume" in bars[0]
 
+    def test_get_klines_returns_latest_bars(self, temp_db, _patch_session):
+        src = MarketDataSource(db_path=temp_db)
+        bars = src.get_klines("600519", limit=5)
+        assert [b["trade_time"] for b in bars] == [
+            f"2026-01-{d:02d}" for d in range(26, 31)
+        ]
+
+    def test_load_watchlist_klines_single_session(self, temp_db, _patch_session):
+        from src import database
+
+        src = MarketDataSource(db_path=temp_db)
+        with patch(
+            "src.database.SessionLocal", wraps=database.SessionLocal
+        ) as session_factory, patch(
+            "src.perception.sources.market_data_source.KLINE_BAR_LIMIT", 10
+        ):
+            events = src._load_watchlist_klines()
+
+        assert session_factory.call_count == 1
+        assert [e.symbol for e in events] == ["600519"]
+        data = events[0].data
+        assert len(data["bars"]) == 10
+        assert list(data["columns"]["trade_time"]) == [
+            f"2026-01-{d:02d}" for d in range(21, 31)
+        ]
+        assert data["columns"]["close"][-1] == data["today"]["close"]
+
+    def test_timeframe_aliases(self):
+        from src.models import KlineTimeframe
+
+        assert MarketDataSource(kline_timeframe="daily")._kline_timeframe == KlineTimeframe.DAY
+        assert MarketDataSource(kline_timeframe="30m")._kline_timeframe == KlineTimeframe.MINS_30
+        assert MarketDataSource(kline_timeframe="DAY")._kline_timeframe == KlineTimeframe.DAY
+        with pytest.raises(ValueError):
+            MarketDataSource(kline_timeframe="weekly")
+
     def test_get_klines_missing_symbol(self, temp_db, _patch_session):
         src = MarketDataSource(db_path=temp_db)
         bars = src.get_klines("999999")
@@ -546,6 +583,47 @@ class TestMarketDataSource:
         assert src.source_type == SourceType.POLLING
 
 
+class _EchoDetector(Detector):
+    """Emits one signal per event; raises on symbol "BAD" (module-level so it pickles)."""
+
+    name = "echo"
+    accepts = [EventType.PRICE_UPDATE]
+
+    def detect(self, event: RawMarketEvent) -> List[UnifiedSignal]:
+        if event.symbol == "BAD":
+            raise ValueError("bad event")
+        return [
+            UnifiedSignal(
+                market=Market.A_SHARE,
+                asset=event.symbol,
+                direction=Direction.LONG,
+                strength=0.5,
+                confidence=0.5,
+                signal_type=SignalType.TECHNICAL,
+                source="echo",
+            )
+        ]
+
+
+def _static_source(events: List[RawMarketEvent]) -> AsyncMock:
+    source = AsyncMock()
+    source.name = "static"
+    source.source_type = SourceType.POLLING
+    source.connect = AsyncMock()
+    source.disconnect = AsyncMock()
+    source.poll.return_value = events
+    source.health = MagicMock(
+        return_value=MagicMock(
+            status=HealthStatus.HEALTHY,
+            latency_ms=1.0,
+            total_events=len(events),
+            consecutive_failures=0,
+            total_polls=1,
+        )
+    )
+    return source
+
+
 # ── Pipeline Tests ───────────────────────────────────────────────────
 
 
@@ -731,6 +809,75 @@ class TestPerceptionPipeline:
 
         await pipeline.stop()
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("executor", ["inline", "thread", "process"])
+    async def test_detector_executor_merges_in_event_order(self, executor):
+        """Sharded detector execution returns signals in serial order."""
+        now = datetime.now(timezone.utc)
+        symbols = [f"{600000 + i:06d}" for i in range(7)]
+        events = [
+            RawMarketEvent(
+                source=EventSource.SINA,
+                event_type=EventType.PRICE_UPDATE,
+                market=MarketScope.CN_STOCK,
+                symbol=code,
+                data={"price": 10.0},
+                timestamp=now,
+            )
+            for code in symbols
+        ]
+        config = PipelineConfig(
+            api_base_url="http://127.0.0.1:9999",
+            detector_executor=executor,
+            detector_workers=2,
+            detector_shard_size=2,
+        )
+        pipeline = PerceptionPipeline(
+            config=config,
+            sources=[_static_source(events)],
+            detectors=[_EchoDetector()],
+        )
+
+        signals, timings = await pipeline._run_detectors(events, [])
+        await pipeline.stop()
+
+        assert [s.asset for s in signals] == symbols
+        assert set(timings) == {"echo"}
+
+    @pytest.mark.asyncio
+    async def test_detector_errors_and_timings_in_scan_result(self):
+        """Detector errors are collected and per-detector timings reported."""
+        now = datetime.now(timezone.utc)
+        events = [
+            RawMarketEvent(
+                source=EventSource.SINA,
+                event_type=EventType.PRICE_UPDATE,
+                market=MarketScope.CN_STOCK,
+                symbol=code,
+                data={"price": 10.0},
+                timestamp=now,
+            )
+            for code in ("600000", "BAD", "600001")
+        ]
+        pipeline = PerceptionPipeline(
+            config=PipelineConfig(api_base_url="http://127.0.0.1:9999"),
+            sources=[_static_source(events)],
+            detectors=[_EchoDetector()],
+        )
+
+        result = await pipeline.scan()
+        await pipeline.stop()
+
+        assert result.signals_detected == 2
+        assert result.errors == ["Detector echo error: bad event"]
+        assert "echo" in result.detector_timings_ms
+        assert "detector_timings_ms" in result.to_dict()
+
+    def test_invalid_detector_executor(self):
+        """Unknown executor names are rejected."""
+        with pytest.raises(ValueError):
+            PipelineConfig(api_base_url="http://x", detector_executor="gpu")
+
     @pytest.mark.asyncio
     async def test_source_error_doesnt_crash_pipeline(self):
         """A failing source doesn't prevent other sources from being polled."""
@@ -108,6 +108,18 @@ class TestDeduplication:
         added = agg.ingest_one(sig2)
         assert added is True
 
+    def test_out_of_order_timestamps(self):
+        """Dedup compares against neighbours on both sides of an older timestamp."""
+        agg = SignalAggregator(AggregatorConfig(dedup_window_seconds=60))
+        ts = datetime.now(timezone.utc)
+        agg.ingest_one(_make_signal(ts=ts))
+        agg.ingest_one(_make_signal(ts=ts - timedelta(seconds=300)))
+
+        assert agg.ingest_one(_make_signal(ts=ts - timedelta(seconds=270))) is False
+        assert agg.ingest_one(_make_signal(ts=ts - timedelta(seconds=30))) is False
+        assert agg.ingest_one(_make_signal(ts=ts - timedelta(seconds=150))) is True
+        assert agg.signal_count() == 3
+
 
 class TestAssetSummary:
     def test_single_long_signal(self):
@@ -150,6 +162,16 @@ class TestAssetSummary:
         assert summary.signal_count == 3
         assert summary.composite_score > 0.5
 
+    def test_returned_summary_not_mutated_by_later_ingest(self):
+        agg = SignalAggregator()
+        agg.ingest_one(_make_signal(source="technical/rsi"))
+        summary = agg.get_asset_signals("TEST.SH")
+        agg.ingest_one(_make_signal(source="technical/macd"))
+
+        assert summary.signal_count == 1
+        assert len(summary.all_signals) == 1
+        assert len(agg.get_asset_signals("TEST.SH").all_signals) == 2
+
 
 class TestReport:
     def test_basic_report(self):
@@ -227,6 +249,32 @@ class TestStaleEviction:
         report = agg.summarize()
         assert report.total_signals == 1
 
+    def test_eviction_updates_summary(self):
+        """Scores, counts and top signal reflect only the surviving signals."""
+        agg = SignalAggregator(AggregatorConfig(max_signal_age_seconds=60))
+        now = datetime.now(timezone.utc)
+        agg.ingest([
+            _make_signal(source="flow/northbound", strength=1.0, confidence=1.0,
+                         ts=now - timedelta(seconds=120)),
+            _make_signal(source="technical/rsi", direction=Direction.SHORT,
+                         ts=now - timedelta(seconds=120)),
+            _make_signal(source="technical/macd", ts=now),
+        ])
+        before = agg.get_asset_signals("TEST.SH")
+        assert before.signal_count == 3
+        assert before.top_signal.source == "flow/northbound"
+
+        agg.summarize()
+        after = agg.get_asset_signals("TEST.SH")
+        expected = SignalAggregator()._build_asset_summary("TEST.SH", after.all_signals)
+
+        assert after.signal_count == 1
+        assert after.short_signals == 0
+        assert after.top_signal.source == "technical/macd"
+        assert after.sources == ["technical/macd"]
+        assert after.composite_score == expected.composite_score
+        assert agg.signal_count() == 1
+
 
 class TestExpiredSignal:
     def test_expired_signal_rejected(self):
@@ -0,0 +1,109 @@
+"""
+Unit tests for BoardMembershipRepository
+
+board_membership mirrors board_mapping.constituents row by row; the in-process
+BoardMembershipIndex answers board -> constituents and ticker -> boards.
+"""
+
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base
+from src.models import BoardMapping, SymbolMetadata
+from src.repositories.board_mapping_repository import BoardMappingRepository
+from src.repositories.board_membership_repository import (
+    BoardMembershipRepository,
+    get_membership_index,
+)
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh in-memory database for each test"""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+
+    yield session
+
+    session.close()
+
+
+def _upsert(session, name, board_type, constituents, code=None):
+    BoardMappingRepository(session).upsert(BoardMapping(
+        board_name=name, board_type=board_type, board_code=code, constituents=constituents,
+        last_updated=datetime.utcnow(),
+    ))
+
+
+class TestMaintenance:
+    """Memberships follow board_mapping writes"""
+
+    def test_upsert_replaces_board(self, db_session):
+        _upsert(db_session, "白酒", "concept", ["600519", "000858"], code="885001.TI")
+        _upsert(db_session, "白酒", "concept", ["000858", "000568", "000858"], code="885001.TI")
+        db_session.commit()
+
+        repo = BoardMembershipRepository(db_session)
+        assert repo.find_constituents("白酒", "concept") == ["000858", "000568"]
+        assert repo.find_boards_by_ticker("600519", "concept") == []
+
+    def test_replace_boards(self, db_session):
+        repo = BoardMembershipRepository(db_session)
+        repo.replace_boards("concept", [("白酒", None, ["600519"]), ("锂电池", None, ["300750"])])
+        repo.replace_boards("concept", [("锂电池", None, ["300750", "002594"])])
+        repo.replace_boards("industry", [("银行", None, ["000001"])])
+        db_session.commit()
+
+        assert repo.find_boards_by_tickers("concept") == {
+            "300750": ["锂电池"], "002594": ["锂电池"],
+        }
+        assert repo.find_constituents("银行", "industry") == ["000001"]
+
+    def test_bootstrap_from_symbol_concepts(self, db_session):
+        db_session.add_all([
+            SymbolMetadata(ticker="600519", name="贵州茅台", concepts=["白酒", "MSCI"]),
+            SymbolMetadata(ticker="000858", name="五粮液", concepts=["白酒"]),
+            SymbolMetadata(ticker="000001", name="平安银行", concepts=[]),
+        ])
+        db_session.commit()
+
+        repo = BoardMembershipRepository(db_session)
+        assert repo.needs_bootstrap()
+        index = get_membership_index(db_session)
+        assert index.constituents("白酒", "concept") == ["000858", "600519"]
+        assert not repo.needs_bootstrap()
+
+
+class TestIndex:
+    """Index lookups and invalidation"""
+
+    def test_lookups(self, db_session):
+        _upsert(db_session, "白酒", "concept", ["600519", "000858"], code="885001.TI")
+        _upsert(db_session, "食品饮料", "industry", ["600519"], code="881125.TI")
+        db_session.commit()
+
+        index = get_membership_index(db_session)
+        assert len(index) == 3
+        assert index.boards_of("600519", "concept") == ["白酒"]
+        assert index.boards_of("600519", "industry") == ["食品饮料"]
+        assert index.constituents_by_code("885001.TI") == ["600519", "000858"]
+        assert index.board_code("食品饮料", "industry") == "881125.TI"
+        assert index.is_member("000858", "白酒", "concept")
+        assert not index.has_board("白酒", "industry")
+
+    def test_cached_until_commit(self, db_session):
+        _upsert(db_session, "白酒", "concept", ["600519"])
+        db_session.commit()
+
+        index = get_membership_index(db_session)
+        assert get_membership_index(db_session) is index
+
+        _upsert(db_session, "白酒", "concept", ["600519", "000858"])
+        assert get_membership_index(db_session).constituents("白酒", "concept") == ["600519", "000858"]
+        db_session.rollback()
+
+        assert get_membership_index(db_session).constituents("白酒", "concept") == ["600519"]
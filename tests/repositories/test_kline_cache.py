@@ -0,0 +1,121 @@
+"""
+Tests for KlineCache (LRU of recent bars) and its write invalidation.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.models import Kline, KlineTimeframe, SymbolType
+from src.repositories.kline_cache import KlineCache, get_kline_cache, make_key
+from src.repositories.kline_repository import KlineRepository
+
+KEY = make_key(SymbolType.STOCK, "600519", KlineTimeframe.DAY)
+
+
+def _bars(n, start=1):
+    return [(f"2026-01-{d:02d}", 1.0, 1.0, 1.0, float(d), 0.0, 0.0) for d in range(start, start + n)]
+
+
+class TestKlineCache:
+
+    def test_hit_serves_latest_slice(self):
+        cache = KlineCache()
+        cache.put(KEY, _bars(10), complete=False)
+
+        bars = cache.get(KEY, 3)
+
+        assert [b[0] for b in bars] == ["2026-01-08", "2026-01-09", "2026-01-10"]
+        assert cache.stats()["hits"] == 1
+
+    def test_larger_limit_misses_unless_complete(self):
+        cache = KlineCache()
+        cache.put(KEY, _bars(5), complete=False)
+        assert cache.get(KEY, 10) is None
+        assert cache.get(KEY, 0) is None
+
+        cache.put(KEY, _bars(5), complete=True)
+        assert len(cache.get(KEY, 10)) == 5
+        assert cache.stats()["misses"] == 2
+
+    def test_lru_eviction(self):
+        cache = KlineCache(max_entries=2)
+        keys = [make_key(SymbolType.STOCK, code, KlineTimeframe.DAY) for code in "abc"]
+        cache.put(keys[0], _bars(1), complete=True)
+        cache.put(keys[1], _bars(1), complete=True)
+        cache.get(keys[0], 1)  # a becomes most recent
+        cache.put(keys[2], _bars(1), complete=True)
+
+        assert cache.get(keys[1], 1) is None
+        assert cache.get(keys[0], 1) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_expired_entry_misses(self):
+        cache = KlineCache(ttl_seconds=10)
+        with patch("src.repositories.kline_cache.time.monotonic", return_value=100.0):
+            cache.put(KEY, _bars(3), complete=True)
+        with patch("src.repositories.kline_cache.time.monotonic", return_value=111.0):
+            assert cache.get(KEY, 3) is None
+
+    def test_put_dropped_after_concurrent_invalidation(self):
+        cache = KlineCache()
+        generation = cache.generation
+        cache.invalidate([KEY])
+        cache.put(KEY, _bars(3), complete=True, generation=generation)
+
+        assert cache.get(KEY, 3) is None
+
+    def test_latest_trade_time(self):
+        cache = KlineCache()
+        assert cache.get_latest_trade_time(KEY) == (False, None)
+        cache.put(KEY, _bars(3), complete=False)
+        assert cache.get_latest_trade_time(KEY) == (True, "2026-01-03")
+
+
+class TestWriteInvalidation:
+
+    @pytest.fixture
+    def cache(self, db_session):
+        cache = get_kline_cache(db_session)
+        cache.put(KEY, _bars(3), complete=True)
+        return cache
+
+    def test_caches_are_per_engine(self, db_session, db_engine):
+        assert get_kline_cache(db_session) is get_kline_cache(db_engine)
+        assert get_kline_cache(object()) is None
+
+    def test_upsert_columns_invalidates(self, db_session, cache):
+        KlineRepository(db_session).upsert_columns(
+            {"trade_time": ["2026-01-05"], "open": [1.0], "high": [1.0],
+             "low": [1.0], "close": [1.0]},
+            SymbolType.STOCK, KlineTimeframe.DAY, symbol_code="600519",
+        )
+        assert cache.get(KEY, 1) is None
+
+    def test_delete_by_symbol_invalidates(self, db_session, cache):
+        KlineRepository(db_session).delete_by_symbol("600519", SymbolType.STOCK, KlineTimeframe.DAY)
+        assert cache.get(KEY, 1) is None
+
+    def test_orm_flush_invalidates_and_commit_invalidates_again(self, db_session, cache):
+        db_session.add(Kline(
+            symbol_type=SymbolType.STOCK, symbol_code="600519",
+            timeframe=KlineTimeframe.DAY, trade_time="2026-01-05",
+            open=1.0, high=1.0, low=1.0, close=1.0, volume=0, amount=0,
+        ))
+        db_session.flush()
+        assert cache.get(KEY, 1) is None
+
+        # 事务内重新填充的条目在提交后失效
+        cache.put(KEY, _bars(3), complete=True)
+        db_session.commit()
+        assert cache.get(KEY, 1) is None
+
+    def test_rollback_invalidates(self, db_session, cache):
+        KlineRepository(db_session).delete_by_symbol("600519", SymbolType.STOCK, KlineTimeframe.DAY)
+        cache.put(KEY, [], complete=True)
+        db_session.rollback()
+        assert cache.get(KEY, 1) is None
+
+    def test_other_symbols_untouched(self, db_session, cache):
+        KlineRepository(db_session).delete_by_symbol("000001", SymbolType.STOCK, KlineTimeframe.DAY)
+        assert cache.get(KEY, 1) is not None
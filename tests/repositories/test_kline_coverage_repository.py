@@ -0,0 +1,193 @@
+"""
+Unit tests for KlineCoverageRepository and GapService
+
+Coverage bitmaps are maintained on kline writes; GapService answers gap
+queries from them.
+"""
+
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base
+from src.models import Kline, KlineTimeframe, SymbolType, TradeCalendar
+from src.repositories.kline_coverage_repository import KlineCoverageRepository
+from src.repositories.kline_repository import KlineRepository
+from src.services.gap_service import GapService
+
+
+TRADING_DAYS = ["2021-01-04", "2021-01-05", "2021-01-06", "2021-01-07", "2021-01-08"]
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh in-memory database for each test"""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+    for day in TRADING_DAYS:
+        session.add(TradeCalendar(date=day, is_trading_day=True))
+    session.commit()
+
+    yield session
+
+    session.close()
+
+
+def _coverage(session, code="600519", symbol_type=SymbolType.STOCK):
+    rows = KlineCoverageRepository(session).find_coverage([symbol_type], symbol_codes=[code])
+    return rows[0] if rows else None
+
+
+def _columns(dates):
+    return {
+        "trade_time": dates,
+        "open": [1.0] * len(dates),
+        "high": [1.0] * len(dates),
+        "low": [1.0] * len(dates),
+        "close": [1.0] * len(dates),
+    }
+
+
+class TestCoverageMaintenance:
+    """Coverage is updated on every write path"""
+
+    def test_upsert_columns_records_dates(self, db_session):
+        repo = KlineRepository(db_session)
+        repo.upsert_columns(
+            _columns(["20210104", "20210106"]), SymbolType.STOCK, KlineTimeframe.DAY,
+            symbol_code="600519",
+        )
+        # Earlier date extends the bitmap to the left
+        repo.upsert_columns(
+            _columns(["20201231"]), SymbolType.STOCK, KlineTimeframe.DAY,
+            symbol_code="600519",
+        )
+
+        row = _coverage(db_session)
+        assert row.first_date == "2020-12-31"
+        assert row.last_date == "2021-01-06"
+        assert row.day_count == 3
+
+    def test_upsert_batch_and_rebuild_after_orm_add(self, db_session):
+        repo = KlineRepository(db_session)
+        repo.upsert_batch([
+            Kline(
+                symbol_type=SymbolType.STOCK, symbol_code="600519", symbol_name="贵州茅台",
+                timeframe=KlineTimeframe.DAY, trade_time="2021-01-04",
+                open=1, high=1, low=1, close=1, volume=0, amount=0,
+                updated_at=datetime.now(),
+            )
+        ])
+        db_session.add(Kline(
+            symbol_type=SymbolType.STOCK, symbol_code="600519", symbol_name="贵州茅台",
+            timeframe=KlineTimeframe.DAY, trade_time="2021-01-05 15:00:00",
+            open=1, high=1, low=1, close=1, volume=0, amount=0,
+        ))
+        db_session.commit()
+        # 不经过 KlineRepository 的写入不会被跟踪，rebuild 后补齐
+        assert _coverage(db_session).day_count == 1
+
+        KlineCoverageRepository(db_session).rebuild()
+        row = _coverage(db_session)
+        assert row.day_count == 2
+        assert row.symbol_name == "贵州茅台"
+
+    def test_writes_create_missing_bookkeeping_tables(self):
+        engine = create_engine("sqlite:///:memory:")
+        Kline.__table__.create(engine)
+        session = sessionmaker(bind=engine)()
+        try:
+            # 未执行 init_db 时，直接 add 不受影响
+            session.add(Kline(
+                symbol_type=SymbolType.STOCK, symbol_code="600519",
+                timeframe=KlineTimeframe.DAY, trade_time="2021-01-04",
+                open=1, high=1, low=1, close=1, volume=0, amount=0,
+            ))
+            session.commit()
+
+            KlineRepository(session).upsert_columns(
+                _columns(["20210105"]), SymbolType.STOCK, KlineTimeframe.DAY,
+                symbol_code="600519",
+            )
+            session.commit()
+            assert _coverage(session).day_count == 1
+        finally:
+            session.close()
+
+    def test_intraday_not_tracked(self, db_session):
+        KlineRepository(db_session).upsert_columns(
+            _columns(["2021-01-04 10:00:00"]), SymbolType.STOCK, KlineTimeframe.MINS_30,
+            symbol_code="600519",
+        )
+        assert _coverage(db_session) is None
+
+    def test_delete_rebuilds(self, db_session):
+        repo = KlineRepository(db_session)
+        repo.upsert_columns(
+            _columns(TRADING_DAYS), SymbolType.STOCK, KlineTimeframe.DAY, symbol_code="600519",
+        )
+        repo.delete_by_date_range(
+            "600519", SymbolType.STOCK, KlineTimeframe.DAY,
+            datetime(2021, 1, 5), datetime(2021, 1, 6),
+        )
+        assert _coverage(db_session).day_count == 3
+
+        repo.delete_by_symbol("600519", SymbolType.STOCK, KlineTimeframe.DAY)
+        assert _coverage(db_session) is None
+
+    def test_rebuild_matches_incremental(self, db_session):
+        repo = KlineRepository(db_session)
+        repo.upsert_columns(
+            _columns(["20210104", "20210108"]), SymbolType.INDEX, KlineTimeframe.DAY,
+            symbol_code="000001.SH",
+        )
+        before = _coverage(db_session, "000001.SH", SymbolType.INDEX)
+
+        # Raw writes bypass the repository; rebuild picks them up
+        db_session.execute(text(
+            "INSERT INTO klines (symbol_type, symbol_code, timeframe, trade_time, "
+            "open, high, low, close, volume, amount, created_at, updated_at) VALUES "
+            "('INDEX', '000001.SH', 'DAY', '2021-01-06', 1, 1, 1, 1, 0, 0, "
+            "CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        ))
+        KlineCoverageRepository(db_session).rebuild()
+        after = _coverage(db_session, "000001.SH", SymbolType.INDEX)
+
+        assert before.day_count == 2
+        assert after.day_count == 3
+        assert after.first_date == before.first_date
+
+
+class TestGapService:
+    """Gap queries answered from coverage bitmaps"""
+
+    def test_missing_dates(self, db_session):
+        repo = KlineRepository(db_session)
+        repo.upsert_columns(
+            _columns(["20210104", "20210107"]), SymbolType.STOCK, KlineTimeframe.DAY,
+            symbol_code="600519",
+        )
+        repo.upsert_columns(
+            _columns(TRADING_DAYS), SymbolType.STOCK, KlineTimeframe.DAY,
+            symbol_code="000001",
+        )
+        db_session.commit()
+
+        missing = GapService(db_session).missing_dates(SymbolType.STOCK)
+        assert missing == {"600519": ["2021-01-05", "2021-01-06", "2021-01-08"]}
+
+    def test_bootstraps_empty_coverage(self, db_session):
+        db_session.execute(text(
+            "INSERT INTO klines (symbol_type, symbol_code, timeframe, trade_time, "
+            "open, high, low, close, volume, amount, created_at, updated_at) VALUES "
+            "('STOCK', '600519', 'DAY', '2021-01-08', 1, 1, 1, 1, 0, 0, "
+            "CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        ))
+        db_session.commit()
+
+        report = GapService(db_session).gap_report()
+        assert report["total_gaps"] == 4
+        assert report["details"][0]["missing_dates"] == TRADING_DAYS[:4]
@@ -259,6 +259,59 @@ class TestKlineRepositoryQueries:
         codes = set(k.symbol_code for k in klines)
         assert codes == {"000001.SH", "000300.SH"}
 
+    def test_find_by_symbols_keeps_latest_n_per_symbol(self, db_session):
+        """Window query keeps only the newest bars of each symbol, as rows"""
+        repo = KlineRepository(db_session)
+        for code, days in (("000001", 5), ("600000", 2)):
+            for day in range(1, days + 1):
+                repo.save(Kline(
+                    symbol_type=SymbolType.STOCK,
+                    symbol_code=code,
+                    timeframe=KlineTimeframe.DAY,
+                    trade_time=f"2024-01-0{day}",
+                    open=1.0, high=1.0, low=1.0, close=float(day),
+                    volume=0.0, amount=0.0,
+                ))
+        repo.commit()
+
+        rows = repo.find_by_symbols(
+            symbol_codes=["000001", "600000"],
+            symbol_type=SymbolType.STOCK,
+            timeframe=KlineTimeframe.DAY,
+            limit_per_symbol=3,
+        )
+
+        assert [(r.symbol_code, r.trade_time) for r in rows] == [
+            ("000001", "2024-01-05"), ("000001", "2024-01-04"), ("000001", "2024-01-03"),
+            ("600000", "2024-01-02"), ("600000", "2024-01-01"),
+        ]
+        assert not isinstance(rows[0], Kline)
+
+    def test_find_latest_columns_by_symbols(self, db_session):
+        """Column arrays per symbol in ascending time order"""
+        repo = KlineRepository(db_session)
+        for day in range(1, 6):
+            repo.save(Kline(
+                symbol_type=SymbolType.STOCK,
+                symbol_code="000001",
+                timeframe=KlineTimeframe.DAY,
+                trade_time=f"2024-01-0{day}",
+                open=1.0, high=1.0, low=1.0, close=float(day),
+                volume=0.0, amount=0.0,
+            ))
+        repo.commit()
+
+        columns = repo.find_latest_columns_by_symbols(
+            symbol_codes=["000001", "MISSING"],
+            symbol_type=SymbolType.STOCK,
+            timeframe=KlineTimeframe.DAY,
+            limit_per_symbol=2,
+        )
+
+        assert list(columns) == ["000001"]
+        assert columns["000001"]["trade_time"].tolist() == ["2024-01-04", "2024-01-05"]
+        assert columns["000001"]["close"].tolist() == [4.0, 5.0]
+
     def test_count_by_symbol(self, db_session, sample_klines):
         """Test counting K-lines for a symbol"""
         repo = KlineRepository(db_session)
@@ -351,6 +404,100 @@ class TestKlineRepositoryBatchOperations:
         assert latest.close == 3250.0  # 3150 + 100
 
 
+class TestKlineRepositoryColumnarUpsert:
+    """Test the columnar (non-ORM) bulk upsert path"""
+
+    def test_upsert_columns_multi_symbol_frame(self, db_session):
+        """DataFrame with several symbols and mixed date formats"""
+        import pandas as pd
+
+        repo = KlineRepository(db_session)
+        frame = pd.DataFrame({
+            "symbol_code": ["000001", "000001", "600000"],
+            "trade_time": ["20240102", "2024-01-03", pd.Timestamp("2024-01-03")],
+            "open": [10.0, 10.5, 8.0],
+            "high": [11.0, 11.5, 8.5],
+            "low": [9.5, 10.0, 7.9],
+            "close": [10.8, 11.0, 8.2],
+            "volume": [1000.0, None, 500.0],
+        })
+
+        count = repo.upsert_columns(frame, SymbolType.STOCK, KlineTimeframe.DAY)
+        repo.commit()
+
+        assert count == 3
+        rows = repo.find_by_symbol("000001", SymbolType.STOCK, KlineTimeframe.DAY)
+        assert [k.trade_time for k in rows] == ["2024-01-03", "2024-01-02"]
+        assert rows[0].volume == 0.0
+        assert rows[0].amount == 0.0
+
+    def test_upsert_columns_numpy_arrays_update(self, db_session):
+        """Mapping of NumPy arrays for a single symbol, upserted twice"""
+        import numpy as np
+
+        repo = KlineRepository(db_session)
+        data = {
+            "trade_time": np.array(["2024-01-02 10:00", "2024-01-02 10:30"]),
+            "open": np.array([1.0, 2.0]),
+            "high": np.array([1.0, 2.0]),
+            "low": np.array([1.0, 2.0]),
+            "close": np.array([1.0, 2.0]),
+            "dif": np.array([np.nan, 0.5]),
+        }
+        repo.upsert_columns(
+            data, SymbolType.INDEX, KlineTimeframe.MINS_30, symbol_code="000001.SH"
+        )
+        data["close"] = np.array([5.0, 6.0])
+        repo.upsert_columns(
+            data, SymbolType.INDEX, KlineTimeframe.MINS_30,
+            symbol_code="000001.SH", chunk_size=1,
+        )
+        repo.commit()
+
+        rows = repo.find_by_symbol("000001.SH", SymbolType.INDEX, KlineTimeframe.MINS_30)
+        assert len(rows) == 2
+        assert rows[0].trade_time == "2024-01-02 10:30:00"
+        assert [k.close for k in rows] == [6.0, 5.0]
+        assert rows[0].dif == 0.5
+        assert rows[1].dif is None
+
+    def test_upsert_columns_partial_update_keeps_volume(self, db_session):
+        """Columns absent from the input are not overwritten on conflict"""
+        repo = KlineRepository(db_session)
+        bar = {"trade_time": ["2024-01-02"], "open": [1.0], "high": [1.0], "low": [1.0], "close": [1.0]}
+        repo.upsert_columns(
+            {**bar, "volume": [100.0], "amount": [1000.0]},
+            SymbolType.STOCK, KlineTimeframe.DAY, symbol_code="000001",
+        )
+        repo.upsert_columns(
+            {**bar, "close": [2.0]}, SymbolType.STOCK, KlineTimeframe.DAY, symbol_code="000001",
+        )
+        repo.commit()
+
+        row = repo.find_by_symbol("000001", SymbolType.STOCK, KlineTimeframe.DAY)[0]
+        assert (row.close, row.volume, row.amount) == (2.0, 100.0, 1000.0)
+
+    def test_upsert_columns_requires_symbol_code(self, db_session):
+        """Missing symbol_code column and argument is an error"""
+        repo = KlineRepository(db_session)
+
+        with pytest.raises(ValueError):
+            repo.upsert_columns(
+                {"trade_time": ["2024-01-02"], "open": [1.0], "high": [1.0],
+                 "low": [1.0], "close": [1.0]},
+                SymbolType.STOCK,
+                KlineTimeframe.DAY,
+            )
+
+    def test_upsert_columns_empty(self, db_session):
+        """Empty input writes nothing"""
+        import pandas as pd
+
+        repo = KlineRepository(db_session)
+
+        assert repo.upsert_columns(pd.DataFrame(), SymbolType.STOCK, KlineTimeframe.DAY) == 0
+
+
 class TestKlineRepositoryDelete:
     """Test delete operations"""
 
@@ -0,0 +1,283 @@
+"""
+Unit tests for MarketStatsRepository
+
+market_daily_stats / sector_daily_stats are marked stale on kline writes and
+recomputed by refresh().
+"""
+
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base
+from src.models import Kline, KlineTimeframe, SymbolType
+from src.repositories.kline_repository import KlineRepository
+from src.repositories.market_stats_repository import MarketStatsRepository
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh in-memory database (with stock_sectors) for each test"""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+    session.execute(text(
+        "CREATE TABLE stock_sectors (ticker TEXT PRIMARY KEY, sector TEXT, "
+        "created_at TEXT, updated_at TEXT)"
+    ))
+    for ticker, sector in (("000001", "银行"), ("600036", "银行"), ("300750", "新能源")):
+        session.execute(
+            text("INSERT INTO stock_sectors (ticker, sector) VALUES (:t, :s)"),
+            {"t": ticker, "s": sector},
+        )
+    session.commit()
+
+    yield session
+
+    session.close()
+
+
+def _write(session, rows, symbol_type=SymbolType.STOCK, timeframe=KlineTimeframe.DAY):
+    """rows: [(code, trade_time, open, close, volume, amount), ...]"""
+    codes, times, opens, closes, volumes, amounts = zip(*rows)
+    KlineRepository(session).upsert_columns(
+        {
+            "symbol_code": list(codes),
+            "trade_time": list(times),
+            "open": list(opens),
+            "high": list(closes),
+            "low": list(opens),
+            "close": list(closes),
+            "volume": list(volumes),
+            "amount": list(amounts),
+        },
+        symbol_type,
+        timeframe,
+    )
+
+
+def _sectors(session, trade_date):
+    return {
+        row.sector: row
+        for row in MarketStatsRepository(session).find_sector_stats([trade_date])
+    }
+
+
+class TestRefresh:
+    """Stale dates are recomputed from klines"""
+
+    def test_breadth_and_turnover(self, db_session):
+        _write(db_session, [
+            ("000001", "2024-01-02", 10.0, 10.0, 100, 1000),
+            ("600036", "2024-01-02", 20.0, 20.0, 100, 2000),
+            ("300750", "2024-01-02", 30.0, 30.0, 0, 0),
+        ])
+        _write(db_session, [
+            ("000001", "2024-01-03", 10.0, 11.0, 200, 2200),   # +10% (limit up)
+            ("600036", "2024-01-03", 20.0, 19.0, 100, 1900),   # -5%
+            ("300750", "2024-01-03", 30.0, 30.0, 50, 1500),    # flat
+            ("688001", "2024-01-03", 5.0, 5.5, 10, 55),        # new listing: vs open, +10%
+        ])
+        repo = MarketStatsRepository(db_session)
+        assert repo.refresh() == 2
+
+        stats = repo.find_by_date("2024-01-03")
+        assert stats.prev_date == "2024-01-02"
+        assert (stats.stock_count, stats.traded_count) == (4, 4)
+        assert (stats.up_count, stats.down_count, stats.flat_count) == (2, 1, 1)
+        assert (stats.limit_up_count, stats.limit_down_count) == (2, 0)
+        assert stats.total_amount == pytest.approx(5655)
+        assert stats.turnover == pytest.approx((200 * 11.0 + 100 * 19.0 + 50 * 30.0 + 10 * 5.5) * 100)
+        assert not stats.stale
+
+        assert repo.find_by_date("2024-01-02").traded_count == 2
+
+        sectors = _sectors(db_session, "2024-01-03")
+        assert set(sectors) == {"银行", "新能源"}
+        assert sectors["银行"].stock_count == 2
+        assert sectors["银行"].paired_count == 2
+        assert sectors["银行"].turnover == pytest.approx((200 * 11.0 + 100 * 19.0) * 100)
+        assert (sectors["银行"].up_count, sectors["银行"].down_count) == (1, 1)
+
+    def test_revision_recomputes_next_day(self, db_session):
+        _write(db_session, [("000001", "2024-01-02", 10.0, 10.0, 100, 1000)])
+        _write(db_session, [("000001", "2024-01-03", 10.0, 10.5, 100, 1000)])
+        repo = MarketStatsRepository(db_session)
+        repo.refresh()
+        assert repo.find_by_date("2024-01-03").up_count == 1
+
+        # 修订上一交易日收盘价后，次日涨跌随之变化
+        _write(db_session, [("000001", "2024-01-02", 10.0, 11.0, 100, 1000)])
+        assert repo.refresh() == 2
+        stats = repo.find_by_date("2024-01-03")
+        assert (stats.up_count, stats.down_count) == (0, 1)
+
+    def test_non_stock_writes_ignored(self, db_session):
+        _write(db_session, [("000001.SH", "2024-01-02", 1.0, 1.0, 1, 1)], symbol_type=SymbolType.INDEX)
+        _write(
+            db_session, [("000001", "2024-01-02 10:00:00", 1.0, 1.0, 1, 1)],
+            timeframe=KlineTimeframe.MINS_30,
+        )
+        assert MarketStatsRepository(db_session).refresh() == 0
+
+    def test_non_stock_writes_keep_table_fresh(self, db_session):
+        _write(db_session, [("000001", "2024-01-02", 10.0, 11.0, 100, 1000)])
+        repo = MarketStatsRepository(db_session)
+        repo.refresh()
+
+        _write(db_session, [("000001.SH", "2024-01-03", 1.0, 1.0, 1, 1)], symbol_type=SymbolType.INDEX)
+        _write(db_session, [("BK0001", "2024-01-03", 1.0, 1.0, 1, 1)], symbol_type=SymbolType.CONCEPT)
+
+        assert repo.is_fresh()
+        assert repo.record_writes([("INDEX", "DAY", "2024-01-03")]) == 0
+        assert repo.record_writes([("STOCK", "DAY", "2024-01-03")]) == 1
+
+    def test_delete_and_rebuild_after_orm_writes(self, db_session):
+        _write(db_session, [
+            ("000001", "2024-01-02", 10.0, 10.0, 100, 1000),
+            ("600036", "2024-01-02", 20.0, 20.0, 100, 2000),
+        ])
+        db_session.add(Kline(
+            symbol_type=SymbolType.STOCK, symbol_code="300750", symbol_name="宁德时代",
+            timeframe=KlineTimeframe.DAY, trade_time="2024-01-03",
+            open=1, high=1, low=1, close=1, volume=1, amount=10,
+        ))
+        db_session.commit()
+
+        # 不经过 KlineRepository 的写入需要 rebuild
+        repo = MarketStatsRepository(db_session)
+        repo.rebuild()
+        assert repo.find_by_date("2024-01-03").total_amount == 10
+
+        KlineRepository(db_session).delete_by_symbol("300750", SymbolType.STOCK, KlineTimeframe.DAY)
+        KlineRepository(db_session).delete_by_date_range(
+            "000001", SymbolType.STOCK, KlineTimeframe.DAY,
+            datetime(2024, 1, 2), datetime(2024, 1, 2),
+        )
+        repo.refresh()
+        assert repo.find_by_date("2024-01-03") is None
+        assert repo.find_by_date("2024-01-02").stock_count == 1
+        assert set(_sectors(db_session, "2024-01-02")) == {"银行"}
+
+    def test_reads_do_not_mark_stale(self, db_session):
+        _write(db_session, [("000001", "2024-01-02", 10.0, 10.0, 100, 1000)])
+        repo = MarketStatsRepository(db_session)
+        repo.refresh()
+
+        KlineRepository(db_session).find_by_symbol_and_date_range(
+            "000001", SymbolType.STOCK, KlineTimeframe.DAY,
+            datetime(2024, 1, 1), datetime(2024, 1, 3),
+        )
+        assert not repo.find_by_date("2024-01-02").stale
+        assert repo.refresh() == 0
+
+
+class TestStaleReads:
+    """Reads compute stale dates on the fly without writing"""
+
+    def test_stale_reads_match_refresh(self, db_session):
+        _write(db_session, [
+            ("000001", "2024-01-02", 10.0, 10.0, 100, 1000),
+            ("600036", "2024-01-02", 20.0, 20.0, 100, 2000),
+        ])
+        _write(db_session, [
+            ("000001", "2024-01-03", 10.0, 11.0, 200, 2200),
+            ("600036", "2024-01-03", 20.0, 19.0, 100, 1900),
+            ("300750", "2024-01-03", 30.0, 30.0, 50, 1500),
+        ])
+        repo = MarketStatsRepository(db_session)
+        assert not repo.is_fresh()
+
+        live = repo.find_by_date("2024-01-03")
+        recent = [row.trade_date for row in repo.find_recent(limit=5, min_traded_count=2)]
+        before = [row.trade_date for row in repo.find_recent(before="2024-01-03")]
+        live_sectors = {
+            row.sector: (row.stock_count, row.paired_count, row.turnover)
+            for row in repo.find_sector_stats(["2024-01-03"])
+        }
+        stale_count = db_session.execute(
+            text("SELECT COUNT(*) FROM market_daily_stats WHERE stale")
+        ).scalar()
+
+        assert repo.refresh() == 2
+        assert stale_count == 2
+        assert recent == ["2024-01-03"]
+        assert before == ["2024-01-02"]
+        stored = repo.find_by_date("2024-01-03")
+        for col in ("prev_date", "stock_count", "up_count", "down_count", "flat_count",
+                    "limit_up_count", "total_amount", "turnover"):
+            assert getattr(live, col) == getattr(stored, col)
+        assert live_sectors == {
+            row.sector: (row.stock_count, row.paired_count, row.turnover)
+            for row in repo.find_sector_stats(["2024-01-03"])
+        }
+
+    def test_unrelated_stale_date_keeps_materialized_reads(self, db_session):
+        for day in ("2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"):
+            _write(db_session, [("000001", day, 10.0, 11.0, 100, 1000)])
+        repo = MarketStatsRepository(db_session)
+        repo.refresh()
+        # Sentinel values only exist in the materialized rows
+        db_session.execute(text("UPDATE market_daily_stats SET up_count = 99"))
+        repo.mark_stale(["2024-01-02"])
+
+        recent = repo.find_recent(limit=2)
+
+        assert [(row.trade_date, row.up_count) for row in recent] == [
+            ("2024-01-05", 99), ("2024-01-04", 99),
+        ]
+        # The stale date and the day after it (its change base) are computed live
+        assert repo.find_by_date("2024-01-03").up_count == 0
+        assert repo.find_by_date("2024-01-02").up_count == 1
+
+    def test_cold_table_reads_do_not_bootstrap(self, db_session):
+        db_session.execute(text(
+            "INSERT INTO klines (symbol_type, symbol_code, timeframe, trade_time, "
+            "open, high, low, close, volume, amount, created_at, updated_at) VALUES "
+            "('STOCK', '000001', 'DAY', '2024-01-02', 10, 10, 10, 11, 1, 1, "
+            "CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        ))
+        db_session.commit()
+
+        repo = MarketStatsRepository(db_session)
+        assert repo.find_by_date("2024-01-02").up_count == 1
+        assert repo.find_by_date("2024-01-05") is None
+        assert repo.needs_bootstrap()
+
+
+class TestRebuild:
+    """Bootstrap and sector reassignment"""
+
+    def test_bootstrap_from_raw_inserts(self, db_session):
+        for day, close in (("2024-01-02", 10.0), ("2024-01-03", 9.0)):
+            db_session.execute(text(
+                "INSERT INTO klines (symbol_type, symbol_code, timeframe, trade_time, "
+                "open, high, low, close, volume, amount, created_at, updated_at) VALUES "
+                "('STOCK', '000001', 'DAY', :day, 10, 10, 10, :close, 1, 1, "
+                "CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+            ), {"day": day, "close": close})
+        db_session.commit()
+
+        repo = MarketStatsRepository(db_session)
+        assert repo.needs_bootstrap()
+        repo.ensure_fresh()
+        assert not repo.needs_bootstrap()
+        assert [row.trade_date for row in repo.find_recent()] == ["2024-01-03", "2024-01-02"]
+        assert repo.find_by_date("2024-01-03").down_count == 1
+
+    def test_rebuild_sectors(self, db_session):
+        _write(db_session, [
+            ("000001", "2024-01-02", 10.0, 10.0, 100, 1000),
+            ("600036", "2024-01-02", 20.0, 20.0, 100, 2000),
+        ])
+        repo = MarketStatsRepository(db_session)
+        repo.refresh()
+
+        db_session.execute(text("UPDATE stock_sectors SET sector = '新能源' WHERE ticker = '600036'"))
+        repo.rebuild_sectors(["银行", "新能源"])
+
+        sectors = _sectors(db_session, "2024-01-02")
+        assert sectors["银行"].stock_count == 1
+        assert sectors["新能源"].total_amount == 2000
@@ -192,7 +192,6 @@ class TestSymbolRepositoryQueries:
         names = {s.name for s in symbols}
         assert names == {"贵州茅台", "五粮液"}
 
-    @pytest.mark.skip(reason="JSON array contains() not supported in SQLite - needs custom implementation")
     def test_find_by_concept(self, db_session, sample_symbols):
         """Test finding symbols by concept"""
         repo = SymbolRepository(db_session)
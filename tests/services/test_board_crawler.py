@@ -0,0 +1,102 @@
+"""
+Tests for BoardCrawler: diffing against the previous snapshot, retries,
+call budget and checkpoint resume.
+"""
+
+import threading
+
+from src.services.board_crawler import BoardCrawler, CrawlCheckpoint
+
+
+BOARDS = [("白酒", "885001.TI"), ("银行", "881155.TI"), ("锂电池", "885002.TI")]
+MEMBERS = {
+    "885001.TI": ["600519", "000858"],
+    "881155.TI": ["000001", "600036"],
+    "885002.TI": ["300750"],
+}
+
+
+def _crawler(fetch, **kw):
+    defaults = dict(workers=2, retry_backoff=0)
+    defaults.update(kw)
+    return BoardCrawler(fetch, **defaults)
+
+
+class TestCrawl:
+    """Concurrent fetch and diff"""
+
+    def test_only_changed_boards_written(self):
+        written = []
+        stats = _crawler(MEMBERS.__getitem__).crawl(
+            BOARDS,
+            previous={"白酒": ["000858", "600519"], "银行": ["000001"]},
+            on_changed=lambda name, code, tickers: written.append((name, tickers)),
+        )
+
+        assert sorted(written) == [("银行", ["000001", "600036"]), ("锂电池", ["300750"])]
+        assert (stats.fetched, stats.changed, stats.unchanged) == (3, 2, 1)
+        assert stats.complete
+
+    def test_on_changed_runs_on_calling_thread(self):
+        threads = set()
+        _crawler(MEMBERS.__getitem__, workers=3).crawl(
+            BOARDS, {}, lambda *_: threads.add(threading.get_ident()),
+        )
+        assert threads == {threading.get_ident()}
+
+    def test_retry_then_fail(self):
+        attempts = {}
+
+        def flaky(code):
+            attempts[code] = attempts.get(code, 0) + 1
+            if code == "885002.TI":
+                raise ConnectionError("boom")
+            if attempts[code] == 1:
+                raise ConnectionError("transient")
+            return MEMBERS[code]
+
+        stats = _crawler(flaky, max_retries=2).crawl(BOARDS, {}, lambda *_: None)
+
+        assert stats.fetched == 2
+        assert stats.failures == ["锂电池"]
+        assert attempts["885002.TI"] == 2
+        assert not stats.complete
+
+
+class TestBudgetAndCheckpoint:
+    """Runs stop at the call budget and resume from the checkpoint"""
+
+    def test_resume_after_budget(self, tmp_path):
+        path = tmp_path / "checkpoint.json"
+        calls = []
+
+        def fetch(code):
+            calls.append(code)
+            return MEMBERS[code]
+
+        first = _crawler(fetch, workers=1, max_calls=2, checkpoint=CrawlCheckpoint(path, "concept"))
+        stats = first.crawl(BOARDS, {}, lambda *_: None)
+        assert (stats.fetched, stats.remaining) == (2, 1)
+        assert path.exists()
+
+        second = _crawler(fetch, workers=1, checkpoint=CrawlCheckpoint(path, "concept"))
+        stats = second.crawl(BOARDS, {}, lambda *_: None)
+        assert (stats.skipped, stats.fetched) == (2, 1)
+        assert calls == [code for _, code in BOARDS]
+        # Completed run clears the checkpoint
+        assert not path.exists()
+
+    def test_checkpoint_keys_independent(self, tmp_path):
+        path = tmp_path / "checkpoint.json"
+        industry = CrawlCheckpoint(path, "industry")
+        industry.done = {"881155.TI"}
+        industry.save()
+
+        concept = CrawlCheckpoint(path, "concept")
+        concept.load()
+        assert concept.done == set()
+
+        industry = CrawlCheckpoint(path, "industry")
+        industry.load()
+        assert industry.done == {"881155.TI"}
+
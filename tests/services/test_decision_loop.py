@@ -0,0 +1,125 @@
+"""
+Tests for concurrent, partial-tolerant input assembly in the decision loop.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.services.decision_loop import InputAssembler
+
+
+class FakeAssembler(InputAssembler):
+    """Replaces each loader with a fixed delay and result (or exception)."""
+
+    def __init__(self, delays=None, results=None, **kwargs):
+        super().__init__(**kwargs)
+        self.delays = delays or {}
+        self.results = {
+            "ashare_indexes": {"000001.SH": {"price": 3100.0, "change_pct": 0.5}},
+            "us_market": {"^GSPC": {"price": 5000.0, "change_pct": -0.2}},
+            "commodities": {"commodities": [{"symbol": "GC=F", "name_cn": "黄金", "price": 2300, "change_pct": 1}]},
+            "crypto": {"prices": [{"symbol": "BTC", "name": "Bitcoin", "price": 60000, "change_24h": 2}]},
+            "intel_signals": {"signals": []},
+            "perception_context": {"regime": "neutral"},
+            **(results or {}),
+        }
+
+    async def _fake(self, name):
+        await asyncio.sleep(self.delays.get(name, 0))
+        result = self.results[name]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def _load_ashare_indexes(self):
+        return await self._fake("ashare_indexes")
+
+    async def _load_us_market(self):
+        return await self._fake("us_market")
+
+    async def _load_commodities(self):
+        return await self._fake("commodities")
+
+    async def _load_crypto(self):
+        return await self._fake("crypto")
+
+    async def _load_intel_signals(self):
+        return await self._fake("intel_signals")
+
+    async def _load_perception_context(self):
+        return await self._fake("perception_context")
+
+
+@pytest.mark.asyncio
+async def test_inputs_fetched_concurrently():
+    delays = dict.fromkeys(
+        ["ashare_indexes", "us_market", "commodities", "crypto", "intel_signals", "perception_context"], 0.2
+    )
+    assembler = FakeAssembler(delays=delays)
+
+    started = time.monotonic()
+    pkg = await assembler.assemble()
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.6  # sequential would take ~1.2s
+    assert [s.symbol for s in pkg.ashare_indexes] == ["000001.SH"]
+    assert [s.symbol for s in pkg.commodities] == ["GC=F"]
+    assert pkg.crypto[0].change_pct == 2
+    assert pkg.perception_context == {"regime": "neutral"}
+    assert set(assembler.last_timings) == set(delays)
+
+
+@pytest.mark.asyncio
+async def test_timeout_marks_input_missing():
+    assembler = FakeAssembler(
+        delays={"perception_context": 5},
+        timeouts={"perception_context": 0.1},
+    )
+
+    started = time.monotonic()
+    pkg = await assembler.assemble()
+
+    assert time.monotonic() - started < 1
+    assert "perception_context" in pkg.missing_fields
+    assert pkg.perception_context == {}
+    assert pkg.intel_signals == {"signals": []}
+
+
+@pytest.mark.asyncio
+async def test_failures_keep_partial_results():
+    assembler = FakeAssembler(results={"commodities": RuntimeError("yfinance down"), "crypto": None})
+
+    pkg = await assembler.assemble()
+
+    assert "commodities" in pkg.missing_fields
+    assert "crypto" in pkg.missing_fields
+    # Per-symbol gaps are reported individually
+    assert "ashare_index:399001.SZ" in pkg.missing_fields
+    assert "us_market:^VIX" in pkg.missing_fields
+    assert "ashare_index:000001.SH" not in pkg.missing_fields
+    assert pkg.us_market[0].price == 5000.0
+    assert pkg.is_low_confidence
+
+
+@pytest.mark.asyncio
+async def test_commodities_fetched_in_worker_thread(monkeypatch):
+    import threading
+
+    import src.api.routes_commodities as routes_commodities
+    from src.api.routes_commodities import CommoditiesResponse
+
+    loop_thread = threading.get_ident()
+    seen = []
+
+    def fetch():
+        seen.append(threading.get_ident())
+        return CommoditiesResponse(count=0, source="test", last_update="", commodities=[])
+
+    monkeypatch.setattr(routes_commodities, "fetch_commodities_realtime", fetch)
+
+    result = await InputAssembler()._load_commodities()
+
+    assert result["source"] == "test"
+    assert seen and seen[0] != loop_thread
@@ -0,0 +1,93 @@
+"""
+Tests for the shared outbound HTTP client pool.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.services.http_clients import HostProfile, HttpClientRegistry
+
+
+def _registry(handler, **profiles):
+    return HttpClientRegistry(
+        profiles=profiles,
+        default_profile=HostProfile(max_concurrency=2),
+        transport=httpx.MockTransport(handler),
+    )
+
+
+class TestHttpClientRegistry:
+    """Per-host client reuse, concurrency limits and stats"""
+
+    @pytest.mark.asyncio
+    async def test_reuses_client_per_host(self):
+        registry = _registry(lambda request: httpx.Response(200, text=request.url.host))
+
+        first = await registry.get("http://a.example/x")
+        await registry.get("http://a.example/y", params={"q": 1})
+        await registry.request("POST", "http://b.example/z")
+
+        assert first.text == "a.example"
+        pools = registry._pools[asyncio.get_running_loop()]
+        assert set(pools) == {"a.example", "b.example"}
+        stats = registry.stats()["hosts"]
+        assert stats["a.example"]["requests"] == 2
+        assert stats["b.example"]["requests"] == 1
+        await registry.aclose()
+
+    @pytest.mark.asyncio
+    async def test_fan_out_bounded_per_host(self):
+        async def handler(request):
+            await asyncio.sleep(0.01)
+            return httpx.Response(200)
+
+        registry = _registry(handler, **{"slow.example": HostProfile(max_concurrency=3)})
+
+        await asyncio.gather(*[registry.get("http://slow.example/") for _ in range(12)])
+        await asyncio.gather(*[registry.get("http://other.example/") for _ in range(6)])
+
+        stats = registry.stats()["hosts"]
+        assert stats["slow.example"]["peak_in_flight"] == 3
+        assert stats["other.example"]["peak_in_flight"] == 2
+        assert stats["slow.example"]["in_flight"] == 0
+        assert stats["slow.example"]["queued"] == 0
+        await registry.aclose()
+
+    @pytest.mark.asyncio
+    async def test_errors_counted_and_raised(self):
+        def handler(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        registry = _registry(handler)
+        with pytest.raises(httpx.ConnectError):
+            await registry.get("http://down.example/")
+
+        assert registry.stats()["hosts"]["down.example"]["errors"] == 1
+        await registry.aclose()
+
+    def test_separate_clients_per_event_loop(self):
+        registry = _registry(lambda request: httpx.Response(200))
+
+        async def fetch():
+            await registry.get("http://a.example/")
+            return registry._pools[asyncio.get_running_loop()]["a.example"].client
+
+        first = asyncio.run(fetch())
+        second = asyncio.run(fetch())
+        assert first is not second
+
+    def test_clients_closed_when_loop_shuts_down(self):
+        registry = _registry(lambda request: httpx.Response(200))
+
+        async def fetch():
+            await registry.get("http://a.example/")
+            await registry.get("http://b.example/")
+            pools = registry._pools[asyncio.get_running_loop()]
+            return [pool.client for pool in pools.values()]
+
+        clients = asyncio.run(fetch())
+        assert len(clients) == 2
+        assert all(client.is_closed for client in clients)
+        assert len(registry._pools) == 0
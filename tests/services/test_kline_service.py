@@ -12,6 +12,9 @@ from src.models import Kline, KlineTimeframe, SymbolType
 from src.repositories.kline_repository import KlineRepository
 from src.repositories.symbol_repository import SymbolRepository
 from src.services.kline_service import KlineService
+import numpy as np
+
+from src.utils import indicators
 from src.utils.indicators import calculate_macd
 
 
@@ -59,6 +62,45 @@ class TestCalculateMacd:
         assert not all(v is None for v in result["dif"])
 
 
+class TestIndicatorKernels:
+    """Test shared NumPy indicator kernels"""
+
+    def test_sma_values(self):
+        """Test SMA full and partial windows"""
+        values = [10.0, 11.0, 12.0, 13.0, 14.0]
+
+        full = indicators.sma(values, 3)
+        assert np.isnan(full[:2]).all()
+        assert full[2:].tolist() == [11.0, 12.0, 13.0]
+        assert indicators.sma(values, 3, partial=True).tolist() == [10.0, 10.5, 11.0, 12.0, 13.0]
+
+    def test_rsi_bounds(self):
+        """Test RSI is 100 on a monotonic rise and within [0, 100] otherwise"""
+        rising = [10.0 + i for i in range(30)]
+        assert indicators.rsi(rising, 14)[-1] == 100.0
+
+        rng = np.random.default_rng(0)
+        closes = 10 + rng.standard_normal(100).cumsum()
+        result = indicators.rsi(closes, 14)
+        assert np.isnan(result[:14]).all()
+        assert ((result[14:] >= 0) & (result[14:] <= 100)).all()
+
+    def test_2d_matches_1d(self):
+        """Test a 2-D call equals row-by-row 1-D calls, including NaN-prefixed rows"""
+        rng = np.random.default_rng(1)
+        matrix = 10 + rng.standard_normal((4, 80)).cumsum(axis=1)
+        matrix[1, :30] = np.nan
+
+        for fn in (
+            lambda x: indicators.sma(x, 5),
+            lambda x: indicators.ema(x, 12, seed="sma"),
+            lambda x: indicators.rsi(x, 14),
+            lambda x: indicators.macd(x)[2],
+        ):
+            expected = np.vstack([fn(row) for row in matrix])
+            assert np.array_equal(fn(matrix), expected, equal_nan=True)
+
+
 class TestKlineServiceGetKlines:
     """Test get_klines method"""
 
@@ -417,3 +459,198 @@ class TestKlineServiceSymbolList:
         assert len(symbols) == 3
         assert "000001.SH" in symbols
         mock_repo.find_symbols_with_data.assert_called_once()
+
+
+class TestKlineServiceCache:
+    """get_klines / get_latest_trade_time served from KlineCache"""
+
+    @staticmethod
+    def _save(service, days):
+        service.save_klines(
+            symbol_type=SymbolType.STOCK,
+            symbol_code="600519",
+            symbol_name=None,
+            timeframe=KlineTimeframe.DAY,
+            klines=[
+                {"datetime": d, "open": 1, "high": 1, "low": 1, "close": i, "volume": 1, "amount": 1}
+                for i, d in enumerate(days)
+            ],
+            calculate_indicators=False,
+        )
+
+    def test_repeat_request_skips_repository(self, db_session):
+        service = KlineService.create_with_session(db_session)
+        self._save(service, ["2026-01-05", "2026-01-06", "2026-01-07"])
+        db_session.commit()
+
+        first = service.get_klines(SymbolType.STOCK, "600519", limit=2)
+        with pytest.MonkeyPatch.context() as mp:
+            spy = MagicMock(side_effect=AssertionError("repository hit"))
+            mp.setattr(service.kline_repo, "find_by_symbol", spy)
+            mp.setattr(service.kline_repo, "find_latest_by_symbol", spy)
+            second = service.get_klines(SymbolType.STOCK, "600519", limit=2)
+            latest = service.get_latest_trade_time(SymbolType.STOCK, "600519")
+
+        assert second == first
+        assert [k["datetime"] for k in second] == ["2026-01-06", "2026-01-07"]
+        assert latest == "2026-01-07"
+        assert service.kline_cache.stats()["hits"] == 2
+
+    def test_returned_dicts_are_not_shared(self, db_session):
+        service = KlineService.create_with_session(db_session)
+        self._save(service, ["2026-01-05"])
+        db_session.commit()
+
+        service.get_klines(SymbolType.STOCK, "600519")[0]["dif"] = 1.0
+
+        assert "dif" not in service.get_klines(SymbolType.STOCK, "600519")[0]
+
+    def test_save_invalidates(self, db_session):
+        service = KlineService.create_with_session(db_session)
+        self._save(service, ["2026-01-05"])
+        db_session.commit()
+        service.get_klines(SymbolType.STOCK, "600519")
+
+        self._save(service, ["2026-01-06"])
+        db_session.commit()
+
+        klines = service.get_klines(SymbolType.STOCK, "600519")
+        assert [k["datetime"] for k in klines] == ["2026-01-05", "2026-01-06"]
+
+
+class TestKlineServiceIncrementalMacd:
+    """save_klines continues MACD from the persisted EMA state"""
+
+    CLOSES = [10 + (i % 7) * 0.3 + i * 0.05 for i in range(80)]
+    DAYS = [f"2025-{1 + i // 28:02d}-{1 + i % 28:02d}" for i in range(80)]
+
+    def _save(self, service, start, end, closes=None):
+        closes = closes or self.CLOSES
+        service.save_klines(
+            symbol_type=SymbolType.STOCK,
+            symbol_code="600519",
+            symbol_name=None,
+            timeframe=KlineTimeframe.DAY,
+            klines=[
+                {"datetime": self.DAYS[i], "open": 1, "high": 1, "low": 1,
+                 "close": closes[i], "volume": 1, "amount": 1}
+                for i in range(start, end)
+            ],
+        )
+
+    @staticmethod
+    def _stored(db_session):
+        rows = db_session.query(Kline).order_by(Kline.trade_time).all()
+        return [(r.dif, r.dea, r.macd) for r in rows]
+
+    @staticmethod
+    def _expected(closes):
+        full = calculate_macd(closes)
+        return list(zip(full["dif"], full["dea"], full["macd"]))
+
+    def test_top_up_matches_full_history(self, db_session):
+        service = KlineService.create_with_session(db_session)
+        self._save(service, 0, 60)
+        find_closes = MagicMock(wraps=service.kline_repo.find_closes)
+        service.kline_repo.find_closes = find_closes
+
+        self._save(service, 50, 80)  # 10 bars overlap, 20 new
+
+        assert self._stored(db_session) == self._expected(self.CLOSES)
+        # 从状态继续：只读取重叠部分，不读全部历史
+        assert find_closes.call_args.kwargs["start_time"] == self.DAYS[50]
+        state = service.kline_repo.get_indicator_state("600519", SymbolType.STOCK, KlineTimeframe.DAY)
+        assert (state.last_trade_time, state.bar_count) == (self.DAYS[79], 80)
+
+    def test_revised_last_bar_uses_previous_state(self, db_session):
+        service = KlineService.create_with_session(db_session)
+        self._save(service, 0, 60)
+        revised = list(self.CLOSES)
+        revised[59] += 1.0
+
+        self._save(service, 59, 60, closes=revised)
+
+        assert self._stored(db_session) == self._expected(revised[:60])
+
+    def test_revised_history_falls_back_to_full_recompute(self, db_session):
+        service = KlineService.create_with_session(db_session)
+        self._save(service, 0, 60)
+        revised = list(self.CLOSES)
+        revised[10] += 1.0
+
+        self._save(service, 10, 11, closes=revised)
+
+        assert self._stored(db_session) == self._expected(revised[:60])
+
+    def test_bars_written_without_state_are_caught_up(self, db_session):
+        service = KlineService.create_with_session(db_session)
+        self._save(service, 0, 60)
+        service.kline_repo.upsert_columns(
+            {"trade_time": self.DAYS[60:70], "open": [1.0] * 10, "high": [1.0] * 10,
+             "low": [1.0] * 10, "close": self.CLOSES[60:70]},
+            SymbolType.STOCK, KlineTimeframe.DAY, symbol_code="600519",
+        )
+
+        self._save(service, 70, 80)
+
+        assert self._stored(db_session) == self._expected(self.CLOSES)
+
+    def test_save_without_indicators_keeps_stored_values(self, db_session):
+        service = KlineService.create_with_session(db_session)
+        self._save(service, 0, 60)
+
+        service.save_klines(
+            symbol_type=SymbolType.STOCK, symbol_code="600519", symbol_name=None,
+            timeframe=KlineTimeframe.DAY,
+            klines=[{"datetime": self.DAYS[59], "open": 1, "high": 1, "low": 1,
+                     "close": self.CLOSES[59], "volume": 2, "amount": 2}],
+            calculate_indicators=False,
+        )
+
+        assert self._stored(db_session) == self._expected(self.CLOSES[:60])
+
+    def test_incremental_kernel_matches_full(self):
+        from src.utils.indicators import calculate_macd_incremental
+
+        head, states = calculate_macd_incremental(self.CLOSES[:50])
+        tail, _ = calculate_macd_incremental(self.CLOSES[50:], states[-1])
+
+        assert head["dif"] + tail["dif"] == calculate_macd(self.CLOSES)["dif"]
+        assert states[-1].bar_count == 50
+
+
+class TestColumnarTradeTimeValidation:
+    """Columnar writes reject trade times the per-row models reject"""
+
+    def test_normalize_trade_times_marks_malformed_values(self):
+        from src.schemas.normalized import normalize_trade_times
+
+        result = normalize_trade_times(["20240105", "2024-01-08", "garbage", "2024-13-45"], is_daily=True)
+
+        assert list(result) == ["2024-01-05", "2024-01-08", None, None]
+
+    def test_save_klines_columns_drops_malformed_rows(self, db_session):
+        import pandas as pd
+
+        service = KlineService.create_with_session(db_session)
+        frame = pd.DataFrame({
+            "symbol_code": ["600519", "600519", "000001"],
+            "trade_time": ["20240105", "not-a-date", "2024-01-05"],
+            "open": [1.0] * 3, "high": [1.0] * 3, "low": [1.0] * 3, "close": [1.0] * 3,
+        })
+
+        assert service.save_klines_columns(frame, SymbolType.STOCK, KlineTimeframe.DAY) == 2
+        stored = db_session.query(Kline.symbol_code, Kline.trade_time).order_by(Kline.symbol_code).all()
+        assert [tuple(row) for row in stored] == [("000001", "2024-01-05"), ("600519", "2024-01-05")]
+
+    def test_upsert_columns_drops_malformed_rows(self, db_session):
+        repo = KlineRepository(db_session)
+
+        count = repo.upsert_columns(
+            {"trade_time": ["2024-01-05 10:00", "bad"], "open": [1.0, 1.0], "high": [1.0, 1.0],
+             "low": [1.0, 1.0], "close": [1.0, 1.0]},
+            SymbolType.STOCK, KlineTimeframe.MINS_30, symbol_code="600519",
+        )
+
+        assert count == 1
+        assert [k.trade_time for k in db_session.query(Kline).all()] == ["2024-01-05 10:00:00"]
@@ -0,0 +1,112 @@
+"""
+Tests for the vectorized z-normalized pattern search over local klines.
+"""
+
+import numpy as np
+import pytest
+
+from src.models import Kline, KlineTimeframe, SymbolType
+from src.services.pattern_matcher import FORWARD_DAYS, PatternMatcher
+from src.utils.similarity import distance_to_similarity, znorm_distance_profile
+
+
+def _brute_force(query, series):
+    m = len(query)
+
+    def z(x):
+        return (x - x.mean()) / x.std()
+
+    return np.array([np.linalg.norm(z(query) - z(series[i:i + m])) for i in range(len(series) - m + 1)])
+
+
+@pytest.mark.parametrize("m", [20, 100])  # direct and FFT sliding dot products
+def test_distance_profile_matches_brute_force(m):
+    rng = np.random.default_rng(0)
+    series = 50 + np.cumsum(rng.normal(size=600))
+    query = series[300:300 + m] * 3 + 7  # shifted and scaled copy
+
+    profile = znorm_distance_profile(query, series)
+
+    np.testing.assert_allclose(profile, _brute_force(query, series), atol=1e-4)
+    assert profile.argmin() == 300
+    assert distance_to_similarity(profile[300], m) == pytest.approx(100, abs=1e-3)
+
+
+def test_flat_windows_are_skipped():
+    series = np.concatenate([np.full(30, 10.0), np.arange(30.0)])
+    profile = znorm_distance_profile(np.arange(5.0), series)
+    assert np.isinf(profile[:26]).all()
+    assert profile[-1] == pytest.approx(0, abs=1e-6)
+
+
+def _add_klines(session, ticker, closes):
+    for i, close in enumerate(closes):
+        session.add(Kline(
+            symbol_type=SymbolType.STOCK, symbol_code=ticker, timeframe=KlineTimeframe.DAY,
+            trade_time=f"2020-01-01+{i:04d}", open=close, high=close, low=close, close=close,
+        ))
+
+
+@pytest.fixture
+def market(db_session):
+    rng = np.random.default_rng(1)
+    shape = np.sin(np.linspace(0, 3 * np.pi, 20))
+    # Query stock: random walk ending in the target shape
+    query = np.concatenate([100 + np.cumsum(rng.normal(size=80)), 90 + 5 * shape])
+    _add_klines(db_session, "600519", query)
+    # Another stock contains the shape (scaled) at bar 40, followed by a rally
+    other = 20 + np.cumsum(rng.normal(scale=0.2, size=100))
+    other[40:60] = 15 + 2 * shape
+    other[60:60 + FORWARD_DAYS] = np.linspace(other[59], other[59] * 1.1, FORWARD_DAYS)
+    _add_klines(db_session, "000001", other)
+    # A stock too short to have any window with a forward outcome
+    _add_klines(db_session, "300750", 10 + np.arange(25.0))
+    db_session.commit()
+    return db_session
+
+
+def test_search_market_finds_shape_in_other_stock(market):
+    matcher = PatternMatcher(session=market)
+
+    matches = matcher.search_market("600519", pattern_days=20, top_n=3)
+
+    best = matches[0]
+    assert (best["ticker"], best["start_idx"], best["end_idx"]) == ("000001", 40, 60)
+    assert best["similarity"] == pytest.approx(100, abs=1e-3)
+    assert best["future_return"] == pytest.approx(10)
+    assert best["start_date"] == "2020-01-01+0040"
+    assert [m["similarity"] for m in matches] == sorted((m["similarity"] for m in matches), reverse=True)
+    # The query itself (and windows overlapping it) are never returned
+    assert all(m["ticker"] != "600519" or m["end_idx"] + FORWARD_DAYS <= 80 for m in matches)
+    assert "300750" not in {m["ticker"] for m in matches}
+
+
+def test_matches_are_not_trivial_neighbours(market):
+    matches = PatternMatcher(session=market).search_market("600519", pattern_days=20, top_n=10)
+    by_ticker = {}
+    for m in matches:
+        by_ticker.setdefault(m["ticker"], []).append(m["start_idx"])
+    for starts in by_ticker.values():
+        starts.sort()
+        assert all(b - a > 10 for a, b in zip(starts, starts[1:]))
+
+
+def test_top_k_pruning_across_chunks(market, monkeypatch):
+    import src.services.pattern_matcher as pattern_matcher
+
+    expected = PatternMatcher(session=market).search_market("600519", pattern_days=20, top_n=5)
+    monkeypatch.setattr(pattern_matcher, "SYMBOL_CHUNK_SIZE", 1)
+    chunked = PatternMatcher(session=market).search_market("600519", pattern_days=20, top_n=5)
+    assert [(m["ticker"], m["start_idx"]) for m in chunked] == [(m["ticker"], m["start_idx"]) for m in expected]
+    assert [m["distance"] for m in chunked] == pytest.approx([m["distance"] for m in expected])
+
+
+def test_analyze_pattern_outcome(market):
+    matcher = PatternMatcher(session=market)
+    result = matcher.analyze_pattern_outcome("000001", pattern_days=20, market=True)
+    assert result["similar_count"] > 0
+    assert result["best_match"] == result["matches"][0]
+    assert 0 <= result["win_rate"] <= 100
+
+    empty = matcher.analyze_pattern_outcome("999999")
+    assert empty["similar_count"] == 0 and empty["matches"] == []
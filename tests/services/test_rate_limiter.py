@@ -0,0 +1,88 @@
+"""
+Tests for the shared token-bucket rate limiter.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.services import rate_limiter
+from src.services.rate_limiter import (
+    TokenBucket,
+    configure_rate_limiter,
+    get_rate_limiter,
+)
+
+
+class TestTokenBucket:
+    """Reservation accounting, sync and async waiters"""
+
+    def test_rejects_non_positive_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket("x", per_minute=0)
+
+    def test_burst_then_paced(self, monkeypatch):
+        slept = []
+        monkeypatch.setattr(rate_limiter.time, "sleep", slept.append)
+        bucket = TokenBucket("x", per_minute=600, burst=2)  # 10/s
+
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 0
+        bucket.acquire()
+        bucket.acquire()
+
+        # Third and fourth callers queue behind each other: ~0.1s, ~0.2s
+        assert slept == [pytest.approx(0.1, abs=0.02), pytest.approx(0.2, abs=0.02)]
+        assert bucket.stats()["waited"] == 2
+
+    def test_try_acquire_does_not_wait(self):
+        bucket = TokenBucket("x", per_minute=60, burst=1)
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+    def test_concurrent_threads_share_budget(self, monkeypatch):
+        waits = []
+        monkeypatch.setattr(rate_limiter.time, "sleep", lambda s: None)
+        bucket = TokenBucket("x", per_minute=60, burst=1)  # 1/s
+
+        threads = [threading.Thread(target=lambda: waits.append(bucket.acquire())) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # Each reservation is one token interval after the previous one
+        assert sorted(round(w) for w in waits) == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_async_waiters(self):
+        bucket = TokenBucket("x", per_minute=6000, burst=1)  # 100/s
+        waits = await asyncio.gather(*[bucket.acquire_async() for _ in range(3)])
+        assert waits[0] == 0
+        assert waits[2] == pytest.approx(0.02, abs=0.01)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_refunds(self):
+        bucket = TokenBucket("x", per_minute=60, burst=1)
+        bucket.acquire()
+        task = asyncio.create_task(bucket.acquire_async())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert bucket.stats()["available"] == pytest.approx(0, abs=0.05)
+
+
+class TestRegistry:
+    """Named per-provider buckets"""
+
+    def test_named_buckets_are_shared(self):
+        assert get_rate_limiter("sina") is get_rate_limiter("sina")
+        assert get_rate_limiter("sina") is not get_rate_limiter("ths")
+
+    def test_configure(self):
+        bucket = configure_rate_limiter("test-provider", per_minute=30, burst=3)
+        assert bucket.per_minute == pytest.approx(30)
+        assert bucket.stats()["burst"] == 3
+        assert rate_limiter.rate_limiter_stats()["test-provider"]["per_minute"] == 30
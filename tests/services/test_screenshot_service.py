@@ -0,0 +1,60 @@
+"""
+Tests for ScreenshotService kline loading (no chart rendering).
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.models import KlineTimeframe, SymbolType
+from src.repositories.kline_repository import KlineRepository
+from src.repositories.symbol_repository import SymbolRepository
+from src.services.screenshot_service import ScreenshotService
+
+
+def _make_service(db_session, tmp_path):
+    repo = KlineRepository(db_session)
+    days = pd.bdate_range("2024-01-01", periods=30)
+    for code in ("000001", "600000"):
+        repo.upsert_columns(
+            {
+                "trade_time": days,
+                "open": np.arange(30.0) + 1,
+                "high": np.arange(30.0) + 2,
+                "low": np.arange(30.0),
+                "close": np.arange(30.0) + 1.5,
+                "volume": np.full(30, 100.0),
+            },
+            SymbolType.STOCK,
+            KlineTimeframe.DAY,
+            symbol_code=code,
+        )
+    db_session.commit()
+    return ScreenshotService(repo, SymbolRepository(db_session), str(tmp_path))
+
+
+def test_load_bars_returns_latest_window_for_all_tickers(db_session, tmp_path):
+    service = _make_service(db_session, tmp_path)
+
+    bars = service._load_bars(["000001", "600000", "300001"], "day", limit=10)
+
+    assert set(bars) == {"000001", "600000"}
+    assert len(bars["000001"]["close"]) == 10
+    assert bars["000001"]["close"][-1] == 30.5
+
+
+def test_get_kline_data_from_prefetched_bars(db_session, tmp_path):
+    service = _make_service(db_session, tmp_path)
+    bars = service._load_bars(["000001"], "day", limit=20)["000001"]
+
+    df = service._get_kline_data("000001", "day", 20, bars=bars)
+
+    assert len(df) == 20
+    assert df.index.is_monotonic_increasing
+    assert {"MA5", "DIF", "DEA", "MACD"} <= set(df.columns)
+
+
+def test_get_kline_data_without_data_returns_none(db_session, tmp_path):
+    service = _make_service(db_session, tmp_path)
+
+    assert service._get_kline_data("300001", "day", 20) is None
+    assert service._get_kline_data("000001", "day", 20, bars={}) is None
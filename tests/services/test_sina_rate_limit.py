@@ -4,12 +4,14 @@ Tests for SinaKlineProvider rate-limit handling and StockUpdater circuit breaker
 
 import asyncio
 import time
-from unittest.mock import MagicMock, patch, PropertyMock
+from unittest.mock import AsyncMock, MagicMock, patch, PropertyMock
 
+import httpx
 import pandas as pd
 import pytest
 import requests
 
+from src.services.http_clients import HttpClientRegistry
 from src.services.sina_kline_provider import SinaKlineProvider, RATE_LIMIT_CODES
 
 
@@ -150,6 +152,44 @@ class TestSinaRateLimit:
         assert provider.consecutive_failures == 0
         assert provider.rate_limited is False
 
+    # -- fetch_kline_async --
+
+    def _patch_http(self, handler):
+        registry = HttpClientRegistry(transport=httpx.MockTransport(handler))
+        return patch("src.services.sina_kline_provider.get_http_clients", return_value=registry)
+
+    @pytest.mark.asyncio
+    async def test_async_456_backs_off(self):
+        """The async path shares rate-limit detection and backoff."""
+        provider = self._make_provider()
+        with self._patch_http(lambda request: httpx.Response(456)), \
+             patch("src.services.sina_kline_provider.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            result = await provider.fetch_kline_async("000001")
+
+        assert result is None
+        assert provider.consecutive_failures == 1
+        assert provider.rate_limited is True
+        mock_sleep.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_async_success_parses(self):
+        provider = self._make_provider()
+        provider._consecutive_failures = 3
+        payload = [{"day": "2026-01-01 10:00:00", "open": "10", "high": "11",
+                    "low": "9", "close": "10.5", "volume": "1000"}]
+
+        def handler(request):
+            assert request.url.params["symbol"] == "sh600519"
+            assert request.url.params["scale"] == "30"
+            return httpx.Response(200, json=payload)
+
+        with self._patch_http(handler):
+            df = await provider.fetch_kline_async("600519")
+
+        assert df["close"].tolist() == [10.5]
+        assert df["volume"].tolist() == [1000]
+        assert provider.consecutive_failures == 0
+
 
 # ---------------------------------------------------------------------------
 # StockUpdater — circuit breaker tests
@@ -165,81 +205,114 @@ class TestStockUpdaterCircuitBreaker:
         symbol_repo = MagicMock()
         return StockUpdater(kline_repo, symbol_repo)
 
+    @staticmethod
+    def _frame(ticker):
+        return pd.DataFrame([{
+            "timestamp": pd.Timestamp("2026-01-01 10:00:00"),
+            "open": 10.0, "high": 11.0, "low": 9.0,
+            "close": 10.5, "volume": 1000, "ticker": ticker,
+        }])
+
+    @staticmethod
+    def _provider(side_effect=None, return_value=None, consecutive_failures=0,
+                  max_consecutive_failures=999):
+        provider = MagicMock()
+        provider.fetch_kline_async = AsyncMock(side_effect=side_effect, return_value=return_value)
+        provider.consecutive_failures = consecutive_failures
+        provider.max_consecutive_failures = max_consecutive_failures
+        return provider
+
+    @pytest.mark.asyncio
     @patch("src.services.stock_updater.CIRCUIT_BREAKER_THRESHOLD", 3)
-    def test_sync_update_30m_aborts_on_consecutive_none(self):
-        """_sync_update_30m should abort after CIRCUIT_BREAKER_THRESHOLD Nones."""
+    async def test_concurrent_update_30m_aborts_on_consecutive_none(self):
+        """Should abort after CIRCUIT_BREAKER_THRESHOLD consecutive Nones."""
         updater = self._make_updater()
-
-        mock_provider = MagicMock()
-        mock_provider.fetch_kline.return_value = None
-        mock_provider.consecutive_failures = 0
-        mock_provider.max_consecutive_failures = 999  # don't trigger provider CB
-
-        mock_service = MagicMock()
+        mock_provider = self._provider(return_value=None)
 
         tickers = [f"{i:06d}" for i in range(20)]
-        result = updater._sync_update_30m(tickers, mock_provider, mock_service)
+        result = await updater._concurrent_update_30m(tickers, mock_provider, MagicMock(), workers=1)
 
         assert result == 0
-        # Should have stopped after 3 consecutive Nones
-        assert mock_provider.fetch_kline.call_count == 3
+        assert mock_provider.fetch_kline_async.call_count == 3
 
+    @pytest.mark.asyncio
     @patch("src.services.stock_updater.CIRCUIT_BREAKER_THRESHOLD", 10)
-    def test_sync_update_30m_resets_on_success(self):
+    async def test_concurrent_update_30m_resets_on_success(self):
         """Successful fetch should reset the consecutive-none counter."""
         updater = self._make_updater()
 
         call_count = 0
-        def side_effect(ticker, **kw):
+        async def side_effect(ticker, **kw):
             nonlocal call_count
             call_count += 1
             if call_count % 3 == 0:  # every 3rd call succeeds
-                df = pd.DataFrame([{
-                    "timestamp": pd.Timestamp("2026-01-01 10:00:00"),
-                    "open": 10.0, "high": 11.0, "low": 9.0,
-                    "close": 10.5, "volume": 1000, "ticker": ticker,
-                }])
-                return df
+                return self._frame(ticker)
             return None
 
-        mock_provider = MagicMock()
-        mock_provider.fetch_kline.side_effect = side_effect
-        mock_provider.consecutive_failures = 0
-        mock_provider.max_consecutive_failures = 999
-
+        mock_provider = self._provider(side_effect=side_effect)
         mock_service = MagicMock()
         mock_service.save_klines.return_value = 1
 
         tickers = [f"{i:06d}" for i in range(12)]
-        result = updater._sync_update_30m(tickers, mock_provider, mock_service)
+        result = await updater._concurrent_update_30m(tickers, mock_provider, mock_service, workers=4)
 
         # All 12 should be attempted because successes reset the counter
-        assert mock_provider.fetch_kline.call_count == 12
+        assert mock_provider.fetch_kline_async.call_count == 12
+        assert result == 4
 
-    def test_sync_update_30m_honours_provider_circuit_breaker(self):
+    @pytest.mark.asyncio
+    async def test_concurrent_update_30m_honours_provider_circuit_breaker(self):
         """Should also stop when provider.consecutive_failures is high."""
         updater = self._make_updater()
+        mock_provider = self._provider(
+            return_value=None, consecutive_failures=5, max_consecutive_failures=5
+        )
 
-        mock_provider = MagicMock()
-        mock_provider.fetch_kline.return_value = None
-        mock_provider.consecutive_failures = 5
-        mock_provider.max_consecutive_failures = 5
-
-        mock_service = MagicMock()
-        tickers = ["000001"]
-        result = updater._sync_update_30m(tickers, mock_provider, mock_service)
+        result = await updater._concurrent_update_30m(["000001"], mock_provider, MagicMock(), workers=4)
 
         assert result == 0
         # Provider CB already tripped — should not even try
-        assert mock_provider.fetch_kline.call_count == 0
+        assert mock_provider.fetch_kline_async.call_count == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_update_30m_writes_each_ticker_once(self):
+        """Every fetched ticker is saved exactly once, with commits per batch."""
+        updater = self._make_updater()
+        mock_provider = self._provider(side_effect=lambda ticker, **kw: self._frame(ticker))
+        mock_service = MagicMock()
+        mock_service.save_klines.return_value = 1
+
+        tickers = [f"{i:06d}" for i in range(120)]
+        with patch("src.services.stock_updater.WATCHLIST_30M_BATCH_SIZE", 50):
+            result = await updater._concurrent_update_30m(tickers, mock_provider, mock_service, workers=8)
+
+        saved = [c.kwargs["symbol_code"] for c in mock_service.save_klines.call_args_list]
+        assert sorted(saved) == tickers
+        assert result == 120
+        assert updater.kline_repo.session.commit.call_count >= 3
+
+    @pytest.mark.asyncio
+    async def test_writer_failure_stops_fetchers(self):
+        """A failed commit surfaces instead of leaving fetchers blocked on the queue."""
+        updater = self._make_updater()
+        updater.kline_repo.session.commit.side_effect = RuntimeError("disk full")
+        mock_provider = self._provider(side_effect=lambda ticker, **kw: self._frame(ticker))
+
+        tickers = [f"{i:06d}" for i in range(500)]
+        with pytest.raises(RuntimeError, match="disk full"):
+            await asyncio.wait_for(
+                updater._concurrent_update_30m(tickers, mock_provider, MagicMock(), workers=4),
+                timeout=5,
+            )
+        assert mock_provider.fetch_kline_async.call_count < len(tickers)
 
 
 class TestStockUpdaterAsync:
-    """Test that async methods properly offload to threads."""
+    """Test that async methods keep the event loop responsive."""
 
     @pytest.mark.asyncio
-    async def test_update_watchlist_30m_calls_to_thread(self):
-        """update_watchlist_30m should delegate to asyncio.to_thread."""
+    async def test_update_watchlist_30m_fetches_concurrently(self):
+        """update_watchlist_30m should fan out through fetch_kline_async."""
         from src.services.stock_updater import StockUpdater
 
         kline_repo = MagicMock()
@@ -250,17 +323,14 @@ class TestStockUpdaterAsync:
 
         updater = StockUpdater(kline_repo, symbol_repo)
 
-        # Patch asyncio.to_thread at the module where it's used
-        async def fake_to_thread(fn, *args, **kwargs):
-            return 0
-
-        with patch("asyncio.to_thread", side_effect=fake_to_thread) as mock_tt, \
-             patch("src.services.sina_kline_provider.SinaKlineProvider.__init__",
-                   return_value=None), \
+        with patch("src.services.sina_kline_provider.SinaKlineProvider.fetch_kline_async",
+                   new_callable=AsyncMock, return_value=None) as mock_fetch, \
              patch("src.services.kline_service.KlineService.__init__",
                    return_value=None):
-            result = await updater.update_watchlist_30m()
-            mock_tt.assert_called_once()
+            result = await updater.update_watchlist_30m(workers=2)
+
+        assert result == 0
+        assert mock_fetch.await_count == 2
 
     @pytest.mark.asyncio
     async def test_update_single_calls_to_thread_for_sina(self):
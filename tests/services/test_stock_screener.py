@@ -0,0 +1,106 @@
+"""
+Tests for the technical indicator snapshot and the vectorized screener rules.
+"""
+
+import pytest
+
+from src.models import TechnicalIndicator
+from src.repositories.technical_indicator_repository import TechnicalIndicatorRepository
+from src.services.stock_screener import StockScreener, bollinger_breakout_rule, evaluate_rules
+
+
+def _add(session, ticker, trade_date, **values):
+    session.add(TechnicalIndicator(ticker=ticker, trade_date=trade_date, **values))
+
+
+@pytest.fixture
+def history(db_session):
+    # 600519: MA golden cross on the last day (older rows must be ignored)
+    _add(db_session, "600519", "20240101", ma5=12, ma10=10)
+    _add(db_session, "600519", "20240102", ma5=9, ma10=10, macd_dif=1, macd_dea=2, rsi6=40)
+    _add(db_session, "600519", "20240103", ma5=11, ma10=10, macd_dif=0.5, macd_dea=1, rsi6=45)
+    # 000001: MACD golden cross + oversold bounce
+    _add(db_session, "000001", "20240102", ma5=10, ma10=9, macd_dif=-1, macd_dea=-0.5, rsi6=25)
+    _add(db_session, "000001", "20240103", ma5=11, ma10=9, macd_dif=-0.2, macd_dea=-0.4, rsi6=31,
+         boll_upper=12, boll_mid=10, boll_lower=8)
+    # 300750: a single row, no previous day
+    _add(db_session, "300750", "20240103", ma5=5, ma10=4)
+    db_session.commit()
+    return db_session
+
+
+class TestSnapshot:
+    """Latest-two-rows snapshot maintenance"""
+
+    def test_rebuild_when_bootstrap_needed(self, history):
+        repo = TechnicalIndicatorRepository(history)
+        assert repo.needs_bootstrap()
+        repo.rebuild()
+        assert not repo.needs_bootstrap()
+
+        rows = {row["ticker"]: row for row in repo.find_snapshot()}
+        assert set(rows) == {"600519", "000001", "300750"}
+        assert (rows["600519"]["trade_date"], rows["600519"]["prev_trade_date"]) == ("20240103", "20240102")
+        assert (rows["600519"]["ma5"], rows["600519"]["prev_ma5"]) == (11, 9)
+        assert rows["300750"]["prev_trade_date"] is None
+
+    def test_refresh_snapshot_per_ticker(self, history):
+        repo = TechnicalIndicatorRepository(history)
+        repo.rebuild()
+
+        _add(history, "300750", "20240104", ma5=6, ma10=4.5)
+        repo.refresh_snapshot(["300750"])
+        history.commit()
+
+        row = next(r for r in repo.find_snapshot() if r["ticker"] == "300750")
+        assert (row["trade_date"], row["prev_trade_date"]) == ("20240104", "20240103")
+        assert (row["ma5"], row["prev_ma5"]) == (6, 5)
+        assert repo.count_snapshot() == 3
+
+    def test_refresh_drops_tickers_without_history(self, history):
+        repo = TechnicalIndicatorRepository(history)
+        repo.rebuild()
+        history.query(TechnicalIndicator).filter_by(ticker="300750").delete()
+        repo.refresh_snapshot(["300750"])
+        assert repo.count_snapshot() == 2
+
+
+class TestScreener:
+    """Rules evaluated over the snapshot"""
+
+    def test_reads_do_not_write_snapshot(self, history):
+        screener = StockScreener(session=history)
+        results = screener.run_all_screens()
+
+        assert [r["ticker"] for r in results["golden_cross"]] == ["600519"]
+        assert TechnicalIndicatorRepository(history).count_snapshot() == 0
+        assert not history.new and not history.dirty
+
+    def test_run_all_screens(self, history):
+        screener = StockScreener(session=history)
+        results = screener.run_all_screens()
+
+        assert results["golden_cross"] == [
+            {"ticker": "600519", "date": "20240103", "ma5": 11.0, "ma10": 10.0, "signal": "MA金叉"}
+        ]
+        assert [r["ticker"] for r in results["macd_golden_cross"]] == ["000001"]
+        assert results["oversold_bounce"] == [
+            {"ticker": "000001", "date": "20240103", "rsi6": 31.0, "prev_rsi6": 25.0, "signal": "超卖反弹"}
+        ]
+
+    def test_threshold_parameter(self, history):
+        screener = StockScreener(session=history)
+        assert screener.screen_oversold_bounce(rsi_threshold=20) == []
+        assert [r["ticker"] for r in screener.screen_oversold_bounce(rsi_threshold=50)] == ["000001", "600519"]
+
+    def test_bollinger_and_empty_snapshot(self, history):
+        assert [r["ticker"] for r in StockScreener(session=history).screen_bollinger_breakout()] == ["000001"]
+
+        import pandas as pd
+        assert evaluate_rules(pd.DataFrame(), [bollinger_breakout_rule()]) == {"bollinger_breakout": []}
+
+    def test_latest_indicators(self, history):
+        result = StockScreener(session=history).get_latest_indicators("600519")
+        assert result["current"]["trade_date"] == "20240103"
+        assert result["previous"]["ma5"] == 9
+        assert StockScreener(session=history).get_latest_indicators("300750") is None
@@ -0,0 +1,303 @@
+"""
+Tests for StockUpdater's by-trade-date (cross-sectional) whole-market ingest.
+"""
+
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from src.models import Kline, KlineTimeframe, SymbolMetadata, SymbolType, TradeCalendar
+from src.repositories.kline_repository import KlineRepository
+from src.services.stock_updater import StockUpdater
+
+
+def _seed_calendar(session, days):
+    for day in days:
+        session.add(TradeCalendar(date=day, is_trading_day=1))
+    session.commit()
+
+
+def _seed_universe(session, tickers):
+    for ticker in tickers:
+        session.add(SymbolMetadata(ticker=ticker, name=ticker))
+    session.commit()
+
+
+def _seed_bar(session, ticker, day):
+    session.add(Kline(
+        symbol_type=SymbolType.STOCK, symbol_code=ticker,
+        timeframe=KlineTimeframe.DAY, trade_time=day,
+        open=1.0, high=1.0, low=1.0, close=1.0, volume=0, amount=0,
+    ))
+
+
+def _cross_section(day, tickers):
+    return pd.DataFrame({
+        "ticker": tickers,
+        "trade_time": [day] * len(tickers),
+        "open": [10.0] * len(tickers),
+        "high": [11.0] * len(tickers),
+        "low": [9.0] * len(tickers),
+        "close": [10.5] * len(tickers),
+        "volume": [1000.0] * len(tickers),
+        "amount": [10500.0] * len(tickers),
+    })
+
+
+@pytest.fixture
+def updater(db_session):
+    return StockUpdater(KlineRepository(db_session), MagicMock())
+
+
+class TestMissingTradeDates:
+
+    def test_returns_none_without_calendar(self, updater):
+        assert updater._get_missing_trade_dates(today="2026-01-09") is None
+
+    def test_only_incomplete_days_are_missing(self, db_session, updater):
+        _seed_calendar(db_session, ["2026-01-05", "2026-01-06", "2026-01-07"])
+        _seed_universe(db_session, ["000001", "000002"])
+        for ticker in ("000001", "000002"):
+            _seed_bar(db_session, ticker, "2026-01-05")
+        _seed_bar(db_session, "000001", "2026-01-06")
+        db_session.commit()
+
+        missing = updater._get_missing_trade_dates(today="2026-01-09")
+
+        assert missing == ["2026-01-06", "2026-01-07"]
+
+    def test_ignores_future_and_old_days(self, db_session, updater):
+        _seed_calendar(
+            db_session, ["2026-01-05", "2026-01-06", "2026-01-07", "2026-01-08"]
+        )
+
+        missing = updater._get_missing_trade_dates(lookback_days=2, today="2026-01-07")
+
+        assert missing == ["2026-01-06", "2026-01-07"]
+
+
+class TestUpdateByTradeDate:
+
+    def test_one_call_per_missing_day_filtered_to_universe(self, db_session, updater):
+        _seed_universe(db_session, ["000001", "600000"])
+
+        with patch(
+            "src.services.tushare_data_provider.TushareDataProvider"
+        ) as MockProvider:
+            provider = MockProvider.return_value
+            provider.fetch_daily_cross_section.side_effect = lambda day: _cross_section(
+                day, ["000001", "600000", "830001"]
+            )
+            count = updater._sync_update_all_daily_by_trade_date(
+                ["2026-01-06", "2026-01-07"]
+            )
+
+        assert provider.fetch_daily_cross_section.call_count == 2
+        assert count == 4
+        rows = db_session.query(Kline).order_by(Kline.symbol_code, Kline.trade_time).all()
+        assert [(r.symbol_code, r.trade_time) for r in rows] == [
+            ("000001", "2026-01-06"), ("000001", "2026-01-07"),
+            ("600000", "2026-01-06"), ("600000", "2026-01-07"),
+        ]
+        assert rows[0].amount == 10500.0
+
+    def test_empty_day_is_skipped(self, db_session, updater):
+        with patch(
+            "src.services.tushare_data_provider.TushareDataProvider"
+        ) as MockProvider:
+            MockProvider.return_value.fetch_daily_cross_section.return_value = pd.DataFrame()
+            count = updater._sync_update_all_daily_by_trade_date(["2026-01-07"])
+
+        assert count == 0
+        assert db_session.query(Kline).count() == 0
+
+    def test_upsert_uses_columnar_path(self, db_session, updater):
+        tickers = [f"{i:06d}" for i in range(7)]
+        with patch("src.services.stock_updater.CROSS_SECTION_CHUNK_SIZE", 3), \
+             patch.object(
+                 updater.kline_repo, "upsert_columns", wraps=updater.kline_repo.upsert_columns
+             ) as spy:
+            count = updater._upsert_cross_section(_cross_section("2026-01-07", tickers))
+
+        assert count == 7
+        assert spy.call_args.kwargs["chunk_size"] == 3
+
+
+class TestCrossSectionMacd:
+
+    def test_continues_macd_from_saved_state(self, db_session, updater):
+        from src.services.kline_service import KlineService
+        from src.utils.indicators import calculate_macd
+
+        days = pd.bdate_range("2025-11-03", periods=40).strftime("%Y-%m-%d").tolist()
+        closes = [10.0 + (i % 7) * 0.3 for i in range(40)]
+        KlineService(updater.kline_repo).save_klines(
+            SymbolType.STOCK, "000001", None, KlineTimeframe.DAY,
+            [{"datetime": d, "open": c, "high": c, "low": c, "close": c} for d, c in zip(days, closes)],
+        )
+
+        updater._upsert_cross_section(_cross_section("2026-01-07", ["000001", "600000"]))
+        db_session.commit()
+
+        row = db_session.query(Kline).filter_by(symbol_code="000001", trade_time="2026-01-07").one()
+        expected = calculate_macd(closes + [10.5])
+        assert row.dif == pytest.approx(expected["dif"][-1])
+        assert row.macd == pytest.approx(expected["macd"][-1])
+        state = updater.kline_repo.get_indicator_state("000001", SymbolType.STOCK, KlineTimeframe.DAY)
+        assert state.last_trade_time == "2026-01-07"
+        # A symbol without history starts its MACD chain
+        assert updater.kline_repo.get_indicator_state("600000", SymbolType.STOCK, KlineTimeframe.DAY)
+
+
+class TestUpdateAllDailyMode:
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_per_ticker_without_calendar(self, updater):
+        with patch.object(
+            updater, "_update_all_daily_per_ticker", new=AsyncMock(return_value=7)
+        ) as per_ticker:
+            result = await updater.update_all_daily()
+
+        assert result == 7
+        per_ticker.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_uses_cross_section_when_calendar_available(self, db_session, updater):
+        _seed_calendar(db_session, ["2026-01-07"])
+        with patch.object(
+            updater, "_sync_update_all_daily_by_trade_date", return_value=5
+        ) as by_date, patch.object(updater, "_update_all_daily_per_ticker") as per_ticker:
+            result = await updater.update_all_daily()
+
+        assert result == 5
+        by_date.assert_called_once()
+        per_ticker.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_missing_dates_queried_off_event_loop(self, updater):
+        loop_thread = threading.get_ident()
+        seen = []
+
+        def missing_dates():
+            seen.append(threading.get_ident())
+            return []
+
+        with patch.object(updater, "_get_missing_trade_dates", side_effect=missing_dates):
+            result = await updater.update_all_daily()
+
+        assert result == 0
+        assert seen and seen[0] != loop_thread
+
+
+def _raw_daily():
+    return pd.DataFrame({
+        "ts_code": ["000001.SZ", "600000.SH"],
+        "trade_date": ["20260107", "20260107"],
+        "open": [10.0, 8.0], "high": [11.0, 8.5],
+        "low": [9.5, 7.9], "close": [10.8, 8.2],
+        "vol": [1000.0, None], "amount": [1080.0, 500.0],
+    })
+
+
+@pytest.fixture
+def provider():
+    from src.services.tushare_data_provider import TushareDataProvider
+
+    provider = TushareDataProvider.__new__(TushareDataProvider)
+    provider.client = MagicMock()
+    provider.client.fetch_daily.return_value = _raw_daily()
+    return provider
+
+
+class TestFetchDailyCrossSection:
+
+    def test_normalizes_tushare_frame(self, provider):
+        frame = provider.fetch_daily_cross_section("2026-01-07")
+
+        provider.client.fetch_daily.assert_called_once_with(trade_date="20260107")
+        assert frame["ticker"].tolist() == ["000001", "600000"]
+        assert frame["trade_time"].tolist() == ["2026-01-07", "2026-01-07"]
+        assert frame["volume"].tolist() == [1000.0, 0.0]
+
+    def test_amount_unit_matches_per_symbol_path(self, provider):
+        frame = provider.fetch_daily_cross_section("2026-01-07")
+        per_symbol = provider._normalize_candle_data(_raw_daily().iloc[[0]], limit=None)
+
+        # Both paths store turnover in yuan (Tushare returns thousands of yuan)
+        assert frame["amount"].tolist() == [1080000.0, 500000.0]
+        assert frame["amount"].iloc[0] == per_symbol["turnover"].iloc[0]
+
+
+class TestSave30mBatch:
+
+    @staticmethod
+    def _frame():
+        return pd.DataFrame([{
+            "timestamp": pd.Timestamp("2026-01-07 10:00:00"),
+            "open": 10.0, "high": 11.0, "low": 9.0, "close": 10.5, "volume": 1000,
+        }])
+
+    def test_failed_ticker_does_not_lose_batch(self, db_session, updater):
+        from src.services.kline_service import KlineService
+
+        kline_service = KlineService(updater.kline_repo, MagicMock())
+        save_klines = kline_service.save_klines
+
+        def flaky_save(**kwargs):
+            count = save_klines(**kwargs)
+            if kwargs["symbol_code"] == "000002":
+                # A failed flush leaves the session needing a rollback
+                db_session.add(Kline(symbol_type=SymbolType.STOCK, timeframe=KlineTimeframe.MINS_30))
+                db_session.flush()
+            return count
+
+        with patch.object(kline_service, "save_klines", side_effect=flaky_save):
+            count, failed = updater._save_30m_batch(
+                [(t, self._frame()) for t in ("000001", "000002", "000003")], kline_service
+            )
+
+        assert (count, failed) == (2, 1)
+        saved = {k.symbol_code for k in db_session.query(Kline).filter_by(timeframe=KlineTimeframe.MINS_30)}
+        assert saved == {"000001", "000003"}
+
+
+class TestCrossSectionRoundTrips:
+
+    @pytest.mark.parametrize("chunk_size", [500, 5])
+    def test_state_and_closes_loaded_in_one_query(self, db_session, updater, chunk_size):
+        from sqlalchemy import event
+
+        from src.utils.indicators import calculate_macd
+
+        tickers = [f"{i:06d}" for i in range(40)]
+        days = pd.bdate_range("2025-11-03", periods=30).strftime("%Y-%m-%d").tolist()
+        history = pd.concat([_cross_section(day, tickers) for day in days])
+        updater._upsert_cross_section(history)
+        db_session.commit()
+
+        statements = []
+
+        def count(conn, cursor, statement, params, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            with patch("src.repositories.kline_repository.SYMBOL_CHUNK_SIZE", chunk_size):
+                updater._upsert_cross_section(_cross_section("2026-01-07", tickers))
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        db_session.commit()
+
+        state_reads = [s for s in statements if s.startswith("SELECT") and "FROM kline_indicator_state" in s]
+        state_writes = [s for s in statements if s.startswith("INSERT INTO kline_indicator_state")]
+        close_reads = [s for s in statements if s.startswith("SELECT") and "FROM klines" in s]
+        assert len(state_reads) == 1
+        assert len(state_writes) == 1
+        assert len(close_reads) == 1
+        row = db_session.query(Kline).filter_by(symbol_code="000007", trade_time="2026-01-07").one()
+        assert row.dif == pytest.approx(calculate_macd([10.5] * 31)["dif"][-1])
+        state = updater.kline_repo.get_indicator_state("000007", SymbolType.STOCK, KlineTimeframe.DAY)
+        assert state.last_trade_time == "2026-01-07"
@@ -0,0 +1,91 @@
+"""
+Tests for the matrix-based portfolio history and its incremental cache.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.models import Kline, KlineTimeframe, SymbolType, Watchlist
+from src.services.watchlist_service import WatchlistService
+
+
+def _bar(session, ticker, trade_time, close):
+    session.add(Kline(
+        symbol_type=SymbolType.STOCK, symbol_code=ticker, timeframe=KlineTimeframe.MINS_30,
+        trade_time=trade_time, open=close, high=close, low=close, close=close,
+    ))
+
+
+@pytest.fixture
+def portfolio(db_session):
+    db_session.add_all([
+        Watchlist(ticker="600519", purchase_price=10, shares=1000, purchase_date=datetime(2024, 1, 2)),
+        Watchlist(ticker="000001", purchase_price=20, shares=500, purchase_date=datetime(2024, 1, 3)),
+    ])
+    _bar(db_session, "600519", "2024-01-02 10:00:00", 10.0)
+    _bar(db_session, "600519", "2024-01-02 15:00:00", 11.0)  # daily close = last bar
+    _bar(db_session, "600519", "2024-01-03 15:00:00", 12.0)
+    _bar(db_session, "000001", "2024-01-03 15:00:00", 20.0)
+    _bar(db_session, "000001", "2024-01-04 15:00:00", 22.0)  # 600519 missing: forward-filled
+    db_session.commit()
+    return db_session
+
+
+def test_portfolio_history(portfolio):
+    result = WatchlistService(portfolio).calculate_portfolio_history()
+
+    assert result["dates"] == ["2024-01-02", "2024-01-03", "2024-01-04"]
+    # 01-02: only 600519 held; 01-03: both; 01-04: 600519 carried at 12
+    assert result["absolute_values"] == [11000.0, 22000.0, 23000.0]
+    assert result["normalized_values"] == [0.55, 1.1, 1.15]
+    assert result["current_value"] == 23000.0
+    assert result["total_return"] == 3000.0
+    assert result["return_pct"] == 15.0
+    assert result["stock_count"] == 2
+
+
+def test_incomplete_days_are_skipped(portfolio):
+    # 300750 is held from 01-03 but never priced
+    portfolio.add(Watchlist(ticker="300750", purchase_price=5, shares=2000, purchase_date=datetime(2024, 1, 3)))
+    portfolio.commit()
+
+    result = WatchlistService(portfolio).calculate_portfolio_history()
+
+    # 01-03 and 01-04: 300750 never priced -> 2/3 held stocks priced (< 70%)
+    assert result["dates"] == ["2024-01-02"]
+
+
+def test_only_newest_day_is_reloaded(portfolio):
+    service = WatchlistService(portfolio)
+    service.calculate_portfolio_history()
+
+    loads = []
+    original = service._load_daily_closes
+    service._load_daily_closes = lambda tickers, since: loads.append(since) or original(tickers, since)
+
+    _bar(portfolio, "600519", "2024-01-04 15:00:00", 13.0)  # newest day updated
+    _bar(portfolio, "600519", "2024-01-05 15:00:00", 14.0)
+    _bar(portfolio, "000001", "2024-01-05 15:00:00", 21.0)
+    portfolio.commit()
+    result = service.calculate_portfolio_history()
+
+    assert loads == ["2024-01-04"]
+    assert result["dates"][-2:] == ["2024-01-04", "2024-01-05"]
+    assert result["absolute_values"][-2:] == [24000.0, 24500.0]
+
+
+def test_watchlist_change_rebuilds(portfolio):
+    service = WatchlistService(portfolio)
+    service.calculate_portfolio_history()
+
+    portfolio.query(Watchlist).filter_by(ticker="000001").update({"shares": 1000})
+    portfolio.commit()
+    loads = []
+    original = service._load_daily_closes
+    service._load_daily_closes = lambda tickers, since: loads.append(since) or original(tickers, since)
+
+    result = service.calculate_portfolio_history()
+
+    assert loads == ["2024-01-02"]
+    assert result["absolute_values"][-1] == 34000.0
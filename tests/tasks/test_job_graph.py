@@ -0,0 +1,143 @@
+"""
+Tests for the declarative job graph runner.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.tasks.job_graph import DONE, FAILED, FRESH, SKIPPED, STALE, JobGraph, JobNode
+
+
+def _node(name, log, deps=(), delay=0.0, **kw):
+    async def action():
+        log.append(("start", name))
+        await asyncio.sleep(delay)
+        log.append(("end", name))
+        return name
+
+    return JobNode(name, action, deps=tuple(deps), **kw)
+
+
+class TestJobGraphValidation:
+    """Graph construction rejects malformed graphs"""
+
+    def test_unknown_dependency(self):
+        with pytest.raises(ValueError):
+            JobGraph("g", [JobNode("a", lambda: None, deps=("missing",))])
+
+    def test_cycle(self):
+        with pytest.raises(ValueError):
+            JobGraph("g", [
+                JobNode("a", lambda: None, deps=("b",)),
+                JobNode("b", lambda: None, deps=("a",)),
+            ])
+
+    def test_subgraph_includes_dependencies(self):
+        graph = JobGraph("g", [
+            JobNode("a", lambda: None),
+            JobNode("b", lambda: None, deps=("a",)),
+            JobNode("c", lambda: None),
+        ])
+        assert graph.subgraph(["b"]).order == ["a", "b"]
+
+
+class TestJobGraphRun:
+    """Scheduling order, freshness polling and failure propagation"""
+
+    @pytest.mark.asyncio
+    async def test_independent_branches_run_in_parallel(self):
+        log = []
+        graph = JobGraph("g", [
+            _node("root", log),
+            _node("slow", log, deps=["root"], delay=0.05),
+            _node("fast", log, deps=["root"]),
+            _node("after_fast", log, deps=["fast"]),
+            _node("join", log, deps=["slow", "after_fast"]),
+        ])
+
+        run = await graph.run()
+
+        assert run.success
+        # after_fast does not wait for the unrelated slow branch
+        assert log.index(("end", "after_fast")) < log.index(("end", "slow"))
+        assert log[-1] == ("end", "join")
+        assert run.nodes["slow"].duration_seconds >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_sync_actions_run_in_threads(self):
+        graph = JobGraph("g", [JobNode("sync", lambda: 42)])
+        run = await graph.run()
+        assert run.nodes["sync"].status == DONE
+        assert run.nodes["sync"].result == 42
+
+    @pytest.mark.asyncio
+    async def test_fresh_node_not_run(self):
+        calls = []
+        graph = JobGraph("g", [JobNode("a", lambda: calls.append(1), is_fresh=lambda: True)])
+        run = await graph.run()
+        assert run.nodes["a"].status == FRESH
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_polls_until_fresh(self):
+        published = iter([False, False, True])
+        calls = []
+        graph = JobGraph("g", [
+            JobNode("a", lambda: calls.append(1), is_fresh=lambda: next(published), poll_interval=0.01),
+        ])
+
+        run = await graph.run(deadline=datetime.now(timezone.utc) + timedelta(seconds=5))
+
+        assert run.nodes["a"].status == DONE
+        assert run.nodes["a"].attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_not_before_delays_start(self):
+        log = []
+        not_before = datetime.now(timezone.utc) + timedelta(seconds=0.1)
+        graph = JobGraph("g", [_node("a", log, not_before=not_before)])
+
+        run = await graph.run()
+
+        assert run.nodes["a"].status == DONE
+        assert run.nodes["a"].started_at >= not_before
+
+    @pytest.mark.asyncio
+    async def test_stale_at_deadline_skips_dependents(self):
+        log = []
+        graph = JobGraph("g", [
+            JobNode("a", lambda: None, is_fresh=lambda: False, poll_interval=0.01),
+            _node("b", log, deps=["a"]),
+        ])
+
+        run = await graph.run(deadline=datetime.now(timezone.utc) + timedelta(seconds=0.05))
+
+        assert run.nodes["a"].status == STALE
+        assert run.nodes["a"].attempts > 1
+        assert run.nodes["b"].status == SKIPPED
+        assert log == []
+        assert not run.success
+
+    @pytest.mark.asyncio
+    async def test_failure_skips_only_downstream(self):
+        log = []
+
+        def boom():
+            raise RuntimeError("provider down")
+
+        graph = JobGraph("g", [
+            JobNode("bad", boom),
+            _node("child", log, deps=["bad"]),
+            _node("other", log),
+        ])
+
+        run = await graph.run()
+
+        assert run.nodes["bad"].status == FAILED
+        assert "provider down" in run.nodes["bad"].error
+        assert run.nodes["child"].status == SKIPPED
+        assert run.nodes["other"].status == DONE
@@ -2,8 +2,8 @@ from __future__ import annotations
 
 import pytest
 
-import src.tasks.scheduler as scheduler_module
-from src.tasks.scheduler import SchedulerManager
+import src.tasks.nightly as nightly_module
+from src.tasks.nightly import build_nightly_graph, script_action
 from src.tasks.task_runner import TaskResult
 
 
@@ -19,28 +19,148 @@ def _task_result(script_name: str, exit_code: int) -> TaskResult:
     )
 
 
-def test_update_industry_data_raises_on_script_failure(monkeypatch: pytest.MonkeyPatch) -> None:
-    manager = SchedulerManager()
-
+def test_script_action_raises_on_script_failure(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(
-        scheduler_module,
+        nightly_module,
         "run_script",
         lambda *args, **kwargs: _task_result("update_industry_daily.py", 1),
     )
 
     with pytest.raises(RuntimeError):
-        manager._update_industry_data()
+        script_action("update_industry_daily.py", timeout=1800)()
 
 
-def test_update_etf_data_raises_when_required_step_fails(monkeypatch: pytest.MonkeyPatch) -> None:
-    manager = SchedulerManager()
+def test_script_action_returns_duration_on_success(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        nightly_module,
+        "run_script",
+        lambda script_name, **kwargs: _task_result(script_name, 0),
+    )
 
-    def _fake_run_script(script_name: str, **kwargs) -> TaskResult:
-        if script_name == "update_etf_daily_summary.py":
-            return _task_result(script_name, 1)
-        return _task_result(script_name, 0)
+    assert script_action("build_etf_filtered.py", timeout=300)() == 1.0
 
-    monkeypatch.setattr(scheduler_module, "run_script", _fake_run_script)
 
-    with pytest.raises(RuntimeError):
-        manager._update_etf_data()
+def test_nightly_graph_dependencies() -> None:
+    graph = build_nightly_graph("2026-03-04", session_factory=lambda: None)
+
+    assert graph.order[0] == "calendar"
+    assert graph.nodes["screenshots"].deps == ("indicators",)
+    assert set(graph.nodes["validation"].deps) == {"stock_daily", "index_daily", "concept_daily"}
+    # ETF scripts share one CSV and must stay sequential
+    etf = [name for name in graph.order if name.startswith("etf_")]
+    assert etf == ["etf_summary", "etf_filtered", "etf_flow", "etf_klines", "etf_flow_history"]
+    # ETF CSVs carry no trade date, so the chain waits for the evening publish
+    not_before = graph.nodes["etf_summary"].not_before
+    assert (not_before.date().isoformat(), not_before.hour, not_before.minute) == ("2026-03-04", 18, 10)
+
+
+def test_board_scripts_fresh_once_trade_date_rows_exist(db_session) -> None:
+    from src.models import ConceptDaily, IndustryDaily
+
+    class _Session:
+        def __enter__(self):
+            return db_session
+
+        def __exit__(self, *exc):
+            return False
+
+    graph = build_nightly_graph("2026-03-04", session_factory=_Session)
+    industry_fresh = graph.nodes["industry_daily"].is_fresh
+    concept_fresh = graph.nodes["concept_stats"].is_fresh
+
+    # The industry script falls back to the previous day's data when today's is not out
+    db_session.add(IndustryDaily(
+        trade_date="20260303", ts_code="881101.TI", industry="种植业", close=1.0, pct_change=0.0, company_num=1,
+    ))
+    db_session.commit()
+    assert not industry_fresh()
+    assert not concept_fresh()
+
+    db_session.add_all([
+        IndustryDaily(
+            trade_date="20260304", ts_code="881101.TI", industry="种植业", close=1.0, pct_change=0.0, company_num=1,
+        ),
+        ConceptDaily(trade_date="20260304", code="885001", name="概念", close=1.0, pct_change=0.0),
+    ])
+    db_session.commit()
+    assert industry_fresh()
+    assert concept_fresh()
+
+
+def test_kline_nodes_fresh_only_when_universe_covered(db_session) -> None:
+    from src.models import Kline, KlineTimeframe, SymbolMetadata, SymbolType
+
+    class _Session:
+        def __enter__(self):
+            return db_session
+
+        def __exit__(self, *exc):
+            return False
+
+    def bar(code, symbol_type, day):
+        return Kline(
+            symbol_type=symbol_type, symbol_code=code, timeframe=KlineTimeframe.DAY, trade_time=day,
+            open=1.0, high=1.0, low=1.0, close=1.0, volume=1.0, amount=1.0,
+        )
+
+    graph = build_nightly_graph("2026-03-04", session_factory=_Session)
+    stock_fresh = graph.nodes["stock_daily"].is_fresh
+    index_fresh = graph.nodes["index_daily"].is_fresh
+
+    tickers = [f"{600000 + i}" for i in range(10)]
+    db_session.add_all(SymbolMetadata(ticker=t, name=t) for t in tickers)
+    db_session.add_all(bar(code, SymbolType.INDEX, "2026-03-03") for code in ("000001.SH", "399001.SZ"))
+    # One stock (e.g. from a watchlist update) must not mark the whole market fresh
+    db_session.add(bar(tickers[0], SymbolType.STOCK, "2026-03-04"))
+    db_session.add(bar("000001.SH", SymbolType.INDEX, "2026-03-04"))
+    db_session.commit()
+    assert not stock_fresh()
+    assert not index_fresh()
+
+    # 9 of 10 stocks (one suspended) and both indexes
+    db_session.add_all(bar(t, SymbolType.STOCK, "2026-03-04") for t in tickers[1:9])
+    db_session.add(bar("399001.SZ", SymbolType.INDEX, "2026-03-04"))
+    db_session.commit()
+    assert stock_fresh()
+    assert index_fresh()
+
+
+@pytest.mark.asyncio
+async def test_run_nightly_records_node_timings(db_session, monkeypatch: pytest.MonkeyPatch) -> None:
+    from src.models import DataUpdateLog, DataUpdateStatus
+    from src.tasks.job_graph import JobGraph, JobNode
+
+    def fail():
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(
+        nightly_module,
+        "build_nightly_graph",
+        lambda trade_date, session_factory: JobGraph("nightly", [
+            JobNode("calendar", lambda: 3),
+            JobNode("industry_daily", fail, deps=("calendar",)),
+        ]),
+    )
+    alerts = []
+    monkeypatch.setattr(
+        nightly_module,
+        "get_alert_manager",
+        lambda: type("Alerts", (), {"emit": lambda self, *args, **kw: alerts.append(args)})(),
+    )
+
+    class _Session:
+        def __enter__(self):
+            return db_session
+
+        def __exit__(self, *exc):
+            return False
+
+    run = await nightly_module.run_nightly("2026-03-04", session_factory=_Session)
+
+    assert not run.success
+    logs = {log.update_type: log for log in db_session.query(DataUpdateLog).all()}
+    assert logs["nightly.calendar"].status == DataUpdateStatus.COMPLETED
+    assert logs["nightly.calendar"].records_updated == 3
+    assert logs["nightly.industry_daily"].status == DataUpdateStatus.FAILED
+    assert "boom" in logs["nightly.industry_daily"].error_message
+    assert [(level, source) for level, source, _ in alerts] == [("error", "scheduler.industry")]
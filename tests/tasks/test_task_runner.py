@@ -0,0 +1,152 @@
+"""
+Tests for in-process job execution in task_runner.
+"""
+
+import itertools
+import logging
+import textwrap
+import time
+
+import pytest
+
+from src.tasks import task_runner
+from src.tasks.task_runner import register_job, run_script
+
+_ids = itertools.count()
+
+
+@pytest.fixture
+def scripts_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(task_runner, "_SCRIPTS_DIR", tmp_path)
+    monkeypatch.setattr(task_runner, "JOB_REGISTRY", dict(task_runner.JOB_REGISTRY))
+    return tmp_path
+
+
+def _script(scripts_dir, body: str, register: bool = True, pool: str = "thread") -> str:
+    # Unique module names: imported scripts stay in sys.modules
+    name = f"_job_{time.time_ns()}_{next(_ids)}.py"
+    (scripts_dir / name).write_text(textwrap.dedent(body), encoding="utf-8")
+    if register:
+        register_job(name, pool=pool)
+    return name
+
+
+class TestInProcess:
+    """Registered jobs run in the worker pool and report like subprocesses"""
+
+    def test_captures_print_and_logging(self, scripts_dir):
+        name = _script(scripts_dir, """
+            import logging
+
+            def main():
+                print("hello from job")
+                logging.getLogger("job").warning("careful")
+        """)
+
+        result = run_script(name, log_to_file=False)
+
+        assert result.success
+        assert result.stdout == "hello from job\n"
+        assert "careful" in result.stderr
+
+    def test_captures_info_logs_under_warning_root(self, scripts_dir):
+        root = logging.getLogger()
+        original_level = root.level
+        other = logging.Handler()
+        seen = []
+        other.emit = seen.append
+        root.setLevel(logging.WARNING)
+        root.addHandler(other)
+        name = _script(scripts_dir, """
+            import logging
+
+            def main():
+                logging.basicConfig(level=logging.INFO)
+                logging.getLogger("job").info("step 1 done")
+        """)
+
+        try:
+            result = run_script(name, log_to_file=False)
+            level_after = root.level
+        finally:
+            root.removeHandler(other)
+            root.setLevel(original_level)
+
+        assert "step 1 done" in result.stderr
+        assert level_after == logging.WARNING
+        # Other root handlers keep the original WARNING threshold
+        assert not [r for r in seen if r.getMessage() == "step 1 done"]
+        assert not other.filters
+
+    def test_sys_exit_code(self, scripts_dir):
+        name = _script(scripts_dir, """
+            import sys
+
+            def main():
+                sys.exit(3)
+        """)
+        assert run_script(name, log_to_file=False).exit_code == 3
+
+    def test_exception_is_exit_1_with_traceback(self, scripts_dir):
+        name = _script(scripts_dir, """
+            def main():
+                raise ValueError("bad input")
+        """)
+
+        result = run_script(name, log_to_file=False)
+
+        assert result.exit_code == 1
+        assert "Traceback" in result.stderr
+        assert "ValueError: bad input" in result.stderr
+
+    def test_timeout_then_refused_until_finished(self, scripts_dir):
+        name = _script(scripts_dir, """
+            import time
+
+            def main():
+                time.sleep(0.5)
+        """)
+
+        assert run_script(name, timeout=0.05, log_to_file=False).exit_code == -2
+        assert task_runner.running_jobs()[name]["timed_out"]
+        refused = run_script(name, log_to_file=False)
+        assert refused.exit_code == -4
+        assert "timed out after" in refused.stderr
+
+        time.sleep(0.6)
+        assert name not in task_runner.running_jobs()
+        assert run_script(name, log_to_file=False).success
+
+    def test_log_file_written(self, scripts_dir, tmp_path, monkeypatch):
+        monkeypatch.setattr(task_runner, "_LOGS_DIR", tmp_path / "logs")
+        name = _script(scripts_dir, """
+            def main():
+                print("to the log")
+        """)
+
+        run_script(name)
+
+        log = tmp_path / "logs" / name.replace(".py", ".log")
+        assert log.read_text(encoding="utf-8") == "to the log\n"
+
+
+class TestSubprocess:
+    """Unregistered scripts keep running as subprocesses"""
+
+    def test_unregistered_runs_as_subprocess(self, scripts_dir):
+        name = _script(scripts_dir, """
+            import os
+            print(os.getpid())
+        """, register=False)
+
+        result = run_script(name, log_to_file=False)
+
+        assert result.success
+        assert int(result.stdout) != __import__("os").getpid()
+
+    def test_missing_script(self, scripts_dir):
+        assert run_script("nope.py", log_to_file=False).exit_code == -1
+
+    def test_register_rejects_unknown_pool(self):
+        with pytest.raises(ValueError):
+            register_job("x.py", pool="fiber")
@@ -2,10 +2,11 @@
 Tests for Crypto WebSocket real-time data module
 Tests cover: TickerSnapshot, MiniKline, CryptoWebSocketManager, message handling
 """
+import json
 import time
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 from src.services.crypto_ws import (
     TickerSnapshot,
@@ -406,6 +407,111 @@ class TestCryptoWebSocketManager:
         assert mgr.get_kline("ETH", "1m") is None
 
 
+# ── Bar History Tests ──
+
+MINUTE_MS = 60_000
+
+
+def _kline_msg(symbol="BTCUSDT", interval="1m", minute=0, close="75000", closed=True):
+    t = 1700000000000 + minute * MINUTE_MS
+    return {
+        "e": "kline",
+        "k": {
+            "s": symbol, "i": interval,
+            "t": t, "T": t + MINUTE_MS - 1,
+            "o": "75000", "h": "75100", "l": "74900", "c": close,
+            "v": "10", "x": closed,
+        },
+    }
+
+
+def _bar(minute, closed=True):
+    t = 1700000000000 + minute * MINUTE_MS
+    return MiniKline(
+        symbol="BTCUSDT", interval="1m", open_time=t, close_time=t + MINUTE_MS - 1,
+        open=1, high=1, low=1, close=minute, volume=1, is_closed=closed,
+    )
+
+
+class TestBarHistory:
+    def test_ring_keeps_last_n_closed_bars(self):
+        mgr = CryptoWebSocketManager(kline_intervals=["1m"], bar_history_size=3)
+        for minute in range(5):
+            mgr._handle_kline(_kline_msg(minute=minute, close=str(minute)))
+        mgr._handle_kline(_kline_msg(minute=5, closed=False))
+
+        assert [b.close for b in mgr.get_bars("BTC", "1m")] == [2, 3, 4]
+        assert [b.close for b in mgr.get_bars("BTC", "1m", limit=2)] == [3, 4]
+        with_live = mgr.get_bars("BTC", "1m", include_live=True)
+        assert len(with_live) == 4 and not with_live[-1].is_closed
+
+    def test_gap_restarts_buffer(self):
+        mgr = CryptoWebSocketManager(kline_intervals=["1m"])
+        for minute in (0, 1, 5):
+            mgr._handle_kline(_kline_msg(minute=minute, close=str(minute)))
+        assert [b.close for b in mgr.get_bars("BTC", "1m")] == [5]
+
+    def test_duplicate_close_replaces(self):
+        mgr = CryptoWebSocketManager(kline_intervals=["1m"])
+        mgr._handle_kline(_kline_msg(minute=0, close="1"))
+        mgr._handle_kline(_kline_msg(minute=0, close="2"))
+        assert [b.close for b in mgr.get_bars("BTC", "1m")] == [2]
+
+    def test_seed_merges_rest_bars(self):
+        mgr = CryptoWebSocketManager(kline_intervals=["1m"])
+        mgr._handle_kline(_kline_msg(minute=3, close="3"))
+
+        count = mgr.seed_bars("BTC", "1m", [_bar(m) for m in range(4)] + [_bar(4, closed=False)])
+
+        assert count == 4
+        assert [b.close for b in mgr.get_bars("BTC", "1m")] == [0, 1, 2, 3]
+        assert mgr.seed_bars("BTC", "1h", [_bar(0)]) == 0
+
+
+class TestStreamFanout:
+    @pytest.mark.asyncio
+    async def test_subscribers_get_filtered_frames(self):
+        mgr = CryptoWebSocketManager(kline_intervals=["1m"])
+        everything = mgr.subscribe()
+        btc_only = mgr.subscribe(symbols=["BTC"])
+
+        mgr._handle_kline(_kline_msg(symbol="BTCUSDT", minute=0))
+        mgr._handle_kline(_kline_msg(symbol="ETHUSDT", minute=0))
+
+        frames = [json.loads(f) for f in await everything.get()]
+        assert [(f["type"], f["data"]["pair"]) for f in frames] == [("bar", "BTCUSDT"), ("bar", "ETHUSDT")]
+        frames = [json.loads(f) for f in await btc_only.get()]
+        assert [f["data"]["pair"] for f in frames] == ["BTCUSDT"]
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_gets_latest_frame_only(self):
+        mgr = CryptoWebSocketManager(kline_intervals=["1m"])
+        sub = mgr.subscribe()
+        for close in ("1", "2", "3"):
+            mgr._handle_kline(_kline_msg(minute=0, close=close, closed=False))
+
+        frames = await sub.get()
+        assert len(frames) == 1
+        assert json.loads(frames[0])["data"]["close"] == 3.0
+        assert sub.dropped == 2
+        assert mgr.get_status()["frames_dropped"] == 2
+
+    def test_subscriber_limit_and_unsubscribe(self, monkeypatch):
+        import src.services.crypto_ws as mod
+        monkeypatch.setattr(mod, "MAX_STREAM_SUBSCRIBERS", 1)
+        mgr = CryptoWebSocketManager()
+        sub = mgr.subscribe()
+        with pytest.raises(RuntimeError):
+            mgr.subscribe()
+        mgr.unsubscribe(sub)
+        assert mgr.get_status()["subscribers"] == 0
+
+    def test_no_subscribers_no_encoding(self, monkeypatch):
+        mgr = CryptoWebSocketManager()
+        monkeypatch.setattr("src.services.crypto_ws.json.dumps", Mock(side_effect=AssertionError))
+        mgr._handle_kline(_kline_msg(minute=0))
+
+
 # ── Singleton Tests ──
 
 class TestSingleton:
@@ -454,3 +560,28 @@ class TestCryptoWSRoutes:
     def test_realtime_symbol_not_found(self, client):
         resp = client.get("/crypto/realtime/NONEXIST")
         assert resp.status_code == 404
+
+    def test_realtime_bars(self, client):
+        import src.services.crypto_ws as mod
+        manager = mod.get_crypto_ws_manager()
+        manager.seed_bars("BTC", "1m", [_bar(m) for m in range(3)])
+        try:
+            resp = client.get("/crypto/realtime/bars/BTC?interval=1m&limit=2")
+            assert resp.status_code == 200
+            assert [b["close"] for b in resp.json()["bars"]] == [1, 2]
+
+            assert client.get("/crypto/realtime/bars/BTC?interval=4h").status_code == 404
+        finally:
+            manager._bars.clear()
+
+    def test_stream_sends_snapshot(self, client):
+        import src.services.crypto_ws as mod
+        manager = mod.get_crypto_ws_manager()
+        manager._handle_kline(_kline_msg(minute=0, closed=False))
+        try:
+            with client.websocket_connect("/crypto/ws/stream?symbols=BTC") as ws:
+                frame = ws.receive_json()
+            assert frame["type"] == "snapshot"
+            assert [k["pair"] for k in frame["klines"]] == ["BTCUSDT"]
+        finally:
+            manager._latest_klines.clear()
@@ -0,0 +1,48 @@
+"""
+KeywordMatcher（Aho–Corasick）测试
+"""
+
+from src.utils.keyword_matcher import KeywordMatcher, build_matcher
+
+
+class TestKeywordMatcher:
+    """多关键词匹配测试"""
+
+    def test_overlapping_keywords(self):
+        """测试重叠/嵌套关键词全部命中"""
+        matcher = build_matcher(["he", "she", "his", "hers"])
+        assert matcher.search("ushers") == ["he", "she", "hers"]
+
+    def test_ignore_case_ascii_only(self):
+        """测试 ignore_case 只折叠 ASCII，精确关键词按原文匹配"""
+        matcher = KeywordMatcher()
+        matcher.add("deepseek", key="ai", ignore_case=True)
+        matcher.add("AAPL", key="aapl")
+        matcher.build()
+
+        assert matcher.search("DeepSeek 发布") == ["ai"]
+        assert matcher.search("aapl") == []
+        assert matcher.search("AAPL") == ["aapl"]
+
+    def test_cjk(self):
+        """测试中文关键词"""
+        matcher = build_matcher(["芯片", "半导体", "芯片股"])
+        assert matcher.search("半导体芯片股走强") == ["芯片", "半导体", "芯片股"]
+        assert matcher.search("房地产") == []
+
+    def test_shared_key_and_order(self):
+        """测试多个关键词共用 key 时去重，并按 key 首次添加顺序返回"""
+        matcher = KeywordMatcher()
+        matcher.add("600519", key="maotai")
+        matcher.add("贵州茅台", key="maotai")
+        matcher.add("芯片", key="chip")
+        matcher.build()
+
+        assert matcher.search("芯片 贵州茅台(600519)") == ["maotai", "chip"]
+
+    def test_matches_and_empty_keyword(self):
+        """测试 matches 及空关键词（与 "" in text 一致）"""
+        assert build_matcher(["广告"]).matches("这是广告内容")
+        assert not build_matcher(["广告"]).matches("正常新闻")
+        assert not build_matcher([]).matches("任意文本")
+        assert build_matcher([""]).matches("任意文本")
@@ -1,9 +1,13 @@
 """
 美股服务测试
 """
+import threading
+import time
+
 import pytest
 from unittest.mock import Mock, patch
 
+from src.services.us_stock.quote_cache import QuoteCache
 from src.services.us_stock.us_stock_service import USStockService, get_us_stock_service
 
 
@@ -53,51 +57,163 @@ class TestUSStockService:
         service2 = get_us_stock_service()
         assert service1 is service2
     
-    @patch.object(USStockService, 'get_quote')
-    def test_get_watchlist_quotes(self, mock_get_quote):
-        """测试获取监控列表报价"""
-        mock_get_quote.return_value = {
-            'symbol': 'AAPL',
-            'name': 'Apple Inc.',
-            'price': 150.0,
-            'change': 1.5,
-            'change_pct': 1.0,
-        }
-
-        service = USStockService()
+    def test_get_watchlist_quotes(self):
+        """测试获取监控列表报价（一次批量请求）"""
+        provider = FakeQuoteProvider()
+        service = USStockService(provider=provider)
         quotes = service.get_watchlist_quotes('mag7')
 
-        assert len(quotes) > 0
-        assert mock_get_quote.called
-    
+        assert [q['symbol'] for q in quotes] == list(service.WATCHLISTS['mag7'])
+        assert quotes[0]['cn_name'] == '苹果'
+        assert provider.calls == [list(service.WATCHLISTS['mag7'])]
+
     def test_get_watchlist_quotes_invalid(self):
         """测试无效监控列表"""
-        service = USStockService()
+        service = USStockService(provider=FakeQuoteProvider())
         quotes = service.get_watchlist_quotes('invalid_list')
         assert quotes == []
-    
-    def test_cache_validity(self):
-        """测试缓存有效性"""
-        from datetime import datetime, timedelta
-        
-        service = USStockService()
-        
-        # 没有缓存
-        assert service._is_cache_valid('test_key') == False
-        
-        # 添加缓存
-        service._cache['test_key'] = {
-            'data': 'test',
-            'timestamp': datetime.now()
-        }
-        assert service._is_cache_valid('test_key') == True
-        
-        # 过期缓存
-        service._cache['old_key'] = {
-            'data': 'test',
-            'timestamp': datetime.now() - timedelta(seconds=service._cache_ttl + 10)
+
+    def test_shared_cache_across_endpoints(self):
+        """测试各接口共享报价缓存，只拉取缺失的 symbol"""
+        provider = FakeQuoteProvider()
+        service = USStockService(provider=provider)
+
+        service.get_watchlist_quotes('mag7')
+        sector = service.get_sector('semiconductors')
+
+        assert sector['etf']['symbol'] == 'SMH'
+        assert len(sector['stocks']) == len(service.WATCHLISTS['semiconductors'])
+        # 第二次只拉取 mag7 中没有的 symbol
+        assert sorted(provider.calls[1]) == ['AMD', 'ASML', 'AVGO', 'INTC', 'QCOM', 'SMH', 'TSM']
+        # 添加 cn_name 不污染缓存
+        assert 'cn_name' not in service.get_quote('NVDA')
+
+    def test_market_summary_single_batch(self):
+        """测试市场概览只发起一次批量请求"""
+        provider = FakeQuoteProvider()
+        service = USStockService(provider=provider)
+        summary = service.get_market_summary()
+
+        assert len(provider.calls) == 1
+        assert summary['china_adr_summary']['total'] == len(service.WATCHLISTS['china_adr'])
+
+
+class FakeQuoteProvider:
+    """本地假报价源：记录每次批量请求"""
+
+    def __init__(self, missing=(), gate=None):
+        self.calls = []
+        self.missing = set(missing)
+        self.gate = gate
+        self._lock = threading.Lock()
+
+    def get_quotes_batch(self, symbols):
+        with self._lock:
+            self.calls.append(list(symbols))
+        if self.gate is not None:
+            self.gate.wait(5)
+        return [
+            {'symbol': s, 'name': s, 'price': 100.0, 'change': 1.0, 'change_pct': 1.0}
+            for s in symbols if s not in self.missing
+        ]
+
+
+class TestQuoteCache:
+    """报价缓存测试"""
+
+    def test_ttl_expiry(self):
+        now = [0.0]
+        provider = FakeQuoteProvider()
+        cache = QuoteCache(provider.get_quotes_batch, ttl=60, clock=lambda: now[0])
+
+        cache.get_many(['AAPL', 'MSFT'])
+        now[0] = 30
+        cache.get_many(['AAPL', 'MSFT'])
+        assert len(provider.calls) == 1
+
+        now[0] = 61
+        cache.get('AAPL')
+        assert provider.calls[-1] == ['AAPL']
+        assert cache.stats()['fresh'] == 1
+
+    def test_failed_symbols_not_cached(self):
+        provider = FakeQuoteProvider(missing={'BAD'})
+        cache = QuoteCache(provider.get_quotes_batch)
+
+        assert set(cache.get_many(['AAPL', 'BAD'])) == {'AAPL'}
+        cache.get_many(['AAPL', 'BAD'])
+        assert provider.calls == [['AAPL', 'BAD'], ['BAD']]
+
+    def test_fetch_error_returns_partial(self):
+        def broken(symbols):
+            raise ConnectionError("down")
+
+        cache = QuoteCache(broken)
+        assert cache.get_many(['AAPL']) == {}
+        assert cache.stats()['inflight'] == 0
+
+    def test_single_flight(self):
+        gate = threading.Event()
+        provider = FakeQuoteProvider(gate=gate)
+        cache = QuoteCache(provider.get_quotes_batch)
+        results = []
+
+        first = threading.Thread(target=lambda: results.append(cache.get_many(['AAPL', 'MSFT'])))
+        first.start()
+        while not provider.calls:
+            time.sleep(0.001)
+        second = threading.Thread(target=lambda: results.append(cache.get_many(['MSFT', 'NVDA'])))
+        second.start()
+        while len(provider.calls) < 2:
+            time.sleep(0.001)
+        gate.set()
+        first.join()
+        second.join()
+
+        # MSFT 只下载一次，第二个请求等待第一次的结果
+        assert provider.calls == [['AAPL', 'MSFT'], ['NVDA']]
+        assert all('MSFT' in r for r in results)
+
+
+class TestBatchQuoteFundamentals:
+    """批量报价的市值/市盈率"""
+
+    @staticmethod
+    def _bars(symbols):
+        import pandas as pd
+
+        frames = {
+            s: pd.DataFrame({'Close': [100.0, 101.0], 'Volume': [1000, 2000]}, index=pd.date_range('2026-01-05', periods=2))
+            for s in symbols
         }
-        assert service._is_cache_valid('old_key') == False
+        return pd.concat(frames, axis=1)
+
+    def test_backfilled_from_cached_info(self):
+        from src.services.yahoo_finance_provider import YahooFinanceProvider
+
+        provider = YahooFinanceProvider()
+        ticker = Mock()
+        ticker.info = {'marketCap': 3_000_000_000_000, 'trailingPE': 30.5}
+        with patch('src.services.yahoo_finance_provider.yf.download', return_value=self._bars(['AAPL', '^GSPC'])), \
+                patch('src.services.yahoo_finance_provider.yf.Ticker', return_value=ticker) as ticker_cls:
+            quotes = {q['symbol']: q for q in provider.get_quotes_batch(['AAPL', '^GSPC'])}
+            provider.get_quotes_batch(['AAPL', '^GSPC'])
+
+        assert quotes['AAPL']['market_cap'] == 3_000_000_000_000
+        assert quotes['AAPL']['pe_ratio'] == 30.5
+        # 指数没有基本面，不单独请求；AAPL 第二次命中缓存
+        assert quotes['^GSPC']['market_cap'] is None
+        ticker_cls.assert_called_once_with('AAPL')
+
+    def test_unknown_when_info_fails(self):
+        from src.services.yahoo_finance_provider import YahooFinanceProvider
+
+        provider = YahooFinanceProvider()
+        with patch('src.services.yahoo_finance_provider.yf.download', return_value=self._bars(['AAPL', 'MSFT'])), \
+                patch('src.services.yahoo_finance_provider.yf.Ticker', side_effect=ConnectionError("down")):
+            quotes = provider.get_quotes_batch(['AAPL', 'MSFT'])
+
+        assert [(q['market_cap'], q['pe_ratio']) for q in quotes] == [(None, None), (None, None)]
 
 
 class TestUSStockServiceIntegration: